@@ -4,6 +4,11 @@
     'use strict';
 
     let vesselData = [];
+    let manifest = null;
+    let registryDigest = null;
+    const vesselRows = new Map();
+    const detailShards = new Map();
+    const detailedVessels = new WeakSet();
 
     // Load Mapbox token from serverless function
     async function loadMapboxToken() {
@@ -53,17 +58,33 @@
         }
     }
 
-    // Load vessel data from JSON file
+    // Load vessel data: the slim index from the build manifest, or the full registry if there is none
     async function loadVesselData() {
         try {
             console.log('Loading vessel data...');
-            const response = await fetch('data/shadow_fleet.json?t=' + Date.now());
-
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+            const manifestResponse = await fetch('data/manifest.json', { cache: 'no-cache' });
+
+            if (manifestResponse.ok) {
+                manifest = await manifestResponse.json();
+                // Content-hashed files never change, so the browser cache can serve them as-is
+                const response = await fetch(`data/${manifest.index}`);
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                vesselData = await response.json();
+                vesselData.forEach((vessel, row) => vesselRows.set(vessel, row));
+                registryDigest = manifest.registry || null;
+            } else {
+                console.warn('No data manifest, falling back to shadow_fleet.json');
+                const response = await fetch('data/shadow_fleet.json', { cache: 'no-cache' });
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                const body = await response.arrayBuffer();
+                vesselData = JSON.parse(new TextDecoder().decode(body));
+                registryDigest = await digestOf(body);
             }
 
-            vesselData = await response.json();
             console.log(`Loaded ${vesselData.length} vessels`);
 
             return vesselData;
@@ -73,6 +94,52 @@
         }
     }
 
+    // SHA-256 prefix of the registry bytes, as scrappers/build_frontend_data.py registry_digest() writes it
+    async function digestOf(body) {
+        if (!window.crypto || !crypto.subtle) {
+            return null;
+        }
+        const hash = new Uint8Array(await crypto.subtle.digest('SHA-256', body));
+        return Array.from(hash.slice(0, 8), byte => byte.toString(16).padStart(2, '0')).join('');
+    }
+
+    // Whether a prebuilt index (clusters.json, search.json, photos.json) was built from the loaded registry
+    function matchesRegistry(index) {
+        return Boolean(index && registryDigest && index.registry === registryDigest);
+    }
+
+    // Whether sanctions, category and intelligence text are already on the record
+    function hasDetails(vessel) {
+        return !vesselRows.has(vessel) || detailedVessels.has(vessel);
+    }
+
+    // Fetch the detail shard holding a vessel and merge its fields into the record
+    async function loadDetails(vessel) {
+        if (hasDetails(vessel)) {
+            return vessel;
+        }
+
+        const row = vesselRows.get(vessel);
+        const shard = Math.floor(row / manifest.shard_size);
+        if (!detailShards.has(shard)) {
+            detailShards.set(shard, fetch(`data/${manifest.shards[shard]}`).then(response => {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                return response.json();
+            }).catch(error => {
+                // Let the next click retry
+                detailShards.delete(shard);
+                throw error;
+            }));
+        }
+
+        const details = await detailShards.get(shard);
+        Object.assign(vessel, details[row % manifest.shard_size]);
+        detailedVessels.add(vessel);
+        return vessel;
+    }
+
     // Plot vessels with saved positions
     function plotVesselsWithPositions() {
         // Filter vessels that have position data
@@ -80,8 +147,8 @@
 
         console.log(`Plotting ${vesselsWithPositions.length} vessels with saved positions...`);
 
-        // Plot on map
-        MapModule.plotVessels(vesselsWithPositions);
+        // Plot on map (as prebuilt clusters when clusters.json matches the registry)
+        MapModule.plotVessels(vesselsWithPositions, vesselData);
 
         // Update stats
         const plottedVesselsEl = document.getElementById('plotted-vessels');
@@ -102,6 +169,8 @@
         `;
     }
 
+    window.VesselData = { hasDetails, loadDetails, matchesRegistry };
+
     // Start application when DOM is ready
     if (document.readyState === 'loading') {
         document.addEventListener('DOMContentLoaded', init);
@@ -1,7 +1,11 @@
 // Map Module - Handles Mapbox GL JS initialization and vessel plotting
 
 const MapModule = (function() {
+    const CLUSTER_INDEX_URL = 'data/clusters.json'; // Per-zoom clusters from scrappers/marker_clusters.py
+    const CLUSTER_LAYERS = ['vessel-clusters', 'vessel-cluster-counts', 'vessel-points', 'vessel-selected'];
+
     let map;
+    let mapLoaded = false;
     let markers = [];
     let infrastructureMarkers = [];
     let infrastructureVisible = true;
@@ -11,6 +15,11 @@ const MapModule = (function() {
     let tooltipElement = null;
     let trackedVesselMarkers = {}; // Store markers by MMSI
     let vesselTrails = {}; // Store trail layers by MMSI
+    let clusterIndex = null; // Promise of clusters.json, resolving to null when none matches the registry
+    let clusterRegistry = null; // Registry the cluster features' rows point into, while the layers are in use
+    let clusterRows = null; // vessel -> registry row
+    let clusterLevel = null;
+    let clusterPopup = null;
 
     // Initialize Mapbox map
     function init() {
@@ -44,6 +53,7 @@ const MapModule = (function() {
 
         // Add grid overlay and infrastructure when map loads
         map.on('load', () => {
+            mapLoaded = true;
             addGridOverlay();
             loadInfrastructure();
             loadSubmarineCables();
@@ -402,11 +412,18 @@ const MapModule = (function() {
         }
     }
 
-    // Plot vessels on map
-    function plotVessels(vessels) {
+    // Plot vessels on map: prebuilt clusters when clusters.json matches `registry`, else a DOM marker per vessel
+    async function plotVessels(vessels, registry = null) {
         // Clear existing markers
         clearMarkers();
 
+        const index = registry ? await loadClusterIndex() : null;
+        if (index) {
+            plotClusters(index, registry);
+            console.log(`Plotted ${index.points} vessels as prebuilt clusters (${registry.length - index.points} skipped)`);
+            return;
+        }
+
         let plottedCount = 0;
 
         vessels.forEach(vessel => {
@@ -446,10 +463,169 @@ const MapModule = (function() {
         console.log(`Plotted ${plottedCount} vessels on map (${vessels.length - plottedCount} skipped)`);
     }
 
+    // Load clusters.json once; null if none is deployed or it was built from another registry
+    function loadClusterIndex() {
+        if (!clusterIndex) {
+            clusterIndex = fetch(CLUSTER_INDEX_URL, { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .then(index => VesselData.matchesRegistry(index) ? index : null)
+                .catch(() => null);
+        }
+        return clusterIndex;
+    }
+
+    // One GeoJSON source for the whole fleet, holding the prebuilt level for the current zoom
+    function plotClusters(index, registry) {
+        clusterRegistry = registry;
+        clusterRows = new Map(registry.map((vessel, row) => [vessel, row]));
+        if (!mapLoaded) {
+            map.once('load', () => plotClusters(index, registry));
+            return;
+        }
+        if (!map.getSource('vessel-clusters')) {
+            addClusterLayers();
+        }
+        clusterLevel = null;
+        updateClusterLevel();
+    }
+
+    function addClusterLayers() {
+        map.addSource('vessel-clusters', {
+            type: 'geojson',
+            data: { type: 'FeatureCollection', features: [] }
+        });
+
+        map.addLayer({
+            id: 'vessel-clusters',
+            type: 'circle',
+            source: 'vessel-clusters',
+            filter: ['has', 'n'],
+            paint: {
+                'circle-color': 'rgba(0, 255, 0, 0.15)',
+                'circle-stroke-color': '#00ff00',
+                'circle-stroke-width': 1,
+                'circle-radius': ['interpolate', ['linear'], ['get', 'n'], 2, 10, 100, 16, 10000, 26]
+            }
+        });
+
+        map.addLayer({
+            id: 'vessel-cluster-counts',
+            type: 'symbol',
+            source: 'vessel-clusters',
+            filter: ['has', 'n'],
+            layout: {
+                'text-field': ['to-string', ['get', 'n']],
+                'text-font': ['DIN Offc Pro Medium', 'Arial Unicode MS Regular'],
+                'text-size': 11,
+                'text-allow-overlap': true
+            },
+            paint: {
+                'text-color': '#00ff00'
+            }
+        });
+
+        map.addLayer({
+            id: 'vessel-points',
+            type: 'circle',
+            source: 'vessel-clusters',
+            filter: ['has', 'row'],
+            paint: {
+                'circle-radius': 5,
+                'circle-color': '#00ff00',
+                'circle-opacity': 0.8,
+                'circle-stroke-color': 'rgba(0, 255, 0, 0.4)',
+                'circle-stroke-width': 3
+            }
+        });
+
+        map.addLayer({
+            id: 'vessel-selected',
+            type: 'circle',
+            source: 'vessel-clusters',
+            filter: ['==', ['get', 'row'], -1],
+            paint: {
+                'circle-radius': 7,
+                'circle-color': '#ffaa00',
+                'circle-stroke-color': 'rgba(255, 170, 0, 0.6)',
+                'circle-stroke-width': 6
+            }
+        });
+
+        // A cluster zooms in to where it splits; a vessel opens its popup and details
+        map.on('click', 'vessel-clusters', (e) => {
+            const feature = e.features[0];
+            map.easeTo({ center: feature.geometry.coordinates, zoom: feature.properties.z });
+        });
+
+        map.on('click', 'vessel-points', (e) => {
+            const vessel = clusterRegistry[e.features[0].properties.row];
+            showClusterPopup(vessel);
+            selectVessel(vessel);
+        });
+
+        map.on('mouseenter', 'vessel-clusters', () => {
+            map.getCanvas().style.cursor = 'pointer';
+        });
+
+        map.on('mouseleave', 'vessel-clusters', () => {
+            map.getCanvas().style.cursor = '';
+        });
+
+        map.on('mouseenter', 'vessel-points', (e) => {
+            map.getCanvas().style.cursor = 'pointer';
+            const feature = e.features[0];
+            const point = map.project(feature.geometry.coordinates);
+            const canvas = map.getCanvas().getBoundingClientRect();
+            // showTooltip only needs the screen rectangle of what it points at
+            showTooltip(clusterRegistry[feature.properties.row], {
+                getBoundingClientRect: () => ({ left: canvas.left + point.x - 6, top: canvas.top + point.y - 6, width: 12, height: 12 })
+            });
+        });
+
+        map.on('mouseleave', 'vessel-points', () => {
+            map.getCanvas().style.cursor = '';
+            hideTooltip();
+        });
+
+        map.on('zoomend', updateClusterLevel);
+    }
+
+    // Swap in the prebuilt level for the current zoom (content-hashed, so the browser cache serves revisits)
+    async function updateClusterLevel() {
+        const index = await clusterIndex;
+        if (!index || !clusterRegistry) return;
+
+        const zooms = index.zooms;
+        const level = Math.min(Math.max(Math.floor(map.getZoom()), zooms[0]), zooms[zooms.length - 1]);
+        if (level === clusterLevel) return;
+
+        clusterLevel = level;
+        map.getSource('vessel-clusters').setData(`data/${index.levels[level]}`);
+    }
+
+    function showClusterPopup(vessel) {
+        if (clusterPopup) {
+            clusterPopup.remove();
+        }
+        clusterPopup = new mapboxgl.Popup({
+            offset: 15,
+            closeButton: true,
+            closeOnClick: false
+        })
+            .setLngLat([vessel.position.lon, vessel.position.lat])
+            .setHTML(createVesselPopupContent(vessel))
+            .addTo(map);
+    }
+
     // Select a vessel
     function selectVessel(vessel, element) {
         selectedVesselId = vessel.IMO;
 
+        if (clusterRows) {
+            const row = clusterRows.has(vessel) ? clusterRows.get(vessel) : -1;
+            map.setFilter('vessel-selected', ['==', ['get', 'row'], row]);
+        }
+
         // Update all markers
         markers.forEach(m => {
             if (m.vessel.IMO === vessel.IMO) {
@@ -473,6 +649,17 @@ const MapModule = (function() {
 
     // Focus on vessel
     function focusOnVessel(vessel) {
+        if (clusterRows && clusterRows.has(vessel) && vessel.position) {
+            map.flyTo({
+                center: [vessel.position.lon, vessel.position.lat],
+                zoom: 8,
+                duration: 1500
+            });
+            showClusterPopup(vessel);
+            selectVessel(vessel);
+            return;
+        }
+
         const marker = markers.find(m => m.vessel.IMO === vessel.IMO);
         if (marker) {
             const lngLat = marker.marker.getLngLat();
@@ -1190,9 +1377,25 @@ const MapModule = (function() {
         return infrastructureMarkers.map(m => m.feature);
     }
 
+    // Current zoom, for modules that load zoom-dependent data
+    function getZoom() {
+        return map.getZoom();
+    }
+
+    // Call handler(zoom) whenever a zoom gesture or animation ends
+    function onZoomEnd(handler) {
+        map.on('zoomend', () => handler(map.getZoom()));
+    }
+
     // Toggle vessel visibility
     function toggleVessels() {
         vesselsVisible = !vesselsVisible;
+        if (clusterRegistry && map.getSource('vessel-clusters')) {
+            CLUSTER_LAYERS.forEach(id => map.setLayoutProperty(id, 'visibility', vesselsVisible ? 'visible' : 'none'));
+            if (!vesselsVisible && clusterPopup) {
+                clusterPopup.remove();
+            }
+        }
         markers.forEach(m => {
             if (vesselsVisible) {
                 m.marker.addTo(map);
@@ -1215,7 +1418,9 @@ const MapModule = (function() {
         updateTrackedVessel,
         removeTrackedVessel,
         clearAllTrackedVessels,
-        getInfrastructure
+        getInfrastructure,
+        getZoom,
+        onZoomEnd
     };
 })();
 
@@ -5,6 +5,8 @@ const TrackerModule = (function() {
     const REFRESH_INTERVAL = 60 * 60 * 1000; // 60 minutes in milliseconds
     const PROXIMITY_RADIUS_KM = 10; // Alert radius for critical infrastructure
     const MAX_TRACKED_VESSELS = 5; // Maximum simultaneous tracked vessels
+    const TRAIL_INDEX_URL = 'data/trails.json'; // Prebuilt LOD trails from scrappers/trail_lod.py
+    const TRAIL_MAX_AGE = 24 * 60 * 60 * 1000; // Older prebuilt trails miss too much of the requested window
 
     const VESSEL_COLORS = [
         { name: 'orange', hex: '#ffaa00', class: 'tracked-marker-orange' },
@@ -16,6 +18,7 @@ const TrackerModule = (function() {
 
     let trackedVessels = []; // Array of tracked vessel objects
     let countdownInterval = null;
+    let trailIndex = null; // Promise of trails.json, resolving to null when none is deployed
     let apiStats = {
         totalCredits: 20000,
         usedCredits: 0,
@@ -28,6 +31,10 @@ const TrackerModule = (function() {
         console.log('Tracker Module initialized');
         setupEventListeners();
         fetchApiUsage(); // Get initial API usage stats
+
+        if (window.MapModule) {
+            window.MapModule.onZoomEnd(refreshTrailLevels);
+        }
     }
 
     // Setup event listeners
@@ -330,7 +337,71 @@ const TrackerModule = (function() {
         }
     }
 
-    // Fetch vessel history (with IMO fallback)
+    // Load trails.json once; null if no prebuilt trails are deployed
+    function loadTrailIndex() {
+        if (!trailIndex) {
+            trailIndex = fetch(TRAIL_INDEX_URL, { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null);
+        }
+        return trailIndex;
+    }
+
+    // Coarsest prebuilt level that is still exact at this zoom
+    function trailLevelForZoom(zooms, zoom) {
+        const level = zooms.find(z => z >= zoom);
+        return level !== undefined ? level : zooms[zooms.length - 1];
+    }
+
+    // Load the prebuilt trail level for the current zoom into trackedVessel.history.
+    // Returns false when the vessel has no prebuilt trail covering `days`, or the trails
+    // were generated more than TRAIL_MAX_AGE ago and no longer reach the present.
+    async function loadStoredTrail(trackedVessel, days = 7) {
+        const index = await loadTrailIndex();
+        if (!index || index.days < days) return false;
+        if (!index.generated || Date.now() - index.generated * 1000 > TRAIL_MAX_AGE) return false;
+
+        const vessel = trackedVessel.vessel;
+        const levels = index.vessels[vessel.MMSI] || index.vessels[vessel.IMO];
+        if (!levels) return false;
+
+        const zoom = window.MapModule ? window.MapModule.getZoom() : index.zooms[0];
+        const level = trailLevelForZoom(index.zooms, zoom);
+        if (trackedVessel.trailLevel === level) return true;
+
+        const response = await fetch(`data/${levels[level]}`);
+        if (!response.ok) return false;
+        const trail = await response.json();
+
+        trackedVessel.history = trail.geometry.coordinates.map(([lng, lat]) => ({ lat, lng }));
+        trackedVessel.trailLevel = level;
+        return true;
+    }
+
+    // Swap prebuilt trails to the level that matches the new zoom
+    async function refreshTrailLevels() {
+        for (const trackedVessel of trackedVessels) {
+            if (!trackedVessel.showHistory || trackedVessel.trailLevel === undefined) continue;
+
+            const previousLevel = trackedVessel.trailLevel;
+            try {
+                if (await loadStoredTrail(trackedVessel) && trackedVessel.trailLevel !== previousLevel &&
+                    trackedVessel.currentPosition && window.MapModule) {
+                    window.MapModule.updateTrackedVessel(
+                        trackedVessel.vessel,
+                        trackedVessel.currentPosition,
+                        trackedVessel.color,
+                        trackedVessel.history,
+                        trackedVessel.showHistory
+                    );
+                }
+            } catch (error) {
+                console.error('Error loading trail level:', error);
+            }
+        }
+    }
+
+    // Fetch vessel history (prebuilt trail first, then the API with IMO fallback)
     async function fetchVesselHistory(trackedVessel, days = 7) {
         if (!trackedVessel) {
             console.error('Cannot fetch history: vessel missing');
@@ -341,6 +412,24 @@ const TrackerModule = (function() {
         const imo = trackedVessel.vessel.IMO;
 
         try {
+            // Prebuilt trails cost no API credits and come at the resolution the map needs
+            if (await loadStoredTrail(trackedVessel, days)) {
+                trackedVessel.showHistory = true;
+
+                if (window.MapModule && trackedVessel.currentPosition) {
+                    window.MapModule.updateTrackedVessel(
+                        trackedVessel.vessel,
+                        trackedVessel.currentPosition,
+                        trackedVessel.color,
+                        trackedVessel.history,
+                        trackedVessel.showHistory
+                    );
+                }
+
+                console.log(`Loaded zoom ${trackedVessel.trailLevel} trail (${trackedVessel.history.length} points) for ${trackedVessel.vessel.vessel_name}`);
+                return;
+            }
+
             // Calculate date range
             const endDate = new Date();
             const startDate = new Date();
@@ -417,7 +506,7 @@ const TrackerModule = (function() {
     }
 
     // Toggle history trail visibility
-    function toggleHistory(mmsi) {
+    async function toggleHistory(mmsi) {
         const trackedVessel = trackedVessels.find(v => v.vessel.MMSI === mmsi);
         if (!trackedVessel) return;
 
@@ -428,6 +517,11 @@ const TrackerModule = (function() {
             // Toggle visibility
             trackedVessel.showHistory = !trackedVessel.showHistory;
 
+            // The zoom may have changed while a prebuilt trail was hidden
+            if (trackedVessel.showHistory && trackedVessel.trailLevel !== undefined) {
+                await loadStoredTrail(trackedVessel).catch(error => console.error('Error loading trail level:', error));
+            }
+
             if (window.MapModule && trackedVessel.currentPosition) {
                 window.MapModule.updateTrackedVessel(
                     trackedVessel.vessel,
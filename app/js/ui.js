@@ -5,6 +5,18 @@ const UIModule = (function() {
     let filteredVessels = [];
     let searchQuery = '';
 
+    // Full-text index built by scrappers/search_index.py; substring filtering covers the gap until it loads
+    const SEARCH_INDEX_URL = 'data/search.json';
+    let searchIndex = null;
+    const searchShards = new Map();
+    let searchGeneration = 0;
+
+    // Mirrored photos from scrappers/photo_mirror.py: list thumbnails in sprite sheets, local detail copies
+    const PHOTO_INDEX_URL = 'data/photos.json';
+    let photoIndex = null;
+    let photos = null;
+    const vesselRows = new Map();
+
     // Initialize UI
     function init() {
         setupEventListeners();
@@ -101,12 +113,49 @@ const UIModule = (function() {
     function loadVessels(vessels) {
         allVessels = vessels;
         filteredVessels = vessels;
+        vesselRows.clear();
+        vessels.forEach((vessel, row) => vesselRows.set(vessel, row));
         updateVesselList();
         updateStats();
+
+        loadPhotoIndex().then(index => {
+            photos = index;
+            if (photos) updateVesselList();
+        });
+    }
+
+    // photos.json, or null when the mirror is missing or built from other data
+    function loadPhotoIndex() {
+        if (!photoIndex) {
+            photoIndex = fetch(PHOTO_INDEX_URL, { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .then(manifest => VesselData.matchesRegistry(manifest) ? manifest : null)
+                .catch(() => null);
+        }
+        return photoIndex;
+    }
+
+    // [sheet, slot, detail copy] of a vessel's mirrored photo, if any
+    function mirroredPhoto(vessel) {
+        const image = photos ? photos.vessels[vesselRows.get(vessel)] : null;
+        return image === null || image === undefined ? null : photos.photos[image];
+    }
+
+    function thumbHtml(vessel) {
+        const photo = mirroredPhoto(vessel);
+        if (!photo) return '';
+        const [width, height] = photos.thumb.map(size => size / photos.scale);
+        const [sheet, slot] = photo;
+        const x = (slot % photos.columns) * width;
+        const y = Math.floor(slot / photos.columns) * height;
+        return `<div class="vessel-thumb" style="width: ${width}px; height: ${height}px; ` +
+            `background-image: url('data/${photos.sheets[sheet]}'); background-size: ${photos.columns * width}px auto; ` +
+            `background-position: -${x}px -${y}px"></div>`;
     }
 
     // Filter vessels based on search
     function filterVessels() {
+        const generation = ++searchGeneration;
         filteredVessels = allVessels.filter(vessel => {
             // Search filter
             return searchQuery === '' ||
@@ -117,6 +166,117 @@ const UIModule = (function() {
 
         updateVesselList();
         updateStats();
+
+        if (searchQuery.length < 2) return;
+        searchRows(searchQuery)
+            .then(rows => {
+                // A newer keystroke has already replaced this result
+                if (rows === null || generation !== searchGeneration) return;
+                // Ranked full-text hits first, then substring matches the index has no word for (partial IMOs)
+                const ranked = rows.map(row => allVessels[row]).filter(Boolean);
+                const seen = new Set(ranked);
+                filteredVessels = ranked.concat(filteredVessels.filter(vessel => !seen.has(vessel)));
+                updateVesselList();
+                updateStats();
+            })
+            .catch(error => console.warn('Full-text search unavailable:', error));
+    }
+
+    // search.json plus the per-vessel lengths, or null when the index is missing or built from other data
+    function loadSearchIndex() {
+        if (!searchIndex) {
+            searchIndex = fetch(SEARCH_INDEX_URL, { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .then(async manifest => {
+                    if (!VesselData.matchesRegistry(manifest)) return null;
+                    const response = await fetch(`data/${manifest.lengths}`);
+                    if (!response.ok) return null;
+                    return { manifest, lengths: await response.json(), stopwords: new Set(manifest.stopwords) };
+                })
+                .catch(() => null);
+        }
+        return searchIndex;
+    }
+
+    function loadSearchShard(index, number) {
+        if (!searchShards.has(number)) {
+            searchShards.set(number, fetch(`data/${index.manifest.shards[number].file}`)
+                .then(response => response.json())
+                .then(shard => {
+                    // Rows are gap-coded within each term
+                    for (let t = 0; t < shard.terms.length; t++) {
+                        for (let i = shard.offsets[t] + 1; i < shard.offsets[t + 1]; i++) {
+                            shard.rows[i] += shard.rows[i - 1];
+                        }
+                    }
+                    return shard;
+                }));
+        }
+        return searchShards.get(number);
+    }
+
+    // First position whose value is >= (lower) or > (upper) the given string
+    function bound(values, value, upper) {
+        let low = 0, high = values.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (values[mid] < value || (upper && values[mid] === value)) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    }
+
+    // Postings of a term, or of every term starting with it; the sorted shards make a prefix one range
+    async function termPostings(index, term, prefix) {
+        const high = prefix ? term + '\uffff' : term;
+        const firstTerms = index.manifest.shards.map(shard => shard.first);
+        const postings = [];
+        for (let number = Math.max(0, bound(firstTerms, term, true) - 1); number < bound(firstTerms, high, true); number++) {
+            const shard = await loadSearchShard(index, number);
+            const start = bound(shard.terms, term, false);
+            const end = prefix ? bound(shard.terms, high, true) : start + (shard.terms[start] === term ? 1 : 0);
+            for (let t = start; t < end; t++) {
+                const [from, to] = [shard.offsets[t], shard.offsets[t + 1]];
+                postings.push({ rows: shard.rows.slice(from, to), tf: shard.tf.slice(from, to) });
+            }
+        }
+        return postings;
+    }
+
+    // Vessel rows matching every word of the query (the last one as a prefix), best BM25 score first
+    async function searchRows(query) {
+        const index = await loadSearchIndex();
+        if (!index) return null;
+        const { manifest, lengths, stopwords } = index;
+        const words = (query.toLowerCase().match(/[\p{L}\p{N}]+/gu) || []).filter(word => !stopwords.has(word));
+        if (words.length === 0) return null;
+
+        let scores = null;
+        for (let w = 0; w < words.length && (scores === null || scores.size > 0); w++) {
+            const postings = (await termPostings(index, words[w], w === words.length - 1))
+                .sort((a, b) => b.rows.length - a.rows.length)
+                .slice(0, manifest.max_expansions);
+            // A word scores once per vessel: its best-matching expansion
+            const best = new Map();
+            for (const { rows, tf } of postings) {
+                const idf = Math.log(1 + (manifest.docs - rows.length + 0.5) / (rows.length + 0.5));
+                rows.forEach((row, i) => {
+                    const norm = manifest.k1 * (1 - manifest.b + manifest.b * lengths[row] / manifest.avgdl);
+                    const score = idf * tf[i] * (manifest.k1 + 1) / (tf[i] + norm);
+                    if (score > (best.get(row) || 0)) best.set(row, score);
+                });
+            }
+            if (scores === null) {
+                scores = best;
+            } else {
+                const both = new Map();
+                best.forEach((score, row) => {
+                    if (scores.has(row)) both.set(row, scores.get(row) + score);
+                });
+                scores = both;
+            }
+        }
+        return [...scores.entries()].sort((a, b) => b[1] - a[1] || a[0] - b[0]).map(([row]) => row);
     }
 
     // Update vessel list display
@@ -133,12 +293,15 @@ const UIModule = (function() {
 
         vesselList.innerHTML = filteredVessels.map(vessel => `
             <div class="vessel-item" data-imo="${vessel.IMO}">
-                <div class="vessel-name">${vessel.vessel_name || 'UNKNOWN'}</div>
-                <div class="vessel-meta">
-                    <span class="vessel-imo">IMO: ${vessel.IMO || 'N/A'}</span>
-                    <span class="vessel-flag">${vessel.flag || 'N/A'}</span>
+                ${thumbHtml(vessel)}
+                <div class="vessel-summary">
+                    <div class="vessel-name">${vessel.vessel_name || 'UNKNOWN'}</div>
+                    <div class="vessel-meta">
+                        <span class="vessel-imo">IMO: ${vessel.IMO || 'N/A'}</span>
+                        <span class="vessel-flag">${vessel.flag || 'N/A'}</span>
+                    </div>
+                    <div class="vessel-type">${vessel.vessel_type || 'Unknown Type'}</div>
                 </div>
-                <div class="vessel-type">${vessel.vessel_type || 'Unknown Type'}</div>
             </div>
         `).join('');
 
@@ -171,8 +334,18 @@ const UIModule = (function() {
         });
     }
 
-    // Show vessel details in sidebar
+    // Show vessel details in sidebar, fetching its detail shard first if needed
     function showVesselDetails(vessel) {
+        if (window.VesselData && !window.VesselData.hasDetails(vessel)) {
+            window.VesselData.loadDetails(vessel)
+                .catch(error => console.error('Error loading vessel details:', error))
+                .then(() => renderVesselDetails(vessel));
+            return;
+        }
+        renderVesselDetails(vessel);
+    }
+
+    function renderVesselDetails(vessel) {
         const detailsPanel = document.getElementById('vessel-details');
 
         // Store current vessel data for tracking
@@ -184,8 +357,10 @@ const UIModule = (function() {
 
         const vesselInfo = vessel.vessel_information || 'No additional intelligence available.';
 
-        const photoHtml = vessel.vessel_photo_url
-            ? `<img src="${vessel.vessel_photo_url}" alt="${vessel.vessel_name}" class="vessel-detail-photo" onerror="this.style.display='none'">`
+        const mirrored = mirroredPhoto(vessel);
+        const photoUrl = mirrored ? `data/${mirrored[2]}` : vessel.vessel_photo_url;
+        const photoHtml = photoUrl
+            ? `<img src="${photoUrl}" alt="${vessel.vessel_name}" class="vessel-detail-photo" onerror="this.style.display='none'">`
             : '';
 
         detailsPanel.innerHTML = `
@@ -0,0 +1,406 @@
+"""Streaming AIS ingestion: decode raw AIVDM/AIVDO sentences and update registry positions in place.
+
+An alternative to polling the paid API vessel by vessel: any NMEA 0183 AIS
+feed (a receiver, an aggregator's TCP stream, a recorded file) carries
+position reports for every vessel in range. The decoder handles
+
+    1, 2, 3   class A position report      position, speed, course, status
+    5         class A static and voyage    IMO, callsign, name, destination
+    18        class B position report      position, speed, course
+    19        class B extended report      position, speed, course, name
+
+including messages split over several sentences, and drops every other
+message type. Filtering happens before the expensive part: the message type
+and MMSI sit in the first seven payload characters, so a sentence for a
+vessel outside the registry's MMSI set costs a split, a 7-character
+translate and a set lookup. Only wanted sentences get their checksum
+verified and their full payload decoded, which keeps a busy feed well above
+100k sentences/sec on one core.
+
+Payloads are 6-bit armored ASCII; translating every character to two octal
+digits turns the whole payload into one int(..., 8) call, and fields are then
+shifts and masks on that integer. NMEA 4.0 tag blocks (\\c:<unix time>*hh\\)
+give a report its receive time; without one the time of decoding is used.
+
+    python ais_stream.py --registry ../app/data/shadow_fleet.json --replay feed.nmea
+    python ais_stream.py --registry ../app/data/shadow_fleet.json --tcp 127.0.0.1:10110 --checkpoint 60
+    python standin_server.py --ais-port 10110   # local stand-in feed
+"""
+import argparse
+import gzip
+import json
+import socket
+import time
+from functools import reduce
+from operator import xor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import telemetry
+from fleet_journal import write_json_atomic
+
+# Armored payload character -> its 6-bit value as two octal digits
+ARMOR = str.maketrans({chr(c): f"{c - 48 if c < 88 else c - 56:02o}" for c in list(range(48, 88)) + list(range(96, 120))})
+SIXBIT_TEXT = "@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !\"#$%&'()*+,-./0123456789:;<=>?"
+# First payload character of each decoded type: 1-3 '1'-'3', 5 '5', 18 'B', 19 'C'
+TYPE_CHARS = frozenset('1235BC')
+NAV_STATUS = ('Under way using engine', 'At anchor', 'Not under command', 'Restricted manoeuverability',
+              'Constrained by her draught', 'Moored', 'Aground', 'Engaged in fishing', 'Under way sailing')
+# Positions are in 1/10000 minute; 181 and 91 degrees mean "not available"
+LON_LIMIT = 180 * 600000
+LAT_LIMIT = 90 * 600000
+# Bits each type must have; shorter payloads (some transmitters trim type 5) are zero-padded
+MESSAGE_BITS = {1: 168, 2: 168, 3: 168, 5: 422, 18: 168, 19: 312}
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def text(value: int, chars: int) -> str:
+    """6-bit AIS text, '@' padding and trailing spaces removed"""
+    out = [SIXBIT_TEXT[(value >> (6 * (chars - 1 - i))) & 63] for i in range(chars)]
+    return ''.join(out).split('@', 1)[0].rstrip()
+
+
+def checksum_ok(sentence: str) -> bool:
+    """XOR of the characters between the leading '!' and '*' against the two hex digits after it"""
+    star = sentence.rfind('*')
+    try:
+        return star > 0 and reduce(xor, sentence[1:star].encode('ascii'), 0) == int(sentence[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+
+
+def tag_time(tag: str) -> Optional[float]:
+    """Unix time from an NMEA 4.0 tag block's c: field (seconds, or milliseconds from some receivers)"""
+    for field in tag.split('*', 1)[0].split(','):
+        if field.startswith('c:'):
+            try:
+                value = float(field[2:])
+            except ValueError:
+                return None
+            return value / 1000 if value > 1e11 else value
+    return None
+
+
+def decode_payload(payload: str, fill: int) -> Optional[Dict]:
+    """Decode one complete armored payload of a supported type; None for other types"""
+    n = int(payload.translate(ARMOR), 8) >> fill
+    bits = 6 * len(payload) - fill
+    msg_type = n >> (bits - 6)
+    need = MESSAGE_BITS.get(msg_type)
+    if need is None:
+        return None
+    if bits < need:
+        n <<= need - bits
+        bits = need
+    mmsi = (n >> (bits - 38)) & 0x3FFFFFFF
+    if msg_type == 5:
+        return {
+            'type': 5,
+            'mmsi': mmsi,
+            'imo': (n >> (bits - 70)) & 0x3FFFFFFF or None,
+            'callsign': text((n >> (bits - 112)) & ((1 << 42) - 1), 7),
+            'name': text((n >> (bits - 232)) & ((1 << 120) - 1), 20),
+            'shiptype': (n >> (bits - 240)) & 0xFF,
+            'draught': ((n >> (bits - 302)) & 0xFF) / 10,
+            'destination': text((n >> (bits - 422)) & ((1 << 120) - 1), 20),
+        }
+    # Speed to heading is the same 87-bit run in every position report, from bit 50 (types 1-3) or 46 (18, 19)
+    m = n >> (bits - (137 if msg_type <= 3 else 133))
+    speed = (m >> 77) & 0x3FF
+    lon = (m >> 48) & 0xFFFFFFF
+    lat = (m >> 21) & 0x7FFFFFF
+    course = (m >> 9) & 0xFFF
+    heading = m & 0x1FF
+    if lon >> 27:
+        lon -= 1 << 28
+    if lat >> 26:
+        lat -= 1 << 27
+    message = {
+        'type': msg_type,
+        'mmsi': mmsi,
+        'speed': speed / 10 if speed != 1023 else None,
+        'lon': lon / 600000 if -LON_LIMIT <= lon <= LON_LIMIT else None,
+        'lat': lat / 600000 if -LAT_LIMIT <= lat <= LAT_LIMIT else None,
+        'course': course / 10 if course < 3600 else None,
+        'heading': heading if heading < 360 else None,
+    }
+    if msg_type <= 3:
+        status = (n >> (bits - 42)) & 0xF
+        message['status'] = NAV_STATUS[status] if status < len(NAV_STATUS) else None
+    elif msg_type == 19:
+        message['name'] = text((n >> (bits - 263)) & ((1 << 120) - 1), 20)
+        message['shiptype'] = (n >> (bits - 271)) & 0xFF
+    return message
+
+
+class AisDecoder:
+    """Decodes a stream of NMEA lines into messages for the wanted MMSIs (all when `mmsis` is None)"""
+
+    def __init__(self, mmsis: Optional[Iterable[int]] = None, check: bool = True):
+        self.mmsis = None if mmsis is None else frozenset(mmsis)
+        self.check = check
+        self.pending: Dict[tuple, Optional[list]] = {}  # (sequence id, channel) -> fragments so far
+        self.stats = {'sentences': 0, 'decoded': 0, 'filtered': 0, 'other_types': 0, 'bad_checksum': 0,
+                      'malformed': 0, 'fragments_dropped': 0}
+
+    def decode(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """Yield decoded messages with a 'time' (tag block receive time, else None) as lines arrive"""
+        wanted, check, pending, armor = self.mmsis, self.check, self.pending, ARMOR
+        sentences = filtered = other = bad = malformed = dropped = decoded = 0
+        try:
+            for line in lines:
+                if not line or line.isspace():
+                    continue
+                sentences += 1
+                tag = None
+                if line[0] != '!':
+                    start = line.find('!')
+                    if start < 0:
+                        malformed += 1
+                        continue
+                    if line[0] == '\\':
+                        tag = line[1:start]  # parsed only for messages that get through
+                    line = line[start:]
+                parts = line.split(',')
+                if len(parts) != 7 or not parts[5]:
+                    malformed += 1
+                    continue
+                payload = parts[5]
+                count = parts[1]
+
+                if count == '1':
+                    if payload[0] not in TYPE_CHARS:
+                        other += 1
+                        continue
+                    if wanted is not None:
+                        try:
+                            mmsi = (int(payload[1:7].translate(armor), 8) >> 4) & 0x3FFFFFFF
+                        except ValueError:  # a character outside the armor alphabet, or no MMSI at all
+                            malformed += 1
+                            continue
+                        if len(payload) < 7 or mmsi not in wanted:
+                            filtered += 1
+                            continue
+                    if check and not checksum_ok(line):
+                        bad += 1
+                        continue
+                    fill = parts[6][:1]
+                else:
+                    # Fragments of one message share a sequence id and channel and arrive in order
+                    key = (parts[3], parts[4])
+                    if parts[2] == '1':
+                        if key in pending:
+                            dropped += 1
+                        if payload[0] not in TYPE_CHARS:
+                            pending[key] = None
+                            other += 1
+                            continue
+                        if wanted is not None:
+                            try:
+                                mmsi = (int(payload[1:7].translate(armor), 8) >> 4) & 0x3FFFFFFF
+                            except ValueError:  # a character outside the armor alphabet, or no MMSI at all
+                                pending[key] = None
+                                malformed += 1
+                                continue
+                            if len(payload) < 7 or mmsi not in wanted:
+                                pending[key] = None
+                                filtered += 1
+                                continue
+                        fragments = pending[key] = [count]
+                    else:
+                        fragments = pending.get(key)
+                        if fragments is None:
+                            if key not in pending:
+                                dropped += 1
+                            if parts[2] == count:
+                                pending.pop(key, None)
+                            continue
+                        try:
+                            out_of_order = fragments[0] != count or int(parts[2]) != len(fragments)
+                        except ValueError:  # non-numeric fragment number
+                            del pending[key]
+                            malformed += 1
+                            continue
+                        if out_of_order:
+                            del pending[key]
+                            dropped += 1
+                            continue
+                    if check and not checksum_ok(line):
+                        bad += 1
+                        pending.pop(key, None)
+                        continue
+                    fragments.append(payload)
+                    if parts[2] != count:
+                        continue
+                    del pending[key]
+                    payload = ''.join(fragments[1:])
+                    fill = parts[6][:1]
+
+                try:
+                    message = decode_payload(payload, int(fill or 0))
+                except (ValueError, IndexError):
+                    malformed += 1
+                    continue
+                if message is None:
+                    other += 1
+                    continue
+                decoded += 1
+                message['time'] = tag_time(tag) if tag else None
+                yield message
+        finally:
+            s = self.stats
+            s['sentences'] += sentences
+            s['decoded'] += decoded
+            s['filtered'] += filtered
+            s['other_types'] += other
+            s['bad_checksum'] += bad
+            s['malformed'] += malformed
+            s['fragments_dropped'] += dropped
+
+
+class PositionUpdater:
+    """Applies decoded messages to registry records in place, matched by MMSI"""
+
+    def __init__(self, vessels: List[Dict]):
+        self.by_mmsi: Dict[int, List[Dict]] = {}
+        for vessel in vessels:
+            mmsi = str(vessel.get('MMSI') or '')
+            if mmsi.isdigit():
+                self.by_mmsi.setdefault(int(mmsi), []).append(vessel)
+        self.updated = set()
+        self.stats = {'positions': 0, 'voyage': 0, 'stale': 0, 'no_position': 0}
+
+    @property
+    def mmsis(self) -> frozenset:
+        return frozenset(self.by_mmsi)
+
+    def apply(self, message: Dict) -> int:
+        """Update every record with the message's MMSI; returns how many changed"""
+        vessels = self.by_mmsi.get(message['mmsi'])
+        if not vessels:
+            return 0
+        when = time.strftime(TIME_FORMAT, time.gmtime(message['time'] if message['time'] is not None else None))
+        changed = 0
+        for vessel in vessels:
+            if message['type'] == 5:
+                if message['destination']:
+                    vessel['destination'] = message['destination']
+                    self.stats['voyage'] += 1
+                    changed += 1
+                continue
+            if message['lat'] is None or message['lon'] is None:
+                self.stats['no_position'] += 1
+                continue
+            # Replayed or reordered feeds must not move a vessel back in time
+            if (vessel.get('lastUpdate') or '') > when:
+                self.stats['stale'] += 1
+                continue
+            vessel['position'] = {'lat': round(message['lat'], 6), 'lon': round(message['lon'], 6)}
+            vessel['speed'] = message['speed']
+            vessel['course'] = message['course']
+            if message.get('status'):
+                vessel['navStatus'] = message['status']
+            vessel['lastUpdate'] = when
+            self.stats['positions'] += 1
+            changed += 1
+        if changed:
+            self.updated.add(message['mmsi'])
+        return changed
+
+
+def replay_lines(path: str) -> Iterator[str]:
+    """Lines of a recorded feed; .gz files are read compressed"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='ascii', errors='replace') as f:
+        yield from f
+
+
+def tcp_lines(host: str, port: int, timeout: float = 5.0, reconnect: bool = True) -> Iterator[str]:
+    """Lines from a TCP NMEA feed; yields '' when the feed is quiet so callers can checkpoint"""
+    backoff = 1.0
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=timeout) as sock:
+                backoff = 1.0
+                with sock.makefile('r', encoding='ascii', errors='replace', newline='') as f:
+                    while True:
+                        try:
+                            line = f.readline()
+                        except socket.timeout:
+                            yield ''
+                            continue
+                        if not line:
+                            break
+                        yield line
+        except OSError as error:
+            telemetry.error('ais_feed', error)
+            print(f"⚠ AIS feed {host}:{port}: {error}")
+        if not reconnect:
+            return
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60.0)
+
+
+def ingest(lines: Iterable[str], vessels: List[Dict], output_file: Optional[str] = None,
+           checkpoint: float = 60.0, duration: Optional[float] = None, check: bool = True) -> Dict:
+    """Decode `lines`, update `vessels` in place and write them to `output_file` every `checkpoint` seconds"""
+    updater = PositionUpdater(vessels)
+    decoder = AisDecoder(updater.mmsis, check=check)
+    start = time.monotonic()
+    last_write = [start]
+
+    def timed(lines):
+        # Clock checks ride on the line stream, so a quiet feed (tcp_lines yields '') still checkpoints and stops
+        for n, line in enumerate(lines):
+            if not line or not n & 4095:
+                now = time.monotonic()
+                if output_file and now - last_write[0] >= checkpoint:
+                    write_json_atomic(output_file, vessels, indent=2)
+                    last_write[0] = now
+                if duration is not None and now - start >= duration:
+                    return
+            yield line
+
+    for message in decoder.decode(timed(lines)):
+        updater.apply(message)
+    elapsed = time.monotonic() - start
+    if output_file:
+        write_json_atomic(output_file, vessels, indent=2)
+
+    s = decoder.stats
+    for key, value in s.items():
+        telemetry.count(f"ais_{key}", value)
+    print(f"✓ {s['sentences']:,} sentences in {elapsed:.1f}s ({s['sentences'] / elapsed if elapsed else 0:,.0f}/s): "
+          f"{s['decoded']:,} registry messages, {s['filtered']:,} other vessels, {s['other_types']:,} other types")
+    print(f"  {updater.stats['positions']:,} position and {updater.stats['voyage']:,} voyage updates for "
+          f"{len(updater.updated)} vessels; {updater.stats['stale']} stale, {s['bad_checksum']} bad checksums, "
+          f"{s['malformed']} malformed, {s['fragments_dropped']} fragments dropped")
+    return {'elapsed': elapsed, 'decoder': dict(s), 'updates': dict(updater.stats), 'vessels': len(updater.updated)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update registry positions from a raw AIS (AIVDM) feed")
+    parser.add_argument('--registry', default='shadow_fleet.json')
+    parser.add_argument('--output', default=None, help="defaults to --registry")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--replay', help="recorded NMEA file (.gz allowed)")
+    source.add_argument('--tcp', help="host:port of a live NMEA feed")
+    parser.add_argument('--checkpoint', type=float, default=60.0, help="seconds between registry writes")
+    parser.add_argument('--duration', type=float, default=None, help="stop a live feed after this many seconds")
+    parser.add_argument('--no-checksum', action='store_true', help="accept sentences without verifying checksums")
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help="write run telemetry to these files (.prom for Prometheus text, else JSON)")
+    args = parser.parse_args()
+
+    with open(args.registry, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    if args.replay:
+        feed = replay_lines(args.replay)
+    else:
+        host, port = args.tcp.rsplit(':', 1)
+        feed = tcp_lines(host, int(port))
+    try:
+        ingest(feed, registry, args.output or args.registry, args.checkpoint, args.duration, not args.no_checksum)
+    except KeyboardInterrupt:
+        write_json_atomic(args.output or args.registry, registry, indent=2)
+        print("Interrupted; registry written")
+    telemetry.finish(args.metrics)
@@ -0,0 +1,86 @@
+"""AIS stream ingestion throughput: decoder alone, file replay and a TCP stand-in feed.
+
+Generates a synthetic busy-receiver feed (class A/B position reports,
+two-sentence type 5 voyage reports, type 19, some base station reports) in
+which `--share` of the messages come from registry MMSIs. It times the
+decoder with and without the registry filter, then full ingestion (decode,
+filter, update the registry in place, write it out) replaying the feed from
+a file and reading it from a local TCP feed. Afterwards every registry
+vessel the feed mentioned must hold the position of its last report.
+
+    python bench_ais.py --input ../app/data/shadow_fleet.json --sentences 1000000
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+from ais_stream import AisDecoder, PositionUpdater, ingest, replay_lines, tcp_lines
+from standin_server import AisFeed, load_vessels, synthetic_ais
+
+TARGET = 100_000  # sentences/sec per core
+
+
+def verify(vessels, sent):
+    """Each vessel's position must match the last position report sent for its MMSI"""
+    last = {}
+    for message in sent:
+        if message['type'] != 5:
+            last[message['mmsi']] = message
+    wrong = 0
+    for mmsi, vessels_for in PositionUpdater(vessels).by_mmsi.items():
+        message = last.get(mmsi)
+        for vessel in vessels_for:
+            if message is not None and (abs(vessel['position']['lat'] - message['lat']) > 1e-5 or
+                                        abs(vessel['position']['lon'] - message['lon']) > 1e-5 or
+                                        vessel['speed'] != message['speed']):
+                wrong += 1
+    return len(last), wrong
+
+
+def rate_line(label, sentences, elapsed):
+    rate = sentences / elapsed
+    mark = '✓' if rate >= TARGET else '✗'
+    print(f"{mark} {label:<34} {sentences:>10,} sentences  {elapsed:6.2f}s  {rate:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--sentences', type=int, default=1_000_000)
+    parser.add_argument('--share', type=float, default=0.05, help="fraction of messages from registry vessels")
+    args = parser.parse_args()
+
+    registry = load_vessels(args.input)
+    start = time.perf_counter()
+    lines, sent = synthetic_ais(registry, args.sentences, args.share)
+    print(f"{len(lines):,} sentences, {len(sent):,} registry messages "
+          f"(generated in {time.perf_counter() - start:.1f}s); {len(PositionUpdater(registry).by_mmsi)} registry MMSIs")
+
+    for label, mmsis in (("decode, registry filter", PositionUpdater(registry).mmsis), ("decode, every vessel", None)):
+        decoder = AisDecoder(mmsis)
+        start = time.perf_counter()
+        for _ in decoder.decode(lines):
+            pass
+        rate_line(label, len(lines), time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as directory:
+        feed_file = os.path.join(directory, 'feed.nmea')
+        with open(feed_file, 'w', encoding='ascii', newline='') as f:
+            f.writelines(lines)
+        output = os.path.join(directory, 'shadow_fleet.json')
+
+        vessels = copy.deepcopy(registry)
+        result = ingest(replay_lines(feed_file), vessels, output)
+        rate_line("ingest, file replay", result['decoder']['sentences'], result['elapsed'])
+        mentioned, wrong = verify(vessels, sent)
+        print(f"{'✓' if not wrong else '✗'} replay: {mentioned} vessels reported, {wrong} positions differ from their last report")
+
+        vessels = copy.deepcopy(registry)
+        with AisFeed(lines) as feed:
+            host, port = feed.address
+            result = ingest(tcp_lines(host, port, reconnect=False), vessels, output)
+        rate_line("ingest, TCP stand-in feed", result['decoder']['sentences'], result['elapsed'])
+        mentioned, wrong = verify(vessels, sent)
+        print(f"{'✓' if not wrong else '✗'} TCP: {mentioned} vessels reported, {wrong} positions differ from their last report")
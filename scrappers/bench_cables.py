@@ -0,0 +1,124 @@
+"""Nearest-cable queries: grid index vs a brute-force reference and a dense NumPy pass.
+
+The reference walks every segment per vessel in plain Python using the
+bearing-based cross-track/along-track formulas, an implementation
+independent of the unit-vector maths in cable_index.py. The shipped fleet
+and a synthetic Baltic sample must match it; exits 1 on any mismatch.
+
+    python bench_cables.py --positions 10000 100000
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from cable_index import CableIndex
+from proximity_engine import EARTH_RADIUS_KM, fleet_positions, unit_vectors
+
+TOLERANCE_KM = 1e-3
+BALTIC = {'lat': (53.5, 60.5), 'lon': (10.0, 30.0)}
+
+
+def _angular(lat1, lon1, lat2, lon2):
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _bearing(lat1, lon1, lat2, lon2):
+    return math.atan2(math.sin(lon2 - lon1) * math.cos(lat2),
+                      math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lon2 - lon1))
+
+
+def reference_segment_km(lat, lon, start, end):
+    """Point to great-circle segment distance from bearings (cross-track / along-track)"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lat1, lon1, lat2, lon2 = math.radians(start[1]), math.radians(start[0]), math.radians(end[1]), math.radians(end[0])
+    d13 = _angular(lat1, lon1, lat, lon)
+    d23 = _angular(lat2, lon2, lat, lon)
+    d12 = _angular(lat1, lon1, lat2, lon2)
+    if d12 == 0:
+        return EARTH_RADIUS_KM * d13
+    theta = _bearing(lat1, lon1, lat, lon) - _bearing(lat1, lon1, lat2, lon2)
+    cross = math.asin(max(-1.0, min(1.0, math.sin(d13) * math.sin(theta))))
+    along = math.atan2(math.sin(d13) * math.cos(theta), math.cos(d13) * math.cos(cross))
+    if 0 <= along <= d12:
+        return EARTH_RADIUS_KM * abs(cross)
+    return EARTH_RADIUS_KM * min(d13, d23)
+
+
+def reference_nearest(lat, lon, features):
+    distances, cables = [], []
+    for p_lat, p_lon in zip(lat, lon):
+        best, best_cable = math.inf, -1
+        for c, feature in enumerate(features):
+            line = feature['geometry']['coordinates']
+            for start, end in zip(line, line[1:]):
+                d = reference_segment_km(p_lat, p_lon, start, end)
+                if d < best:
+                    best, best_cable = d, c
+        distances.append(best)
+        cables.append(best_cable)
+    return np.array(distances), np.array(cables)
+
+
+def dense_all_segments(index, lat, lon, chunk=4096):
+    """Every position against every segment, no index"""
+    return np.concatenate([index.arc_distances(unit_vectors(lat[i:i + chunk], lon[i:i + chunk])).min(axis=1)
+                           for i in range(0, len(lat), chunk)])
+
+
+def check(label, index, lat, lon, features):
+    start = time.perf_counter()
+    expected, expected_cable = reference_nearest(lat.tolist(), lon.tolist(), features)
+    reference_time = time.perf_counter() - start
+    distance, cable, _ = index.nearest(lat, lon)
+    error = np.abs(distance - expected)
+    # Equal-distance ties may name a different cable; only the distance must match there
+    wrong_cable = (cable != expected_cable) & (error > TOLERANCE_KM)
+    print(f"  {label:<26} {len(lat):6d} positions  max error {error.max() * 1000:.4f} m  "
+          f"reference {len(lat) / reference_time:8.0f} positions/sec")
+    return error.max() <= TOLERANCE_KM and not wrong_cable.any()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--check-sample', type=int, default=2000)
+    args = parser.parse_args()
+
+    with open('../app/data/submarine_cables.json', 'r', encoding='utf-8') as f:
+        features = json.load(f)['features']
+    with open('../app/data/shadow_fleet.json', 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    index = CableIndex(features)
+    rng = np.random.default_rng(7)
+    print(f"{len(index.features)} cables, {len(index)} segments")
+
+    _, fleet_lat, fleet_lon = fleet_positions(vessels)
+    ok = check('shipped fleet', index, fleet_lat, fleet_lon, features)
+    sample_lat = rng.uniform(*BALTIC['lat'], args.check_sample)
+    sample_lon = rng.uniform(*BALTIC['lon'], args.check_sample)
+    ok &= check('synthetic Baltic sample', index, sample_lat, sample_lon, features)
+    if not ok:
+        print("✗ cable index disagrees with the brute-force reference")
+        sys.exit(1)
+    print("✓ matches the brute-force reference")
+
+    for count in args.positions:
+        lat = rng.uniform(*BALTIC['lat'], count)
+        lon = rng.uniform(*BALTIC['lon'], count)
+        cold = CableIndex(features)
+        start = time.perf_counter()
+        cold.nearest(lat, lon)
+        cold_time = time.perf_counter() - start
+        start = time.perf_counter()
+        cold.nearest(lat, lon)
+        warm_time = time.perf_counter() - start
+        start = time.perf_counter()
+        dense_all_segments(index, lat, lon)
+        dense_time = time.perf_counter() - start
+        print(f"  {count:>7} positions  grid {count / cold_time:9.0f}/sec cold, {count / warm_time:9.0f}/sec warm "
+              f"({len(cold.cells)} cells)  dense all-segments {count / dense_time:9.0f}/sec")
@@ -0,0 +1,67 @@
+"""Cold vs warm refresh benchmark for the conditional-GET response cache.
+
+    python bench_cache.py --vessels 650 --changed 5
+"""
+import argparse
+import copy
+import tempfile
+import time
+
+from crawl_engine import CrawlEngine
+from http_cache import ResponseCache
+from scrape_all_vessels import fetch_vessel, parse_vessel_page
+from standin_server import StandinSite, synthetic_vessels
+from vessel_extract import record_version
+
+
+def refresh(site, cache, concurrency):
+    """Crawl every vessel page, returning (seconds, pages parsed)"""
+    site.requests = site.not_modified = site.bytes_sent = 0
+    parsed = 0
+    start = time.perf_counter()
+    engine = CrawlEngine(concurrency=concurrency, rate=0, retries=0)
+    for _, url, fetched, error in engine.run(site.vessel_urls(), lambda url: fetch_vessel(url, cache)):
+        if error is not None:
+            raise error
+        content, record = fetched
+        if record is None:
+            cache.store_record(url, parse_vessel_page(content))
+            parsed += 1
+    cache.save()
+    return time.perf_counter() - start, parsed
+
+
+def report(label, site, elapsed, parsed):
+    print(f"{label:<28} {elapsed:8.2f}s  {site.requests:5d} requests  "
+          f"{site.not_modified:5d} x 304  {parsed:5d} parsed  {site.bytes_sent / 1024:9.0f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, default=650)
+    parser.add_argument('--changed', type=int, default=5, help="pages edited between the two warm runs")
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vessels = synthetic_vessels(args.vessels)
+        with StandinSite(vessels) as site:
+            version = record_version()
+            cache = ResponseCache(tmp, record_version=version)
+            report('cold (empty cache)', site, *refresh(site, cache, args.concurrency))
+            report('warm (nothing changed)', site, *refresh(site, cache, args.concurrency))
+
+            for i in range(args.changed):
+                vessel = copy.deepcopy(vessels[i])
+                vessel['flag'] = 'Gabon'
+                site.update_vessel(i, vessel)
+            report(f'warm ({args.changed} pages changed)', site, *refresh(site, ResponseCache(tmp, record_version=version), args.concurrency))
+
+            # Without validators every body is downloaded, but the content hash still skips parsing
+            site.validators = False
+            report('warm, no ETag (hash only)', site, *refresh(site, ResponseCache(tmp, record_version=version), args.concurrency))
+
+            # A new extractor version re-parses every page, still without downloading the unchanged ones
+            site.validators = True
+            version = record_version() + '+next'
+            report('warm, new extractor version', site, *refresh(site, ResponseCache(tmp, record_version=version), args.concurrency))
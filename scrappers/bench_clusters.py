@@ -0,0 +1,73 @@
+"""Marker cluster build time at fleet, history and AIS scale: 100k and 1M synthetic points.
+
+Points are drawn around the registry's positions (ports, anchorages and
+lanes are dense) with a uniform share spread over the open sea, the shape a
+history or wider-fleet layer has. For every size the benchmark times the
+cluster hierarchy and the GeoJSON encoding separately, checks that every
+level accounts for every point, and reports features and bytes per zoom and
+how build time grows with the point count (1.0 is linear, 2.0 quadratic).
+
+    python bench_clusters.py --input ../app/data/shadow_fleet.json --points 100000 1000000
+"""
+import argparse
+import gzip
+import json
+import math
+import time
+
+import numpy as np
+
+from marker_clusters import (MAX_ZOOM, MIN_ZOOM, RADIUS_PX, cluster_levels, level_geojson, project, registry_points,
+                             unproject)
+
+
+def synthetic_points(count: int, centres_lon, centres_lat, seed: int = 0, spread: float = 0.3):
+    """(lon, lat) with 80% of the points near the given centres and the rest anywhere at sea latitudes"""
+    rng = np.random.default_rng(seed)
+    near = int(count * 0.8)
+    pick = rng.integers(0, len(centres_lon), near)
+    lon = np.concatenate((centres_lon[pick] + rng.normal(0, spread, near), rng.uniform(-180, 180, count - near)))
+    lat = np.concatenate((centres_lat[pick] + rng.normal(0, spread / 2, near), rng.uniform(-60, 70, count - near)))
+    return (lon + 180) % 360 - 180, np.clip(lat, -80, 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--points', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--radius', type=float, default=RADIUS_PX)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        _, centres_lon, centres_lat = registry_points(json.load(f))
+    print(f"{len(centres_lon)} registry positions as traffic centres, zooms {MIN_ZOOM}-{MAX_ZOOM} at {args.radius:g} px")
+
+    timings = []
+    for count in args.points:
+        lon, lat = synthetic_points(count, centres_lon, centres_lat)
+        start = time.perf_counter()
+        x, y = project(lon, lat)
+        levels = cluster_levels(x, y, MIN_ZOOM, MAX_ZOOM, args.radius)
+        build = time.perf_counter() - start
+        timings.append((count, build))
+        assert all(int(level['count'].sum()) == count for level in levels.values()), "a level lost points"
+
+        start = time.perf_counter()
+        rows = np.arange(count)
+        bodies = {}
+        for zoom, level in levels.items():
+            clon, clat = unproject(level['x'], level['y'])
+            bodies[zoom] = level_geojson(clon, clat, level['count'], rows[level['first']], level['expand'], zoom)
+        encode = time.perf_counter() - start
+        print(f"✓ {count:>9,} points: hierarchy {build:6.2f}s ({count / build:,.0f} points/s), "
+              f"GeoJSON {encode:6.2f}s, {sum(map(len, bodies.values())) / 1e6:.1f} MB for {len(levels)} levels")
+        for zoom in (MIN_ZOOM, 5, 8, MAX_ZOOM):
+            body = bodies[zoom]
+            print(f"    zoom {zoom:>2}: {len(levels[zoom]['count']):9,} features "
+                  f"(largest {int(levels[zoom]['count'].max()):,}) {len(body) / 1024:9.0f} KB "
+                  f"{len(gzip.compress(body, 6)) / 1024:8.0f} KB gz")
+
+    for (small, small_time), (large, large_time) in zip(timings, timings[1:]):
+        growth = math.log(large_time / small_time) / math.log(large / small)
+        print(f"{'✓' if growth < 1.5 else '✗'} {small:,} -> {large:,} points: build time x{large_time / small_time:.1f} "
+              f"for x{large / small:.0f} points (growth exponent {growth:.2f}; quadratic would be 2.00)")
@@ -0,0 +1,88 @@
+"""Load time and memory: json.load of the registry vs the columnar snapshot.
+
+Each measurement runs in a fresh interpreter that loads the registry and
+answers a typical analytics question (names of Panama-flagged vessels north
+of 54°N), reporting wall time and the resident-set growth it caused.
+
+    python bench_columns.py --vessels 650 10000 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from standin_server import synthetic_vessels
+from vessel_columns import export_columns
+
+PROBE = r'''
+import json, sys, time
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+
+import numpy as np
+from vessel_columns import VesselColumns
+fmt, path = sys.argv[1], sys.argv[2]
+before = rss_kb()
+start = time.perf_counter()
+if fmt == 'json':
+    with open(path, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    loaded = time.perf_counter()
+    names = [v['vessel_name'] for v in vessels
+             if v['flag'] == 'Panama' and v['position'] and (v['position']['lat'] or 0) > 54]
+else:
+    fleet = VesselColumns(path, mmap=(fmt == 'columns'))
+    if fmt == 'columns-eager':
+        fleet.records()
+    loaded = time.perf_counter()
+    rows = np.flatnonzero(fleet.equals('flag', 'Panama') & (fleet.column('lat') > 54))
+    names = fleet.values('vessel_name', rows)
+done = time.perf_counter()
+print(json.dumps({'load': loaded - start, 'query': done - loaded, 'rss_kb': rss_kb() - before, 'matches': len(names)}))
+'''
+
+
+def probe(fmt, path):
+    output = subprocess.run([sys.executable, '-c', PROBE, fmt, path], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output)
+
+
+def disk_kb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1024
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, nargs='+', default=[650, 10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.vessels:
+            vessels = synthetic_vessels(count)
+            json_path = os.path.join(tmp, f"fleet_{count}.json")
+            columns_path = os.path.join(tmp, f"fleet_{count}.columns")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(vessels, f, ensure_ascii=False, indent=2)
+            start = time.perf_counter()
+            export_columns(vessels, columns_path)
+            export_time = time.perf_counter() - start
+            del vessels
+
+            print(f"\n{count} vessels (export {export_time:.2f}s)")
+            for label, fmt, path in (
+                ('json.load', 'json', json_path),
+                ('columns, mmap', 'columns', columns_path),
+                ('columns, records()', 'columns-eager', columns_path),
+            ):
+                result = probe(fmt, path)
+                print(f"  {label:<20} {disk_kb(path) / 1024:8.1f} MB on disk  load {result['load'] * 1000:9.1f} ms  "
+                      f"query {result['query'] * 1000:7.1f} ms  RSS +{result['rss_kb'] / 1024:7.1f} MB  "
+                      f"({result['matches']} matches)")
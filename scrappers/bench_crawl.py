@@ -0,0 +1,51 @@
+"""Offline throughput benchmark for the crawl engine against the stand-in site.
+
+    python bench_crawl.py --vessels 200 --latency 0.2
+"""
+import argparse
+import time
+
+from crawl_engine import CrawlEngine
+from scrape_all_vessels import fetch_vessel_page, parse_vessel_page
+from standin_server import StandinSite, synthetic_vessels
+
+
+def run_serial(urls, delay):
+    """The previous loop: one request at a time with a fixed sleep in between"""
+    start = time.monotonic()
+    for i, url in enumerate(urls):
+        parse_vessel_page(fetch_vessel_page(url))
+        if i < len(urls) - 1:
+            time.sleep(delay)
+    return len(urls) / (time.monotonic() - start)
+
+
+def run_engine(urls, concurrency, rate):
+    engine = CrawlEngine(concurrency=concurrency, rate=rate, retries=0)
+    for _, _, content, error in engine.run(urls, fetch_vessel_page):
+        if error is not None:
+            raise error
+        parse_vessel_page(content)
+    return engine.pages_per_second()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2, help="simulated server latency in seconds")
+    parser.add_argument('--serial-delay', type=float, default=1.5, help="sleep used by the serial baseline")
+    parser.add_argument('--rate', type=float, default=50.0, help="token bucket rate for the engine runs")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    with StandinSite(synthetic_vessels(args.vessels), latency=args.latency) as site:
+        urls = site.vessel_urls()
+        print(f"{len(urls)} pages, {args.latency * 1000:.0f} ms simulated latency\n")
+
+        serial_urls = urls[:min(len(urls), 10)]
+        rate = run_serial(serial_urls, args.serial_delay)
+        print(f"{'serial + sleep(%.1f)' % args.serial_delay:<24} {rate:8.2f} pages/sec  (sampled {len(serial_urls)} pages)")
+
+        for concurrency in args.concurrency:
+            rate = run_engine(urls, concurrency, args.rate)
+            print(f"{'engine x%d' % concurrency:<24} {rate:8.2f} pages/sec")
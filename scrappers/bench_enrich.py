@@ -0,0 +1,62 @@
+"""Position refresh time against the mock vessel API: sequential vs concurrent lookups.
+
+The sequential run mirrors enrich_positions.js (one lookup at a time with a
+50 ms pause, about 20 requests/sec at most); the concurrent runs use
+enrich_positions.py's pipeline at several worker counts. The budget runs
+spend half the fleet's worth of credits on a fresh registry and on the
+output of a full run, where the vessels the API did not know carry lastMiss.
+
+    python bench_enrich.py --latency 0.2 --rate 40
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from enrich_positions import enrich_positions
+from standin_server import StandinSite, load_vessels
+
+
+def run(site, registry, concurrency, rate, credits=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'shadow_fleet.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f)
+        site.api_requests = site.api_throttled = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = enrich_positions(path, api_key='bench', api_base=site.api_base, concurrency=concurrency,
+                                     rate=rate, credits=credits, fresh=True)
+        elapsed = time.perf_counter() - start
+        with open(path, 'r', encoding='utf-8') as f:
+            stats['registry'] = json.load(f)
+        return elapsed, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2, help="mock API response time in seconds")
+    parser.add_argument('--rate', type=float, default=40.0, help="requests/sec for the concurrent runs")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    registry = load_vessels()
+    with StandinSite(load_vessels(), latency=args.latency) as site:
+        print(f"{len(registry)} vessels, mock API latency {args.latency * 1000:.0f} ms")
+        runs = [] if args.skip_sequential else [('sequential (enrich_positions.js)', 1, 20.0)]
+        runs += [(f"{concurrency} workers @ {args.rate:g} req/s", concurrency, args.rate)
+                 for concurrency in args.concurrency]
+        for label, concurrency, rate in runs:
+            elapsed, stats = run(site, registry, concurrency, rate)
+            print(f"  {label:<34} {elapsed:6.1f}s  {site.api_requests:4d} credits  "
+                  f"{stats['found']} positions, {stats['not_found']} not found, {stats['failed']} failed")
+
+        budget = len(registry) // 2
+        for label, start_registry in (('no misses recorded', registry), ('after a full run', stats['registry'])):
+            elapsed, budget_stats = run(site, start_registry, max(args.concurrency), args.rate, credits=budget)
+            print(f"  {'budget of %d, %s' % (budget, label):<34} {elapsed:6.1f}s  {site.api_requests:4d} credits  "
+                  f"{budget_stats['found']} positions, {budget_stats['over_budget']} deferred to the next run")
@@ -0,0 +1,121 @@
+"""Entity graph: extraction on the registry and 2-hop queries at 100k nodes.
+
+The real registry is small, so the benchmark also builds a synthetic fleet:
+companies with a heavy-tailed number of managed tankers (a few run hundreds),
+each tanker linked to one to three companies and sometimes cross-referenced
+to another tanker. It times CSR construction with the component pass and
+2-hop queries from random vessels and from the busiest companies, and checks
+both against a dict-of-sets breadth-first search and a union-find.
+
+    python bench_entity_graph.py --input ../app/data/shadow_fleet.json --nodes 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from entity_graph import COMPONENT_KINDS, EDGE_KINDS, NODE_KINDS, EntityGraph, build_graph
+
+
+def synthetic_graph(nodes: int, seed: int = 0, company_share: float = 0.1):
+    """(node_kinds, src, dst, kinds) of a fleet with heavy-tailed company sizes"""
+    rng = np.random.default_rng(seed)
+    companies = int(nodes * company_share)
+    vessels = nodes - companies
+    popularity = 1 / np.arange(1, companies + 1) ** 0.8
+    popularity /= popularity.sum()
+
+    per_vessel = rng.integers(1, 4, vessels)
+    src = np.repeat(np.arange(companies, nodes), per_vessel)
+    dst = rng.choice(companies, len(src), p=popularity)
+    kinds = rng.choice([EDGE_KINDS.index(k) for k in EDGE_KINDS], len(src), p=[0.5, 0.2, 0, 0.3])
+    cited = rng.random(vessels) < 0.2
+    imo_src = np.arange(companies, nodes)[cited]
+    imo_dst = rng.integers(companies, nodes, len(imo_src))
+    node_kinds = np.r_[np.full(companies, NODE_KINDS.index('company')), np.full(vessels, NODE_KINDS.index('vessel'))]
+    return (node_kinds, np.r_[src, imo_src], np.r_[dst, imo_dst],
+            np.r_[kinds, np.full(len(imo_src), EDGE_KINDS.index('imo'))].astype(np.uint8))
+
+
+def reference_within(adjacency, node, hops):
+    seen, frontier = {node}, {node}
+    for _ in range(hops):
+        frontier = {other for current in frontier for other in adjacency.get(current, ())} - seen
+        seen |= frontier
+    return seen - {node}
+
+
+def reference_components(n, src, dst):
+    parent = list(range(n))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in zip(src.tolist(), dst.tolist()):
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.array([root(i) for i in range(n)])
+
+
+def time_queries(graph, nodes, hops=2):
+    """Per-query milliseconds and result sizes"""
+    times, sizes = [], []
+    for node in nodes:
+        start = time.perf_counter()
+        sizes.append(len(graph.within(int(node), hops)))
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times), np.array(sizes)
+
+
+def report(label, times, sizes):
+    print(f"  {label:<28} p50 {np.median(times):6.2f} ms  p99 {np.percentile(times, 99):6.2f} ms  "
+          f"max {times.max():6.2f} ms  median {int(np.median(sizes))} / max {sizes.max()} nodes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--nodes', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--check', type=int, default=200, help="queries compared with the reference BFS")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    start = time.perf_counter()
+    graph = build_graph(registry)
+    print(f"registry: {len(registry)} records -> {len(graph)} nodes, {graph.edges} edges "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    companies = np.flatnonzero(graph.node_kinds == NODE_KINDS.index('company'))
+    report('2 hops from every company', *time_queries(graph, companies))
+
+    node_kinds, src, dst, kinds = synthetic_graph(args.nodes)
+    keys = [str(i) for i in range(args.nodes)]
+    start = time.perf_counter()
+    graph = EntityGraph.from_edges(keys, keys, node_kinds, src, dst, kinds)
+    build = time.perf_counter() - start
+    print(f"synthetic: {len(graph):,} nodes, {graph.edges:,} edges, CSR and components in {build * 1000:.0f} ms, "
+          f"{len(graph.component_sizes())} components")
+
+    rng = np.random.default_rng(1)
+    vessels = np.flatnonzero(node_kinds == NODE_KINDS.index('vessel'))
+    report('2 hops from random vessels', *time_queries(graph, rng.choice(vessels, args.queries)))
+    busiest = np.argsort(np.diff(graph.indptr))[::-1][:args.queries // 10]
+    report('2 hops from busiest nodes', *time_queries(graph, busiest))
+
+    strong = np.isin(kinds, [EDGE_KINDS.index(kind) for kind in COMPONENT_KINDS]) & (src != dst)
+    adjacency = {}
+    for a, b in zip(src[strong].tolist(), dst[strong].tolist()):
+        adjacency.setdefault(a, set()).add(b)
+        adjacency.setdefault(b, set()).add(a)
+    sample = rng.choice(len(graph), args.check)
+    same = all(set(graph.within(int(node)).tolist()) == reference_within(adjacency, int(node), 2) for node in sample)
+    print(f"  {'✓' if same else '✗'} {args.check} queries match a dict-of-sets BFS")
+    labels = reference_components(len(graph), src[strong], dst[strong])
+    same = np.array_equal(labels, graph.components)
+    print(f"  {'✓' if same else '✗'} components match union-find")
@@ -0,0 +1,69 @@
+"""Extractor parity check and single-core micro-benchmark.
+
+Every backend must reproduce the golden records in fixtures/vessel_pages
+field for field; the script exits non-zero on any mismatch. Throughput is
+then measured on pages rendered from the shipped registry:
+
+    python bench_extract.py --pages 650
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from standin_server import load_vessels, render_vessel_page
+from vessel_extract import TEXT_BACKENDS, extract_vessel, lxml
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'vessel_pages')
+
+
+def available_backends():
+    return [name for name in TEXT_BACKENDS if name != 'lxml' or lxml is not None]
+
+
+def check_corpus(backends):
+    """Compare each backend with the golden records, returning the number of mismatched fields"""
+    mismatches = 0
+    pages = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+    for page_path in pages:
+        with open(page_path, 'rb') as f:
+            content = f.read()
+        with open(page_path[:-len('.html')] + '.json', 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        for backend in backends:
+            record = extract_vessel(content, backend)
+            for field, value in expected.items():
+                if record.get(field) != value:
+                    mismatches += 1
+                    print(f"  ✗ {os.path.basename(page_path)} [{backend}] {field}: {record.get(field)!r:.60} != {value!r:.60}")
+    print(f"Golden corpus: {len(pages)} pages x {len(backends)} backends, {mismatches} mismatched fields")
+    return mismatches
+
+
+def benchmark(backend, pages, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        for content in pages:
+            extract_vessel(content, backend)
+    return len(pages) * repeat / (time.process_time() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=650)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    if check_corpus(backends):
+        sys.exit(1)
+
+    pages = [render_vessel_page(v).encode('utf-8') for v in load_vessels()[:args.pages]]
+    print(f"\n{len(pages)} pages, CPU time on one core\n")
+    baseline = None
+    for backend in backends:
+        rate = benchmark(backend, pages, args.repeat)
+        baseline = baseline or rate
+        print(f"{backend:<6} {rate:9.1f} pages/sec/core  ({rate / baseline:.1f}x bs4)")
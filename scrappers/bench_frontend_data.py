@@ -0,0 +1,59 @@
+"""Bytes on the wire and parse time: monolithic shadow_fleet.json vs index + detail shards.
+
+Parse time is json.loads in CPython, a stand-in for the browser's JSON.parse;
+the ratio between layouts is what matters.
+
+    python bench_frontend_data.py --vessels 650 10000
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+from build_frontend_data import SHARD_SIZE, build_artifacts, compress_variants
+from standin_server import synthetic_vessels
+
+
+def parse_ms(body: bytes, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def wire_sizes(body: bytes):
+    variants = compress_variants(body)
+    return len(body), len(variants['.gz']), len(variants['.br']) if '.br' in variants else None
+
+
+def report(label, body):
+    raw, gz, br = wire_sizes(body)
+    br_text = f"{br / 1024:9.1f} KB br" if br is not None else "         (no brotli)"
+    print(f"  {label:<28} {raw / 1024:9.1f} KB raw {gz / 1024:9.1f} KB gzip {br_text} {parse_ms(body):8.2f} ms parse")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, nargs='+', default=[650, 10000])
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    for count in args.vessels:
+        vessels = synthetic_vessels(count)
+        # The file as the scrapers write it and the app used to fetch it
+        legacy = json.dumps(vessels, ensure_ascii=False, indent=2).encode('utf-8')
+        manifest, files = build_artifacts(vessels, args.shard_size)
+        index = files[os.path.basename(manifest['index'])]
+        shard = files[os.path.basename(manifest['shards'][0])]
+
+        print(f"\n{count} vessels, {len(manifest['shards'])} detail shards of {args.shard_size}")
+        report('startup: shadow_fleet.json', legacy)
+        report('startup: index', index)
+        report('open vessel: one shard', shard)
+        legacy_gz = len(gzip.compress(legacy, 9, mtime=0))
+        index_gz = len(compress_variants(index)['.gz'])
+        print(f"  startup transfer {legacy_gz / index_gz:.1f}x smaller gzipped, "
+              f"parse {parse_ms(legacy) / parse_ms(index):.1f}x faster")
@@ -0,0 +1,57 @@
+"""Listing discovery benchmark on synthetic fleets up to 10k vessels.
+
+Compares the old list-rebuilding dedupe with the dict-based one and times
+concurrent discovery against the stand-in site:
+
+    python bench_listing.py --sizes 650 2500 5000 10000
+"""
+import argparse
+import time
+
+from listing_discovery import discover_vessels
+from standin_server import StandinSite, synthetic_vessels
+
+
+def legacy_dedupe(urls):
+    """The previous approach: rebuild the URL list for every link"""
+    vessels = []
+    for url in urls:
+        if url not in [v['url'] for v in vessels]:
+            vessels.append({'url': url})
+    return vessels
+
+
+def dict_dedupe(urls):
+    vessels = {}
+    for url in urls:
+        vessels.setdefault(url, {'url': url})
+    return list(vessels.values())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[650, 2500, 5000, 10000])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated server latency in seconds")
+    parser.add_argument('--legacy-limit', type=int, default=5000, help="skip the quadratic dedupe above this size")
+    args = parser.parse_args()
+
+    print(f"{'vessels':>8} {'pages':>6} {'legacy dedupe':>14} {'dict dedupe':>12} {'discovery':>10} {'us/vessel':>10}")
+    for size in args.sizes:
+        vessels = synthetic_vessels(size)
+        with StandinSite(vessels, latency=args.latency) as site:
+            # Every vessel link appears twice, as on a page with image and title links
+            urls = [url for url in site.vessel_urls() for _ in range(2)]
+            legacy = f"{timed(legacy_dedupe, urls)[0]:.3f}s" if size <= args.legacy_limit else 'skipped'
+            dict_time, _ = timed(dict_dedupe, urls)
+
+            elapsed, found = timed(lambda: discover_vessels(site.listing_url, concurrency=args.concurrency, rate=0))
+            assert len(found) == size, f"found {len(found)} of {size}"
+            pages = -(-size // site.page_size)
+            print(f"{size:>8} {pages:>6} {legacy:>14} {dict_time:>11.4f}s {elapsed:>9.2f}s {1e6 * elapsed / size:>10.1f}")
@@ -0,0 +1,102 @@
+"""What the photo mirror changes: the cold vessel-list render and the details photo.
+
+The stand-in server serves a synthetic full-size .webp at every registry
+photo path. Before the mirror the vessel list showed no photos, so a cold
+list render made no image requests; the details panel hot-linked the
+full-size original. The benchmark mirrors the photos through the stand-in
+(cold, then a conditional-GET re-run), serves the output directory like the
+deployed app, and fetches what the list now needs (photos.json plus the
+sprite sheets, six connections at a time like a browser with an empty
+cache). It then compares one details photo per vessel, full-size original
+against detail copy.
+
+    python bench_photos.py --input ../app/data/shadow_fleet.json --latency 0.05 --concurrency 8
+"""
+import argparse
+import functools
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import photo_mirror
+from standin_server import StandinSite, load_vessels, synthetic_vessels
+
+BROWSER_CONNECTIONS = 6  # per-host HTTP/1.1 connection limit in browsers
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def cold_fetch(urls):
+    """GET every URL once over BROWSER_CONNECTIONS keep-alive connections; (requests, bytes, seconds)"""
+    local = threading.local()
+
+    def get(url):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        response = local.session.get(url, timeout=30)
+        response.raise_for_status()
+        return len(response.content)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(BROWSER_CONNECTIONS) as pool:
+        sizes = list(pool.map(get, urls))
+    return len(urls), sum(sizes), time.perf_counter() - start
+
+
+def report(label, requests_made, size, elapsed):
+    print(f"  {label:<34} {requests_made:5d} requests  {size / 1e6:8.2f} MB  {elapsed:6.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--vessels', type=int, default=0, help="synthetic fleet size (default: the registry)")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every stand-in response")
+    parser.add_argument('--concurrency', type=int, default=8, help="mirror downloads in flight")
+    parser.add_argument('--rate', type=float, default=0, help="mirror requests/sec (0 = unlimited; the stand-in is local)")
+    args = parser.parse_args()
+
+    vessels = synthetic_vessels(args.vessels, args.input) if args.vessels else load_vessels(args.input)
+    with StandinSite(vessels, latency=args.latency) as site, tempfile.TemporaryDirectory() as directory:
+        local = [dict(vessel, vessel_photo_url=site.photo_url(vessel)) for vessel in vessels]
+        urls = list(dict.fromkeys(vessel['vessel_photo_url'] for vessel in local if vessel['vessel_photo_url']))
+        start = time.perf_counter()
+        for path in site.photos:
+            site.photo(path)
+        print(f"{len(local)} vessels, {len(urls)} distinct photo URLs "
+              f"(stand-in rendered them in {time.perf_counter() - start:.1f}s, {args.latency * 1000:.0f} ms latency)")
+
+        report("before: list, no photos", 0, 0, 0)
+
+        output_dir, cache_dir = os.path.join(directory, 'app'), os.path.join(directory, 'cache')
+        for run in ('cold', 'warm'):
+            served = site.requests
+            start = time.perf_counter()
+            manifest = photo_mirror.mirror_photos(local, output_dir, cache_dir, args.concurrency, args.rate)
+            print(f"⏱ mirror ({run}): {time.perf_counter() - start:.1f}s, {site.requests - served} requests, "
+                  f"{site.not_modified} not modified so far")
+
+        assert all(image is not None for image in manifest['vessels']), "mirror is missing photos"
+        app = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=output_dir))
+        threading.Thread(target=app.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{app.server_address[1]}"
+        requests_made, size, elapsed = cold_fetch([f"{base}/{photo_mirror.PHOTO_INDEX}"] +
+                                                  [f"{base}/{sheet}" for sheet in manifest['sheets']])
+        report("after: list, photos.json + sprites", requests_made, size, elapsed)
+
+        requests_made, size, elapsed = cold_fetch(urls)
+        report("before: details, full-size originals", requests_made, size, elapsed)
+        print(f"    {size / requests_made / 1024:.0f} KB per photo")
+        requests_made, size, elapsed = cold_fetch([f"{base}/{image[2]}" for image in manifest['photos']])
+        report("after: details, detail copies", requests_made, size, elapsed)
+        print(f"    {size / requests_made / 1024:.0f} KB per photo")
+        app.shutdown()
+        app.server_close()
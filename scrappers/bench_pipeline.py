@@ -0,0 +1,53 @@
+"""Per-stage throughput of the fetch -> process-pool parse pipeline.
+
+Runs the whole registry through the stand-in site with parsing inline and
+with 1..N parse processes, using the bs4 extractor by default since it is
+the most CPU-heavy:
+
+    python bench_pipeline.py --pages 650 --fetch-workers 8 --parse-workers 1 2 4
+"""
+import argparse
+import os
+import time
+
+from crawl_engine import CrawlEngine
+from parse_pipeline import ParsePipeline
+from scrape_all_vessels import crawl_vessels, fetch_vessel
+from standin_server import StandinSite, synthetic_vessels
+
+
+def run_inline(urls, fetch_workers, backend):
+    engine = CrawlEngine(concurrency=fetch_workers, rate=0, retries=0)
+    start = time.perf_counter()
+    for _, _, _, error in crawl_vessels(urls, engine, backend=backend):
+        if error is not None:
+            raise error
+    return len(urls) / (time.perf_counter() - start)
+
+
+def run_pipeline(urls, fetch_workers, parse_workers, queue_size, backend):
+    engine = CrawlEngine(concurrency=fetch_workers, rate=0, retries=0)
+    pipeline = ParsePipeline(engine, fetch_vessel, parse_workers, queue_size, backend)
+    for _, _, _, error in pipeline.run(urls):
+        if error is not None:
+            raise error
+    return pipeline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=650)
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    parser.add_argument('--parse-workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--queue-size', type=int, default=32)
+    parser.add_argument('--extractor', default='bs4')
+    args = parser.parse_args()
+
+    with StandinSite(synthetic_vessels(args.pages)) as site:
+        urls = site.vessel_urls()
+        print(f"{len(urls)} pages, {args.fetch_workers} fetch threads, {args.extractor} extractor, "
+              f"{os.cpu_count()} CPUs\n")
+        print(f"inline parse: {run_inline(urls, args.fetch_workers, args.extractor):.1f} pages/sec end to end\n")
+        for workers in args.parse_workers:
+            pipeline = run_pipeline(urls, args.fetch_workers, workers, args.queue_size, args.extractor)
+            print(f"[{workers} parse processes]\n{pipeline.report()}\n")
@@ -0,0 +1,75 @@
+"""Credits spent by analysts polling the same ships: direct API calls vs the caching proxy.
+
+Each simulated analyst tracks the same handful of vessels and polls them
+the way tracker.js does (MMSI first, IMO when there is no data). All
+analysts poll at the same moment, which is the worst case for a plain
+cache and the case request coalescing exists for.
+
+    python bench_position_cache.py --analysts 10 --vessels 5 --rounds 3
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_session
+from position_cache import PositionCache, PositionProxy
+from standin_server import StandinSite, load_vessels
+
+
+class NoCache(PositionCache):
+    """Every lookup goes upstream, like get-vessel.js"""
+
+    def get(self, key, load):
+        with self.lock:
+            self.stats['misses'] += 1
+        return load()
+
+
+def poll(base_url, vessel):
+    """One tracker.js updateVesselPosition: MMSI, then IMO if that had no data"""
+    data = None
+    if vessel.get('MMSI'):
+        data = http_session.get(f"{base_url}/get-vessel", params={'mmsi': vessel['MMSI']}).json()
+    if not (data and data.get('data')) and vessel.get('IMO'):
+        data = http_session.get(f"{base_url}/get-vessel", params={'imo': vessel['IMO']}).json()
+    return data
+
+
+def run_rounds(base_url, tracked, analysts, rounds):
+    client_requests = 0
+    with ThreadPoolExecutor(max_workers=analysts * len(tracked)) as pool:
+        for _ in range(rounds):
+            polls = [pool.submit(poll, base_url, vessel) for _ in range(analysts) for vessel in tracked]
+            for future in polls:
+                future.result()
+            client_requests += len(polls)
+    return client_requests
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--analysts', type=int, default=10)
+    parser.add_argument('--vessels', type=int, default=5, help="ships every analyst tracks")
+    parser.add_argument('--rounds', type=int, default=3, help="polling rounds within one TTL")
+    parser.add_argument('--latency', type=float, default=0.2, help="mock API response time in seconds")
+    args = parser.parse_args()
+
+    vessels = load_vessels()
+    # Mix ships with and without AIS coverage so negative caching shows up
+    tracked = [v for v in vessels if v.get('position')][:args.vessels - 1] + \
+              [v for v in vessels if not v.get('position') and v.get('MMSI')][:1]
+    http_session.configure(max_per_host=args.analysts * len(tracked))
+
+    with StandinSite(vessels, latency=args.latency) as site:
+        for label, cache in (('direct (get-vessel.js)', NoCache()),
+                             ('coalescing only (TTL 0)', PositionCache(ttl=0, negative_ttl=0)),
+                             ('TTL + coalescing', PositionCache(ttl=300, negative_ttl=3600))):
+            site.api_requests = 0
+            with PositionProxy('bench', site.api_base, cache, port=0) as proxy:
+                start = time.perf_counter()
+                polls = run_rounds(f"{proxy.base_url}/api", tracked, args.analysts, args.rounds)
+                elapsed = time.perf_counter() - start
+            s = cache.summary()
+            print(f"{label:<26} {polls:4d} vessel polls  {site.api_requests:4d} upstream credits  {elapsed:6.2f}s  "
+                  f"hits {s['hits']}, negative hits {s['negative_hits']}, coalesced {s['coalesced']}, "
+                  f"misses {s['misses']}")
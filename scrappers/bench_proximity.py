@@ -0,0 +1,93 @@
+"""Proximity alerts: naive per-vessel haversine loop vs the vectorized engine.
+
+Synthetic AIS positions are scattered over the Baltic; infrastructure is the
+shipped poland_infrastructure.json, optionally padded with synthetic sites.
+Every run checks that all methods return the same (vessel, site) pairs.
+
+    python bench_proximity.py --positions 1000 10000 50000 --sites 19 2000
+"""
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from proximity_engine import PROXIMITY_RADIUS_KM, InfrastructureIndex, cKDTree
+
+BALTIC = {'lat': (53.5, 60.5), 'lon': (10.0, 30.0)}
+
+
+def naive_pairs(lat, lon, features, radius_km):
+    """The tracker.js algorithm: scalar haversine for every vessel x every site"""
+    pairs = set()
+    for i in range(len(lat)):
+        for j, feature in enumerate(features):
+            site_lon, site_lat = feature['geometry']['coordinates'][:2]
+            d_lat = math.radians(site_lat - lat[i])
+            d_lon = math.radians(site_lon - lon[i])
+            a = (math.sin(d_lat / 2) ** 2 +
+                 math.cos(math.radians(lat[i])) * math.cos(math.radians(site_lat)) * math.sin(d_lon / 2) ** 2)
+            if 2 * 6371 * math.atan2(math.sqrt(a), math.sqrt(1 - a)) <= radius_km:
+                pairs.add((i, j))
+    return pairs
+
+
+def synthetic_sites(features, count, rng):
+    sites = list(features)
+    for i in range(len(sites), count):
+        sites.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [rng.uniform(*BALTIC['lon']), rng.uniform(*BALTIC['lat'])]},
+            'properties': {'name': f'Synthetic site {i}', 'category': 'energy', 'criticality': 'medium'},
+        })
+    return sites
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--sites', type=int, nargs='+', default=[19, 2000])
+    parser.add_argument('--radius', type=float, default=PROXIMITY_RADIUS_KM)
+    parser.add_argument('--naive-limit', type=int, default=2_000_000,
+                        help='skip the naive loop above this many vessel x site pairs')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    with open('../app/data/poland_infrastructure.json', 'r', encoding='utf-8') as f:
+        shipped = json.load(f)['features']
+
+    for site_count in args.sites:
+        features = synthetic_sites(shipped, site_count, rng)
+        start = time.perf_counter()
+        tree_index = InfrastructureIndex(features, use_tree=True)
+        build = time.perf_counter() - start
+        dense_index = InfrastructureIndex(features, use_tree=False)
+        print(f"\n{len(features)} sites, radius {args.radius:g} km "
+              f"(cKDTree {'build %.1f ms' % (build * 1000) if cKDTree is not None else 'unavailable, pip install scipy'})")
+
+        for count in args.positions:
+            lat = rng.uniform(*BALTIC['lat'], count)
+            lon = rng.uniform(*BALTIC['lon'], count)
+            dense_time, (pos, feat, _) = timed(lambda: dense_index.within(lat, lon, args.radius))
+            pairs = set(zip(pos.tolist(), feat.tolist()))
+            line = f"  {count:>7} positions  numpy {dense_time * 1000:8.1f} ms"
+
+            if tree_index.tree is not None:
+                tree_time, (pos, feat, _) = timed(lambda: tree_index.within(lat, lon, args.radius))
+                assert set(zip(pos.tolist(), feat.tolist())) == pairs, 'cKDTree and numpy disagree'
+                line += f"  cKDTree {tree_time * 1000:8.1f} ms"
+
+            if count * len(features) <= args.naive_limit:
+                naive_time, naive = timed(lambda: naive_pairs(lat.tolist(), lon.tolist(), features, args.radius))
+                assert naive == pairs, 'naive loop and numpy disagree'
+                line += f"  naive {naive_time * 1000:8.1f} ms ({naive_time / dense_time:.0f}x numpy)"
+            else:
+                line += "  naive skipped"
+            print(f"{line}  {len(pairs)} alerts")
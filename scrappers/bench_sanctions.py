@@ -0,0 +1,72 @@
+"""Sanctions queries: rescanning the registry text per query vs the prebuilt index.
+
+The baseline answers "vessels the EU sanctioned after D" the way the
+registry had to before: run vessel_extract.SANCTION_RE over every record's
+sanctions strings and information text, then parse each match's date. The
+index is built once and answers the same question with a binary search. The
+benchmark times both, compares their answers and reports jurisdiction
+mentions the old pattern misses.
+
+    python bench_sanctions.py --input ../app/data/shadow_fleet.json --repeat 20
+"""
+import argparse
+import json
+import time
+
+from sanctions_index import SanctionsIndex, canonical_jurisdiction, find_dates
+from vessel_extract import SANCTION_RE
+
+QUERIES = [('EU', '2025-05-01'), ('United Kingdom', '2025-01-01'), ('Canada', None), ('United States', '2024-06-01')]
+
+
+def rescan(registry, jurisdiction, after):
+    """Registry rows whose text has a SANCTION_RE match by `jurisdiction` dated after `after`"""
+    rows = []
+    for row, vessel in enumerate(registry):
+        text = ' '.join(vessel.get('sanctions') or []) + ' ' + vessel.get('vessel_information', '')
+        for match in SANCTION_RE.finditer(text):
+            if canonical_jurisdiction(match.group(1)) != jurisdiction:
+                continue
+            dates = find_dates(match.group(0))
+            if dates and (after is None or dates[0][1] > after):
+                rows.append(row)
+                break
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    text_kb = sum(len(v.get('vessel_information', '')) + sum(map(len, v.get('sanctions') or []))
+                  for v in registry) / 1024
+    print(f"{len(registry)} vessels, {text_kb:.0f} KB of sanctions and information text")
+
+    start = time.perf_counter()
+    index, records = SanctionsIndex.build(registry)
+    build = time.perf_counter() - start
+    print(f"  index build {build * 1000:.0f} ms, {sum(map(len, records))} records "
+          f"({len(registry) / build:,.0f} vessels/s)")
+
+    for jurisdiction, after in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            old = rescan(registry, jurisdiction, after)
+        scan_time = (time.perf_counter() - start) / args.repeat
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            new = index.rows(jurisdiction, after, actions=('imposed', 'related'))
+        index_time = (time.perf_counter() - start) / args.repeat
+        only_old, only_new = set(old) - set(new), set(new) - set(old)
+        print(f"  {jurisdiction:<15} after {after or 'any':<10} rescan {scan_time * 1000:7.1f} ms {len(old):4d} vessels  "
+              f"index {index_time * 1e6:7.1f} µs {len(new):4d} vessels  "
+              f"(+{len(only_new)} found only by the index, {len(only_old)} only by the rescan)")
+
+    # Sentences the old pattern cannot match at all, e.g. "In June 2025, ..." without a day
+    sentences = {record['sentence'] for vessel_sanctions in records for record in vessel_sanctions}
+    missed = [sentence for sentence in sentences if not SANCTION_RE.search(sentence)]
+    print(f"  {len(missed)} of {len(sentences)} distinct sentences with records have no SANCTION_RE match")
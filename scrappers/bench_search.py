@@ -0,0 +1,94 @@
+"""Search index vs substring scanning, on the registry and a 100k-vessel synthetic fleet.
+
+Synthetic vessels get a made-up name and IMO, a real flag and type, and
+sentences sampled from real sanctions and intelligence text, so term
+statistics look like the registry's. For each fleet the benchmark reports
+index build time and artifact size, then query latency for the prebuilt
+index (first query per shard and warm) against scanning the lowercased text
+of every vessel, which is what filterVessels does over fewer fields.
+
+    python bench_search.py --input ../app/data/shadow_fleet.json --sizes 650 100000
+"""
+import argparse
+import gzip
+import os
+import random
+import re
+import tempfile
+import time
+import json
+
+import numpy as np
+
+from search_index import FIELD_WEIGHTS, SearchIndex, field_text
+
+QUERIES = ('gatik', 'sovcomflot', 'seafaring savants', 'panama tanker', 'eu imposed sanctions', 'shadow fl', 'cam')
+
+
+def synthetic_fleet(registry, count, seed=0):
+    """`count` vessels assembled from registry sentences, with fresh names and identifiers"""
+    rng = random.Random(seed)
+    sentences = [s for v in registry for s in re.split(r'(?<=\.)\s+', v.get('vessel_information') or '') if s]
+    sanctions = [s for v in registry for s in v.get('sanctions') or []]
+    syllables = ['ka', 'ro', 'mi', 'sa', 'to', 'ne', 'la', 'vi', 'da', 'po', 'ri', 'an', 'el', 'or', 'us']
+    fleet = []
+    for i in range(count):
+        template = registry[rng.randrange(len(registry))]
+        name = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).upper()
+        fleet.append({
+            'vessel_name': f"{name} {rng.randint(1, 9)}" if rng.random() < 0.2 else name,
+            'IMO': str(9_000_000 + i), 'MMSI': str(200_000_000 + rng.randrange(500_000_000)),
+            'flag': template.get('flag'), 'vessel_type': template.get('vessel_type'),
+            'category': template.get('category'),
+            'sanctions': rng.sample(sanctions, min(len(sanctions), rng.randint(0, 3))),
+            'vessel_information': ' '.join(rng.sample(sentences, rng.randint(3, 10))),
+        })
+    return fleet
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[650, 100_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+
+    for size in args.sizes:
+        fleet = registry if size == len(registry) else synthetic_fleet(registry, size)
+        text_mb = sum(len(field_text(v.get(field))) for v in fleet for field in FIELD_WEIGHTS) / 1e6
+        start = time.perf_counter()
+        index = SearchIndex.build(fleet)
+        build = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as directory:
+            manifest, files, _ = index.write(directory)
+            size_kb = sum(map(len, files.values())) / 1024
+            gz_kb = sum(len(gzip.compress(body, 9, mtime=0)) for body in files.values()) / 1024
+            shard_kb = [len(body) / 1024 for name, body in files.items() if name.startswith('terms-')]
+            print(f"{size:,} vessels ({'registry' if fleet is registry else 'synthetic'}, {text_mb:.1f} MB of text): "
+                  f"built in {build:.2f}s, {sum(s['terms'] for s in manifest['shards']):,} terms, "
+                  f"{sum(s['postings'] for s in manifest['shards']):,} postings")
+            print(f"  artifacts {size_kb:,.0f} KB ({gz_kb:,.0f} KB gzipped) in {len(shard_kb)} shards "
+                  f"of {np.median(shard_kb):.0f} KB median, {os.path.getsize(os.path.join(directory, 'search.json'))} B "
+                  f"search.json")
+
+            loaded = SearchIndex.load(directory)
+            lowered = [' '.join(field_text(v.get(field)) for field in FIELD_WEIGHTS).lower() for v in fleet]
+            for query in QUERIES:
+                cold, results = timed(lambda: loaded.search(query), 1)
+                warm, _ = timed(lambda: loaded.search(query), args.repeat)
+                scan, scanned = timed(lambda: [row for row, text in enumerate(lowered) if query in text],
+                                      max(1, args.repeat // 10))
+                print(f"  {query!r:<24} index {cold * 1000:7.2f} ms cold {warm * 1000:7.2f} ms warm  "
+                      f"scan {scan * 1000:8.2f} ms  {len(loaded.search(query, None)):6d} ranked / "
+                      f"{len(scanned):6d} substring hits")
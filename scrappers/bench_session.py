@@ -0,0 +1,68 @@
+"""Handshake and latency benchmark: bare requests.get vs the pooled shared session.
+
+Runs against a local HTTPS stand-in with a throwaway self-signed certificate
+(requires the openssl CLI):
+
+    python bench_session.py --pages 200 --concurrency 4
+"""
+import argparse
+import tempfile
+import time
+
+import requests
+
+import http_session
+from crawl_engine import CrawlEngine
+from standin_server import StandinSite, make_self_signed_cert, synthetic_vessels
+
+
+def run(site, urls, fetch, concurrency):
+    site.server.connections = 0
+    site.bytes_sent = 0
+    latencies = []
+
+    def timed(url):
+        start = time.perf_counter()
+        response = fetch(url)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    engine = CrawlEngine(concurrency=concurrency, rate=0, retries=0)
+    for _, _, _, error in engine.run(urls, timed):
+        if error is not None:
+            raise error
+    return {
+        'handshakes': site.connections,
+        'mean_ms': 1000 * sum(latencies) / len(latencies),
+        'kb_on_wire': site.bytes_sent / 1024,
+        'pages_per_sec': engine.pages_per_second(),
+    }
+
+
+def report(label, result):
+    print(f"{label:<10} {result['handshakes']:>10} {result['mean_ms']:>12.2f} "
+          f"{result['kb_on_wire']:>12.0f} {result['pages_per_sec']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated server latency in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert = make_self_signed_cert(tmp)
+        with StandinSite(synthetic_vessels(args.pages), latency=args.latency, tls_cert=cert) as site:
+            urls = site.vessel_urls()
+            headers = {'User-Agent': http_session.USER_AGENT}
+            print(f"{len(urls)} HTTPS pages, {args.concurrency} workers\n")
+            print(f"{'':<10} {'handshakes':>10} {'mean ms':>12} {'KB on wire':>12} {'pages/s':>10}")
+
+            before = run(site, urls, lambda url: requests.get(url, headers=headers, timeout=30, verify=cert),
+                         args.concurrency)
+            report('before', before)
+
+            http_session.configure(max_per_host=args.concurrency)
+            after = run(site, urls, lambda url: http_session.get(url, verify=cert), args.concurrency)
+            report('after', after)
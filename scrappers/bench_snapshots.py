@@ -0,0 +1,135 @@
+"""Snapshot store over a year of synthetic daily scrapes of the registry.
+
+Day 0 is the registry as scraped. Each following day moves most vessels
+(position, speed, course, lastUpdate), reflags a few, appends sanctions
+entries to a few more, edits some intelligence text, and adds and drops the
+odd vessel, roughly what consecutive scrapes plus enrichment look like. The
+benchmark reports commit time and store size against keeping a full JSON
+copy per day, then checkout ("as of D") and diff latency on a freshly opened
+store, cold and with its record cache warm, and verifies that checkout
+reproduces every sampled day exactly.
+
+    python bench_snapshots.py --input ../app/data/shadow_fleet.json --days 365
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from snapshot_store import SnapshotStore, canonical
+
+FLAGS = ('Panama', 'Gabon', 'Comoros', 'Cameroon', 'Sierra Leone', 'Cook Islands', 'Barbados', 'Unknown')
+SANCTIONS = ('EU imposed sanctions on the vessel on {date}.', 'UK imposed sanctions on the vessel on {date}.',
+             'Canada imposed sanctions on the vessel on {date}.', 'USA imposed sanctions on the vessel on {date}.')
+STATUSES = ('Under way using engine', 'At anchor', 'Moored')
+
+
+def next_day(fleet, day, when, rng, args):
+    """A copy of `fleet` with one day's worth of changes applied"""
+    fleet = [dict(vessel) for vessel in fleet]
+    for vessel in fleet:
+        if rng.random() < args.moving:
+            position = vessel.get('position') or {}
+            if position.get('lat') is None or position.get('lon') is None:
+                position = {'lat': rng.uniform(54, 60), 'lon': rng.uniform(10, 30)}
+            vessel['position'] = {'lat': round(position['lat'] + rng.uniform(-0.5, 0.5), 6),
+                                  'lon': round(position['lon'] + rng.uniform(-0.5, 0.5), 6)}
+            vessel['speed'] = round(rng.uniform(0, 14), 1)
+            vessel['course'] = rng.randrange(360)
+            vessel['navStatus'] = rng.choice(STATUSES)
+            vessel['lastUpdate'] = when.strftime('%Y-%m-%dT%H:%M:%SZ')
+        if rng.random() < 0.002:
+            vessel['flag'] = rng.choice(FLAGS)
+        if rng.random() < 0.005:
+            vessel['sanctions'] = list(vessel.get('sanctions') or []) + [
+                rng.choice(SANCTIONS).format(date=when.strftime('%d.%m.%Y'))]
+        if rng.random() < 0.003:
+            vessel['vessel_information'] = (vessel.get('vessel_information') or '') + \
+                f" Spotted near the Gulf of Finland on {when.date().isoformat()}."
+    if rng.random() < 0.3:
+        template = dict(rng.choice(fleet))
+        template.update({'IMO': str(9_900_000 + day), 'vessel_name': f"NEWBUILD {day}"})
+        fleet.insert(rng.randrange(len(fleet) + 1), template)
+    if rng.random() < 0.1:
+        fleet.pop(rng.randrange(len(fleet)))
+    return fleet
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (statistics.median(samples) * 1000, samples[int(0.99 * (len(samples) - 1))] * 1000)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--moving', type=float, default=0.6, help="share of vessels whose position changes daily")
+    parser.add_argument('--samples', type=int, default=30, help="days checked out and verified")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        fleet = json.load(f)
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1, 6, tzinfo=timezone.utc)
+    sampled = set(rng.sample(range(args.days), min(args.samples, args.days)))
+    expected, commits, full_bytes, changes = {}, [], 0, 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SnapshotStore(directory)
+        for day in range(args.days):
+            when = start + timedelta(days=day)
+            if day:
+                fleet = next_day(fleet, day, when, rng, args)
+            full_bytes += len(json.dumps(fleet, ensure_ascii=False, indent=2).encode('utf-8'))
+            if day in sampled:
+                expected[day] = [json.loads(canonical(vessel)) for vessel in fleet]
+            began = time.perf_counter()
+            result = store.commit(fleet, when, label=f"day {day}")
+            commits.append(time.perf_counter() - began)
+            if not day:
+                day0_bytes = result['bytes']
+            else:
+                changes += result['added'] + result['changed'] + result['removed']
+            if day in (0, 1):
+                print(f"  day {day}: {result['added']} added, {result['changed']} changed, "
+                      f"{result['bytes'] / 1024:.0f} KB")
+
+        s = store.stats()
+        stored = s['bytes']
+        first = commits[0]
+        print(f"{args.days} daily snapshots of ~{len(fleet)} vessels: {s['objects']:,} versions "
+              f"({s['keyframes']:,} keyframes), store {stored / 1e6:.1f} MB vs {full_bytes / 1e6:.0f} MB of daily "
+              f"copies ({full_bytes / stored:.0f}x smaller)")
+        print(f"  {changes:,} vessel changes after day 0, {changes / max(1, args.days - 1):.0f} a day: "
+              f"{(stored - day0_bytes) / max(1, changes):.0f} bytes per change")
+        print(f"  commit: first {first * 1000:.0f} ms, then median {percentiles(commits[1:])[0]:.0f} ms, "
+              f"p99 {percentiles(commits[1:])[1]:.0f} ms")
+
+        began = time.perf_counter()
+        reopened = SnapshotStore(directory)
+        print(f"  open: {(time.perf_counter() - began) * 1000:.0f} ms (log and object index)")
+
+        cold, warm = [], []
+        for day in sorted(sampled):
+            date = (start + timedelta(days=day)).date().isoformat()
+            began = time.perf_counter()
+            vessels = reopened.as_of(date)
+            cold.append(time.perf_counter() - began)
+            assert vessels == expected[day], f"checkout of day {day} differs from what was committed"
+            began = time.perf_counter()
+            reopened.as_of(date)
+            warm.append(time.perf_counter() - began)
+        print(f"  as_of: median {percentiles(cold)[0]:.1f} ms first checkout, {percentiles(warm)[0]:.1f} ms "
+              f"repeated; {len(sampled)} sampled days reproduced exactly")
+
+        for span in (1, 30, args.days - 1):
+            end = start + timedelta(days=args.days - 1)
+            began = time.perf_counter()
+            diff = reopened.diff((end - timedelta(days=span)).date().isoformat(), end.date().isoformat())
+            elapsed = time.perf_counter() - began
+            print(f"  diff over {span:3d} days: {elapsed * 1000:6.1f} ms, {len(diff['added'])} added, "
+                  f"{len(diff['removed'])} removed, {len(diff['changed'])} changed (positions ignored)")
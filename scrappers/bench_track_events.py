@@ -0,0 +1,146 @@
+"""Detection engine on a synthetic day of fleet-wide AIS with planted events.
+
+Every vessel sails for 24 hours with a fix every `--interval` seconds; some
+lie at anchor all day. Planted on top: ship-to-ship meetings (two vessels
+drifting within 200 m for 90 minutes), loitering near infrastructure sites
+and AIS gaps. The benchmark reports detection time and which planted events
+were found, then checks the bucketed rendezvous search against an all-pairs
+comparison of the same slow fixes and times both as the fleet grows.
+
+    python bench_track_events.py --vessels 5000 --interval 120
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from proximity_engine import InfrastructureIndex, chord_length, unit_vectors
+from track_events import (RENDEZVOUS_DISTANCE_M, SLOW_SPEED_KN, TIME_WINDOW, SiteIndex, candidate_pairs,
+                          detect_events)
+
+DAY = 86400
+
+
+def synthetic_day(vessels, interval, sites, seed=0, meetings=20, loiterers=20, gaps=20, anchored=0.1):
+    """{key: track} for one day, plus the planted (kind, keys, start) events"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, DAY, interval, dtype=np.int64) + 1_790_000_000 // DAY * DAY
+    tracks = {}
+    for key in range(1, vessels + 1):
+        lat0, lon0 = rng.uniform(54, 60), rng.uniform(12, 28)
+        if rng.random() < anchored:
+            speed = np.full(len(t), 0.2)
+            lat = lat0 + rng.normal(0, 2e-4, len(t))
+            lon = lon0 + rng.normal(0, 4e-4, len(t))
+        else:
+            speed = rng.uniform(8, 14) + rng.normal(0, 0.3, len(t))
+            heading = rng.uniform(0, 2 * np.pi) + np.cumsum(rng.normal(0, 0.01, len(t)))
+            step = speed * interval / 3600 / 60  # degrees of latitude per fix
+            lat = lat0 + np.cumsum(step * np.cos(heading))
+            lon = lon0 + np.cumsum(step * np.sin(heading)) / np.cos(np.radians(lat))
+        tracks[key] = {'timestamp': t.copy(), 'lat': lat, 'lon': lon, 'speed': speed, 'course': np.full(len(t), np.nan)}
+
+    planted = []
+    keys = rng.permutation(np.arange(1, vessels + 1)).tolist()
+
+    def drift(track, rows, lat, lon, spread):
+        track['lat'][rows] = lat + rng.normal(0, spread, len(rows))
+        track['lon'][rows] = lon + rng.normal(0, spread * 2, len(rows))
+        track['speed'][rows] = rng.uniform(0.2, 1.0, len(rows))
+
+    for _ in range(meetings):
+        a, b = keys.pop(), keys.pop()
+        start = int(rng.integers(0, len(t) - 90 * 60 // interval))
+        rows = np.arange(start, start + 90 * 60 // interval)
+        lat, lon = rng.uniform(54, 60), rng.uniform(12, 28)
+        drift(tracks[a], rows, lat, lon, 3e-4)
+        drift(tracks[b], rows, lat + 5e-4, lon, 3e-4)
+        planted.append(('rendezvous', (min(a, b), max(a, b)), int(t[start])))
+    for _ in range(loiterers):
+        key = keys.pop()
+        site = sites.features[int(rng.integers(len(sites.features)))]['geometry']['coordinates']
+        start = int(rng.integers(0, len(t) - 120 * 60 // interval))
+        drift(tracks[key], np.arange(start, start + 120 * 60 // interval), site[1] + 0.02, site[0], 3e-3)
+        planted.append(('loitering', (key,), int(t[start])))
+    for _ in range(gaps):
+        key = keys.pop()
+        start = int(rng.integers(0, len(t) - 4 * 3600 // interval))
+        keep = np.ones(len(t), dtype=bool)
+        keep[start:start + 4 * 3600 // interval] = False
+        tracks[key] = {name: column[keep] for name, column in tracks[key].items()}
+        planted.append(('ais_gap', (key,), int(t[start])))
+    return tracks, planted
+
+
+def found(planted, events):
+    hits = 0
+    for kind, keys, _ in planted:
+        for event in events[kind]:
+            event_keys = (event['key'], event['other_key']) if kind == 'rendezvous' else (event['key'],)
+            if event_keys == keys:
+                hits += 1
+                break
+    return hits
+
+
+def brute_force_pairs(t, xyz, distance_km, window, chunk=2048):
+    """All-pairs version of candidate_pairs"""
+    cell2 = chord_length(distance_km) ** 2 * (1 + 1e-9)
+    left, right = [], []
+    for start in range(0, len(t), chunk):
+        block = slice(start, start + chunk)
+        close = (np.abs(t[block, None] - t[None, :]) <= window) & \
+                (2 - 2 * (xyz[block] @ xyz.T) <= cell2)
+        i, j = np.nonzero(close)
+        i += start
+        keep = i < j
+        left.append(i[keep])
+        right.append(j[keep])
+    return np.concatenate(left), np.concatenate(right)
+
+
+def slow_fixes(tracks):
+    """(timestamp, lat, lon) of every fix at or below the idling speed"""
+    slow = [track['speed'] <= SLOW_SPEED_KN for track in tracks.values()]
+    return tuple(np.concatenate([track[name][rows] for track, rows in zip(tracks.values(), slow)])
+                 for name in ('timestamp', 'lat', 'lon'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, default=5000)
+    parser.add_argument('--interval', type=int, default=120, help="seconds between fixes")
+    parser.add_argument('--infrastructure', default='../app/data/poland_infrastructure.json')
+    parser.add_argument('--scaling', type=int, nargs='+', default=[125, 250, 500],
+                        help="fleet sizes for the all-pairs comparison")
+    args = parser.parse_args()
+
+    with open(args.infrastructure, 'r', encoding='utf-8') as f:
+        sites = InfrastructureIndex(json.load(f)['features'])
+    tracks, planted = synthetic_day(args.vessels, args.interval, sites)
+    fixes = sum(len(track['timestamp']) for track in tracks.values())
+    print(f"{args.vessels} vessels, one day, {fixes:,} fixes")
+
+    start = time.perf_counter()
+    events = detect_events(tracks.items(), SiteIndex(sites))
+    elapsed = time.perf_counter() - start
+    print(f"  detection {elapsed:.2f}s ({fixes / elapsed:,.0f} fixes/s)")
+    for kind in ('rendezvous', 'loitering', 'ais_gap'):
+        expected = [p for p in planted if p[0] == kind]
+        print(f"  {kind:<11} {len(events[kind]):4d} events, {found(expected, events)}/{len(expected)} planted found")
+
+    print(f"rendezvous candidates ({RENDEZVOUS_DISTANCE_M} m, {TIME_WINDOW} s): buckets vs all pairs")
+    for size in args.scaling:
+        subset = {key: tracks[key] for key in list(tracks)[:size]}
+        t, lat, lon = slow_fixes(subset)
+        xyz = unit_vectors(lat, lon)
+        begin = time.perf_counter()
+        bucketed = candidate_pairs(t, xyz, RENDEZVOUS_DISTANCE_M / 1000, TIME_WINDOW)
+        bucket_time = time.perf_counter() - begin
+        begin = time.perf_counter()
+        brute = brute_force_pairs(t, xyz, RENDEZVOUS_DISTANCE_M / 1000, TIME_WINDOW)
+        brute_time = time.perf_counter() - begin
+        same = set(zip(*(np.minimum(*bucketed), np.maximum(*bucketed)))) == set(zip(*brute))
+        print(f"  {size:5d} vessels {len(t):8,d} slow fixes  buckets {bucket_time * 1000:8.1f} ms  "
+              f"all pairs {brute_time * 1000:9.1f} ms  {len(brute[0])} pairs  {'✓ identical' if same else '✗ MISMATCH'}")
@@ -0,0 +1,80 @@
+"""Track storage and query time: raw vessel_history JSON vs the compact track store.
+
+Builds a synthetic history for every positioned vessel (the same tracks the
+mock vessel_history endpoint serves), ingests it one day per flush like a
+daily refresh would, and times "last 7 days for vessel X" against a fresh
+store (cold index) and a warm one.
+
+    python bench_track_store.py --days 30 --interval 600 --queries 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from standin_server import load_vessels, synthetic_track, synthetic_vessels
+from track_store import TrackStore, vessel_key
+
+
+def timed_queries(store, keys, now):
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        store.last(key, 7, now=now)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vessels', type=int, default=0, help="synthetic fleet size (default: shipped registry)")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--interval', type=int, default=600, help="seconds between history points")
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    vessels = synthetic_vessels(args.vessels) if args.vessels else load_vessels()
+    # One track per key, as ingest_fleet stores it
+    vessels = list({vessel_key(v): v for v in vessels
+                    if v.get('position') and v['position'].get('lat') is not None and vessel_key(v)}.values())
+    now = int(time.time()) // 86400 * 86400
+    start_day = now - args.days * 86400
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TrackStore(os.path.join(tmp, 'tracks'))
+        json_bytes = points = 0
+        ingest = 0.0
+        for day in range(start_day, now, 86400):
+            for vessel in vessels:
+                track = synthetic_track(vessel, day, day + 86400, args.interval)
+                json_bytes += len(json.dumps({'data': track}))
+                points += len(track)
+                begin = time.perf_counter()
+                store.add_history(vessel_key(vessel), track)
+                ingest += time.perf_counter() - begin
+            begin = time.perf_counter()
+            store.flush()
+            ingest += time.perf_counter() - begin
+
+        stats = store.stats()
+        print(f"{len(vessels)} vessels x {args.days} days, one point per {args.interval}s: {points:,} points")
+        print(f"  raw vessel_history JSON   {json_bytes / 1e6:8.1f} MB  ({json_bytes / points:.0f} B/point)")
+        print(f"  track store               {stats['bytes'] / 1e6:8.1f} MB  ({stats['bytes'] / points:.1f} B/point, "
+              f"{json_bytes / stats['bytes']:.0f}x smaller, {stats['segments']} segments)")
+        print(f"  ingest                    {ingest:8.2f} s   ({points / ingest:,.0f} points/s)")
+
+        keys = [vessel_key(v) for v in random.Random(0).choices(vessels, k=args.queries)]
+        cold = []
+        for key in keys[:20]:
+            fresh = TrackStore(store.path)
+            begin = time.perf_counter()
+            fresh.last(key, 7, now=now)
+            cold.append((time.perf_counter() - begin) * 1000)
+        warm_median, warm_max = timed_queries(store, keys, now)
+        sample = store.last(keys[0], 7, now=now)
+        print(f"last 7 days for one vessel ({len(sample['timestamp'])} points):")
+        print(f"  cold index                {statistics.median(cold):8.2f} ms median, {max(cold):.2f} ms max")
+        print(f"  warm index                {warm_median:8.2f} ms median, {warm_max:.2f} ms max")
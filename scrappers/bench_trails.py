@@ -0,0 +1,72 @@
+"""Trail simplification on long synthetic tracks: points, bytes and throughput per zoom level.
+
+Tracks are random legs of slowly wandering course with GPS jitter, the
+kind of line drawVesselTrail used to receive in full. For every method the
+benchmark reports how many points and bytes each zoom level keeps and the
+largest deviation from the full track in screen pixels.
+
+    python bench_trails.py --points 100000 --tracks 3
+"""
+import argparse
+import gzip
+import time
+
+import numpy as np
+
+from build_frontend_data import minify
+from trail_lod import (SIMPLIFIERS, TOLERANCE_PX, ZOOM_LEVELS, _segment_distance, lod_coordinates, mercator,
+                       point_importance, zoom_tolerance)
+
+
+def synthetic_path(points: int, seed: int):
+    """(lon, lat) of a track that changes course every ~2000 points, starting in the Baltic"""
+    rng = np.random.default_rng(seed)
+    legs = -(-points // 2000)
+    heading = np.repeat(rng.uniform(0, 2 * np.pi, legs), 2000)[:points] + np.cumsum(rng.normal(0, 0.02, points))
+    step = 0.0005  # about 55 m between fixes
+    lat = 56 + np.cumsum(step * np.sin(heading)) + rng.normal(0, 1e-5, points)
+    lon = 19 + np.cumsum(step * np.cos(heading)) / np.cos(np.radians(lat)) + rng.normal(0, 1e-5, points)
+    return lon, lat
+
+
+def max_deviation_px(lon, lat, weights, zoom) -> float:
+    """Largest distance, in pixels at `zoom`, from a dropped point to the kept segment spanning it"""
+    x, y = mercator(lon, lat)
+    kept = np.flatnonzero(weights >= zoom_tolerance(zoom))
+    dropped = np.setdiff1d(np.arange(len(x)), kept)
+    if not len(dropped):
+        return 0.0
+    right = np.searchsorted(kept, dropped)
+    distance = _segment_distance(x, y, dropped, kept[right - 1], kept[right])
+    return float(distance.max() / zoom_tolerance(zoom, 1.0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--tracks', type=int, default=3)
+    parser.add_argument('--methods', nargs='+', choices=sorted(SIMPLIFIERS), default=['dp', 'vw'])
+    args = parser.parse_args()
+
+    paths = [synthetic_path(args.points, seed) for seed in range(args.tracks)]
+    raw = [minify(np.round(np.column_stack(path), 6).tolist()) for path in paths]
+    raw_bytes = sum(map(len, raw))
+    raw_gz = sum(len(gzip.compress(body, 6)) for body in raw)
+    print(f"{args.tracks} tracks x {args.points:,} points, tolerance {TOLERANCE_PX:g} px")
+    print(f"  raw coordinates        {args.points * args.tracks:9,d} points  {raw_bytes / 1024:8.0f} KB  "
+          f"{raw_gz / 1024:7.0f} KB gz")
+
+    for method in args.methods:
+        start = time.perf_counter()
+        weights = [point_importance(lon, lat, method) for lon, lat in paths]
+        elapsed = time.perf_counter() - start
+        print(f"{method}: {args.points * args.tracks / elapsed:,.0f} points/s "
+              f"({elapsed / args.tracks * 1000:.0f} ms per track, all levels at once)")
+        for zoom in ZOOM_LEVELS:
+            levels = [lod_coordinates(lon, lat, w, zoom) for (lon, lat), w in zip(paths, weights)]
+            bodies = [minify(coordinates) for coordinates in levels]
+            deviation = max(max_deviation_px(lon, lat, w, zoom) for (lon, lat), w in zip(paths, weights))
+            print(f"  zoom {zoom:>2}                {sum(map(len, levels)):9,d} points  "
+                  f"{sum(map(len, bodies)) / 1024:8.0f} KB  "
+                  f"{sum(len(gzip.compress(b, 6)) for b in bodies) / 1024:7.0f} KB gz  "
+                  f"max deviation {deviation:.2f} px")
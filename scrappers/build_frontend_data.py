@@ -0,0 +1,157 @@
+"""Build compact frontend data artifacts from the vessel registry.
+
+The map only needs identity and position fields at startup, so the registry
+is split into a slim index plus detail shards (sanctions, category,
+intelligence text) that the UI fetches when a vessel is opened. Every file
+is minified, written alongside .gz (and .br when brotli is installed)
+copies for servers that serve pre-compressed assets, and named after its
+content hash so it can be cached forever. `manifest.json` is the only file
+that changes name-for-name between builds.
+
+    python build_frontend_data.py --input ../app/data/shadow_fleet.json --output-dir ../app/data
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+from fleet_journal import write_json_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Fields the vessel list, map markers, popups and tooltips read before a vessel is opened
+INDEX_FIELDS = (
+    'vessel_name', 'IMO', 'MMSI', 'flag', 'vessel_type', 'vessel_photo_url',
+    'position', 'speed', 'course', 'destination', 'navStatus', 'lastUpdate',
+)
+SHARD_SIZE = 32
+BUILD_DIR = 'build'
+MANIFEST_FILE = 'manifest.json'
+
+
+def minify(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_name(stem: str, body: bytes, suffix: str = '.json') -> str:
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}{suffix}"
+
+
+def registry_digest(path: str) -> str:
+    """SHA-256 prefix of a registry file as stored; every index built from it records this as `registry`"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Pre-compressed copies keyed by file suffix; mtime=0 keeps rebuilds byte-identical"""
+    variants = {'.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(body, quality=11)
+    return variants
+
+
+def split_record(vessel: Dict) -> Tuple[Dict, Dict]:
+    """Split a registry record into its index entry and its on-demand details"""
+    entry = {key: vessel[key] for key in INDEX_FIELDS if vessel.get(key) not in (None, '')}
+    details = {key: value for key, value in vessel.items() if key not in INDEX_FIELDS}
+    return entry, details
+
+
+def build_artifacts(vessels: List[Dict], shard_size: int = SHARD_SIZE) -> Tuple[Dict, Dict[str, bytes]]:
+    """Return the manifest and {filename: minified body} for the index and detail shards.
+
+    Index entries keep registry order; details for entry i live at offset
+    i % shard_size of shard i // shard_size.
+    """
+    index, details = [], []
+    for vessel in vessels:
+        entry, detail = split_record(vessel)
+        index.append(entry)
+        details.append(detail)
+
+    files = {}
+    index_body = minify(index)
+    index_name = content_name('index', index_body)
+    files[index_name] = index_body
+
+    shards = []
+    for start in range(0, len(details), shard_size):
+        body = minify(details[start:start + shard_size])
+        name = content_name(f"details-{start // shard_size:04d}", body)
+        files[name] = body
+        shards.append(f"{BUILD_DIR}/{name}")
+
+    manifest = {
+        'version': 1,
+        'vessels': len(vessels),
+        'shard_size': shard_size,
+        'index': f"{BUILD_DIR}/{index_name}",
+        'shards': shards,
+        'encodings': ['gzip', 'br'] if brotli is not None else ['gzip'],
+    }
+    return manifest, files
+
+
+def write_artifacts(output_dir: str, manifest: Dict, files: Dict[str, bytes],
+                    build_dir: str = BUILD_DIR, manifest_file: str = MANIFEST_FILE, compress: bool = True) -> List[str]:
+    """Write the artifacts and their compressed copies, drop files from older builds, then swap in the manifest.
+
+    Pass compress=False for bodies that are already compressed, such as images.
+    """
+    build_dir = os.path.join(output_dir, build_dir)
+    os.makedirs(build_dir, exist_ok=True)
+
+    keep = set()
+    for name, body in files.items():
+        outputs = {name: body}
+        if compress:
+            outputs.update({name + suffix: data for suffix, data in compress_variants(body).items()})
+        for out_name, data in outputs.items():
+            keep.add(out_name)
+            path = os.path.join(build_dir, out_name)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+
+    # The manifest goes last so a browser never sees it pointing at files that are not there yet
+    write_json_atomic(os.path.join(output_dir, manifest_file), manifest)
+
+    stale = sorted(name for name in os.listdir(build_dir) if name not in keep)
+    for name in stale:
+        os.remove(os.path.join(build_dir, name))
+    return stale
+
+
+def build_frontend_data(input_file: str, output_dir: str, shard_size: int = SHARD_SIZE) -> Dict:
+    with open(input_file, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+
+    manifest, files = build_artifacts(vessels, shard_size)
+    # app.js hands this to map.js and ui.js, which drop clusters, search and photo indexes built from other data
+    manifest['registry'] = registry_digest(input_file)
+    stale = write_artifacts(output_dir, manifest, files)
+
+    index_body = files[os.path.basename(manifest['index'])]
+    source_size = os.path.getsize(input_file)
+    print(f"✓ {len(vessels)} vessels: index {len(index_body) / 1024:.0f} KB "
+          f"({len(gzip.compress(index_body, 9, mtime=0)) / 1024:.0f} KB gzipped), "
+          f"{len(manifest['shards'])} detail shards of {shard_size}")
+    print(f"  source {input_file} is {source_size / 1024:.0f} KB; "
+          f"manifest written to {os.path.join(output_dir, MANIFEST_FILE)}, {len(stale)} stale files removed")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the slim index and detail shards the map loads")
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--output-dir', default='../app/data')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    build_frontend_data(args.input, args.output_dir, args.shard_size)
@@ -0,0 +1,168 @@
+"""Nearest submarine cable for every vessel, from a grid index over cable segments.
+
+Each LineString in submarine_cables.json is split into great-circle
+segments. Distance from a position to a segment is the cross-track distance
+when the position projects inside the arc, otherwise the distance to the
+nearer endpoint, all computed on unit vectors with dot products.
+
+Queries are bucketed into lat/lon grid cells. The first time a cell is hit,
+the distance from its centre to every segment is computed once and only the
+segments that could be nearest to some point in the cell are kept: with r
+the centre-to-corner distance, any point in the cell is within r of the
+centre, so a segment farther than (nearest + 2r) from the centre can never
+win. Vessels in the same cell are then matched against that short list in
+one vectorized pass, and the answer is exact.
+
+    python cable_index.py --radius 10 --output cable_alerts.json
+"""
+import argparse
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fleet_journal import write_json_atomic
+from proximity_engine import EARTH_RADIUS_KM, PROXIMITY_RADIUS_KM, fleet_positions, haversine_km, unit_vectors
+
+CELL_DEGREES = 1.0  # measured fastest for the shipped cables in bench_cables.py
+
+
+def _angle_from_dot(dot: np.ndarray) -> np.ndarray:
+    """Angle between unit vectors from their dot product, via the chord for precision near zero"""
+    return 2 * np.arcsin(np.sqrt(np.clip(2 - 2 * dot, 0, 4)) / 2)
+
+
+class CableIndex:
+    """Segment-level index over GeoJSON LineString/MultiLineString cable features"""
+
+    def __init__(self, features: List[Dict], cell_degrees: float = CELL_DEGREES):
+        self.features = []
+        starts, ends, owners = [], [], []
+        for feature in features:
+            geometry = feature['geometry']
+            if geometry['type'] == 'LineString':
+                lines = [geometry['coordinates']]
+            elif geometry['type'] == 'MultiLineString':
+                lines = geometry['coordinates']
+            else:
+                continue
+            for line in lines:
+                for start, end in zip(line, line[1:]):
+                    starts.append(start[:2])
+                    ends.append(end[:2])
+                    owners.append(len(self.features))
+            self.features.append(feature)
+
+        starts = np.array(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.array(ends, dtype=np.float64).reshape(-1, 2)
+        self.segment_cable = np.array(owners, dtype=np.int64)
+        self.a = unit_vectors(starts[:, 1], starts[:, 0])
+        self.b = unit_vectors(ends[:, 1], ends[:, 0])
+
+        normal = np.cross(self.a, self.b)
+        length = np.linalg.norm(normal, axis=1)
+        # Zero-length segments (repeated vertices) are measured as points
+        self.degenerate = length < 1e-15
+        self.normal = normal / np.where(self.degenerate, 1, length)[:, None]
+        # Tangents at A and B pointing along the arc; a projection lies on the
+        # arc when it is past A going forward and not yet past B
+        self.forward_a = np.cross(self.normal, self.a)
+        self.forward_b = np.cross(self.normal, self.b)
+
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.a)
+
+    def arc_distances(self, xyz: np.ndarray, segments=slice(None)) -> np.ndarray:
+        """(points x segments) great-circle distance in km from unit vectors to cable segments"""
+        normal = self.normal[segments]
+        cross_track = np.arcsin(np.clip(np.abs(xyz @ normal.T), 0, 1))
+        inside = ((xyz @ self.forward_a[segments].T >= 0) & (xyz @ self.forward_b[segments].T <= 0)
+                  & ~self.degenerate[segments])
+        endpoints = np.minimum(_angle_from_dot(xyz @ self.a[segments].T), _angle_from_dot(xyz @ self.b[segments].T))
+        return EARTH_RADIUS_KM * np.where(inside, np.minimum(cross_track, endpoints), endpoints)
+
+    def _cell_candidates(self, cell: Tuple[int, int]) -> np.ndarray:
+        candidates = self.cells.get(cell)
+        if candidates is None:
+            size = self.cell_degrees
+            lat0, lon0 = cell[0] * size, cell[1] * size
+            center_lat, center_lon = min(max(lat0 + size / 2, -90), 90), lon0 + size / 2
+            corner_lat = np.clip([lat0, lat0, lat0 + size, lat0 + size], -90, 90)
+            corner_lon = np.array([lon0, lon0 + size, lon0, lon0 + size])
+            reach = haversine_km(center_lat, center_lon, corner_lat, corner_lon).max()
+            from_center = self.arc_distances(unit_vectors([center_lat], [center_lon]))[0]
+            # Small slack so rounding can never drop the true nearest segment
+            candidates = np.flatnonzero(from_center <= from_center.min() + 2 * reach + 1e-6)
+            self.cells[cell] = candidates
+        return candidates
+
+    def nearest(self, lat, lon) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(distance km, cable index, segment index) of the nearest cable for each position"""
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        distance = np.full(len(lat), np.inf)
+        segment = np.full(len(lat), -1, dtype=np.int64)
+        if not len(lat) or not len(self):
+            return distance, segment.copy(), segment
+
+        xyz = unit_vectors(lat, lon)
+        keys = np.column_stack((np.floor(lat / self.cell_degrees), np.floor(lon / self.cell_degrees))).astype(np.int64)
+        cells, cell_of = np.unique(keys, axis=0, return_inverse=True)
+        cell_of = cell_of.reshape(-1)
+        order = np.argsort(cell_of, kind='stable')
+        bounds = np.searchsorted(cell_of[order], np.arange(len(cells) + 1))
+
+        for c, cell in enumerate(cells):
+            rows = order[bounds[c]:bounds[c + 1]]
+            candidates = self._cell_candidates((int(cell[0]), int(cell[1])))
+            distances = self.arc_distances(xyz[rows], candidates)
+            best = distances.argmin(axis=1)
+            distance[rows] = distances[np.arange(len(rows)), best]
+            segment[rows] = candidates[best]
+        return distance, self.segment_cable[segment], segment
+
+
+def cable_alerts(vessels: List[Dict], index: CableIndex, radius_km: float = PROXIMITY_RADIUS_KM) -> List[Dict]:
+    """Proximity alert records, nearest first, for vessels within `radius_km` of a cable"""
+    rows, lat, lon = fleet_positions(vessels)
+    distance, cable, _ = index.nearest(lat, lon)
+    alerts = []
+    for k in np.argsort(distance, kind='stable'):
+        if distance[k] > radius_km:
+            break
+        vessel = vessels[rows[k]]
+        properties = index.features[cable[k]]['properties']
+        alerts.append({
+            'vesselName': vessel.get('vessel_name', ''),
+            'IMO': vessel.get('IMO', ''),
+            'MMSI': vessel.get('MMSI', ''),
+            'infrastructure': properties.get('name', ''),
+            'category': properties.get('category', ''),
+            'cable_type': properties.get('cable_type', ''),
+            'distance': round(float(distance[k]), 2),
+            'criticality': properties.get('criticality', ''),
+        })
+    return alerts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find vessels close to submarine cables")
+    parser.add_argument('--fleet', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--cables', default='../app/data/submarine_cables.json')
+    parser.add_argument('--radius', type=float, default=PROXIMITY_RADIUS_KM, help='alert radius in km')
+    parser.add_argument('--output', default='cable_alerts.json')
+    args = parser.parse_args()
+
+    with open(args.fleet, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    with open(args.cables, 'r', encoding='utf-8') as f:
+        index = CableIndex(json.load(f)['features'])
+
+    alerts = cable_alerts(vessels, index, args.radius)
+    write_json_atomic(args.output, alerts, indent=2)
+    print(f"✓ {len(alerts)} vessels within {args.radius:g} km of {len(index.features)} cables "
+          f"({len(index)} segments), saved to {args.output}")
+    for alert in alerts[:10]:
+        print(f"  ⚠ {alert['vesselName']} - {alert['infrastructure']} ({alert['cable_type']}): {alert['distance']} km")
@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import telemetry
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting how many requests start per second"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class CrawlEngine:
+    """Runs a fetch/parse worker over many items with bounded concurrency.
+
+    At most `concurrency` items are in flight at once, every attempt takes a
+    token from a shared bucket refilled at `rate` per second, and failures
+    accepted by `retry_if` are retried with full-jitter exponential backoff.
+    """
+
+    def __init__(self, concurrency: int = 4, rate: float = 2.0, burst: Optional[int] = None,
+                 retries: int = 3, backoff: float = 1.0, max_backoff: float = 30.0,
+                 retry_if: Optional[Callable[[Exception], bool]] = None):
+        self.concurrency = max(1, concurrency)
+        self.limiter = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_if = retry_if or (lambda error: True)
+
+        self.stats_lock = threading.Lock()
+        self.stats = {'completed': 0, 'failed': 0, 'attempts': 0, 'retries': 0, 'elapsed': 0.0}
+
+    def _count(self, key: str, amount: int = 1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def _run_one(self, worker: Callable, item):
+        """Run worker(item) under the rate limiter, retrying transient errors"""
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            self._count('attempts')
+            try:
+                return worker(item)
+            except Exception as error:
+                if attempt >= self.retries or not self.retry_if(error):
+                    raise
+                attempt += 1
+                self._count('retries')
+                telemetry.count('retries', error=type(error).__name__)
+                # Full jitter keeps retrying workers from hitting the site in lockstep
+                delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+                time.sleep(random.uniform(0, delay))
+
+    def run(self, items: Iterable, worker: Callable) -> Iterator[Tuple[int, object, object, Optional[Exception]]]:
+        """Yield (index, item, result, error) tuples in completion order"""
+        start = time.monotonic()
+        items = iter(enumerate(items))
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            def submit_next():
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    return False
+                in_flight[pool.submit(self._run_one, worker, item)] = (index, item)
+                return True
+
+            for _ in range(self.concurrency):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, item = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        self._count('completed')
+                        result = future.result()
+                    else:
+                        self._count('failed')
+                        result = None
+                    submit_next()
+                    yield index, item, result, error
+
+        self.stats['elapsed'] = time.monotonic() - start
+
+    def pages_per_second(self) -> float:
+        elapsed = self.stats['elapsed']
+        done = self.stats['completed'] + self.stats['failed']
+        return done / elapsed if elapsed else 0.0
@@ -0,0 +1,292 @@
+"""Concurrent position enrichment from the Datalastic vessel API.
+
+Python replacement for enrich_positions.js: lookups run on the crawl engine
+with several requests in flight, every API request takes a token from a
+requests-per-second limiter and a credit from a fixed budget, and vessels
+with the oldest (or no) lastUpdate are refreshed first so a budget that runs
+out still spends its credits where they matter most. A vessel the API did
+not find is stamped with lastMiss and waits behind the merely stale ones
+until MISS_RETRY_HOURS have passed. Results are journaled as they arrive, so
+an interrupted or budget-limited run resumes where it stopped without paying
+for the same lookups again.
+
+    python enrich_positions.py --concurrency 8 --rate 10 --credits 1000
+    python enrich_positions.py --api-base http://127.0.0.1:8765/api/v0   # standin_server.py mock
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import http_session
+import telemetry
+from crawl_engine import CrawlEngine, TokenBucket
+from fleet_journal import FleetJournal, JOURNAL_SUFFIX, write_json_atomic
+from position_cache import API_BASE, API_KEY_ENV, PositionCache, lookup_key
+from scrape_all_vessels import is_transient_error
+
+POSITION_FIELDS = ('position', 'speed', 'course', 'destination', 'navStatus', 'lastUpdate')
+CHECKPOINT_SUFFIX = '.positions' + JOURNAL_SUFFIX
+MISS_RETRY_HOURS = 7 * 24
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class CreditBudget:
+    """Thread-safe API credit counter; `limit` None means unlimited"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def spend(self, credits: int = 1):
+        with self.lock:
+            if self.limit is not None and self.used + credits > self.limit:
+                raise BudgetExhausted(f"credit budget of {self.limit} exhausted")
+            self.used += credits
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.limit is None else self.limit - self.used
+
+
+class PositionAPI:
+    """Vessel position and history lookups by MMSI, then IMO, each upstream request paid for up front.
+
+    With a PositionCache, repeated and concurrent identical lookups are served
+    from it and cost nothing.
+    """
+
+    def __init__(self, api_key: str, api_base: str = API_BASE, budget: Optional[CreditBudget] = None,
+                 limiter: Optional[TokenBucket] = None, get: Callable = http_session.get,
+                 cache: Optional[PositionCache] = None):
+        self.api_key = api_key
+        self.cache = cache
+        self.api_base = api_base.rstrip('/')
+        self.budget = budget or CreditBudget()
+        self.limiter = limiter or TokenBucket(0)
+        self.get = get
+        self.slowed_at = 0.0
+
+    def fetch(self, endpoint: str = 'vessel', **params) -> Tuple[int, Dict]:
+        """One upstream call, returning (status, payload); 404 means the vessel is unknown"""
+        self.budget.spend()
+        telemetry.count('credits')
+        self.limiter.acquire()
+        with telemetry.stage('api'):
+            response = self.get(f"{self.api_base}/{endpoint}", params={'api-key': self.api_key, **params})
+        telemetry.count('api_responses', endpoint=endpoint, status=response.status_code)
+        if response.status_code == 404:
+            return 404, {}
+        if response.status_code == 429:
+            self.slow_down()
+        response.raise_for_status()
+        return response.status_code, response.json()
+
+    def request(self, endpoint: str = 'vessel', **params) -> Optional[Dict]:
+        """Data object for a lookup, or None if the vessel is unknown"""
+        if self.cache is not None:
+            key = lookup_key(dict(params, endpoint=endpoint))
+            status, payload = self.cache.get(key, lambda: self.fetch(endpoint, **params))
+        else:
+            status, payload = self.fetch(endpoint, **params)
+        return payload.get('data') or None if status == 200 else None
+
+    def slow_down(self):
+        """Halve the request rate after a 429 so retries fit under the API's real limit"""
+        with self.limiter.lock:
+            now = time.monotonic()
+            # Requests already in flight answer 429 together; count that as one signal
+            if self.limiter.rate > 1 and now - self.slowed_at >= 1.0:
+                self.slowed_at = now
+                self.limiter.rate = max(1.0, self.limiter.rate / 2)
+                self.limiter.capacity = min(self.limiter.capacity, max(1.0, int(self.limiter.rate)))
+                self.limiter.tokens = min(self.limiter.tokens, self.limiter.capacity)
+                print(f"⏱ API throttled us, slowing to {self.limiter.rate:g} req/s")
+
+    def _by_identifier(self, vessel: Dict, endpoint: str = 'vessel', **params):
+        data = None
+        if vessel.get('MMSI'):
+            data = self.request(endpoint, mmsi=vessel['MMSI'], **params)
+        if data is None and vessel.get('IMO'):
+            data = self.request(endpoint, imo=vessel['IMO'], **params)
+        return data
+
+    def history(self, vessel: Dict, date_from: str, date_to: str):
+        """vessel_history data (YYYY-MM-DD bounds) for a registry record, or None if it is unknown"""
+        return self._by_identifier(vessel, 'vessel_history', date_from=date_from, date_to=date_to)
+
+    def lookup(self, vessel: Dict) -> Optional[Dict]:
+        """Position fields for a registry record, or None if neither identifier is found"""
+        data = self._by_identifier(vessel)
+        if data is None:
+            return None
+        return {
+            'position': {'lat': data.get('lat'), 'lon': data.get('lon')},
+            'speed': data.get('speed'),
+            'course': data.get('course'),
+            'destination': data.get('destination'),
+            'navStatus': data.get('navigation_status'),
+            'lastUpdate': data.get('last_position_UTC'),
+        }
+
+
+def parse_utc(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def last_update(vessel: Dict) -> Optional[datetime]:
+    return parse_utc(vessel.get('lastUpdate'))
+
+
+def utc_now() -> str:
+    """Current time in the API's last_position_UTC format"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def staleness_order(vessels: List[Dict], max_age_hours: Optional[float] = None, now: Optional[datetime] = None,
+                    miss_retry_hours: float = MISS_RETRY_HOURS) -> List[int]:
+    """Row indices to refresh, never-positioned vessels first, then oldest lastUpdate.
+
+    Vessels updated within `max_age_hours` are left out. Vessels the API did
+    not find within `miss_retry_hours` come last, oldest miss first, so a
+    limited budget goes to vessels it can actually position.
+    """
+    now = now or datetime.now(timezone.utc)
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    rows = []
+    for i, vessel in enumerate(vessels):
+        if not vessel.get('MMSI') and not vessel.get('IMO'):
+            continue
+        updated = last_update(vessel)
+        if updated is not None and max_age_hours is not None and (now - updated).total_seconds() < max_age_hours * 3600:
+            continue
+        missed = parse_utc(vessel.get('lastMiss'))
+        if missed is not None and (now - missed).total_seconds() < miss_retry_hours * 3600:
+            rows.append((1, missed, i))
+        else:
+            rows.append((0, updated or oldest, i))
+    return [i for _, _, i in sorted(rows)]
+
+
+def checkpoint_key(i: int, vessel: Dict) -> str:
+    # Row plus identifiers, so a checkpoint from a different registry file is never applied
+    return f"{i}:{vessel.get('IMO', '')}:{vessel.get('MMSI', '')}"
+
+
+def enrich_positions(input_file='shadow_fleet.json', output_file=None, api_key=None, api_base=API_BASE,
+                     concurrency=8, rate=10.0, credits=None, max_age_hours=None, limit=None, retries=3,
+                     fresh=False):
+    """Refresh positions for the stalest vessels within the rate and credit limits"""
+    output_file = output_file or input_file
+    api_key = api_key or os.environ.get(API_KEY_ENV)
+    if not api_key:
+        print(f"✗ {API_KEY_ENV} is not set (or pass --api-key)")
+        return None
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+
+    checkpoint_file = output_file + CHECKPOINT_SUFFIX
+    if fresh and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+    journal = FleetJournal(checkpoint_file)
+
+    rows = staleness_order(vessels, max_age_hours)
+    rows = [i for i in rows if checkpoint_key(i, vessels[i]) not in journal.records]
+    deferred = len(rows) - limit if limit and len(rows) > limit else 0
+    if deferred:
+        rows = rows[:limit]
+    print(f"Enriching {len(rows)} vessels ({len(journal.records)} already checkpointed) "
+          f"with {concurrency} workers at {rate:g} req/s, budget {credits if credits is not None else 'unlimited'} credits")
+
+    http_session.configure(max_per_host=concurrency)
+    budget = CreditBudget(credits)
+    # Registry records share MMSIs/IMOs, so repeats are answered from the cache for free
+    cache = PositionCache()
+    api = PositionAPI(api_key, api_base, budget, TokenBucket(rate), cache=cache)
+    # The API object rate-limits each request itself (a lookup may need two),
+    # so the engine only bounds concurrency and retries
+    engine = CrawlEngine(concurrency=concurrency, rate=0, retries=retries, retry_if=is_transient_error)
+
+    stats = {'found': 0, 'not_found': 0, 'failed': 0, 'over_budget': 0}
+    start = time.monotonic()
+    for done, (_, i, fields, error) in enumerate(engine.run(rows, lambda i: api.lookup(vessels[i])), start=1):
+        vessel = vessels[i]
+        if isinstance(error, BudgetExhausted):
+            stats['over_budget'] += 1
+            continue
+        if error is not None:
+            stats['failed'] += 1
+            telemetry.error('enrich', error)
+            print(f"[{done}/{len(rows)}] ✗ {vessel.get('vessel_name', '')}: {error}")
+            continue
+        # Misses are checkpointed too so a resumed run does not pay for them again
+        if fields is None:
+            journal.append(checkpoint_key(i, vessel), {'fields': None, 'missed_at': utc_now()})
+            stats['not_found'] += 1
+        else:
+            journal.append(checkpoint_key(i, vessel), {'fields': fields})
+            stats['found'] += 1
+        if done % 50 == 0:
+            print(f"[{done}/{len(rows)}] {stats['found']} positions, {budget.used} credits used")
+    elapsed = time.monotonic() - start
+
+    # Apply every checkpointed result; vessels without a fresh fix keep their previous position
+    applied = 0
+    for i, vessel in enumerate(vessels):
+        entry = journal.records.get(checkpoint_key(i, vessel))
+        if entry and entry['fields']:
+            vessel.update(entry['fields'])
+            vessel.pop('lastMiss', None)
+            applied += 1
+        elif entry and entry.get('missed_at'):
+            vessel['lastMiss'] = entry['missed_at']
+    write_json_atomic(output_file, vessels, indent=2)
+    complete = not stats['failed'] and not stats['over_budget'] and not deferred
+    journal.close(remove=complete)
+
+    requests_per_second = budget.used / elapsed if elapsed else 0.0
+    print(f"\n✓ {stats['found']} positions, {stats['not_found']} not found, {stats['failed']} failed, "
+          f"{stats['over_budget']} skipped over budget")
+    print(f"💳 {budget.used} credits in {elapsed:.1f}s ({requests_per_second:.1f} req/s), "
+          f"{cache.upstream_saved()} lookups answered from cache; {applied} vessels updated in {output_file}")
+    if not complete:
+        print(f"Checkpoint kept in {checkpoint_file}; re-run to continue")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh vessel positions from the Datalastic API")
+    parser.add_argument('--input', default='shadow_fleet.json')
+    parser.add_argument('--output', default=None, help="defaults to --input")
+    parser.add_argument('--api-key', default=None, help=f"defaults to ${API_KEY_ENV}")
+    parser.add_argument('--api-base', default=API_BASE)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10.0, help="API requests per second")
+    parser.add_argument('--credits', type=int, default=None, help="stop spending after this many credits")
+    parser.add_argument('--max-age', type=float, default=None, help="skip vessels updated within this many hours")
+    parser.add_argument('--limit', type=int, default=None, help="refresh at most this many vessels")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--fresh', action='store_true', help="discard the checkpoint from an earlier run")
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help="write run telemetry to these files (.prom for Prometheus text, else JSON)")
+    parser.add_argument('--profile', choices=telemetry.PROFILERS, default=None, help="profile the enrichment loop")
+    args = parser.parse_args()
+
+    with telemetry.profiled(args.profile):
+        enrich_positions(args.input, args.output, args.api_key, args.api_base, args.concurrency, args.rate,
+                         args.credits, args.max_age, args.limit, args.retries, args.fresh)
+    telemetry.finish(args.metrics)
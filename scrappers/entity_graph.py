@@ -0,0 +1,386 @@
+"""Graph of vessels, companies and IMO cross-references from the registry text.
+
+Each vessel's `vessel_information` is split into sentences. In each sentence
+we find:
+
+    company   a run of capitalized words ending in a legal form or trade word
+              (Seafaring Savants LLC, Gatik Ship Management, PJSC Sovcomflot);
+              names are normalized, so "Gaurik Ship Management LLP" and
+              "Gaurik Ship Management", or "PJSC Sovcomflot's" and
+              "Sovcomflot PJSC", are one node
+    IMO       "IMO 9318034" other than the vessel's own (check digit verified)
+
+The vessel and every IMO it cites in a sentence are linked to that
+sentence's companies, and the vessel to the cited IMOs. Edges carry a kind:
+
+    manager    the sentence is about management, operation or ownership
+    linked     any other sentence naming a few companies
+    imo        a cross-referenced tanker
+    mentioned  the sentence lists many companies (boilerplate enumerations)
+
+The graph is stored as CSR adjacency (indptr/indices/kinds arrays), with
+connected components over manager, linked and imo edges precomputed. A
+snapshot directory holds one .npy per array plus meta.json with the node
+keys and names, like vessel_columns.
+
+    python entity_graph.py build --input ../app/data/shadow_fleet.json --output entity_graph
+    python entity_graph.py query --graph entity_graph --node "Seafaring Savants LLC" --hops 2
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GRAPH_DIR = 'entity_graph'
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+
+NODE_KINDS = ('vessel', 'company')
+EDGE_KINDS = ('manager', 'linked', 'imo', 'mentioned')  # strongest first; duplicate edges keep the strongest
+COMPONENT_KINDS = ('manager', 'linked', 'imo')
+LIST_SIZE = 3  # sentences naming more companies than this are enumerations
+
+LEGAL_FORMS = ('LLC', 'LLP', 'SRL', 'FZCO', 'FZE', 'DMCC', 'Ltd', 'Limited', 'Inc', 'Corp', 'Corporation', 'Co',
+               'GmbH', 'PLC', 'PVT', 'Pte', 'SA', 'AG', 'BV', 'NV', 'JSC', 'PJSC', 'OOO')
+TRADE_WORDS = ('Shipmanagement', 'Shipmanagment', 'Ship Management', 'Management', 'Shipping', 'Holdings', 'Tankers')
+PREFIX_FORMS = ('PJSC', 'JSC', 'OJSC', 'OOO', 'LLC')
+# Capitalized words that start a sentence or qualify a company without being part of its name
+LEADING_WORDS = {'THE', 'A', 'AN', 'IN', 'ON', 'FROM', 'SINCE', 'AS', 'OF', 'AT', 'BY', 'AND', 'WITH', 'TO', 'FOR',
+                 'UNTIL', 'AFTER', 'BEFORE', 'THEN', 'ALSO', 'ANOTHER', 'ISM', 'INDIAN', 'MOLDOVAN', 'AZERBAIJANI',
+                 'RUSSIAN', 'CHINESE', 'EMIRATI', 'GREEK', 'TURKISH', 'SEYCHELLES', 'MARSHALL', 'HONG', 'KONG',
+                 'JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER',
+                 'NOVEMBER', 'DECEMBER'}
+KEY_ALIASES = {'SHIPMANAGEMENT': 'SHIP MANAGEMENT', 'SHIPMANAGMENT': 'SHIP MANAGEMENT', 'MGMT': 'MANAGEMENT'}
+# Generic descriptors around a company's name: "PJSC NK Rosneft", "Rosneft Oil Company PJSC"
+KEY_QUALIFIERS = (('OIL', 'COMPANY'), ('NK',))
+
+
+def _alternation(words: Iterable[str]) -> str:
+    """Title-case and upper-case spellings, longest first"""
+    forms = {form for word in words for form in (word, word.upper())}
+    return '|'.join(re.escape(form).replace(r'\ ', r'\s+') for form in sorted(forms, key=len, reverse=True))
+
+
+TOKEN = r"[A-Z0-9][\w&'’\-]*"
+COMPANY_RE = re.compile(
+    rf"\b(?:(?:{TOKEN}\s+){{1,5}}(?:{_alternation(TRADE_WORDS + LEGAL_FORMS)})"
+    rf"(?:\s+(?:{_alternation(LEGAL_FORMS)}))*"
+    rf"|(?:{_alternation(PREFIX_FORMS)})\s+[\"“]?{TOKEN}(?:\s+{TOKEN})*[\"”]?)\b")
+CROSS_IMO_RE = re.compile(r'\bIMO\s*(\d{7})\b')
+SENTENCE_RE = re.compile(r'\n+|(?<=[a-z0-9)][.!?])\s*(?=[A-Z][a-z])')
+MANAGER_RE = re.compile(r'\b(?:manag|operat|owne|ISM\b|DOC\b)', re.IGNORECASE)
+
+
+def valid_imo(number: str) -> bool:
+    """IMO check digit: the weighted sum of the first six digits ends in the seventh"""
+    return len(number) == 7 and sum(int(d) * w for d, w in zip(number[:6], range(7, 1, -1))) % 10 == int(number[6])
+
+
+def company_key(name: str) -> str:
+    """Normalized company identity: upper case, possessives dropped, trade-word aliases folded,
+    and legal forms and KEY_QUALIFIERS stripped from both ends"""
+    upper = re.sub(r"['’]S\b", '', name.upper())
+    words = ' '.join(KEY_ALIASES.get(word, word) for word in re.findall(r'[A-Z0-9]+', upper)).split()
+    legal = {form.upper() for form in LEGAL_FORMS}
+    prefixes = {form.upper() for form in PREFIX_FORMS}
+    while len(words) > 1:
+        # A lone trailing S is a possessive already split off by an earlier tokenizer
+        if words[-1] in legal or words[-1] == 'S':
+            words.pop()
+        elif words[0] in prefixes:
+            words.pop(0)
+        else:
+            for qualifier in KEY_QUALIFIERS:
+                size = len(qualifier)
+                if len(words) > size and tuple(words[:size]) == qualifier:
+                    del words[:size]
+                    break
+                if len(words) > size and tuple(words[-size:]) == qualifier:
+                    del words[-size:]
+                    break
+            else:
+                break
+    return ' '.join(words)
+
+
+def find_companies(sentence: str) -> List[str]:
+    """Company names in a sentence, without leading sentence words or nationalities"""
+    names = []
+    for match in COMPANY_RE.finditer(sentence):
+        words = match.group(0).strip('"“” ').split()
+        while len(words) > 1 and (words[0].upper() in LEADING_WORDS or words[0].isdigit()
+                                  or words[0].endswith(("'s", "’s"))):
+            words.pop(0)
+        words[-1] = re.sub(r"['’][sS]$", '', words[-1])
+        name = ' '.join(words)
+        if len(words) > 1 or name.upper() not in {form.upper() for form in TRADE_WORDS + LEGAL_FORMS}:
+            names.append(name)
+    return list(dict.fromkeys(names))
+
+
+def vessel_links(vessel: Dict) -> List[Tuple[str, str, str]]:
+    """(source IMO, target, edge kind) for one registry record; company targets are names, vessels 'IMO n'"""
+    own = str(vessel.get('IMO') or '')
+    links = []
+    for sentence in SENTENCE_RE.split(vessel.get('vessel_information') or ''):
+        companies = find_companies(sentence)
+        cited = [imo for imo in dict.fromkeys(CROSS_IMO_RE.findall(sentence)) if imo != own and valid_imo(imo)]
+        if len(companies) > LIST_SIZE:
+            kind = 'mentioned'
+        else:
+            kind = 'manager' if MANAGER_RE.search(sentence) else 'linked'
+        for imo in [own] + cited if own else cited:
+            links.extend((imo, company, kind) for company in companies)
+        if own:
+            links.extend((own, f"IMO {imo}", 'imo') for imo in cited)
+    return links
+
+
+def display_name(vessel: Dict) -> str:
+    """Registry vessel name, trimmed of label text some pages leave in front of it"""
+    name = ' '.join((vessel.get('vessel_name') or '').split())
+    name = name.rpartition('Vessel name ')[2]
+    return name or f"IMO {vessel['IMO']}"
+
+
+def connected_components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Component label (smallest member id) of every node: min-label hooking plus pointer jumping"""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[src], low)
+        np.minimum.at(hooked, labels[dst], low)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+class EntityGraph:
+    """Undirected multi-kind graph in CSR form with precomputed connected components.
+
+        graph = EntityGraph.load('entity_graph')
+        node = graph.find('Seafaring Savants LLC')
+        nearby = graph.within(node, hops=2)
+        names = [graph.names[i] for i in nearby]
+    """
+
+    def __init__(self, keys: List[str], names: List[str], node_kinds: np.ndarray, indptr: np.ndarray,
+                 indices: np.ndarray, edge_kinds: np.ndarray, components: np.ndarray):
+        self.keys = keys
+        self.names = names
+        self.node_kinds = node_kinds
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_kinds = edge_kinds
+        self.components = components
+        self._lookup = {key: node for node, key in enumerate(keys)}
+        # Members of each component are a contiguous slice of this order
+        self._component_order = np.argsort(components, kind='stable')
+        self._component_labels = components[self._component_order]
+
+    @classmethod
+    def from_edges(cls, keys: List[str], names: List[str], node_kinds: Sequence[int], src: np.ndarray,
+                   dst: np.ndarray, kinds: np.ndarray) -> 'EntityGraph':
+        """Build from one entry per undirected edge; repeated pairs keep their strongest (lowest) kind"""
+        n = len(keys)
+        src, dst, kinds = np.asarray(src, np.int64), np.asarray(dst, np.int64), np.asarray(kinds, np.uint8)
+        keep = src != dst
+        low, high, kinds = np.minimum(src, dst)[keep], np.maximum(src, dst)[keep], kinds[keep]
+        order = np.lexsort((kinds, high, low))
+        low, high, kinds = low[order], high[order], kinds[order]
+        first = np.ones(len(low), dtype=bool)
+        first[1:] = (low[1:] != low[:-1]) | (high[1:] != high[:-1])
+        low, high, kinds = low[first], high[first], kinds[first]
+
+        both_src, both_dst = np.concatenate((low, high)), np.concatenate((high, low))
+        both_kinds = np.concatenate((kinds, kinds))
+        order = np.lexsort((both_dst, both_src))
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(both_src, minlength=n), out=indptr[1:])
+
+        strong = np.isin(kinds, [EDGE_KINDS.index(kind) for kind in COMPONENT_KINDS])
+        components = connected_components(n, low[strong], high[strong])
+        return cls(keys, names, np.asarray(node_kinds, np.uint8), indptr, both_dst[order].astype(np.int32),
+                   both_kinds[order], components)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def edges(self) -> int:
+        return len(self.indices) // 2
+
+    def find(self, name: str) -> Optional[int]:
+        """Node for an 'IMO n' string, a bare IMO number or a company name in any spelling"""
+        name = name.strip()
+        if name.isdigit():
+            name = f"IMO {name}"
+        if name.upper().startswith('IMO '):
+            return self._lookup.get(f"IMO {name[4:].strip()}")
+        return self._lookup.get(company_key(name))
+
+    def _kind_mask(self, kinds: Iterable[str]) -> Optional[np.ndarray]:
+        codes = [EDGE_KINDS.index(kind) for kind in kinds]
+        return None if len(codes) == len(EDGE_KINDS) else np.isin(np.arange(len(EDGE_KINDS)), codes)
+
+    def neighbors(self, nodes, kinds: Iterable[str] = EDGE_KINDS) -> np.ndarray:
+        """Adjacent nodes of every node in `nodes` through edges of `kinds` (with repeats)"""
+        nodes = np.atleast_1d(np.asarray(nodes, dtype=np.int64))
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        slots = offsets + np.arange(lengths.sum())
+        mask = self._kind_mask(kinds)
+        if mask is not None:
+            slots = slots[mask[self.edge_kinds[slots]]]
+        return self.indices[slots]
+
+    def within(self, node: int, hops: int = 2, kinds: Iterable[str] = COMPONENT_KINDS) -> np.ndarray:
+        """Nodes reachable from `node` in at most `hops` edges of `kinds`, the node itself excluded"""
+        kinds = tuple(kinds)
+        seen = np.zeros(len(self.keys), dtype=bool)
+        seen[node] = True
+        frontier = np.array([node])
+        reached = []
+        for _ in range(hops):
+            adjacent = self.neighbors(frontier, kinds)
+            frontier = np.unique(adjacent[~seen[adjacent]])
+            if not len(frontier):
+                break
+            seen[frontier] = True
+            reached.append(frontier)
+        return np.sort(np.concatenate(reached)) if reached else np.array([], dtype=np.int64)
+
+    def component(self, node: int) -> np.ndarray:
+        """All nodes in the node's connected component (manager, linked and imo edges)"""
+        label = self.components[node]
+        low = np.searchsorted(self._component_labels, label, 'left')
+        high = np.searchsorted(self._component_labels, label, 'right')
+        return self._component_order[low:high]
+
+    def component_sizes(self) -> Dict[int, int]:
+        labels, counts = np.unique(self.components, return_counts=True)
+        return dict(zip(labels.tolist(), counts.tolist()))
+
+    def save(self, path: str = GRAPH_DIR):
+        """Write a snapshot directory at `path`, replacing any previous one"""
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path)
+        for name in ('node_kinds', 'indptr', 'indices', 'edge_kinds', 'components'):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+        meta = {'version': FORMAT_VERSION, 'node_kinds': NODE_KINDS, 'edge_kinds': EDGE_KINDS,
+                'component_kinds': COMPONENT_KINDS, 'keys': self.keys, 'names': self.names}
+        with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        old_path = f"{path}.old{os.getpid()}"
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str = GRAPH_DIR, mmap: bool = True) -> 'EntityGraph':
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"unsupported graph version {meta['version']}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in ('node_kinds', 'indptr', 'indices', 'edge_kinds', 'components')}
+        return cls(meta['keys'], meta['names'], **arrays)
+
+
+def build_graph(registry: List[Dict]) -> EntityGraph:
+    """Extract links from every registry record and assemble the graph"""
+    keys, names, node_kinds = [], [], []
+    lookup: Dict[str, int] = {}
+    spellings: Dict[int, Counter] = {}
+
+    def node(key: str, kind: str, name: str) -> int:
+        if key not in lookup:
+            lookup[key] = len(keys)
+            keys.append(key)
+            names.append(name)
+            node_kinds.append(NODE_KINDS.index(kind))
+        return lookup[key]
+
+    for vessel in registry:
+        if vessel.get('IMO'):
+            names[node(f"IMO {vessel['IMO']}", 'vessel', '')] = display_name(vessel)
+
+    src, dst, kinds = [], [], []
+    for vessel in registry:
+        for imo, target, kind in vessel_links(vessel):
+            source = node(f"IMO {imo}", 'vessel', f"IMO {imo}")
+            if kind == 'imo':
+                other = node(target, 'vessel', target)
+            else:
+                other = node(company_key(target), 'company', target)
+                spellings.setdefault(other, Counter())[target] += 1
+            src.append(source)
+            dst.append(other)
+            kinds.append(EDGE_KINDS.index(kind))
+    for company, counts in spellings.items():
+        names[company] = counts.most_common(1)[0][0]
+    return EntityGraph.from_edges(keys, names, node_kinds, np.array(src, np.int64), np.array(dst, np.int64),
+                                  np.array(kinds, np.uint8))
+
+
+def describe(graph: EntityGraph, nodes: Iterable[int]) -> List[Dict]:
+    return [{'name': graph.names[i], 'key': graph.keys[i], 'kind': NODE_KINDS[graph.node_kinds[i]]} for i in nodes]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the vessel/company entity graph")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="extract entities from the registry and write the graph")
+    build.add_argument('--input', default='../app/data/shadow_fleet.json')
+    build.add_argument('--output', default=GRAPH_DIR)
+    query = commands.add_parser('query', help="nodes within N hops of a vessel or company")
+    query.add_argument('--graph', default=GRAPH_DIR)
+    query.add_argument('--node', required=True, help="company name, 'IMO 1234567' or an IMO number")
+    query.add_argument('--hops', type=int, default=2)
+    query.add_argument('--kinds', nargs='+', choices=EDGE_KINDS, default=list(COMPONENT_KINDS))
+    query.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.input, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+        start = time.perf_counter()
+        graph = build_graph(registry)
+        elapsed = time.perf_counter() - start
+        graph.save(args.output)
+        sizes = sorted(graph.component_sizes().values(), reverse=True)
+        companies = int((graph.node_kinds == NODE_KINDS.index('company')).sum())
+        print(f"✓ {len(graph)} nodes ({len(graph) - companies} vessels, {companies} companies), "
+              f"{graph.edges} edges in {elapsed:.2f}s, saved to {args.output}")
+        print(f"  {len(sizes)} components, largest {sizes[:5]}, {sizes.count(1)} isolated")
+        counts = np.bincount(graph.edge_kinds, minlength=len(EDGE_KINDS)) // 2
+        print('  ' + ', '.join(f"{count} {kind}" for kind, count in zip(EDGE_KINDS, counts)))
+    else:
+        graph = EntityGraph.load(args.graph)
+        node = graph.find(args.node)
+        if node is None:
+            raise SystemExit(f"✗ {args.node!r} is not in the graph")
+        start = time.perf_counter()
+        nearby = graph.within(node, args.hops, args.kinds)
+        elapsed = time.perf_counter() - start
+        if args.json:
+            print(json.dumps(describe(graph, nearby), ensure_ascii=False, indent=2))
+        else:
+            print(f"✓ {len(nearby)} nodes within {args.hops} hops of {graph.names[node]} "
+                  f"({elapsed * 1000:.2f} ms, component of {len(graph.component(node))})")
+            for entry in sorted(describe(graph, nearby), key=lambda entry: (entry['kind'], entry['name'])):
+                print(f"  {entry['kind']:<8} {entry['name']:<45} {entry['key'] if entry['kind'] == 'vessel' else ''}")
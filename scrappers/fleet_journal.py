@@ -0,0 +1,111 @@
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import telemetry
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+
+
+def write_json_atomic(path: str, data, indent=None):
+    """Write JSON to a temp file in the same directory, fsync it, then rename over `path`.
+
+    Readers see either the old file or the complete new one, never a
+    truncated mix, even if the process dies mid-write.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with telemetry.stage('write_json'):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+            telemetry.count('written_bytes', f.tell())
+        os.replace(tmp_path, path)
+
+
+class FleetJournal:
+    """Append-only JSON Lines journal of scraped vessels.
+
+    Each scraped vessel costs one short line instead of re-serializing the
+    whole registry; lines are flushed immediately and fsynced in batches of
+    `fsync_every` records or every `fsync_interval` seconds. A torn last line
+    from a crash is dropped on replay.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 25, fsync_interval: float = 2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records: Dict[str, dict] = {}
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.replay()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def replay(self) -> Dict[str, dict]:
+        """Load records from an existing journal, later lines winning"""
+        try:
+            f = open(self.path, 'r+', encoding='utf-8')
+        except FileNotFoundError:
+            return self.records
+        with f:
+            good_offset = 0
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the tail: cut it so new appends start on a clean line
+                    f.truncate(good_offset)
+                    break
+                if not line.endswith('\n'):
+                    f.write('\n')
+                self.records[entry['key']] = entry['record']
+                good_offset = f.tell()
+        return self.records
+
+    def append(self, key: str, record: dict):
+        with telemetry.stage('journal_append'):
+            line = json.dumps({'key': key, 'record': record}, ensure_ascii=False) + '\n'
+            self.file.write(line)
+            self.file.flush()
+        telemetry.count('journal_bytes', len(line))
+        self.records[key] = record
+        self.unsynced += 1
+        if self.unsynced >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.unsynced:
+            with telemetry.stage('journal_fsync'):
+                os.fsync(self.file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def ordered(self, keys: Optional[Iterable[str]] = None) -> List[dict]:
+        """Journaled records in `keys` order (default: journal order)"""
+        if keys is None:
+            return list(self.records.values())
+        return [self.records[key] for key in keys if key in self.records]
+
+    def compact(self, output_path: str, keys: Optional[Iterable[str]] = None, prefix: Iterable[dict] = (),
+                indent=2):
+        """Atomically write `prefix` followed by the journaled records to `output_path`"""
+        self.sync()
+        write_json_atomic(output_path, list(prefix) + self.ordered(keys), indent=indent)
+
+    def close(self, remove: bool = False):
+        self.sync()
+        self.file.close()
+        if remove:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.file.closed:
+            self.close()
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import telemetry
+
+DEFAULT_CACHE_DIR = '.http_cache'
+DEFAULT_MAX_ENTRIES = 5000
+
+
+class ResponseCache:
+    """On-disk LRU cache of page bodies with their HTTP validators and content hash.
+
+    Each entry remembers the ETag / Last-Modified headers, a SHA-256 of the
+    body and, once the caller has parsed it, the extracted record. A refresh
+    sends a conditional GET; when the server answers 304 or returns a body
+    with the same hash, the cached record is handed back and the page is
+    never parsed again. Records are tagged with `record_version` (e.g.
+    vessel_extract.record_version()); a record stored under another version
+    counts as missing, so the page is parsed again after a parser change.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 record_version: Optional[str] = None):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.record_version = record_version
+        self.index_path = os.path.join(directory, 'index.json')
+        self.lock = threading.Lock()
+        self.stats = {'not_modified': 0, 'same_hash': 0, 'changed': 0, 'new': 0, 'evicted': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = OrderedDict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = OrderedDict()
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+
+    def _validators(self, url: str) -> Dict[str, str]:
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _record(self, entry: dict) -> Optional[dict]:
+        return entry.get('record') if entry.get('record_version') == self.record_version else None
+
+    def _touch(self, url: str, key: str) -> Optional[dict]:
+        """Mark `url` as used and return its record; None when it has none or was evicted meanwhile"""
+        with self.lock:
+            if url not in self.entries:
+                return None
+            self.entries.move_to_end(url)
+            self.stats[key] += 1
+            return self._record(self.entries[url])
+
+    def fetch(self, url: str, get: Callable, **kwargs) -> Tuple[Optional[bytes], Optional[dict]]:
+        """Conditionally GET `url` with `get` (e.g. http_session.get).
+
+        Returns (None, record) when the page is unchanged and a parsed record
+        is cached, otherwise (body, None) and the caller should parse the body
+        and hand the result to store_record().
+        """
+        headers = kwargs.pop('headers', None) or {}
+        with self.lock:
+            validators = self._validators(url)
+        response = get(url, headers=dict(headers, **validators), **kwargs)
+
+        if response.status_code == 304:
+            # Another worker may evict the entry at any point; then the body is usually gone too
+            record = self._touch(url, 'not_modified')
+            if record is not None:
+                return None, record
+            body = self.body(url)
+            if body is not None:
+                return body, None
+            # The cached body is gone, so a 304 leaves nothing to parse: fetch the page in full
+            response = get(url, headers=headers, **kwargs)
+
+        response.raise_for_status()
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+
+        with self.lock:
+            entry = self.entries.get(url)
+            same = entry is not None and entry['sha256'] == digest
+            self.stats['same_hash' if same else ('changed' if entry else 'new')] += 1
+            if not same:
+                entry = {'sha256': digest}
+            entry['etag'] = response.headers.get('ETag')
+            entry['last_modified'] = response.headers.get('Last-Modified')
+            self.entries[url] = entry
+            self.entries.move_to_end(url)
+            if same and self._record(entry) is not None:
+                return None, self._record(entry)
+            evicted = self._evict()
+
+        with open(self._body_path(url), 'wb') as f:
+            f.write(gzip.compress(body, 6))
+        for old_url in evicted:
+            try:
+                os.remove(self._body_path(old_url))
+            except FileNotFoundError:
+                pass
+        return body, None
+
+    def _evict(self):
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            old_url, _ = self.entries.popitem(last=False)
+            evicted.append(old_url)
+            self.stats['evicted'] += 1
+        return evicted
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def store_record(self, url: str, record: dict):
+        """Remember the parsed record for the body currently cached under `url`"""
+        with self.lock:
+            if url in self.entries:
+                self.entries[url]['record'] = record
+                self.entries[url]['record_version'] = self.record_version
+
+    def save(self):
+        """Atomically persist the index"""
+        with telemetry.stage('cache_save'):
+            with self.lock:
+                data = json.dumps(self.entries, ensure_ascii=False)
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.index_path)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['not_modified']} not modified, {s['same_hash']} unchanged body, "
+                f"{s['changed']} changed, {s['new']} new, {s['evicted']} evicted")
@@ -0,0 +1,74 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import telemetry
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+try:
+    # urllib3 transparently decodes br bodies when one of these is installed
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        import brotlicffi  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_TIMEOUT = 30
+MAX_HOSTS = 4
+MAX_CONNECTIONS_PER_HOST = 8
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def create_session(max_hosts: int = MAX_HOSTS, max_per_host: int = MAX_CONNECTIONS_PER_HOST) -> requests.Session:
+    """Build a keep-alive session with bounded per-host connection pools.
+
+    `pool_block=True` makes threads wait for a free connection instead of
+    opening (and handshaking) extra ones, so `max_per_host` is a hard cap.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide session shared by every scraper"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def configure(max_hosts: int = MAX_HOSTS, max_per_host: int = MAX_CONNECTIONS_PER_HOST):
+    """Replace the shared session, e.g. to match the crawl concurrency"""
+    global _session
+    with _lock:
+        old, _session = _session, create_session(max_hosts, max_per_host)
+    if old is not None:
+        old.close()
+
+
+def get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """GET through the shared pooled session, timed and counted in telemetry"""
+    with telemetry.stage('http'):
+        response = get_session().get(url, timeout=timeout, **kwargs)
+        if not kwargs.get('stream'):
+            # Reading the body here keeps its download inside the timed stage
+            telemetry.count('http_bytes', len(response.content))
+    telemetry.count('http_responses', status=response.status_code)
+    return response
@@ -0,0 +1,185 @@
+"""Incremental refresh: re-scrape only vessels whose listing entry changed.
+
+The paginated listing (id, URL, preview text) is diffed against a manifest
+keyed by vessel id, so a daily update costs one listing crawl plus a detail
+fetch per new or modified vessel instead of one per vessel in the fleet.
+
+    python incremental_refresh.py --concurrency 4 --rate 2
+"""
+import argparse
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import http_session
+import telemetry
+from crawl_engine import CrawlEngine
+from fleet_journal import write_json_atomic
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
+from listing_discovery import IncompleteListingError, discover_vessels
+from scrape_all_vessels import DEFAULT_EXTRACTOR, crawl_vessels, is_transient_error
+from vessel_extract import record_version
+
+MANIFEST_FILE = 'vessel_manifest.json'
+REPORT_FILE = 'change_report.json'
+
+
+def listing_hash(entry: Dict) -> str:
+    """Fingerprint of what the listing shows for a vessel"""
+    return hashlib.sha1(f"{entry['url']}\n{entry.get('preview', '')}".encode('utf-8')).hexdigest()
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Dict[str, Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['vessels']
+    except FileNotFoundError:
+        return {}
+
+
+def fetch_listing() -> Tuple[List[Dict], bool]:
+    """(listing, complete); complete is False when some listing pages failed to load"""
+    try:
+        with telemetry.stage('listing'):
+            return discover_vessels(), True
+    except IncompleteListingError as e:
+        print(f"⚠ {e}; vessels on those pages are kept, nothing is removed this run")
+        return e.vessels, False
+    except Exception as e:
+        print(f"Error fetching vessel list: {e}")
+        return [], False
+
+
+def diff_listing(listing: List[Dict], manifest: Dict[str, Dict],
+                 complete: bool = True) -> Tuple[List[Dict], List[Dict], List[str]]:
+    """Split the listing into (added, modified, removed ids) against the manifest.
+
+    Vessels whose last fetch failed have no record and are treated as modified
+    so they are retried. An incomplete listing removes nothing: a vessel
+    missing from it may just sit on a page that failed.
+    """
+    added, modified = [], []
+    for entry in listing:
+        known = manifest.get(entry['id'])
+        if known is None:
+            added.append(entry)
+        elif known['listing_hash'] != listing_hash(entry) or known.get('record') is None:
+            modified.append(entry)
+    listed = {entry['id'] for entry in listing}
+    removed = [vessel_id for vessel_id in manifest if vessel_id not in listed] if complete else []
+    return added, modified, removed
+
+
+def changed_fields(old: Dict, new: Dict) -> List[str]:
+    return [key for key in new if old.get(key) != new[key]]
+
+
+def carry_over_enrichment(records: List[Dict], previous: List[Dict]) -> List[Dict]:
+    """Keep fields added after scraping (positions etc.) from the previous registry, matched by IMO and MMSI"""
+    scraped_keys = set(records[0]) if records else set()
+    extras = {}
+    for vessel in previous:
+        extra = {key: value for key, value in vessel.items() if key not in scraped_keys}
+        if extra:
+            extras.setdefault((vessel.get('IMO'), vessel.get('MMSI')), extra)
+    return [dict(record, **extras.get((record.get('IMO'), record.get('MMSI')), {})) for record in records]
+
+
+def incremental_refresh(output_file='shadow_fleet.json', manifest_file=MANIFEST_FILE, report_file=REPORT_FILE,
+                        concurrency=4, rate=2.0, retries=3, cache_dir=DEFAULT_CACHE_DIR):
+    """Fetch only new or changed vessels and rebuild the registry from the manifest"""
+    print("Fetching vessel list from website...")
+    listing, complete = fetch_listing()
+    if not listing:
+        print("✗ Listing came back empty, leaving the registry untouched")
+        return None
+
+    manifest = load_manifest(manifest_file)
+    added, modified, removed = diff_listing(listing, manifest, complete)
+    to_fetch = added + modified
+    print(f"Listing: {len(listing)} vessels, {len(added)} new, {len(modified)} modified, "
+          f"{len(removed)} removed, {len(listing) - len(to_fetch)} unchanged")
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'listed': len(listing),
+        'listing_complete': complete,
+        'unchanged': len(listing) - len(to_fetch),
+        'added': [],
+        'modified': [],
+        'removed': [],
+        'failed': [],
+    }
+    added_ids = {entry['id'] for entry in added}
+
+    http_session.configure(max_per_host=concurrency)
+    engine = CrawlEngine(concurrency=concurrency, rate=rate, retries=retries, retry_if=is_transient_error)
+    cache = ResponseCache(cache_dir, record_version=record_version(DEFAULT_EXTRACTOR)) if cache_dir else None
+    urls = [entry['url'] for entry in to_fetch]
+
+    for done, (i, vessel_url, vessel_data, error) in enumerate(crawl_vessels(urls, engine, cache), start=1):
+        entry = to_fetch[i]
+        vessel_id = entry['id']
+        if error is not None:
+            print(f"[{done}/{len(to_fetch)}] ✗ {vessel_id}: Failed to scrape ({error})")
+            report['failed'].append({'id': vessel_id, 'url': vessel_url, 'error': str(error)})
+            # Keep any previous record; the stale listing hash makes the next run retry it
+            manifest.setdefault(vessel_id, {'url': vessel_url, 'listing_hash': None, 'record': None})
+            continue
+
+        old = manifest.get(vessel_id) or {}
+        summary = {'id': vessel_id, 'url': vessel_url, 'vessel_name': vessel_data['vessel_name'], 'IMO': vessel_data['IMO']}
+        if vessel_id in added_ids:
+            report['added'].append(summary)
+        else:
+            summary['changed_fields'] = changed_fields(old.get('record') or {}, vessel_data)
+            report['modified'].append(summary)
+        manifest[vessel_id] = {
+            'url': vessel_url,
+            'listing_hash': listing_hash(entry),
+            'record': vessel_data,
+            'scraped_at': report['generated_at'],
+        }
+        print(f"[{done}/{len(to_fetch)}] ✓ {vessel_id}: {vessel_data['vessel_name']} - IMO: {vessel_data['IMO']}")
+
+    for vessel_id in removed:
+        record = manifest.pop(vessel_id).get('record') or {}
+        report['removed'].append({'id': vessel_id, 'vessel_name': record.get('vessel_name', ''), 'IMO': record.get('IMO', '')})
+
+    # Rebuild the registry in listing order; after an incomplete listing the
+    # vessels it missed keep their manifest records, after the listed ones
+    listed = {entry['id'] for entry in listing}
+    order = [entry['id'] for entry in listing] + [vessel_id for vessel_id in manifest if vessel_id not in listed]
+    records = [manifest[vessel_id]['record'] for vessel_id in order if manifest.get(vessel_id, {}).get('record')]
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            records = carry_over_enrichment(records, json.load(f))
+    except FileNotFoundError:
+        pass
+
+    write_json_atomic(output_file, records, indent=2)
+    write_json_atomic(manifest_file, {'version': 1, 'vessels': manifest})
+    write_json_atomic(report_file, report, indent=2)
+    if cache is not None:
+        cache.save()
+
+    print(f"\n✓ {len(report['added'])} added, {len(report['modified'])} modified, {len(report['removed'])} removed")
+    print(f"✗ {len(report['failed'])} failed")
+    print(f"Registry: {len(records)} vessels saved to {output_file}, change report in {report_file}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-scrape only vessels whose listing entry changed")
+    parser.add_argument('--output', default='shadow_fleet.json')
+    parser.add_argument('--manifest', default=MANIFEST_FILE)
+    parser.add_argument('--report', default=REPORT_FILE)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=2.0)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    incremental_refresh(args.output, args.manifest, args.report, args.concurrency, args.rate, args.retries,
+                        None if args.no_cache else DEFAULT_CACHE_DIR)
@@ -0,0 +1,114 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+import http_session
+import telemetry
+from crawl_engine import CrawlEngine
+
+BASE_URL = "https://war-sanctions.gur.gov.ua/en/transport/shadow-fleet"
+MAX_PAGES = 55
+
+PAGE_NUMBER = re.compile(r'[?&]page=(\d+)')
+
+
+class IncompleteListingError(Exception):
+    """Some listing pages failed to load; `vessels` holds what the other pages listed"""
+
+    def __init__(self, vessels: List[Dict], failed_pages: List[int]):
+        super().__init__(f"{len(failed_pages)} listing pages failed: {', '.join(map(str, failed_pages))}")
+        self.vessels = vessels
+        self.failed_pages = failed_pages
+
+
+def parse_listing_page(content: bytes, page_url: str) -> Tuple[List[Dict], Optional[int]]:
+    """Extract vessel entries and the highest pagination number from a listing page"""
+    soup = BeautifulSoup(content, 'html.parser')
+    vessels = []
+    last_page = None
+
+    for link in soup.find_all('a', href=lambda x: x and '/shadow-fleet' in x):
+        href = link.get('href')
+        page_match = PAGE_NUMBER.search(href)
+        if page_match:
+            last_page = max(last_page or 0, int(page_match.group(1)))
+            continue
+        if '/shadow-fleet/' not in href:
+            continue
+
+        vessel_url = urljoin(page_url, href)
+        vessel_details = link.find('div', class_='vessel-details')
+        vessels.append({
+            'id': vessel_url.rstrip('/').split('/')[-1],
+            'url': vessel_url,
+            'preview': (vessel_details or link).get_text(strip=True)
+        })
+
+    return vessels, last_page
+
+
+def discover_vessels(base_url: str = BASE_URL, max_pages: Optional[int] = None, concurrency: int = 4,
+                     rate: float = 2.0, fetch: Callable = http_session.get) -> List[Dict]:
+    """Collect every vessel from the paginated listing.
+
+    Page 1 is fetched first to read the last page number from the pagination
+    links; the remaining pages are then fetched concurrently. As soon as a
+    page comes back empty, pages after it are skipped. Vessels are
+    deduplicated by URL in listing order. `max_pages` caps the crawl; without
+    it the advertised page count is trusted, falling back to MAX_PAGES.
+
+    If any page fails, IncompleteListingError is raised after the crawl with
+    the vessels found on the other pages, so a caller never mistakes a
+    partial listing for the whole fleet.
+    """
+    def fetch_page(page):
+        url = f"{base_url}?page={page}" if page > 1 else base_url
+        response = fetch(url)
+        response.raise_for_status()
+        with telemetry.stage('listing_parse'):
+            return parse_listing_page(response.content, url)
+
+    first_page, last_page = fetch_page(1)
+    if not first_page:
+        return []
+    page_count = last_page or max_pages or MAX_PAGES
+    if max_pages:
+        page_count = min(page_count, max_pages)
+    if last_page:
+        print(f"Listing has {last_page} pages, fetching {page_count} with {concurrency} workers...")
+    else:
+        print(f"No pagination found, probing up to {page_count} pages with {concurrency} workers...")
+
+    # Lowered when an empty page shows the listing ends earlier than advertised;
+    # workers read it before fetching so queued pages past the end are skipped
+    end = [page_count]
+    pages = {1: first_page}
+    failed = []
+
+    def fetch_remaining(page):
+        return fetch_page(page)[0] if page <= end[0] else None
+
+    engine = CrawlEngine(concurrency=concurrency, rate=rate)
+    for _, page, entries, error in engine.run(range(2, page_count + 1), fetch_remaining):
+        if error is not None:
+            print(f"Error fetching page {page}: {error}")
+            failed.append(page)
+        elif entries == []:
+            end[0] = min(end[0], page - 1)
+        elif entries:
+            pages[page] = entries
+
+    vessels = {}
+    for page in sorted(pages):
+        if page > end[0]:
+            break
+        for entry in pages[page]:
+            vessels.setdefault(entry['url'], entry)
+
+    print(f"Found {len(vessels)} vessels on {end[0]} pages")
+    failed = sorted(page for page in failed if page <= end[0])
+    if failed:
+        raise IncompleteListingError(list(vessels.values()), failed)
+    return list(vessels.values())
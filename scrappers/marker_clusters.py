@@ -0,0 +1,200 @@
+"""Server-side marker clusters for the fleet layer: one compact GeoJSON file per zoom level.
+
+plotVessels creates a DOM marker per vessel, which holds up for the
+registry but not for history positions or a wider fleet. This stage
+clusters the positions once, supercluster-style, from the finest zoom up.
+Each level groups the previous level's clusters on a grid of RADIUS_PX
+screen pixels, then folds clusters whose centroids sit closer than the
+radius across a cell boundary into their heaviest neighbour. A level is a
+few numpy sorts over the one before it, so the build is O(n log n) in the
+number of points.
+
+Every zoom is written as a GeoJSON FeatureCollection with coordinates
+rounded to what that zoom can show. A cluster carries its size `n` and the
+zoom `z` at which it splits; a single vessel carries its registry `row`.
+Above the last clustered zoom every vessel is its own feature. Files are
+content-hashed under clusters/ and listed in clusters.json. map.js loads
+the level for the current zoom into one GeoJSON source and swaps it on
+zoomend. It keeps DOM markers when clusters.json is missing or its
+`registry` digest is not that of the registry the page loaded.
+
+    python marker_clusters.py --input ../app/data/shadow_fleet.json --output-dir ../app/data
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from build_frontend_data import content_name, registry_digest, write_artifacts
+from trail_lod import MAX_LAT, decimals_for_zoom
+
+MIN_ZOOM, MAX_ZOOM = 2, 11  # map.js allows zoom 2-12; at 12 every vessel is shown on its own
+RADIUS_PX = 40
+WORLD_PX = 512  # Mapbox GL's world is 512 screen pixels wide at zoom 0
+CLUSTER_DIR = 'clusters'
+CLUSTER_INDEX = 'clusters.json'
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+def project(lon, lat) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalized Web Mercator (0..1 across the world) of independent points"""
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LAT, MAX_LAT))
+    return (np.asarray(lon, dtype=np.float64) + 180) / 360, (1 - np.log(np.tan(np.pi / 4 + lat / 2)) / np.pi) / 2
+
+
+def unproject(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    return x * 360 - 180, np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y))))
+
+
+def registry_points(vessels: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rows, lon, lat) of the records app.js plots: those with a non-zero position"""
+    rows, lon, lat = [], [], []
+    for row, vessel in enumerate(vessels):
+        position = vessel.get('position') or {}
+        if position.get('lat') and position.get('lon'):
+            rows.append(row)
+            lon.append(position['lon'])
+            lat.append(position['lat'])
+    return np.array(rows, dtype=np.int64), np.array(lon, dtype=np.float64), np.array(lat, dtype=np.float64)
+
+
+def _cell_keys(x, y, cell: float) -> Tuple[np.ndarray, int]:
+    """Grid cell of every point as one int64, with a margin so neighbour offsets never wrap"""
+    side = int(1 / cell) + 3
+    return (np.floor(x / cell).astype(np.int64) + 1) * side + np.floor(y / cell).astype(np.int64) + 1, side
+
+
+def _aggregate(parent, groups: int, x, y, weight):
+    """Weighted centroids and weights of `groups` groups"""
+    total = np.bincount(parent, weights=weight, minlength=groups)
+    return (np.bincount(parent, weights=x * weight, minlength=groups) / total,
+            np.bincount(parent, weights=y * weight, minlength=groups) / total, total)
+
+
+def _merge_neighbours(x, y, weight, cell: float) -> np.ndarray:
+    """Group index of each grid cluster after folding it into its heaviest neighbour closer than `cell`.
+
+    Only clusters that are the heaviest in their own neighbourhood absorb
+    others, so merges never chain across a level.
+    """
+    n = len(x)
+    keys, side = _cell_keys(x, y, cell)
+    order = np.argsort(keys)
+    ordered = keys[order]
+    best, best_weight = np.arange(n), weight.copy()
+    for dx, dy in NEIGHBOURS:
+        position = np.minimum(np.searchsorted(ordered, keys + dx * side + dy), n - 1)
+        other = order[position]
+        near = (ordered[position] == keys + dx * side + dy) & ((x[other] - x) ** 2 + (y[other] - y) ** 2 < cell * cell)
+        heavier = near & ((weight[other] > best_weight) | ((weight[other] == best_weight) & (other < best)))
+        best[heavier] = other[heavier]
+        best_weight[heavier] = weight[other][heavier]
+    parent = np.where(best[best] == best, best, np.arange(n))
+    return np.unique(parent, return_inverse=True)[1].reshape(-1)
+
+
+def cluster_levels(x, y, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                   radius_px: float = RADIUS_PX) -> Dict[int, Dict[str, np.ndarray]]:
+    """Cluster hierarchy in normalized Mercator, finest zoom first.
+
+    Each level has centroids x, y, member `count`, `first` (index of a member
+    point, the point itself when count is 1) and `expand`, the zoom at which
+    the cluster first shows as more than one feature.
+    """
+    n = len(x)
+    weight, first, expand = np.ones(n), np.arange(n), np.full(n, max_zoom + 1)
+    levels = {}
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        cell = radius_px / (WORLD_PX * 2 ** zoom)
+        grid = np.unique(_cell_keys(x, y, cell)[0], return_inverse=True)[1].reshape(-1)
+        groups = int(grid.max()) + 1 if len(grid) else 0
+        gx, gy, gw = _aggregate(grid, groups, x, y, weight)
+        parent = grid
+        if groups:
+            merged = _merge_neighbours(gx, gy, gw, cell)
+            parent = merged[grid]
+            groups = int(merged.max()) + 1
+        x, y, total = _aggregate(parent, groups, x, y, weight)
+
+        children = np.bincount(parent, minlength=groups)
+        child = np.empty(groups, dtype=np.int64)
+        child[parent[::-1]] = np.arange(len(parent))[::-1]
+        expand = np.where(children >= 2, zoom + 1, expand[child])
+        first = first[child]
+        weight = total
+        levels[zoom] = {'x': x, 'y': y, 'count': total.astype(np.int64), 'first': first, 'expand': expand}
+    return levels
+
+
+def level_geojson(lon, lat, count, rows, expand, zoom: int) -> bytes:
+    """Minified FeatureCollection: clusters with n and z, single vessels with their registry row"""
+    places = decimals_for_zoom(zoom)
+    lon, lat = np.round(lon, places).tolist(), np.round(lat, places).tolist()
+    features = [
+        f'{{"type":"Feature","geometry":{{"type":"Point","coordinates":[{x},{y}]}},"properties":{{"n":{n},"z":{z}}}}}'
+        if n > 1 else
+        f'{{"type":"Feature","geometry":{{"type":"Point","coordinates":[{x},{y}]}},"properties":{{"row":{row}}}}}'
+        for x, y, n, row, z in zip(lon, lat, count.tolist(), rows.tolist(), expand.tolist())
+    ]
+    return ('{"type":"FeatureCollection","features":[' + ','.join(features) + ']}').encode('utf-8')
+
+
+def cluster_files(rows, lon, lat, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                  radius_px: float = RADIUS_PX) -> Tuple[Dict[str, str], Dict[str, bytes], Dict[int, int]]:
+    """Level path per zoom, {filename: body} and feature count per zoom, points level included"""
+    x, y = project(lon, lat)
+    levels = cluster_levels(x, y, min_zoom, max_zoom, radius_px)
+    bodies = {max_zoom + 1: level_geojson(lon, lat, np.ones(len(rows), dtype=np.int64), rows,
+                                          np.full(len(rows), max_zoom + 1), max_zoom + 1)}
+    features = {max_zoom + 1: len(rows)}
+    for zoom, level in levels.items():
+        # A single vessel sits at its own position, not a rounded centroid of one
+        single = level['count'] == 1
+        clon, clat = unproject(level['x'], level['y'])
+        clon[single], clat[single] = lon[level['first'][single]], lat[level['first'][single]]
+        bodies[zoom] = level_geojson(clon, clat, level['count'], rows[level['first']], level['expand'], zoom)
+        features[zoom] = len(level['count'])
+
+    paths, files = {}, {}
+    for zoom in sorted(bodies):
+        name = content_name(f"z{zoom:02d}", bodies[zoom])
+        files[name] = bodies[zoom]
+        paths[str(zoom)] = f"{CLUSTER_DIR}/{name}"
+    return paths, files, features
+
+
+def build_clusters(input_file: str, output_dir: str, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                   radius_px: float = RADIUS_PX) -> Dict:
+    with open(input_file, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    rows, lon, lat = registry_points(vessels)
+
+    start = time.perf_counter()
+    paths, files, features = cluster_files(rows, lon, lat, min_zoom, max_zoom, radius_px)
+    elapsed = time.perf_counter() - start
+
+    index = {'version': 1, 'registry': registry_digest(input_file), 'vessels': len(vessels), 'points': len(rows),
+             'radius_px': radius_px, 'zooms': list(range(min_zoom, max_zoom + 2)), 'levels': paths}
+    stale = write_artifacts(output_dir, index, files, build_dir=CLUSTER_DIR, manifest_file=CLUSTER_INDEX)
+
+    print(f"✓ {len(rows)} of {len(vessels)} vessels have positions; zooms {min_zoom}-{max_zoom} clustered "
+          f"at {radius_px:g} px in {elapsed:.2f}s")
+    for zoom in sorted(features):
+        body = files[paths[str(zoom)].split('/', 1)[1]]
+        print(f"  zoom {zoom:>2}: {features[zoom]:8d} features {len(body) / 1024:8.1f} KB")
+    print(f"  {CLUSTER_INDEX} written to {output_dir}, {len(stale)} stale files removed")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-zoom marker clusters for the fleet layer")
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--output-dir', default='../app/data')
+    parser.add_argument('--min-zoom', type=int, default=MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM, help="last clustered zoom; above it vessels show singly")
+    parser.add_argument('--radius', type=float, default=RADIUS_PX, help="cluster radius in screen pixels")
+    args = parser.parse_args()
+
+    build_clusters(args.input, args.output_dir, args.min_zoom, args.max_zoom, args.radius)
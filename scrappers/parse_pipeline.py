@@ -0,0 +1,123 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import telemetry
+from crawl_engine import CrawlEngine
+from vessel_extract import extract_vessel
+
+_DONE = object()
+
+
+def _parse_job(content: bytes, backend: str):
+    """Runs in a worker process; returns the record and the CPU seconds spent"""
+    start = time.process_time()
+    record = extract_vessel(content, backend)
+    return record, time.process_time() - start
+
+
+class ParsePipeline:
+    """Fetch threads feeding a process pool that runs the HTML extraction.
+
+    `fetch(url)` must return (content, record) like scrape_all_vessels.fetch_vessel,
+    where a non-None record (a cache hit) skips parsing.
+
+    Fetchers push raw bodies onto a bounded queue; when parsing falls behind
+    the queue fills, the feeder blocks and the crawl engine stops starting
+    new requests, so at most about `queue_size` + 2 x `parse_workers` pages
+    are held in memory whatever the fleet size.
+    """
+
+    def __init__(self, engine: CrawlEngine, fetch: Callable, parse_workers: Optional[int] = None,
+                 queue_size: int = 32, backend: str = 'auto', cache=None):
+        self.engine = engine
+        self.fetch = fetch
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.backend = backend
+        self.cache = cache
+        self.stats = {
+            'fetched': 0, 'fetch_bytes': 0, 'cache_hits': 0, 'parsed': 0, 'parse_cpu': 0.0,
+            'queue_peak': 0, 'fetch_elapsed': 0.0, 'elapsed': 0.0,
+        }
+
+    def _feed(self, urls, raw: queue.Queue):
+        start = time.monotonic()
+        try:
+            for item in self.engine.run(urls, self.fetch):
+                raw.put(item)
+                self.stats['queue_peak'] = max(self.stats['queue_peak'], raw.qsize())
+        finally:
+            self.stats['fetch_elapsed'] = time.monotonic() - start
+            raw.put(_DONE)
+
+    def run(self, urls: Iterable[str]) -> Iterator[Tuple[int, str, Optional[dict], Optional[Exception]]]:
+        """Yield (index, url, vessel_data, error) as pages finish parsing"""
+        start = time.monotonic()
+        raw = queue.Queue(maxsize=self.queue_size)
+        feeder = threading.Thread(target=self._feed, args=(urls, raw), daemon=True)
+        feeder.start()
+
+        pending = {}
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            def drain(block):
+                done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, url = pending.pop(future)
+                    try:
+                        record, cpu = future.result()
+                    except Exception as e:
+                        telemetry.error('parse', e)
+                        yield i, url, None, e
+                        continue
+                    self.stats['parsed'] += 1
+                    self.stats['parse_cpu'] += cpu
+                    telemetry.observe('parse', cpu)
+                    if self.cache is not None:
+                        self.cache.store_record(url, record)
+                    yield i, url, record, None
+
+            while True:
+                item = raw.get()
+                if item is _DONE:
+                    break
+                i, url, fetched, error = item
+                if error is not None:
+                    yield i, url, None, error
+                    continue
+
+                content, record = fetched
+                self.stats['fetched'] += 1
+                if record is not None:
+                    # fetch() has already counted the hit in telemetry, as it does without a pipeline
+                    self.stats['cache_hits'] += 1
+                    yield i, url, record, None
+                    continue
+
+                self.stats['fetch_bytes'] += len(content)
+                # Two jobs per worker keeps every process busy without queueing bodies in the pool
+                while len(pending) >= 2 * self.parse_workers:
+                    yield from drain(block=True)
+                pending[pool.submit(_parse_job, content, self.backend)] = (i, url)
+                yield from drain(block=False)
+
+            while pending:
+                yield from drain(block=True)
+
+        feeder.join()
+        self.stats['elapsed'] = time.monotonic() - start
+
+    def report(self) -> str:
+        s = self.stats
+        fetch_rate = s['fetched'] / s['fetch_elapsed'] if s['fetch_elapsed'] else 0.0
+        parse_rate = s['parsed'] / s['parse_cpu'] if s['parse_cpu'] else 0.0
+        total_rate = s['fetched'] / s['elapsed'] if s['elapsed'] else 0.0
+        return (
+            f"fetch: {s['fetched']} pages ({s['cache_hits']} cached), {s['fetch_bytes'] / 1024:.0f} KB, "
+            f"{fetch_rate:.1f} pages/sec with {self.engine.concurrency} threads\n"
+            f"parse: {s['parsed']} pages, {parse_rate:.1f} pages/sec per process x {self.parse_workers} processes\n"
+            f"pipeline: {total_rate:.1f} pages/sec end to end, queue peak {s['queue_peak']}/{self.queue_size}"
+        )
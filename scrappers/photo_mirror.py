@@ -0,0 +1,208 @@
+"""Local mirror of the vessel photos: sprite-sheet list thumbnails and detail-size copies.
+
+Every record hot-links `vessel_photo_url`, a full-size .webp on the sanctions
+site. The mirror downloads each distinct URL once, through the crawl engine
+(bounded concurrency, rate limit, retries) and a conditional-GET cache, and
+dedupes the bodies by content hash. From each distinct image it derives:
+
+    a list thumbnail   THUMB_SIZE, centre-cropped, packed SHEET_SIZE to a
+                       sprite sheet, so the vessel list costs a few image
+                       requests instead of one full-size photo per row
+    a detail copy      fitted into DETAIL_SIZE for the details panel
+
+Sheets and detail copies are content-named under app/data/photos/ and listed
+in photos.json, which gives each registry row its image (sheet slot and
+detail copy). Like the search index, the UI ignores a photos.json whose
+`registry` digest is not that of the registry it loaded, and falls back to
+the remote URL for photos the mirror does not have.
+Derived images are kept next to the download cache, so a re-run only sends
+conditional requests and processes new or changed photos. Needs Pillow.
+
+    python photo_mirror.py --input ../app/data/shadow_fleet.json --output-dir ../app/data
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import http_session
+import telemetry
+from build_frontend_data import content_name, registry_digest, write_artifacts
+from crawl_engine import CrawlEngine
+from http_cache import ResponseCache
+from scrape_all_vessels import is_transient_error
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+PHOTO_CACHE_DIR = '.photo_cache'
+PHOTO_DIR = 'photos'
+PHOTO_INDEX = 'photos.json'
+THUMB_SIZE = (128, 80)  # shown at half size, so sharp on 2x screens
+THUMB_SCALE = 2
+SHEET_COLUMNS = 16
+SHEET_SIZE = 256
+DETAIL_SIZE = (640, 640)
+WEBP_QUALITY = 80
+
+
+class PhotoMirror:
+    """Downloads photos through the response cache and derives each distinct image once"""
+
+    def __init__(self, cache_dir: str = PHOTO_CACHE_DIR):
+        if Image is None:
+            raise RuntimeError("photo_mirror needs Pillow: pip install pillow")
+        self.cache = ResponseCache(cache_dir)
+        self.derived_dir = os.path.join(cache_dir, 'derived')
+        os.makedirs(self.derived_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.locks: Dict[str, threading.Lock] = {}
+        self.stats = {'decoded_bytes': 0, 'processed': 0, 'duplicates': 0}
+
+    def paths(self, digest: str) -> Tuple[str, str]:
+        """Derived list thumbnail (lossless, input to the sheets) and detail copy for an image"""
+        return (os.path.join(self.derived_dir, f"{digest}.thumb.png"),
+                os.path.join(self.derived_dir, f"{digest}.detail.webp"))
+
+    def derive(self, body: bytes) -> Dict:
+        """Thumbnail and detail copy for one image body, made once per distinct content"""
+        digest = hashlib.sha256(body).hexdigest()
+        thumb_path, detail_path = self.paths(digest)
+        with self.lock:
+            lock = self.locks.setdefault(digest, threading.Lock())
+        with lock:
+            if os.path.exists(thumb_path) and os.path.exists(detail_path):
+                self._count('duplicates')
+                return {'sha256': digest}
+            with telemetry.stage('thumbnail'):
+                image = Image.open(io.BytesIO(body))
+                image.draft('RGB', DETAIL_SIZE)  # JPEG decodes at reduced scale; no-op for other formats
+                image = image.convert('RGB')
+                ImageOps.fit(image, THUMB_SIZE, Image.LANCZOS).save(thumb_path + '.tmp', 'PNG')
+                image.thumbnail(DETAIL_SIZE, Image.LANCZOS)
+                image.save(detail_path + '.tmp', 'WEBP', quality=WEBP_QUALITY)
+            os.replace(thumb_path + '.tmp', thumb_path)
+            os.replace(detail_path + '.tmp', detail_path)
+        self._count('processed')
+        return {'sha256': digest}
+
+    def _count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def fetch(self, url: str) -> Dict:
+        """Conditionally GET one photo; unchanged photos whose derived images exist are not decoded"""
+        body, record = self.cache.fetch(url, http_session.get)
+        if record is not None and all(map(os.path.exists, self.paths(record['sha256']))):
+            return record
+        if body is None:
+            body = self.cache.body(url)
+        self._count('decoded_bytes', len(body))
+        record = self.derive(body)
+        self.cache.store_record(url, record)
+        return record
+
+
+def build_sheets(digests: List[str], mirror: PhotoMirror) -> Tuple[Dict[str, bytes], List[str]]:
+    """Pack the thumbnails, in order, SHEET_SIZE to a sheet; returns {name: body} and the sheet names"""
+    width, height = THUMB_SIZE
+    files, sheets = {}, []
+    for start in range(0, len(digests), SHEET_SIZE):
+        chunk = digests[start:start + SHEET_SIZE]
+        rows = -(-len(chunk) // SHEET_COLUMNS)
+        sheet = Image.new('RGB', (width * SHEET_COLUMNS, height * rows))  # full width, so the UI can scale it
+        for slot, digest in enumerate(chunk):
+            with Image.open(mirror.paths(digest)[0]) as thumb:
+                sheet.paste(thumb, (slot % SHEET_COLUMNS * width, slot // SHEET_COLUMNS * height))
+        body = io.BytesIO()
+        sheet.save(body, 'WEBP', quality=WEBP_QUALITY)
+        name = content_name(f"sprites-{start // SHEET_SIZE:04d}", body.getvalue(), '.webp')
+        files[name] = body.getvalue()
+        sheets.append(f"{PHOTO_DIR}/{name}")
+    return files, sheets
+
+
+def mirror_photos(vessels: List[Dict], output_dir: str, cache_dir: str = PHOTO_CACHE_DIR,
+                  concurrency: int = 8, rate: float = 8.0, retries: int = 3, registry: Optional[str] = None) -> Dict:
+    """Mirror every vessel photo and write the sheets, detail copies and photos.json.
+
+    `registry` is the registry_digest() of the file `vessels` came from; ui.js ignores
+    a photos.json whose digest differs from the registry it loaded.
+    """
+    urls = list(dict.fromkeys(v['vessel_photo_url'] for v in vessels if v.get('vessel_photo_url')))
+    mirror = PhotoMirror(cache_dir)
+    http_session.configure(max_per_host=concurrency)
+    engine = CrawlEngine(concurrency=concurrency, rate=rate, retries=retries, retry_if=is_transient_error)
+
+    records: List = [None] * len(urls)
+    failed = []
+    for i, url, record, error in engine.run(urls, mirror.fetch):
+        if error is None:
+            records[i] = record
+        else:
+            failed.append(url)
+            telemetry.error('photo', error)
+            print(f"✗ {url}: {error}")
+    mirror.cache.save()
+
+    # One image per distinct content, in registry order of first use
+    digests = list(dict.fromkeys(record['sha256'] for record in records if record))
+    files, sheets = build_sheets(digests, mirror)
+    images = []
+    for i, digest in enumerate(digests):
+        with open(mirror.paths(digest)[1], 'rb') as f:
+            body = f.read()
+        name = content_name('photo', body, '.webp')
+        files[name] = body
+        images.append([i // SHEET_SIZE, i % SHEET_SIZE, f"{PHOTO_DIR}/{name}"])
+    number = {digest: i for i, digest in enumerate(digests)}
+    by_url = {url: number[record['sha256']] for url, record in zip(urls, records) if record}
+    manifest = {
+        'version': 1,
+        'registry': registry,
+        'images': len(images),
+        'thumb': list(THUMB_SIZE),
+        'scale': THUMB_SCALE,
+        'columns': SHEET_COLUMNS,
+        'sheets': sheets,
+        'photos': images,  # [sheet, slot, detail copy]
+        'vessels': [by_url.get(v.get('vessel_photo_url')) for v in vessels],  # image per registry row, or null
+    }
+    stale = write_artifacts(output_dir, manifest, files, build_dir=PHOTO_DIR, manifest_file=PHOTO_INDEX,
+                            compress=False)
+
+    sheet_bytes = sum(len(files[os.path.basename(name)]) for name in sheets)
+    detail_bytes = sum(len(files[os.path.basename(image[2])]) for image in images)
+    print(f"✓ {sum(1 for v in vessels if v.get('vessel_photo_url'))} photo references, {len(urls)} URLs, "
+          f"{len(images)} distinct images ({mirror.stats['processed']} processed, "
+          f"{mirror.stats['duplicates']} duplicate bodies), {len(failed)} failed")
+    print(f"  decoded {mirror.stats['decoded_bytes'] / 1e6:.1f} MB of originals in {engine.stats['elapsed']:.1f}s; "
+          f"{len(sheets)} sprite sheets {sheet_bytes / 1024:.0f} KB, detail copies {detail_bytes / 1e6:.1f} MB")
+    print(f"🗄 Cache: {mirror.cache.summary()}; {len(stale)} stale files removed from {PHOTO_DIR}/")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mirror vessel photos as sprite-sheet thumbnails and detail copies")
+    parser.add_argument('--input', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--output-dir', default='../app/data')
+    parser.add_argument('--cache-dir', default=PHOTO_CACHE_DIR)
+    parser.add_argument('--concurrency', type=int, default=8, help="downloads in flight")
+    parser.add_argument('--rate', type=float, default=8.0, help="maximum requests started per second (0 = unlimited)")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help="write run telemetry to these files (.prom for Prometheus text, else JSON)")
+    args = parser.parse_args()
+
+    if Image is None:
+        raise SystemExit("✗ photo_mirror.py needs Pillow: pip install pillow")
+    with open(args.input, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    mirror_photos(registry, args.output_dir, args.cache_dir, args.concurrency, args.rate, args.retries,
+                  registry_digest(args.input))
+    telemetry.finish(args.metrics)
@@ -0,0 +1,232 @@
+"""TTL cache with request coalescing in front of the Datalastic vessel API.
+
+Every identical lookup (same endpoint and MMSI/IMO) within the TTL is
+answered from memory, and concurrent identical lookups share one upstream
+request: the first caller fetches while the rest wait for its answer.
+Vessels the API has no data for (404, or 200 without data) are cached too,
+for `negative_ttl`, so repeated misses stop costing credits. Any other
+upstream status (401/402/403, 429, 5xx) and timeouts are errors and are
+never cached.
+
+Used by enrich_positions.py, and as a local proxy that serves the same
+/api/get-vessel URL the browser calls, so every analyst polling the same
+ship shares one upstream request per TTL:
+
+    DATALASTIC_VESSELS_API=... python position_cache.py --port 8787 --ttl 300
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import http_session
+
+API_BASE = 'https://api.datalastic.com/api/v0'
+API_KEY_ENV = 'DATALASTIC_VESSELS_API'
+DEFAULT_TTL = 300
+DEFAULT_NEGATIVE_TTL = 3600
+# Query parameters the proxy accepts, as netlify/functions/get-vessel.js reads them
+QUERY_PARAMS = ('mmsi', 'imo', 'date_from', 'date_to', 'endpoint')
+
+
+def has_data(status: int, payload) -> bool:
+    """Whether an upstream answer carries vessel data (a position or non-empty history)"""
+    return status == 200 and isinstance(payload, dict) and bool(payload.get('data'))
+
+
+class _Flight:
+    """One upstream request that later callers for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PositionCache:
+    """Thread-safe TTL cache of (status, payload) upstream answers with single-flight loads"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_entries: int = 10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.in_flight: Dict[Hashable, _Flight] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'evictions': 0}
+
+    def get(self, key: Hashable, load: Callable[[], Tuple[int, dict]]) -> Tuple[int, dict]:
+        """Cached answer for `key`, calling `load()` at most once per key at a time"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.stats['hits' if has_data(*result) else 'negative_hits'] += 1
+                    return result
+                del self.entries[key]
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = _Flight()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = load()
+        except Exception as error:
+            flight.error = error
+            with self.lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+                if flight.error is None:
+                    ttl = self.ttl if has_data(*flight.result) else self.negative_ttl
+                    self.entries[key] = (time.monotonic() + ttl, flight.result)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                        self.stats['evictions'] += 1
+            flight.done.set()
+        return flight.result
+
+    def upstream_saved(self) -> int:
+        """Upstream requests (credits) avoided so far"""
+        return self.stats['hits'] + self.stats['negative_hits'] + self.stats['coalesced']
+
+    def summary(self) -> Dict:
+        with self.lock:
+            summary = dict(self.stats, entries=len(self.entries))
+        summary['upstream_saved'] = self.upstream_saved()
+        return summary
+
+
+def lookup_key(params: Dict[str, str]) -> Tuple:
+    """Cache key for an API query: everything but the credential"""
+    return tuple(sorted((name, str(value)) for name, value in params.items() if name != 'api-key'))
+
+
+class PositionProxy:
+    """HTTP proxy for /api/get-vessel (position and history) backed by a PositionCache"""
+
+    def __init__(self, api_key: str, api_base: str = API_BASE, cache: PositionCache = None,
+                 host: str = '127.0.0.1', port: int = 8787, get: Callable = http_session.get):
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.cache = cache or PositionCache()
+        self.get = get
+        self.upstream_requests = 0
+        self.lock = threading.Lock()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path.rstrip('/').endswith('/stats'):
+                    self.respond(200, proxy.cache.summary())
+                elif parts.path.rstrip('/').endswith('/get-vessel'):
+                    params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+                    self.respond(*proxy.lookup(params))
+                else:
+                    self.respond(404, {'error': 'Not found'})
+
+            def respond(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    def fetch(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        """One upstream call, mapped like netlify/functions/get-vessel.js"""
+        params = dict(params)
+        endpoint = 'vessel_history' if params.pop('endpoint', None) == 'history' else 'vessel'
+        with self.lock:
+            self.upstream_requests += 1
+        response = self.get(f"{self.api_base}/{endpoint}", params={'api-key': self.api_key, **params})
+        if response.status_code not in (200, 404):
+            # An auth or credit failure says nothing about the vessel; caching it would hide the vessel for an hour
+            raise requests.HTTPError(f"{response.status_code} from upstream {endpoint}", response=response)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {'error': 'Upstream returned invalid JSON'}
+
+    def lookup(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        # Anything else would split the cache key and reach the authenticated upstream call
+        params = {name: value for name, value in params.items() if name in QUERY_PARAMS}
+        if not params.get('mmsi') and not params.get('imo'):
+            return 400, {'error': 'mmsi or imo is required'}
+        try:
+            return self.cache.get(lookup_key(params), lambda: self.fetch(params))
+        except requests.HTTPError as error:
+            return error.response.status_code, {'error': str(error)}
+        except requests.RequestException as error:
+            return 502, {'error': f'Failed to fetch vessel data: {error}'}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caching, coalescing proxy for the vessel position API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--api-base', default=API_BASE)
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="seconds a position is reused")
+    parser.add_argument('--negative-ttl', type=float, default=DEFAULT_NEGATIVE_TTL,
+                        help="seconds a 'no data' answer is reused")
+    args = parser.parse_args()
+
+    api_key = os.environ.get(API_KEY_ENV)
+    if not api_key:
+        raise SystemExit(f"✗ {API_KEY_ENV} is not set")
+    proxy = PositionProxy(api_key, args.api_base, PositionCache(args.ttl, args.negative_ttl), args.host, args.port)
+    print(f"Proxying {args.api_base} at {proxy.base_url}/api/get-vessel (stats at {proxy.base_url}/api/stats)")
+    proxy.server.serve_forever()
@@ -1,159 +1,45 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
 import time
+from collections import Counter
 
-def scrape_vessel(vessel_url):
-    """Scrape a single vessel page for all details"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
-    try:
-        response = requests.get(vessel_url, headers=headers, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        vessel_data = {
-            'vessel_name': '',
-            'IMO': '',
-            'MMSI': '',
-            'flag': '',
-            'vessel_type': '',
-            'category': '',
-            'vessel_photo_url': '',
-            'sanctions': [],
-            'vessel_information': ''
-        }
-
-        # Extract vessel photo
-        img = soup.find('img', src=lambda x: x and ('/uploads/' in x or '/media/' in x))
-        if img:
-            photo_url = img.get('src', '')
-            if photo_url and not photo_url.startswith('http'):
-                vessel_data['vessel_photo_url'] = f"https://war-sanctions.gur.gov.ua{photo_url}"
-            else:
-                vessel_data['vessel_photo_url'] = photo_url
-
-        # Get page text for parsing
-        page_text = soup.get_text()
-
-        # Extract vessel name - improved pattern
-        name_match = re.search(r'Vessel\s*name\s*([A-Z0-9\s\-\.]+?)(?=Category|IMO)', page_text, re.IGNORECASE)
-        if name_match:
-            vessel_data['vessel_name'] = name_match.group(1).strip()
-
-        # Extract IMO
-        imo_match = re.search(r'IMO\s*(\d+)', page_text)
-        if imo_match:
-            vessel_data['IMO'] = imo_match.group(1).strip()
-
-        # Extract MMSI
-        mmsi_match = re.search(r'MMSI\s*(\d+)', page_text)
-        if mmsi_match:
-            vessel_data['MMSI'] = mmsi_match.group(1).strip()
-
-        # Extract flag - improved pattern
-        flag_match = re.search(r'Flag\s*\(Current\)\s*([A-Za-z\s]+?)(?=MMSI|Vessel\s*Type|Call)', page_text)
-        if flag_match:
-            vessel_data['flag'] = flag_match.group(1).strip()
-
-        # Extract vessel type - improved pattern
-        type_match = re.search(r'Vessel\s*Type\s*([A-Za-z\s/\-]+?)(?=Length|Gross|DWT|P&I)', page_text)
-        if type_match:
-            vessel_data['vessel_type'] = type_match.group(1).strip()
-
-        # Extract category - get both lines
-        category_match = re.search(r'Category\s*(.+?)(?=IMO|Flag|MMSI)', page_text, re.DOTALL)
-        if category_match:
-            category_text = category_match.group(1).strip()
-            # Clean up - remove extra whitespace and combine lines
-            category_lines = [line.strip() for line in category_text.split('\n') if line.strip() and len(line.strip()) > 5]
-            # Join unique lines
-            unique_cats = []
-            for line in category_lines:
-                if line not in unique_cats and not line.startswith(('The ', 'On ', 'In ', 'From ', 'Since ')):
-                    unique_cats.append(line)
-            vessel_data['category'] = ' → '.join(unique_cats[:2]) if len(unique_cats) > 1 else (unique_cats[0] if unique_cats else '')
-
-        # Extract vessel information - look for the justification section
-        info_match = re.search(r'(?:Justification|Vessel information)\s*(.+?)(?=Cases of AIS|Visited ports|Available additional|Web Resources|Go to site|$)', page_text, re.DOTALL)
-        if info_match:
-            vessel_data['vessel_information'] = info_match.group(1).strip()
-
-        # Extract sanctions - more comprehensive
-        sanctions = []
-        # Find all sanction mentions
-        sanction_sentences = re.finditer(
-            r'(?:On|From|Since|In)\s+[A-Za-z]+\s+\d{1,2},?\s+\d{4},?\s+(?:the\s+)?([A-Z][A-Za-z\s,]+?)\s+(?:imposed|introduced|applied)\s+sanctions[^\.]*\.',
-            page_text,
-            re.IGNORECASE
-        )
-
-        for match in sanction_sentences:
-            sanction_text = match.group(0).strip()
-            if sanction_text and sanction_text not in sanctions:
-                sanctions.append(sanction_text)
-
-        vessel_data['sanctions'] = sanctions
-
-        return vessel_data
-
-    except Exception as e:
-        print(f"Error scraping vessel {vessel_url}: {e}")
-        return None
+import telemetry
+from fleet_journal import FleetJournal, JOURNAL_SUFFIX
+from http_cache import ResponseCache
+from listing_discovery import BASE_URL, IncompleteListingError, discover_vessels
+from scrape_all_vessels import DEFAULT_EXTRACTOR, scrape_vessel
+from vessel_extract import record_version
 
+LISTING_IMO = re.compile(r'IMO\D{0,3}(\d{7})')
 
-def get_vessel_list_from_web():
+def get_vessel_list_from_web(base_url=BASE_URL, concurrency=4, rate=2.0):
     """Fetch vessel list directly from the website"""
-    vessels = []
-    base_url = "https://war-sanctions.gur.gov.ua/en/transport/shadow-fleet"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-
-    page = 1
-    max_pages = 55
-
-    while page <= max_pages:
-        try:
-            url = f"{base_url}?page={page}" if page > 1 else base_url
-            print(f"Fetching vessel list page {page}/{max_pages}...")
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            vessel_links = soup.find_all('a', href=lambda x: x and '/shadow-fleet/' in x and x != '/en/transport/shadow-fleet')
-
-            found_vessels = 0
-            for link in vessel_links:
-                vessel_url = link.get('href')
-                if '?page=' in vessel_url:
-                    continue
-                if not vessel_url.startswith('http'):
-                    vessel_url = f"https://war-sanctions.gur.gov.ua{vessel_url}"
-                if vessel_url not in [v['url'] for v in vessels]:
-                    vessel_id = vessel_url.split('/')[-1]
-                    vessels.append({
-                        'id': vessel_id,
-                        'url': vessel_url
-                    })
-                    found_vessels += 1
-
-            print(f"  Found {found_vessels} new vessels on page {page} (Total: {len(vessels)})")
-
-            if found_vessels == 0:
-                print(f"No more vessels found. Stopping at page {page}.")
-                break
-
-            page += 1
-            time.sleep(1)
-        except Exception as e:
-            print(f"Error fetching page {page}: {e}")
-            break
-
-    return vessels
+    try:
+        with telemetry.stage('listing'):
+            return discover_vessels(base_url, concurrency=concurrency, rate=rate)
+    except IncompleteListingError as e:
+        # Scraping what was listed is still progress; the next resume picks up the rest
+        print(f"⚠ {e}, continuing with {len(e.vessels)} vessels")
+        return e.vessels
+    except Exception as e:
+        print(f"Error fetching vessel list: {e}")
+        return []
+
+def scraped_listing_ids(all_vessels, scraped_vessels):
+    """Ids of listed vessels whose record is already in the registry.
+
+    Registry records carry no listing id, so a listed vessel is matched by
+    the IMO in its preview text. IMOs repeat in the registry, so each record
+    is claimed by one listed vessel only.
+    """
+    unclaimed = Counter(str(vessel['IMO']) for vessel in scraped_vessels if vessel.get('IMO'))
+    scraped = set()
+    for vessel in all_vessels:
+        match = LISTING_IMO.search(vessel.get('preview', ''))
+        if match and unclaimed[match.group(1)] > 0:
+            unclaimed[match.group(1)] -= 1
+            scraped.add(vessel['id'])
+    return scraped
 
 def resume_scraping():
     """Resume scraping from where we left off"""
@@ -170,38 +56,38 @@ def resume_scraping():
     except FileNotFoundError:
         scraped_vessels = []
 
-    # Get list of already scraped vessel IDs
-    scraped_ids = set()
-    for vessel in scraped_vessels:
-        # Try to find ID from vessel data
-        if 'IMO' in vessel and vessel['IMO']:
-            scraped_ids.add(vessel['IMO'])
+    # Listing order shifts as vessels are added, so match the registry to the listing by IMO
+    scraped_ids = scraped_listing_ids(all_vessels, scraped_vessels)
 
-    # Also check which vessel IDs we've already attempted (from URL if available)
-    scraped_urls = set()
-    for i, vessel in enumerate(all_vessels):
-        if i < len(scraped_vessels):
-            scraped_urls.add(vessel['url'])
+    # Vessels scraped by an interrupted run (this script or scrape_all_vessels.py, which shares
+    # the journal) live in the journal, keyed by listing vessel id
+    journal = FleetJournal('shadow_fleet.json' + JOURNAL_SUFFIX)
 
-    print(f"Already scraped: {len(scraped_vessels)} vessels")
+    print(f"Already scraped: {len(scraped_vessels)} vessels ({len(scraped_ids)} matched to the listing)")
+    if journal.records:
+        print(f"Replayed from journal: {len(journal.records)} vessels")
     print(f"Total vessels: {len(all_vessels)}")
 
     # Find vessels that need to be scraped
     remaining = []
     for vessel in all_vessels:
-        # Check if we haven't scraped this URL yet
-        if vessel['url'] not in scraped_urls:
+        # Journals from older resume runs are keyed by URL
+        if vessel['id'] not in scraped_ids and not {vessel['id'], vessel['url']} & journal.records.keys():
             remaining.append(vessel)
 
     print(f"Remaining to scrape: {len(remaining)} vessels")
 
     if not remaining:
+        if journal.records:
+            journal.compact('shadow_fleet.json', prefix=scraped_vessels)
+        journal.close(remove=True)
         print("All vessels already scraped!")
         return
 
     # Start scraping remaining vessels
     failed = []
-    new_vessels = []
+    # Pages fetched by earlier runs come back as 304s and skip parsing
+    cache = ResponseCache(record_version=record_version(DEFAULT_EXTRACTOR))
 
     for i, vessel_info in enumerate(remaining):
         vessel_url = vessel_info['url']
@@ -209,33 +95,33 @@ def resume_scraping():
 
         print(f"\n[{i+1}/{len(remaining)}] Scraping vessel {vessel_id}...")
 
-        vessel_data = scrape_vessel(vessel_url)
+        vessel_data = scrape_vessel(vessel_url, cache)
 
         if vessel_data:
-            new_vessels.append(vessel_data)
+            journal.append(vessel_id, vessel_data)
             print(f"  ✓ {vessel_data.get('vessel_name', 'Unknown')} - IMO: {vessel_data.get('IMO', 'N/A')}")
         else:
             failed.append(vessel_url)
             print(f"  ✗ Failed to scrape")
 
-        # Save progress every 50 vessels
+        # Checkpoint the cache index every 50 vessels; the journal is already on disk
         if (i + 1) % 50 == 0:
-            print(f"\n>>> Saving progress ({len(scraped_vessels) + len(new_vessels)} total vessels)...")
-            combined = scraped_vessels + new_vessels
-            with open('shadow_fleet.json', 'w', encoding='utf-8') as f:
-                json.dump(combined, f, ensure_ascii=False, indent=2)
+            cache.save()
 
         # Rate limiting - be respectful
         if i < len(remaining) - 1:
             time.sleep(1.5)
 
-    # Final save
+    # Final save: fold the journal into the registry atomically, then drop it
     print("\n>>> Saving final data...")
+    new_vessels = journal.ordered()
     combined = scraped_vessels + new_vessels
-    with open('shadow_fleet.json', 'w', encoding='utf-8') as f:
-        json.dump(combined, f, ensure_ascii=False, indent=2)
+    journal.compact('shadow_fleet.json', prefix=scraped_vessels)
+    journal.close(remove=True)
+    cache.save()
 
     print(f"\n✓ Successfully scraped {len(new_vessels)} new vessels")
+    print(f"🗄 Cache: {cache.summary()}")
     print(f"✓ Total vessels now: {len(combined)}")
     print(f"✗ Failed to scrape {len(failed)} vessels")
 
@@ -248,4 +134,14 @@ def resume_scraping():
 
 
 if __name__ == "__main__":
-    resume_scraping()
+    import sys
+
+    # Telemetry paths and the profiler come from $SCRAPER_METRICS / $SCRAPER_PROFILE
+    with telemetry.profiled():
+        if '--incremental' in sys.argv[1:]:
+            # Diff the listing against vessel_manifest.json and fetch only new/changed vessels
+            from incremental_refresh import incremental_refresh
+            incremental_refresh()
+        else:
+            resume_scraping()
+    telemetry.finish()
@@ -0,0 +1,303 @@
+"""Structured sanctions records and an inverted index over the vessel registry.
+
+The registry's `sanctions` strings and `vessel_information` text are split
+into sentences. Each sentence that mentions sanctions becomes one record per
+jurisdiction:
+
+    {'jurisdiction': 'EU', 'date': '2025-05-20', 'effective': '2025-05-21',
+     'action': 'imposed', 'sentence': ...}
+
+Jurisdiction names and their aliases are found in a single pass with an
+Aho-Corasick automaton. Only names in the subject of the sentence count
+("the EU imposed ...", "... sanctioned by USA ..."), not names in the reason
+("... destabilizing Ukraine"). Dates come from one precompiled pattern and
+accept "May 20, 2025", "20 May 2025", "June 2025" and "February 24, March 04,
+2025".
+Dates after "effective"/"enter into force" are effective dates. With
+"respectively", jurisdictions and dates are paired in order.
+
+action is one of:
+    imposed   sanctions on the vessel itself
+    related   sanctions on its owner, manager or an affiliated company
+    lifted    sanctions lifted or the vessel delisted
+
+The index keeps, per jurisdiction and action, registry rows sorted by date,
+so "all vessels sanctioned by the EU after D" is a binary search:
+
+    python sanctions_index.py build --input ../app/data/shadow_fleet.json
+    python sanctions_index.py query --jurisdiction EU --after 2025-05-01
+"""
+import argparse
+import bisect
+import json
+import re
+from collections import deque
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fleet_journal import write_json_atomic
+
+INDEX_FILE = 'sanctions_index.json'
+
+# Canonical jurisdiction -> names as they appear in the text (matched case-insensitively)
+JURISDICTIONS = {
+    'EU': ('eu', 'european union', 'council of the eu', 'council of the european union'),
+    'United Kingdom': ('united kingdom', 'uk', 'great britain', 'britain', 'hm treasury', 'ofsi'),
+    'United States': ('united states', 'usa', 'u.s.', 'us treasury', 'ofac'),
+    'Canada': ('canada',),
+    'Switzerland': ('switzerland',),
+    'Australia': ('australia',),
+    'New Zealand': ('new zealand',),
+    'Norway': ('norway',),
+    'Japan': ('japan',),
+    'Ukraine': ('ukraine',),
+}
+
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+          'november', 'december')
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z"\'])')
+DATE_RE = re.compile(r'\b(?:(\d{1,2})\s+)?(' + '|'.join(MONTHS) + r')(?:\s+(\d{1,2})(?!\d))?(?:,?\s+(\d{4}))?',
+                     re.IGNORECASE)
+EFFECTIVE_RE = re.compile(r'(?:effective|in\s+force|into\s+force|takes?\s+effect|applies)\s+(?:from|on|since)?\s*$',
+                          re.IGNORECASE)
+IMPOSED_RE = re.compile(r'\b(?:imposed|introduced|applied|extended|designated)\b', re.IGNORECASE)
+LIFTED_RE = re.compile(r'\b(?:lifted|removed|delisted|revoked|excluded)\b', re.IGNORECASE)
+PASSIVE_RE = re.compile(r'\b(?:sanctioned|imposed|introduced|designated)\s+by\b', re.IGNORECASE)
+VESSEL_OBJECT_RE = re.compile(r'\b(?:(?:on|against)\s+(?:the|a|this)?\s*|designated\s+(?:the|a|this)\s+)'
+                              r'(?:vessel|tanker|ship|carrier)\b', re.IGNORECASE)
+RESPECTIVELY_RE = re.compile(r'\brespectively\b', re.IGNORECASE)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one pass over the text"""
+
+    def __init__(self, patterns: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, str]]] = [[]]
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = self.goto[state][char]
+            self.output[state].append((len(pattern), value))
+
+        # Breadth-first failure links; a state also reports what its failure state reports
+        queue = deque(self.goto[0].values())  # depth-1 states fail to the root
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, value) for every match, in order of end position"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield end - length, end, value
+
+
+JURISDICTION_MATCHER = AhoCorasick({alias: name for name, aliases in JURISDICTIONS.items() for alias in aliases})
+
+
+def find_jurisdictions(text: str) -> List[Tuple[int, int, str]]:
+    """Whole-word jurisdiction mentions, longest first where they overlap"""
+    lowered = text.lower()
+    matches = []
+    for start, end, name in JURISDICTION_MATCHER.finditer(lowered):
+        if (start and lowered[start - 1].isalnum()) or (end < len(lowered) and lowered[end].isalnum()):
+            continue
+        # 'Council of the EU' also contains 'EU'; keep the longer, enclosing match
+        while matches and matches[-1][0] >= start:
+            matches.pop()
+        if matches and matches[-1][1] > start:
+            continue
+        matches.append((start, end, name))
+    return matches
+
+
+def find_dates(text: str) -> List[Tuple[int, str, bool]]:
+    """(position, ISO date, is_effective) for each date; 'February 24, March 04, 2025' shares the year"""
+    found = []
+    for match in DATE_RE.finditer(text):
+        month = MONTHS.index(match.group(2).lower()) + 1
+        day = int(match.group(1) or match.group(3) or 1)
+        year = int(match.group(4)) if match.group(4) else None
+        effective = bool(EFFECTIVE_RE.search(text[max(0, match.start() - 30):match.start()]))
+        found.append([match.start(), year, month, day, effective])
+    dates, year = [], None
+    for entry in reversed(found):
+        year = entry[1] or year
+        if year is None:
+            continue
+        try:
+            dates.append((entry[0], date(year, entry[2], entry[3]).isoformat(), entry[4]))
+        except ValueError:
+            continue
+    return dates[::-1]
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_RE.split(text or '') if sentence.strip()]
+
+
+def sentence_records(sentence: str) -> List[Dict]:
+    """Structured (jurisdiction, date, effective, action) records for one sentence"""
+    if 'sanction' not in sentence.lower():
+        return []
+    lifted = LIFTED_RE.search(sentence)
+    verb = lifted or IMPOSED_RE.search(sentence)
+    passive = PASSIVE_RE.search(sentence)
+    if verb is None and passive is None:
+        return []
+
+    mentions = find_jurisdictions(sentence)
+    if verb is not None:
+        # The jurisdiction is the subject: named before the verb, or after 'by' in the passive
+        names = [name for start, _, name in mentions if start < verb.start()]
+        if not names and passive is not None:
+            names = [name for start, _, name in mentions if start >= passive.end()][:1]
+    else:
+        names = [name for start, _, name in mentions if start >= passive.end()][:1]
+    names = list(dict.fromkeys(names))
+    dates = find_dates(sentence)
+    imposed_dates = [iso for _, iso, effective in dates if not effective]
+    effective_dates = [iso for _, iso, effective in dates if effective]
+    if not names or not imposed_dates:
+        return []
+
+    if lifted is not None:
+        action = 'lifted'
+    elif verb is not None and VESSEL_OBJECT_RE.search(sentence, verb.start()):
+        action = 'imposed'
+    else:
+        action = 'related'
+
+    if RESPECTIVELY_RE.search(sentence) and len(imposed_dates) == len(names):
+        pairs = list(zip(names, imposed_dates))
+    else:
+        pairs = [(name, imposed_dates[0]) for name in names]
+    return [{'jurisdiction': name, 'date': when, 'effective': effective_dates[0] if effective_dates else None,
+             'action': action, 'sentence': sentence} for name, when in pairs]
+
+
+def vessel_records(vessel: Dict) -> List[Dict]:
+    """Deduplicated sanctions records from a registry record's sanctions strings and information text"""
+    records = {}
+    sentences = list(vessel.get('sanctions') or []) + split_sentences(vessel.get('vessel_information', ''))
+    for sentence in sentences:
+        for record in sentence_records(sentence):
+            records.setdefault((record['jurisdiction'], record['date'], record['action']), record)
+    return sorted(records.values(), key=lambda record: (record['date'], record['jurisdiction']))
+
+
+def canonical_jurisdiction(name: str) -> Optional[str]:
+    """'eu', 'European Union' or 'EU' -> 'EU'; None if unknown"""
+    matches = find_jurisdictions(name.strip())
+    return matches[0][2] if matches else None
+
+
+class SanctionsIndex:
+    """Inverted index: (jurisdiction, action) -> registry rows sorted by sanction date"""
+
+    def __init__(self, postings: Dict[str, Dict[str, Tuple[List[str], List[int]]]], vessels: List[Dict]):
+        self.postings = postings
+        self.vessels = vessels
+
+    @classmethod
+    def build(cls, registry: List[Dict]) -> Tuple['SanctionsIndex', List[List[Dict]]]:
+        """Index a registry; also returns each vessel's records"""
+        entries: Dict[str, Dict[str, List[Tuple[str, int]]]] = {}
+        records = []
+        for row, vessel in enumerate(registry):
+            vessel_sanctions = vessel_records(vessel)
+            records.append(vessel_sanctions)
+            for record in vessel_sanctions:
+                entries.setdefault(record['jurisdiction'], {}).setdefault(record['action'], []).append(
+                    (record['date'], row))
+        postings = {name: {action: tuple(map(list, zip(*sorted(pairs)))) for action, pairs in actions.items()}
+                    for name, actions in entries.items()}
+        vessels = [{'vessel_name': v.get('vessel_name', ''), 'IMO': v.get('IMO', ''), 'MMSI': v.get('MMSI', '')}
+                   for v in registry]
+        return cls(postings, vessels), records
+
+    def rows(self, jurisdiction: Optional[str] = None, after: Optional[str] = None, before: Optional[str] = None,
+             actions: Iterable[str] = ('imposed',)) -> List[int]:
+        """Registry rows with a matching record dated after `after` and before `before` (ISO dates, exclusive)"""
+        names = [jurisdiction] if jurisdiction else list(self.postings)
+        rows = set()
+        for name in names:
+            for action in actions:
+                dates, members = self.postings.get(name, {}).get(action, ([], []))
+                low = bisect.bisect_right(dates, after) if after else 0
+                high = bisect.bisect_left(dates, before) if before else len(dates)
+                rows.update(members[low:high])
+        return sorted(rows)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        return {name: {action: len(set(members)) for action, (_, members) in actions.items()}
+                for name, actions in sorted(self.postings.items())}
+
+    def save(self, path: str = INDEX_FILE, records: Optional[List[List[Dict]]] = None):
+        data = {'version': 1, 'vessels': self.vessels, 'postings': self.postings}
+        if records is not None:
+            data['records'] = records
+        write_json_atomic(path, data)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> 'SanctionsIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        postings = {name: {action: (pair[0], pair[1]) for action, pair in actions.items()}
+                    for name, actions in data['postings'].items()}
+        return cls(postings, data['vessels'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the structured sanctions index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="extract records from the registry and write the index")
+    build.add_argument('--input', default='../app/data/shadow_fleet.json')
+    build.add_argument('--output', default=INDEX_FILE)
+    query = commands.add_parser('query', help="vessels sanctioned by a jurisdiction within a date range")
+    query.add_argument('--index', default=INDEX_FILE)
+    query.add_argument('--jurisdiction', default=None, help="EU, UK, USA, Canada, ... (default: any)")
+    query.add_argument('--after', default=None, help="YYYY-MM-DD, exclusive")
+    query.add_argument('--before', default=None, help="YYYY-MM-DD, exclusive")
+    query.add_argument('--action', nargs='+', default=['imposed'], choices=['imposed', 'related', 'lifted'])
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.input, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+        index, records = SanctionsIndex.build(registry)
+        index.save(args.output, records)
+        print(f"✓ {sum(map(len, records))} sanctions records for {sum(1 for r in records if r)} of "
+              f"{len(registry)} vessels, saved to {args.output}")
+        for name, actions in index.counts().items():
+            print(f"  {name:<15} " + ', '.join(f"{count} {action}" for action, count in sorted(actions.items())))
+    else:
+        jurisdiction = None
+        if args.jurisdiction:
+            jurisdiction = canonical_jurisdiction(args.jurisdiction)
+            if jurisdiction is None:
+                raise SystemExit(f"✗ unknown jurisdiction {args.jurisdiction!r}; known: {', '.join(JURISDICTIONS)}")
+        index = SanctionsIndex.load(args.index)
+        rows = index.rows(jurisdiction, args.after, args.before, args.action)
+        print(f"✓ {len(rows)} vessels")
+        for row in rows:
+            vessel = index.vessels[row]
+            print(f"  {vessel['vessel_name']:<30} IMO {vessel['IMO']:<8} MMSI {vessel['MMSI']}")
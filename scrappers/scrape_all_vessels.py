@@ -1,164 +1,200 @@
 import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
-import re
-import time
+import os
 
-def scrape_vessel(vessel_url):
-    """Scrape a single vessel page for all details"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
+import http_session
+import telemetry
+from crawl_engine import CrawlEngine
+from fleet_journal import FleetJournal, JOURNAL_SUFFIX
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
+from parse_pipeline import ParsePipeline
+from snapshot_store import SnapshotStore, SNAPSHOT_DIR
+from vessel_extract import BACKENDS, extract_vessel, record_version
 
-    try:
-        response = requests.get(vessel_url, headers=headers, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        vessel_data = {
-            'vessel_name': '',
-            'IMO': '',
-            'MMSI': '',
-            'flag': '',
-            'vessel_type': '',
-            'category': '',
-            'vessel_photo_url': '',
-            'sanctions': [],
-            'vessel_information': ''
-        }
-
-        # Extract vessel photo
-        img = soup.find('img', src=lambda x: x and ('/uploads/' in x or '/media/' in x))
-        if img:
-            photo_url = img.get('src', '')
-            if photo_url and not photo_url.startswith('http'):
-                vessel_data['vessel_photo_url'] = f"https://war-sanctions.gur.gov.ua{photo_url}"
-            else:
-                vessel_data['vessel_photo_url'] = photo_url
-
-        # Get page text for parsing
-        page_text = soup.get_text()
-
-        # Extract vessel name - improved pattern
-        name_match = re.search(r'Vessel\s*name\s*([A-Z0-9\s\-\.]+?)(?=Category|IMO)', page_text, re.IGNORECASE)
-        if name_match:
-            vessel_data['vessel_name'] = name_match.group(1).strip()
-
-        # Extract IMO
-        imo_match = re.search(r'IMO\s*(\d+)', page_text)
-        if imo_match:
-            vessel_data['IMO'] = imo_match.group(1).strip()
-
-        # Extract MMSI
-        mmsi_match = re.search(r'MMSI\s*(\d+)', page_text)
-        if mmsi_match:
-            vessel_data['MMSI'] = mmsi_match.group(1).strip()
-
-        # Extract flag - improved pattern
-        flag_match = re.search(r'Flag\s*\(Current\)\s*([A-Za-z\s]+?)(?=MMSI|Vessel\s*Type|Call)', page_text)
-        if flag_match:
-            vessel_data['flag'] = flag_match.group(1).strip()
-
-        # Extract vessel type - improved pattern
-        type_match = re.search(r'Vessel\s*Type\s*([A-Za-z\s/\-]+?)(?=Length|Gross|DWT|P&I)', page_text)
-        if type_match:
-            vessel_data['vessel_type'] = type_match.group(1).strip()
-
-        # Extract category - get both lines
-        category_match = re.search(r'Category\s*(.+?)(?=IMO|Flag|MMSI)', page_text, re.DOTALL)
-        if category_match:
-            category_text = category_match.group(1).strip()
-            # Clean up - remove extra whitespace and combine lines
-            category_lines = [line.strip() for line in category_text.split('\n') if line.strip() and len(line.strip()) > 5]
-            # Join unique lines
-            unique_cats = []
-            for line in category_lines:
-                if line not in unique_cats and not line.startswith(('The ', 'On ', 'In ', 'From ', 'Since ')):
-                    unique_cats.append(line)
-            vessel_data['category'] = ' → '.join(unique_cats[:2]) if len(unique_cats) > 1 else (unique_cats[0] if unique_cats else '')
-
-        # Extract vessel information - look for the justification section
-        info_match = re.search(r'(?:Justification|Vessel information)\s*(.+?)(?=Cases of AIS|Visited ports|Available additional|Web Resources|Go to site|$)', page_text, re.DOTALL)
-        if info_match:
-            vessel_data['vessel_information'] = info_match.group(1).strip()
-
-        # Extract sanctions - more comprehensive
-        sanctions = []
-        # Find all sanction mentions
-        sanction_sentences = re.finditer(
-            r'(?:On|From|Since|In)\s+[A-Za-z]+\s+\d{1,2},?\s+\d{4},?\s+(?:the\s+)?([A-Z][A-Za-z\s,]+?)\s+(?:imposed|introduced|applied)\s+sanctions[^\.]*\.',
-            page_text,
-            re.IGNORECASE
-        )
-
-        for match in sanction_sentences:
-            sanction_text = match.group(0).strip()
-            if sanction_text and sanction_text not in sanctions:
-                sanctions.append(sanction_text)
-
-        vessel_data['sanctions'] = sanctions
+# Any backend in vessel_extract gives identical records (see fixtures/vessel_pages)
+DEFAULT_EXTRACTOR = 'auto'
 
-        return vessel_data
 
+def fetch_vessel_page(vessel_url):
+    """Download a vessel page, raising on network or HTTP errors"""
+    response = http_session.get(vessel_url)
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_vessel(vessel_url, cache=None):
+    """Fetch a vessel page, going through the response cache when one is given.
+
+    Returns (content, record): record is the previously parsed result if the
+    page has not changed, otherwise content holds the body still to be parsed.
+    """
+    if cache is None:
+        return fetch_vessel_page(vessel_url), None
+    content, record = cache.fetch(vessel_url, http_session.get)
+    if record is not None:
+        telemetry.count('cache_hits')
+    return content, record
+
+
+def is_transient_error(error):
+    """Connection problems, timeouts, throttling and 5xx responses are worth retrying"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def parse_vessel_page(content, backend=DEFAULT_EXTRACTOR):
+    """Extract vessel details from the raw HTML of a vessel page"""
+    with telemetry.stage('parse'):
+        return extract_vessel(content, backend)
+
+
+def scrape_vessel(vessel_url, cache=None, backend=DEFAULT_EXTRACTOR):
+    """Scrape a single vessel page for all details"""
+    try:
+        content, vessel_data = fetch_vessel(vessel_url, cache)
+        if vessel_data is None:
+            vessel_data = parse_vessel_page(content, backend)
+            if cache is not None:
+                cache.store_record(vessel_url, vessel_data)
+        return vessel_data
     except Exception as e:
+        telemetry.error('scrape', e)
         print(f"Error scraping vessel {vessel_url}: {e}")
         return None
 
 
-def scrape_all_vessels():
+def crawl_vessels(urls, engine, cache=None, backend=DEFAULT_EXTRACTOR):
+    """Yield (index, url, vessel_data, error) for each vessel page as the engine completes it"""
+    for i, vessel_url, fetched, error in engine.run(urls, lambda url: fetch_vessel(url, cache)):
+        vessel_data = None
+        if error is None:
+            content, vessel_data = fetched
+            if vessel_data is None:
+                try:
+                    vessel_data = parse_vessel_page(content, backend)
+                    if cache is not None:
+                        cache.store_record(vessel_url, vessel_data)
+                except Exception as e:
+                    error = e
+        yield i, vessel_url, vessel_data, error
+
+
+def scrape_all_vessels(list_file='vessel_list.json', output_file='shadow_fleet.json',
+                       concurrency=4, rate=2.0, retries=3, cache_dir=DEFAULT_CACHE_DIR,
+                       extractor=DEFAULT_EXTRACTOR, parse_workers=0, queue_size=32, fresh=False,
+                       snapshot_dir=SNAPSHOT_DIR):
     """Scrape all vessels from vessel_list.json"""
 
     # Load vessel list
     print("Loading vessel list...")
-    with open('vessel_list.json', 'r', encoding='utf-8') as f:
+    with open(list_file, 'r', encoding='utf-8') as f:
         vessel_list = json.load(f)
 
-    total = len(vessel_list)
+    # Every scraped vessel is appended to the journal; a crashed run picks up where it stopped
+    journal_path = output_file + JOURNAL_SUFFIX
+    if fresh and os.path.exists(journal_path):
+        os.remove(journal_path)
+    journal = FleetJournal(journal_path)
+    pending = [vessel_info for vessel_info in vessel_list if vessel_info['id'] not in journal.records]
+    if len(pending) < len(vessel_list):
+        print(f"Resuming: {len(vessel_list) - len(pending)} vessels already in {journal_path}")
+
+    total = len(pending)
     print(f"Found {total} vessels to scrape")
+    print(f"Crawling with {concurrency} workers at up to {rate} requests/sec")
 
-    all_vessels = []
     failed = []
 
-    for i, vessel_info in enumerate(vessel_list):
-        vessel_url = vessel_info['url']
-        vessel_id = vessel_info['id']
-
-        print(f"\n[{i+1}/{total}] Scraping vessel {vessel_id}...")
-
-        vessel_data = scrape_vessel(vessel_url)
-
-        if vessel_data:
-            all_vessels.append(vessel_data)
-            print(f"  ✓ {vessel_data.get('vessel_name', 'Unknown')} - IMO: {vessel_data.get('IMO', 'N/A')}")
+    # One pooled keep-alive connection per worker
+    http_session.configure(max_per_host=concurrency)
+    engine = CrawlEngine(concurrency=concurrency, rate=rate, retries=retries, retry_if=is_transient_error)
+    urls = [vessel_info['url'] for vessel_info in pending]
+    cache = ResponseCache(cache_dir, record_version=record_version(extractor)) if cache_dir else None
+
+    if parse_workers:
+        # Parsing moves to a process pool fed through a bounded queue
+        pipeline = ParsePipeline(engine, lambda url: fetch_vessel(url, cache), parse_workers, queue_size,
+                                 extractor, cache)
+        results = pipeline.run(urls)
+        print(f"Parsing in {pipeline.parse_workers} worker processes")
+    else:
+        pipeline = None
+        results = crawl_vessels(urls, engine, cache, extractor)
+
+    for done, (i, vessel_url, vessel_data, error) in enumerate(results, start=1):
+        vessel_id = pending[i]['id']
+
+        if error is None:
+            journal.append(vessel_id, vessel_data)
+            print(f"[{done}/{total}] ✓ {vessel_id}: {vessel_data.get('vessel_name', 'Unknown')} - IMO: {vessel_data.get('IMO', 'N/A')}")
         else:
             failed.append(vessel_url)
-            print(f"  ✗ Failed to scrape")
+            telemetry.error('scrape', error)
+            print(f"[{done}/{total}] ✗ {vessel_id}: Failed to scrape ({error})")
 
-        # Save progress every 50 vessels
-        if (i + 1) % 50 == 0:
-            print(f"\n>>> Saving progress ({i+1} vessels)...")
-            with open('shadow_fleet.json', 'w', encoding='utf-8') as f:
-                json.dump(all_vessels, f, ensure_ascii=False, indent=2)
+        # Checkpoint the cache index every 50 vessels; the journal is already on disk
+        if done % 50 == 0 and cache is not None:
+            cache.save()
 
-        # Rate limiting - be respectful (1.5 seconds between requests)
-        if i < total - 1:
-            time.sleep(1.5)
-
-    # Final save
+    # Compact the journal into the registry, in listing order
     print("\n>>> Saving final data...")
-    with open('shadow_fleet.json', 'w', encoding='utf-8') as f:
-        json.dump(all_vessels, f, ensure_ascii=False, indent=2)
-
-    print(f"\n✓ Successfully scraped {len(all_vessels)} vessels")
+    journal.compact(output_file, [vessel_info['id'] for vessel_info in vessel_list])
+    if cache is not None:
+        cache.save()
+    # Keep the journal while vessels are missing so a re-run only retries those
+    journal.close(remove=not failed)
+
+    # A partial registry would record the missing vessels as removed
+    if snapshot_dir and not failed:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            snapshot = SnapshotStore(snapshot_dir).commit(json.load(f), label=os.path.basename(output_file))
+        print(f"✓ Snapshot {snapshot['seq']} in {snapshot_dir}: {snapshot['added']} added, "
+              f"{snapshot['changed']} changed, {snapshot['removed']} removed")
+    elif snapshot_dir:
+        print(f"⚠ Not snapshotting an incomplete registry ({len(failed)} vessels failed)")
+
+    print(f"\n✓ Successfully scraped {len(journal.records)} vessels")
     print(f"✗ Failed to scrape {len(failed)} vessels")
+    print(f"⏱ {engine.stats['elapsed']:.1f}s, {engine.pages_per_second():.2f} pages/sec, {engine.stats['retries']} retries")
+    if pipeline is not None:
+        print(pipeline.report())
+    if cache is not None:
+        print(f"🗄 Cache: {cache.summary()}")
 
     if failed:
         print("\nFailed URLs:")
         for url in failed:
             print(f"  - {url}")
 
-    print(f"\nData saved to shadow_fleet.json")
+    print(f"\nData saved to {output_file}")
 
 
 if __name__ == "__main__":
-    scrape_all_vessels()
+    parser = argparse.ArgumentParser(description="Scrape all vessels listed in vessel_list.json")
+    parser.add_argument('--input', default='vessel_list.json', help="vessel list produced by vessel_scraper.py")
+    parser.add_argument('--output', default='shadow_fleet.json')
+    parser.add_argument('--concurrency', '--fetch-workers', dest='concurrency', type=int, default=4,
+                        help="fetch threads, i.e. requests kept in flight")
+    parser.add_argument('--rate', type=float, default=2.0, help="maximum requests started per second")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="conditional-GET response cache")
+    parser.add_argument('--no-cache', action='store_true', help="always download and parse every page")
+    parser.add_argument('--extractor', choices=BACKENDS, default=DEFAULT_EXTRACTOR, help="HTML extraction backend")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="parse in this many processes (0 parses in the main process)")
+    parser.add_argument('--queue-size', type=int, default=32, help="raw pages buffered between fetch and parse")
+    parser.add_argument('--snapshots', default=SNAPSHOT_DIR, help="snapshot store recording each complete scrape")
+    parser.add_argument('--no-snapshot', action='store_true', help="do not record this scrape in the snapshot store")
+    parser.add_argument('--fresh', action='store_true', help="discard the journal of an interrupted run")
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        help="write run telemetry to these files (.prom for Prometheus text, else JSON)")
+    parser.add_argument('--profile', choices=telemetry.PROFILERS, default=None, help="profile the crawl loop")
+    args = parser.parse_args()
+
+    with telemetry.profiled(args.profile):
+        scrape_all_vessels(args.input, args.output, args.concurrency, args.rate, args.retries,
+                           None if args.no_cache else args.cache_dir, args.extractor, args.parse_workers,
+                           args.queue_size, args.fresh, None if args.no_snapshot else args.snapshots)
+    telemetry.finish(args.metrics)
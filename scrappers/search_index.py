@@ -0,0 +1,314 @@
+"""Full-text search index over the vessel registry, shipped as sharded frontend artifacts.
+
+Every text field of shadow_fleet.json is tokenized (lower case, runs of
+letters and digits, a short stopword list) into one inverted index. Term
+frequencies are weighted by field, so a hit in the vessel name or IMO counts
+more than one in the intelligence text, and documents are ranked by BM25.
+
+The term dictionary is kept sorted, which makes it a flattened prefix trie:
+the terms below any prefix are one contiguous range, found with two binary
+searches. The last query word is treated as a prefix ("sovcom" finds
+Sovcomflot), every other word must match exactly, and a vessel must match
+every word.
+
+The index is written next to the other build artifacts:
+
+    search.json                 BM25 parameters, field weights, stopwords, shard ranges
+    search/lengths.<hash>.json  weighted length of every vessel (row order of the registry)
+    search/terms-NNNN.<hash>.json  a contiguous term range: terms, posting offsets,
+                                delta-coded rows and weighted term frequencies
+
+ui.js loads only the shards covering the typed words. SearchIndex is the
+same lookup for Python:
+
+    python search_index.py build --input ../app/data/shadow_fleet.json --output-dir ../app/data
+    python search_index.py query "gatik ship" --limit 10
+"""
+import argparse
+import bisect
+import gzip
+import json
+import os
+import re
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from build_frontend_data import content_name, minify, registry_digest, write_artifacts
+from entity_graph import display_name
+
+SEARCH_DIR = 'search'
+SEARCH_INDEX = 'search.json'
+FORMAT_VERSION = 1
+# Field -> integer weight applied to its term frequencies
+FIELD_WEIGHTS = {
+    'vessel_name': 5, 'IMO': 5, 'MMSI': 5, 'flag': 3, 'vessel_type': 2, 'category': 2, 'destination': 2,
+    'sanctions': 1, 'vessel_information': 1,
+}
+STOPWORDS = ('a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it', 'its', 'of',
+             'on', 'or', 'that', 'the', 'to', 'was', 'which', 'with')
+K1 = 1.2
+B = 0.75
+SHARD_POSTINGS = 16384  # postings per shard, roughly 60-100 KB of minified JSON
+MAX_EXPANSIONS = 64  # prefix terms scored for the last query word, most frequent first
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+_STOPWORDS = frozenset(STOPWORDS)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def field_text(value) -> str:
+    """Searchable text of a registry value: strings as-is, lists joined, numbers as digits"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(field_text(item) for item in value)
+    return str(value)
+
+
+class SearchIndex:
+    """Sorted term dictionary with postings (rows, weighted tf) and BM25 ranking.
+
+    Built in memory from a registry, or opened from the artifacts, in which
+    case term shards are read on first use:
+
+        index = SearchIndex.load('../app/data')
+        for row, score in index.search('seafaring savants', limit=5):
+            ...
+    """
+
+    def __init__(self, manifest: Dict, lengths: np.ndarray, shards: Optional[List[Dict]] = None,
+                 directory: Optional[str] = None):
+        self.manifest = manifest
+        self.lengths = lengths
+        self.directory = directory
+        self.k1, self.b = manifest['k1'], manifest['b']
+        self.documents = manifest['docs']
+        self.average_length = manifest['avgdl']
+        self.first_terms = [shard['first'] for shard in manifest['shards']]
+        self._shards: Dict[int, Dict] = dict(enumerate(shards)) if shards is not None else {}
+        self._norm = self.k1 * (1 - self.b + self.b * lengths / max(self.average_length, 1e-9))
+
+    @classmethod
+    def build(cls, vessels: Sequence[Dict], weights: Dict[str, int] = FIELD_WEIGHTS,
+              shard_postings: int = SHARD_POSTINGS) -> 'SearchIndex':
+        vocabulary: Dict[str, int] = {}
+        term_ids, term_weights, per_document = array('i'), array('i'), array('i')
+        for vessel in vessels:
+            tokens = 0
+            for field, weight in weights.items():
+                words = tokenize(field_text(vessel.get(field)))
+                term_ids.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+                term_weights.extend([weight] * len(words))
+                tokens += len(words)
+            per_document.append(tokens)
+
+        # Renumber terms alphabetically, then one sort groups postings by (term, row)
+        terms = sorted(vocabulary)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+        rows = np.repeat(np.arange(len(vessels), dtype=np.int64), np.frombuffer(per_document, dtype=np.int32))
+        term = rank[np.frombuffer(term_ids, dtype=np.int32)]
+        weight = np.frombuffer(term_weights, dtype=np.int32).astype(np.int64)
+        lengths = np.bincount(rows, weights=weight, minlength=len(vessels))
+
+        key = term * len(vessels) + rows
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        tf = np.add.reduceat(weight[order], starts) if len(starts) else np.array([], dtype=np.int64)
+        posting_term, posting_row = np.divmod(key[starts], len(vessels)) if len(vessels) else (key, key)
+        offsets = np.searchsorted(posting_term, np.arange(len(terms) + 1))
+
+        shards, ranges = [], []
+        first = 0
+        while first < len(terms):
+            # Whole terms per shard, about `shard_postings` postings each
+            last = max(first + 1, int(np.searchsorted(offsets, offsets[first] + shard_postings, 'right')) - 1)
+            last = min(last, len(terms))
+            low, high = offsets[first], offsets[last]
+            shards.append({'terms': terms[first:last], 'offsets': offsets[first:last + 1] - low,
+                           'rows': posting_row[low:high].astype(np.int32), 'tf': tf[low:high].astype(np.int32)})
+            ranges.append({'first': terms[first], 'last': terms[last - 1], 'terms': last - first,
+                           'postings': int(high - low)})
+            first = last
+
+        manifest = {'version': FORMAT_VERSION, 'docs': len(vessels),
+                    'avgdl': float(lengths.mean()) if len(vessels) else 0.0, 'k1': K1, 'b': B,
+                    'fields': dict(weights), 'stopwords': list(STOPWORDS), 'max_expansions': MAX_EXPANSIONS,
+                    'shards': ranges}
+        return cls(manifest, lengths, shards)
+
+    # Artifacts
+
+    def artifacts(self) -> Tuple[Dict, Dict[str, bytes]]:
+        """search.json contents and {filename: minified body} for the lengths file and term shards"""
+        manifest = dict(self.manifest, shards=[dict(shard) for shard in self.manifest['shards']])
+        files = {}
+        body = minify(self.lengths.astype(np.int64).tolist())
+        name = content_name('lengths', body)
+        files[name] = body
+        manifest['lengths'] = f"{SEARCH_DIR}/{name}"
+        for number, shard in enumerate(self._load_all()):
+            rows, offsets = shard['rows'].astype(np.int64), shard['offsets']
+            # Rows ascend within a term, so storing gaps keeps the numbers short
+            deltas = rows.copy()
+            deltas[1:] -= rows[:-1]
+            deltas[offsets[:-1]] = rows[offsets[:-1]]  # every term has at least one posting
+            body = minify({'terms': shard['terms'], 'offsets': offsets.tolist(), 'rows': deltas.tolist(),
+                           'tf': shard['tf'].tolist()})
+            name = content_name(f"terms-{number:04d}", body)
+            files[name] = body
+            manifest['shards'][number]['file'] = f"{SEARCH_DIR}/{name}"
+        return manifest, files
+
+    def write(self, output_dir: str, registry: Optional[str] = None) -> Tuple[Dict, Dict[str, bytes], List[str]]:
+        """Write the artifacts; `registry` is the registry_digest() of the indexed file"""
+        manifest, files = self.artifacts()
+        if registry is not None:
+            manifest['registry'] = registry
+        stale = write_artifacts(output_dir, manifest, files, build_dir=SEARCH_DIR, manifest_file=SEARCH_INDEX)
+        return manifest, files, stale
+
+    @classmethod
+    def load(cls, directory: str, manifest_file: str = SEARCH_INDEX) -> 'SearchIndex':
+        with open(os.path.join(directory, manifest_file), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['version'] != FORMAT_VERSION:
+            raise ValueError(f"unsupported search index version {manifest['version']}")
+        with open(os.path.join(directory, manifest['lengths']), 'r', encoding='utf-8') as f:
+            lengths = np.array(json.load(f), dtype=np.float64)
+        return cls(manifest, lengths, directory=directory)
+
+    def _shard(self, number: int) -> Dict:
+        shard = self._shards.get(number)
+        if shard is None:
+            with open(os.path.join(self.directory, self.manifest['shards'][number]['file']), 'r',
+                      encoding='utf-8') as f:
+                data = json.load(f)
+            offsets = np.array(data['offsets'], dtype=np.int64)
+            rows = np.array(data['rows'], dtype=np.int64)
+            # Undo the gap coding term by term: cumulative sum restarted at each term's first posting
+            term_of = np.repeat(np.arange(len(data['terms'])), np.diff(offsets))
+            cumulative = np.cumsum(rows)
+            rows = cumulative - np.r_[0, cumulative][offsets[:-1]][term_of]
+            shard = self._shards[number] = {'terms': data['terms'], 'offsets': offsets,
+                                            'rows': rows.astype(np.int32), 'tf': np.array(data['tf'], np.int32)}
+        return shard
+
+    def _load_all(self) -> List[Dict]:
+        return [self._shard(number) for number in range(len(self.manifest['shards']))]
+
+    # Lookup
+
+    def _shard_range(self, low: str, high: str) -> range:
+        """Shards that can hold terms in [low, high]"""
+        first = max(0, bisect.bisect_right(self.first_terms, low) - 1)
+        return range(first, bisect.bisect_right(self.first_terms, high))
+
+    def postings(self, term: str, prefix: bool = False) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """(term, rows, tf) for `term`, or for every term starting with it when `prefix`"""
+        high = term + '\uffff' if prefix else term
+        found = []
+        for number in self._shard_range(term, high):
+            shard = self._shard(number)
+            start = bisect.bisect_left(shard['terms'], term)
+            end = bisect.bisect_right(shard['terms'], high) if prefix else start + (
+                start < len(shard['terms']) and shard['terms'][start] == term)
+            for i in range(start, end):
+                low, up = shard['offsets'][i], shard['offsets'][i + 1]
+                found.append((shard['terms'][i], shard['rows'][low:up], shard['tf'][low:up]))
+        return found
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Most frequent indexed terms starting with `prefix`"""
+        matches = self.postings(prefix.lower(), prefix=True)
+        return [term for term, rows, _ in sorted(matches, key=lambda m: -len(m[1]))[:limit]]
+
+    def _bm25(self, rows: np.ndarray, tf: np.ndarray) -> np.ndarray:
+        idf = np.log(1 + (self.documents - len(rows) + 0.5) / (len(rows) + 0.5))
+        return idf * tf * (self.k1 + 1) / (tf + self._norm[rows])
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Tuple[int, float]]:
+        """(registry row, BM25 score) of vessels matching every query word, best first"""
+        words = tokenize(query)
+        if not words:
+            return []
+        scores = np.zeros(self.documents)
+        matched = np.zeros(self.documents, dtype=np.int32)
+        for position, word in enumerate(words):
+            expand = prefix and position == len(words) - 1
+            found = self.postings(word, prefix=expand)
+            if expand and len(found) > self.manifest['max_expansions']:
+                found = sorted(found, key=lambda m: -len(m[1]))[:self.manifest['max_expansions']]
+            if not found:
+                return []
+            # A word scores once per vessel: its best-matching expansion
+            best = np.zeros(self.documents)
+            for _, rows, tf in found:
+                best[rows] = np.maximum(best[rows], self._bm25(rows, tf))
+            hit = np.flatnonzero(best)
+            scores[hit] += best[hit]
+            matched[hit] += 1
+        candidates = np.flatnonzero(matched == len(words))
+        order = np.argsort(-scores[candidates], kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [(int(row), float(scores[row])) for row in candidates[order]]
+
+
+def substring_scan(vessels: Sequence[Dict], query: str, fields: Iterable[str] = FIELD_WEIGHTS) -> List[int]:
+    """What filterVessels does today, extended to every field: rows whose lowercased text contains `query`"""
+    query = query.lower()
+    fields = tuple(fields)
+    return [row for row, vessel in enumerate(vessels)
+            if any(query in field_text(vessel.get(field)).lower() for field in fields)]
+
+
+def build_search_index(input_file: str, output_dir: str) -> Dict:
+    with open(input_file, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    start = time.perf_counter()
+    index = SearchIndex.build(vessels)
+    elapsed = time.perf_counter() - start
+    manifest, files, stale = index.write(output_dir, registry_digest(input_file))
+    size = sum(map(len, files.values()))
+    gz = sum(len(gzip.compress(body, 9, mtime=0)) for body in files.values())
+    terms = sum(shard['terms'] for shard in manifest['shards'])
+    postings = sum(shard['postings'] for shard in manifest['shards'])
+    print(f"✓ {len(vessels)} vessels: {terms} terms, {postings} postings in {elapsed:.2f}s")
+    print(f"  {len(manifest['shards'])} term shards + lengths, {size / 1024:.0f} KB ({gz / 1024:.0f} KB gzipped); "
+          f"{SEARCH_INDEX} written to {output_dir}, {len(stale)} stale files removed")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the registry full-text search index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="index shadow_fleet.json and write the search artifacts")
+    build.add_argument('--input', default='../app/data/shadow_fleet.json')
+    build.add_argument('--output-dir', default='../app/data')
+    query = commands.add_parser('query', help="ranked vessels for a query")
+    query.add_argument('text')
+    query.add_argument('--index-dir', default='../app/data')
+    query.add_argument('--registry', default='../app/data/shadow_fleet.json', help="for printing vessel names")
+    query.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_search_index(args.input, args.output_dir)
+    else:
+        index = SearchIndex.load(args.index_dir)
+        start = time.perf_counter()
+        results = index.search(args.text, args.limit)
+        elapsed = time.perf_counter() - start
+        with open(args.registry, 'r', encoding='utf-8') as f:
+            vessels = json.load(f)
+        print(f"✓ {len(results)} vessels in {elapsed * 1000:.1f} ms")
+        for row, score in results:
+            print(f"  {score:7.2f}  {display_name(vessels[row]):<30} IMO {vessels[row].get('IMO', '')}")
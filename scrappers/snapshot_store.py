@@ -0,0 +1,440 @@
+"""Versioned registry snapshots: every scrape kept, storage growing with what changed.
+
+A store directory holds three append-only files:
+
+    objects.pack   vessel record versions, content-addressed: a version whose
+                   canonical JSON has a known SHA-256 is never stored twice.
+                   An entry is a header (digest, keyframe, depth, payload
+                   length) and a deflate payload. A keyframe holds the full
+                   record; the versions after it hold the fields set or
+                   removed relative to that keyframe, so any version is rebuilt
+                   from at most two payloads. A new keyframe is written every
+                   MAX_CHAIN versions of a vessel, or sooner once the delta
+                   outgrows half the record.
+    objects.idx    the pack headers with their offsets, fixed-size, so opening
+                   a store does not walk the pack; completed from the pack tail
+                   when a crash left it short.
+    log.jsonl      one line per snapshot: when it was taken, the vessels whose
+                   version changed ({key: object number, or null when removed})
+                   and, when the registry order changed, the rows removed and
+                   inserted (or the whole order if rows were shuffled).
+
+Objects are numbered in pack order. An unchanged vessel costs nothing, a
+vessel whose position moved costs a few-field delta (about 100 bytes with
+header and index entry), and a snapshot where nothing changed costs one log
+line. Opening a store reads the log and the index into per-vessel version
+lists, so "registry as of D" is a binary search per vessel plus the payloads
+of the versions it lands on, and "what changed between D1 and D2" compares
+two such lookups, only for vessels with a version in between.
+
+Vessels are keyed by IMO (MMSI or name when it is missing); repeated
+identifiers get #2, #3 in registry order.
+
+    python snapshot_store.py commit --input ../app/data/shadow_fleet.json
+    python snapshot_store.py checkout --as-of 2025-10-01 --output fleet_2025-10-01.json
+    python snapshot_store.py diff --from 2025-09-01 --to 2025-10-01
+    python snapshot_store.py history 9271951
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fleet_journal import write_json_atomic
+
+SNAPSHOT_DIR = 'snapshots'
+PACK_FILE = 'objects.pack'
+INDEX_FILE = 'objects.idx'
+LOG_FILE = 'log.jsonl'
+MAX_CHAIN = 64
+CACHE_SIZE = 8192
+ENTRY_HEADER = struct.Struct('<32siHI')  # digest, keyframe object (-1 for a keyframe), depth, payload length
+INDEX_ENTRY = struct.Struct('<32siHIQ')  # the header plus the payload's offset in the pack
+KEYFRAME = -1
+# Preset deflate dictionary: registry field names and the shape of a delta, which
+# otherwise make up most of a small payload. Part of the pack format; never edit.
+DEFLATE_DICT = (b'{"set":{"IMO":"","MMSI":"","category":"","course":,"destination":"","flag":"",'
+                b'"lastUpdate":"T:00Z","navStatus":"Under way using engine","At anchor","Moored",null,'
+                b'"position":{"lat":,"lon":},"sanctions":[" imposed sanctions on the vessel on ."],"speed":,'
+                b'"vessel_information":"","vessel_name":"","vessel_photo_url":"","vessel_type":""},"unset":[]}')
+# Refreshed by every enrichment run; left out of diffs unless asked for
+VOLATILE_FIELDS = ('position', 'speed', 'course', 'destination', 'navStatus', 'lastUpdate', 'lastMiss')
+
+
+def canonical(record: Dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def record_digest(record: Dict) -> bytes:
+    return hashlib.sha256(canonical(record)).digest()
+
+
+def pack_payload(payload: Dict) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=DEFLATE_DICT)
+    return compressor.compress(canonical(payload)) + compressor.flush()
+
+
+def unpack_payload(data: bytes) -> Dict:
+    return json.loads(zlib.decompressobj(-15, zdict=DEFLATE_DICT).decompress(data))
+
+
+def vessel_keys(vessels: Iterable[Dict]) -> List[str]:
+    """Stable identity per registry row: IMO, else MMSI, else name; repeats numbered in order"""
+    keys, seen = [], {}
+    for vessel in vessels:
+        key = str(vessel.get('IMO') or (f"MMSI {vessel['MMSI']}" if vessel.get('MMSI') else
+                                        f"name {vessel.get('vessel_name', '')}"))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def parse_when(value) -> datetime:
+    """datetime from a datetime, 'YYYY-MM-DD' (end of that day) or an ISO timestamp; naive means UTC"""
+    if isinstance(value, datetime):
+        when = value
+    elif len(value) == 10:
+        when = datetime.fromisoformat(value).replace(hour=23, minute=59, second=59)
+    else:
+        when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+
+def order_delta(old: List[str], new: List[str]) -> Optional[Dict]:
+    """Removals and insertions turning `old` into `new`, or None if rows were also reordered"""
+    old_keys, new_keys = set(old), set(new)
+    if [key for key in old if key in new_keys] != [key for key in new if key in old_keys]:
+        return None
+    return {'remove': [key for key in old if key not in new_keys],
+            'insert': [[i, key] for i, key in enumerate(new) if key not in old_keys]}
+
+
+def apply_order_delta(order: List[str], delta: Dict) -> List[str]:
+    removed = set(delta['remove'])
+    order = [key for key in order if key not in removed]
+    for i, key in delta['insert']:
+        order.insert(i, key)
+    return order
+
+
+def field_delta(old: Dict, new: Dict) -> Dict:
+    return {'set': {field: value for field, value in new.items() if old.get(field, object()) != value},
+            'unset': [field for field in old if field not in new]}
+
+
+class SnapshotStore:
+    """Append-only, content-addressed history of the vessel registry"""
+
+    def __init__(self, path: str = SNAPSHOT_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.pack_path = os.path.join(path, PACK_FILE)
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self.log_path = os.path.join(path, LOG_FILE)
+        self.objects: List[Tuple[int, int, int, int]] = []  # object -> (offset, length, keyframe, depth)
+        self.numbers: Dict[bytes, int] = {}  # digest -> object
+        self.snapshots: List[Dict] = []  # log entries without their change maps
+        self.times: List[datetime] = []
+        self.versions: Dict[str, Tuple[List[int], List[Optional[int]]]] = {}  # key -> (snapshot seqs, objects)
+        self.orders: Tuple[List[int], List[List[str]]] = ([], [])
+        self._cache: 'OrderedDict[int, Dict]' = OrderedDict()
+        self._reader = None
+        self._read_objects()
+        self._read_log()
+
+    def _add_object(self, digest: bytes, offset: int, length: int, keyframe: int, depth: int) -> int:
+        self.numbers[digest] = len(self.objects)
+        self.objects.append((offset, length, keyframe, depth))
+        return len(self.objects) - 1
+
+    def _read_objects(self):
+        """Object table from the index, plus any pack entries written after its last one"""
+        end = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+            data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+            for digest, keyframe, depth, length, offset in INDEX_ENTRY.iter_unpack(data):
+                self._add_object(digest, offset, length, keyframe, depth)
+                end = offset + length
+        if not os.path.exists(self.pack_path):
+            return
+        missing = []
+        with open(self.pack_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            while end + ENTRY_HEADER.size <= size:
+                f.seek(end)
+                digest, keyframe, depth, length = ENTRY_HEADER.unpack(f.read(ENTRY_HEADER.size))
+                if end + ENTRY_HEADER.size + length > size:
+                    break  # torn write at the tail; the log never references it
+                self._add_object(digest, end + ENTRY_HEADER.size, length, keyframe, depth)
+                missing.append(INDEX_ENTRY.pack(digest, keyframe, depth, length, end + ENTRY_HEADER.size))
+                end += ENTRY_HEADER.size + length
+        if missing:
+            self._append_index(missing)
+
+    def _append_index(self, entries: List[bytes]):
+        with open(self.index_path, 'ab') as f:
+            f.truncate(f.tell() - f.tell() % INDEX_ENTRY.size)  # drop a torn entry
+            f.write(b''.join(entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_log(self):
+        try:
+            f = open(self.log_path, 'r+', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            good_offset = 0
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the tail: cut it so the next commit starts on a clean line
+                    f.truncate(good_offset)
+                    break
+                if not line.endswith('\n'):
+                    f.write('\n')
+                self._apply(entry)
+                good_offset = f.tell()
+
+    def _apply(self, entry: Dict):
+        seq = len(self.snapshots)
+        for key, number in entry['changes'].items():
+            seqs, numbers = self.versions.setdefault(key, ([], []))
+            seqs.append(seq)
+            numbers.append(number)
+        if 'order' in entry or 'reorder' in entry:
+            order = entry.get('order') or apply_order_delta(self._order_at(seq - 1), entry['reorder'])
+            self.orders[0].append(seq)
+            self.orders[1].append(order)
+        self.snapshots.append({key: value for key, value in entry.items()
+                               if key not in ('changes', 'order', 'reorder')})
+        self.times.append(parse_when(entry['taken']))
+
+    # Objects
+
+    def _load(self, number: int) -> Dict:
+        """Full record of an object: a keyframe, or a keyframe with one delta applied"""
+        record = self._cache.get(number)
+        if record is not None:
+            self._cache.move_to_end(number)
+            return record
+        offset, length, keyframe, _ = self.objects[number]
+        if self._reader is None:
+            self._reader = open(self.pack_path, 'rb')
+        self._reader.seek(offset)
+        payload = unpack_payload(self._reader.read(length))
+        if keyframe == KEYFRAME:
+            record = payload
+        else:
+            record = dict(self._load(keyframe))
+            for field in payload['unset']:
+                record.pop(field, None)
+            record.update(payload['set'])
+        self._cache[number] = record
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return record
+
+    def _write_object(self, pack, record: Dict, digest: bytes, previous: Optional[int]) -> Tuple[int, bytes]:
+        """Append one version as a delta on the keyframe of `previous`, or as a new keyframe.
+
+        Returns the new object's number and its index entry.
+        """
+        data = None
+        if previous is not None:
+            _, _, keyframe, depth = self.objects[previous]
+            keyframe = previous if keyframe == KEYFRAME else keyframe
+            if depth + 1 < MAX_CHAIN:
+                delta = pack_payload(field_delta(self._load(keyframe), record))
+                if len(delta) * 2 < self.objects[keyframe][1]:
+                    data, depth = delta, depth + 1
+        if data is None:
+            data, keyframe, depth = pack_payload(record), KEYFRAME, 0
+        offset = pack.tell() + ENTRY_HEADER.size
+        pack.write(ENTRY_HEADER.pack(digest, keyframe, depth, len(data)) + data)
+        number = self._add_object(digest, offset, len(data), keyframe, depth)
+        return number, INDEX_ENTRY.pack(digest, keyframe, depth, len(data), offset)
+
+    # Snapshots
+
+    def _seq_at(self, when) -> int:
+        """Index of the last snapshot taken at or before `when`, -1 if none"""
+        return bisect.bisect_right(self.times, parse_when(when)) - 1
+
+    def _objects_at(self, seq: int, keys: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        found = {}
+        for key in self.versions if keys is None else keys:
+            seqs, numbers = self.versions[key]
+            i = bisect.bisect_right(seqs, seq) - 1
+            if i >= 0 and numbers[i] is not None:
+                found[key] = numbers[i]
+        return found
+
+    def _order_at(self, seq: int) -> List[str]:
+        i = bisect.bisect_right(self.orders[0], seq) - 1
+        return self.orders[1][i] if i >= 0 else []
+
+    def commit(self, vessels: List[Dict], taken=None, label: str = '') -> Dict:
+        """Record `vessels` as the next snapshot; returns what it changed and cost"""
+        taken = parse_when(taken) if taken is not None else datetime.now(timezone.utc)
+        if self.times and taken < self.times[-1]:
+            raise ValueError(f"snapshot at {taken.isoformat()} is older than the latest ({self.times[-1].isoformat()})")
+        keys = vessel_keys(vessels)
+        current = self._objects_at(len(self.snapshots) - 1)
+        changes, index = {}, []
+        packed = os.path.getsize(self.pack_path) if os.path.exists(self.pack_path) else 0
+        with open(self.pack_path, 'ab') as pack:
+            for key, vessel in zip(keys, vessels):
+                digest = record_digest(vessel)
+                number = self.numbers.get(digest)
+                if number is None:
+                    number, entry = self._write_object(pack, vessel, digest, current.get(key))
+                    index.append(entry)
+                if current.get(key) != number:
+                    changes[key] = number
+            pack.flush()
+            os.fsync(pack.fileno())
+            packed = pack.tell() - packed
+        if index:
+            self._append_index(index)
+        removed = set(current) - set(keys)
+        changes.update({key: None for key in sorted(removed)})
+
+        entry = {'taken': taken.isoformat(), 'label': label, 'vessels': len(vessels), 'changes': changes}
+        previous_order = self._order_at(len(self.snapshots) - 1)
+        if keys != previous_order:
+            delta = order_delta(previous_order, keys) if previous_order else None
+            if delta is None:
+                entry['order'] = keys
+            else:
+                entry['reorder'] = delta
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        # Pack and index are synced first, so the log never names an object that is not on disk
+        with open(self.log_path, 'a', encoding='utf-8') as log:
+            log.write(line)
+            log.flush()
+            os.fsync(log.fileno())
+        self._apply(entry)
+        added = sum(1 for key, number in changes.items() if number is not None and key not in current)
+        return {'seq': len(self.snapshots) - 1, 'taken': entry['taken'], 'added': added, 'removed': len(removed),
+                'changed': len(changes) - added - len(removed), 'objects': len(index),
+                'bytes': packed + len(index) * INDEX_ENTRY.size + len(line.encode('utf-8'))}
+
+    def as_of(self, when) -> List[Dict]:
+        """The registry as it was in the last snapshot taken at or before `when`, in its row order.
+
+        Records are shared with the store's cache; copy one before changing it.
+        """
+        seq = self._seq_at(when)
+        if seq < 0:
+            return []
+        numbers = self._objects_at(seq)
+        return [self._load(numbers[key]) for key in self._order_at(seq) if key in numbers]
+
+    def diff(self, start, end, ignore: Iterable[str] = VOLATILE_FIELDS) -> Dict:
+        """Vessels added, removed and changed (field -> [old, new]) between two points in time"""
+        first, last = self._seq_at(start), self._seq_at(end)
+        ignore = set(ignore)
+        # Only vessels with a version recorded after `start` and up to `end` can differ
+        touched = [key for key, (seqs, _) in self.versions.items()
+                   if bisect.bisect_right(seqs, last) > bisect.bisect_right(seqs, first)]
+        before, after = self._objects_at(first, touched), self._objects_at(last, touched)
+        result = {'from': self.snapshots[first]['taken'] if first >= 0 else None,
+                  'to': self.snapshots[last]['taken'] if last >= 0 else None,
+                  'added': sorted(set(after) - set(before)), 'removed': sorted(set(before) - set(after)),
+                  'changed': {}}
+        for key in sorted(set(before) & set(after)):
+            if before[key] == after[key]:
+                continue
+            old, new = self._load(before[key]), self._load(after[key])
+            fields = {field: [old.get(field), new.get(field)] for field in set(old) | set(new)
+                      if field not in ignore and old.get(field) != new.get(field)}
+            if fields:
+                result['changed'][key] = dict(sorted(fields.items()))
+        return result
+
+    def history(self, key: str, ignore: Iterable[str] = VOLATILE_FIELDS) -> List[Dict]:
+        """Every recorded change of one vessel: when, whether it was added, changed or removed, and which fields"""
+        seqs, numbers = self.versions.get(key, ([], []))
+        ignore = set(ignore)
+        changes, previous = [], {}
+        for seq, number in zip(seqs, numbers):
+            record = self._load(number) if number is not None else {}
+            fields = sorted(field for field in set(previous) | set(record)
+                            if field not in ignore and previous.get(field) != record.get(field))
+            if fields or number is None:
+                change = 'removed' if number is None else 'changed' if previous else 'added'
+                changes.append({'taken': self.snapshots[seq]['taken'], 'change': change, 'fields': fields})
+            previous = record
+        return changes
+
+    def stats(self) -> Dict:
+        sizes = {name: os.path.getsize(path) if os.path.exists(path) else 0 for name, path in
+                 (('pack_bytes', self.pack_path), ('index_bytes', self.index_path), ('log_bytes', self.log_path))}
+        keyframes = sum(1 for _, _, keyframe, _ in self.objects if keyframe == KEYFRAME)
+        return {'snapshots': len(self.snapshots), 'vessels': len(self.versions), 'objects': len(self.objects),
+                'keyframes': keyframes, **sizes, 'bytes': sum(sizes.values())}
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned snapshots of the vessel registry")
+    parser.add_argument('--store', default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commit = commands.add_parser('commit', help="record a registry file as a new snapshot")
+    commit.add_argument('--input', default='shadow_fleet.json')
+    commit.add_argument('--taken', default=None, help="ISO time of the scrape (default: now)")
+    checkout = commands.add_parser('checkout', help="write the registry as of a date")
+    checkout.add_argument('--as-of', required=True, help="YYYY-MM-DD (end of day) or ISO timestamp")
+    checkout.add_argument('--output', required=True)
+    diff = commands.add_parser('diff', help="what changed between two dates")
+    diff.add_argument('--from', dest='start', required=True)
+    diff.add_argument('--to', dest='end', required=True)
+    diff.add_argument('--all-fields', action='store_true', help=f"include {', '.join(VOLATILE_FIELDS)}")
+    history = commands.add_parser('history', help="recorded changes of one vessel")
+    history.add_argument('key', help="IMO (or the key shown by diff)")
+    commands.add_parser('log', help="list snapshots")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store)
+    if args.command == 'commit':
+        with open(args.input, 'r', encoding='utf-8') as f:
+            vessels = json.load(f)
+        result = store.commit(vessels, args.taken, label=os.path.basename(args.input))
+        print(f"✓ snapshot {result['seq']} at {result['taken']}: {result['added']} added, {result['changed']} changed, "
+              f"{result['removed']} removed; {result['bytes']} bytes stored")
+    elif args.command == 'checkout':
+        vessels = store.as_of(args.as_of)
+        if not vessels:
+            raise SystemExit(f"✗ no snapshot at or before {args.as_of}")
+        write_json_atomic(args.output, vessels, indent=2)
+        print(f"✓ {len(vessels)} vessels as of {args.as_of} written to {args.output}")
+    elif args.command == 'diff':
+        result = store.diff(args.start, args.end, () if args.all_fields else VOLATILE_FIELDS)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif args.command == 'history':
+        for change in store.history(args.key):
+            fields = ', '.join(change['fields']) if change['change'] == 'changed' else ''
+            print(f"  {change['taken']}  {change['change']:<8} {fields}".rstrip())
+    else:
+        for seq, snapshot in enumerate(store.snapshots):
+            print(f"  {seq:5d}  {snapshot['taken']}  {snapshot['vessels']:6d} vessels  {snapshot['label']}")
+        s = store.stats()
+        print(f"✓ {s['snapshots']} snapshots, {s['vessels']} vessels, {s['objects']} versions "
+              f"({s['keyframes']} keyframes), {s['bytes'] / 1024:.0f} KB")
@@ -0,0 +1,637 @@
+"""Local stand-in for the war-sanctions.gur.gov.ua shadow fleet pages.
+
+Serves listing and vessel pages rendered from shadow_fleet.json records so the
+scrapers can be exercised and benchmarked offline, plus mocks of the
+Datalastic /api/v0/vessel and /api/v0/vessel_history endpoints for the
+position enrichment and track ingestion, a synthetic full-size .webp at every
+vessel_photo_url path (needs Pillow) and, optionally, a synthetic AIS NMEA
+feed over TCP for ais_stream.py. Usage:
+
+    python standin_server.py --port 8765 --latency 0.2
+"""
+import argparse
+import copy
+import gzip
+import hashlib
+import html
+import io
+import json
+import math
+import os
+import random
+import socketserver
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), '..', 'app', 'data', 'shadow_fleet.json')
+LISTING_PATH = '/en/transport/shadow-fleet'
+API_VESSEL_PATH = '/api/v0/vessel'
+API_HISTORY_PATH = '/api/v0/vessel_history'
+HISTORY_INTERVAL = 600  # seconds between mock history points
+HTML_TYPE = 'text/html; charset=utf-8'
+PHOTO_TYPE = 'image/webp'
+PHOTO_SIZE = (1024, 683)
+
+
+def load_vessels(path: str = DEFAULT_DATA) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def synthetic_vessels(count: int, path: str = DEFAULT_DATA) -> List[Dict]:
+    """Scale the shipped registry to `count` records with unique names, IMOs and MMSIs"""
+    base = load_vessels(path)
+    vessels = []
+    for i in range(count):
+        vessel = copy.deepcopy(base[i % len(base)])
+        if i >= len(base):
+            vessel['vessel_name'] = f"{vessel['vessel_name']} {i // len(base)}"
+            vessel['IMO'] = str(9000000 + i)
+            vessel['MMSI'] = str(200000000 + i)
+        vessels.append(vessel)
+    return vessels
+
+
+def synthetic_track(vessel: Dict, start: int, end: int, interval: int = HISTORY_INTERVAL) -> List[Dict]:
+    """Deterministic history points in [start, end) epoch seconds, wandering around the vessel's position.
+
+    Points fall on multiples of `interval` and depend only on the vessel and
+    the timestamp, so overlapping windows return identical points.
+    """
+    seed = int(hashlib.md5(str(vessel.get('MMSI') or vessel.get('IMO')).encode()).hexdigest()[:8], 16)
+    lat0, lon0 = vessel['position']['lat'], vessel['position']['lon']
+    period_lat, period_lon = 86400 * (2 + seed % 5), 86400 * (3 + seed % 7)
+    phase = (seed % 360) * math.pi / 180
+    points = []
+    for t in range(-(-start // interval) * interval, end, interval):
+        a, b = 2 * math.pi * t / period_lat + phase, 2 * math.pi * t / period_lon
+        dlat = 0.5 * math.cos(a) * 2 * math.pi / period_lat
+        dlon = 0.8 * math.cos(b) * 2 * math.pi / period_lon * math.cos(math.radians(lat0))
+        points.append({
+            'lat': round(lat0 + 0.5 * math.sin(a), 6),
+            'lon': round(lon0 + 0.8 * math.sin(b), 6),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(t)),
+            'speed': round(math.hypot(dlat, dlon) * 60 * 3600, 1),
+            'course': round(math.degrees(math.atan2(dlon, dlat)) % 360, 1),
+        })
+    return points
+
+
+_grain = {}
+
+
+def synthetic_photo(path: str, size=PHOTO_SIZE) -> bytes:
+    """A photo-sized .webp that depends only on `path`: sky and sea gradient, film grain and a dark hull"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(path)
+    width, height = size
+    if size not in _grain:
+        # One seeded texture, cropped at a different offset per photo
+        noise = np.random.default_rng(0).normal(128, 40, (height + 256, width + 256, 3))
+        _grain[size] = Image.fromarray(np.clip(noise, 0, 255).astype(np.uint8))
+    x, y = rng.randrange(256), rng.randrange(256)
+    gradient = Image.linear_gradient('L').resize(size)
+    bands = [gradient.point(lambda v, top=rng.randint(120, 200), bottom=rng.randint(30, 120):
+                            top + (bottom - top) * v // 255) for _ in range(3)]
+    image = Image.blend(Image.merge('RGB', bands), _grain[size].crop((x, y, x + width, y + height)), 0.15)
+    hull = [width * rng.uniform(0.05, 0.3), height * 0.42, width * rng.uniform(0.6, 0.95), height * rng.uniform(0.55, 0.65)]
+    ImageDraw.Draw(image).rectangle(hull, fill=(60, 50, 45))
+    body = io.BytesIO()
+    image.save(body, 'WEBP', quality=80)
+    return body.getvalue()
+
+
+AIS_ARMOR = ''.join(chr(v + 48 if v < 40 else v + 56) for v in range(64))
+AIS_TEXT = "@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_ !\"#$%&'()*+,-./0123456789:;<=>?"
+AIS_STATUS = {'Under way using engine': 0, 'At anchor': 1, 'Not under command': 2, 'Restricted manoeuverability': 3,
+              'Constrained by her draught': 4, 'Moored': 5, 'Under way sailing': 8}
+AIS_FRAGMENT_CHARS = 60  # payload characters per sentence, as transmitters split type 5
+
+
+def ais_text(value: str, chars: int) -> int:
+    """Pack text into `chars` 6-bit AIS characters, '@' padded"""
+    packed = 0
+    for c in (value.upper()[:chars]).ljust(chars, '@'):
+        packed = packed << 6 | (AIS_TEXT.index(c) if c in AIS_TEXT else 32)  # unknown characters as spaces
+    return packed
+
+
+def ais_payload(fields) -> tuple:
+    """Armor (value, width) bit fields into an AIVDM payload; returns (payload, fill bits)"""
+    n = bits = 0
+    for value, width in fields:
+        n = n << width | (int(value) & ((1 << width) - 1))
+        bits += width
+    fill = -bits % 6
+    n <<= fill
+    chars = (bits + fill) // 6
+    return ''.join(AIS_ARMOR[(n >> 6 * (chars - 1 - i)) & 63] for i in range(chars)), fill
+
+
+def ais_position(message: Dict) -> tuple:
+    """Payload of a type 1-3 (class A) or 18 (class B) position report, or a type 19 extended report"""
+    msg_type = message['type']
+    lon = round(message['lon'] * 600000) if message.get('lon') is not None else 181 * 600000
+    lat = round(message['lat'] * 600000) if message.get('lat') is not None else 91 * 600000
+    speed = round(message['speed'] * 10) if message.get('speed') is not None else 1023
+    course = round(message['course'] * 10) if message.get('course') is not None else 3600
+    heading = message.get('heading', 511)
+    motion = [(speed, 10), (1, 1), (lon, 28), (lat, 27), (course, 12), (heading, 9), (message.get('second', 60), 6)]
+    if msg_type <= 3:
+        status = AIS_STATUS.get(message.get('status'), 15)
+        return ais_payload([(msg_type, 6), (0, 2), (message['mmsi'], 30), (status, 4), (-128, 8)] + motion +
+                           [(0, 2), (0, 3), (0, 1), (0, 19)])
+    head = [(msg_type, 6), (0, 2), (message['mmsi'], 30), (0, 8)] + motion
+    if msg_type == 18:
+        return ais_payload(head + [(0, 2), (1, 1), (0, 1), (1, 1), (1, 1), (1, 1), (0, 1), (0, 1), (0, 20)])
+    return ais_payload(head + [(0, 4), (ais_text(message.get('name', ''), 20), 120), (message.get('shiptype', 80), 8),
+                              (100, 9), (20, 9), (10, 6), (10, 6), (1, 4), (0, 1), (1, 1), (0, 1), (0, 4)])
+
+
+def ais_static(message: Dict) -> tuple:
+    """Payload of a type 5 static and voyage report (71 characters, so always two sentences)"""
+    return ais_payload([(5, 6), (0, 2), (message['mmsi'], 30), (0, 2), (message.get('imo') or 0, 30),
+                        (ais_text(message.get('callsign', ''), 7), 42), (ais_text(message.get('name', ''), 20), 120),
+                        (message.get('shiptype', 80), 8), (180, 9), (40, 9), (16, 6), (16, 6), (1, 4),
+                        (10, 4), (15, 5), (12, 5), (0, 6), (round(message.get('draught', 0) * 10), 8),
+                        (ais_text(message.get('destination', ''), 20), 120), (0, 1), (0, 1)])
+
+
+def nmea_checksum(body: str) -> str:
+    value = 0
+    for c in body.encode('ascii'):
+        value ^= c
+    return f"{value:02X}"
+
+
+def nmea_sentences(payload: str, fill: int, seq_id: str = '', channel: str = 'A',
+                   timestamp: float = None) -> List[str]:
+    """!AIVDM lines (CRLF-terminated) carrying `payload`, split over sentences when it is long.
+
+    With a timestamp, each sentence gets an NMEA 4.0 tag block with the receive time.
+    """
+    chunks = [payload[i:i + AIS_FRAGMENT_CHARS] for i in range(0, len(payload), AIS_FRAGMENT_CHARS)]
+    tag = ''
+    if timestamp is not None:
+        field = f"c:{int(timestamp)}"
+        tag = f"\\{field}*{nmea_checksum(field)}\\"
+    lines = []
+    for i, chunk in enumerate(chunks, 1):
+        body = f"AIVDM,{len(chunks)},{i},{seq_id if len(chunks) > 1 else ''},{channel},{chunk},{fill if i == len(chunks) else 0}"
+        lines.append(f"{tag}!{body}*{nmea_checksum(body)}\r\n")
+    return lines
+
+
+def synthetic_ais(vessels: List[Dict], count: int, share: float = 0.05, seed: int = 0,
+                  start: float = None, rate: float = 2000.0, tagged: bool = True) -> tuple:
+    """At least `count` sentences of a busy AIS feed; returns (lines, messages sent for registry vessels).
+
+    About `share` of the messages come from registry MMSIs, the rest from
+    other vessels. The mix is roughly that of a coastal receiver: class A
+    position reports, class B reports, two-sentence type 5 voyage reports,
+    type 19 and a few base station reports (type 4) the ingestion ignores.
+    Receive times advance at `rate` messages per second from `start` and are
+    sent in tag blocks when `tagged`.
+    """
+    rng = random.Random(seed)
+    registry = [v for v in vessels if str(v.get('MMSI') or '').isdigit()]
+    known = {int(v['MMSI']) for v in registry}
+    start = time.time() - count / rate if start is None else start
+    lines, sent = [], []
+    messages = 0
+    while len(lines) < count:
+        when = start + messages / rate
+        messages += 1
+        if registry and rng.random() < share:
+            vessel = rng.choice(registry)
+            mmsi = int(vessel['MMSI'])
+            position = vessel.get('position') or {}
+        else:
+            vessel = None
+            mmsi = rng.randrange(200000000, 800000000)
+            while mmsi in known:
+                mmsi = rng.randrange(200000000, 800000000)
+            position = {}
+        lat = position.get('lat') if position.get('lat') is not None else rng.uniform(30, 66)
+        lon = position.get('lon') if position.get('lon') is not None else rng.uniform(-10, 40)
+        roll = rng.random()
+        message = {'mmsi': mmsi, 'time': int(when)}
+        if roll < 0.03:
+            payload, fill = ais_payload([(4, 6), (0, 2), (mmsi, 30), (2026, 14), (1, 4), (1, 5), (0, 5), (0, 6),
+                                         (0, 6), (1, 1), (round(lon * 600000), 28), (round(lat * 600000), 27),
+                                         (1, 4), (0, 10), (0, 1), (0, 19)])
+            message = None
+        elif roll < 0.13:
+            message.update(type=5, imo=int(vessel['IMO']) if vessel and str(vessel.get('IMO')).isdigit() else 0,
+                           callsign=f"UB{rng.randrange(10000)}", name=(vessel or {}).get('vessel_name', 'VESSEL')[:20],
+                           shiptype=80, draught=round(rng.uniform(5, 15), 1),
+                           destination=rng.choice(['PRIMORSK', 'UST-LUGA', 'NOVOROSSIYSK', 'SIKKA', 'FUJAIRAH', '']))
+            payload, fill = ais_static(message)
+        else:
+            msg_type = 19 if roll < 0.16 else 18 if roll < 0.32 else rng.choice((1, 1, 1, 2, 3))
+            message.update(type=msg_type, lat=round(lat + rng.uniform(-0.05, 0.05), 5),
+                           lon=round(lon + rng.uniform(-0.05, 0.05), 5), speed=round(rng.uniform(0, 16), 1),
+                           course=round(rng.uniform(0, 359.9), 1), heading=rng.randrange(360),
+                           status=rng.choice(list(AIS_STATUS)) if msg_type <= 3 else None)
+            if msg_type == 19:
+                message.update(name=(vessel or {}).get('vessel_name', 'VESSEL')[:20], shiptype=80)
+            payload, fill = ais_position(message)
+        lines.extend(nmea_sentences(payload, fill, str(messages % 10), rng.choice('AB'), when if tagged else None))
+        if vessel is not None and message is not None:
+            sent.append(message)
+    return lines, sent
+
+
+def render_vessel_page(vessel: Dict) -> str:
+    """Render a vessel page laid out like the sanctions site detail view"""
+    e = html.escape
+    photo = urlsplit(vessel.get('vessel_photo_url', '')).path
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{e(vessel['vessel_name'])} | War&amp;Sanctions</title>
+<script>window.dataLayer = window.dataLayer || [];</script>
+<style>.vessel-card {{ display: grid; }}</style>
+</head>
+<body>
+<header><a href="{LISTING_PATH}">Shadow fleet</a></header>
+<main class="vessel-card">
+<img src="/images/logo.svg" alt="logo">
+<img src="{e(photo)}" alt="{e(vessel['vessel_name'])}">
+<div class="vessel-table">
+<div class="row"><div class="label">Vessel name</div><div class="value">{e(vessel['vessel_name'])}</div></div>
+<div class="row"><div class="label">Category</div><div class="value">{e(vessel['category'])}</div></div>
+<div class="row"><div class="label">IMO</div><div class="value">{e(vessel['IMO'])}</div></div>
+<div class="row"><div class="label">Flag (Current)</div><div class="value">{e(vessel['flag'])}</div></div>
+<div class="row"><div class="label">MMSI</div><div class="value">{e(vessel['MMSI'])}</div></div>
+<div class="row"><div class="label">Call sign</div><div class="value">-</div></div>
+<div class="row"><div class="label">Vessel Type</div><div class="value">{e(vessel['vessel_type'])}</div></div>
+<div class="row"><div class="label">Gross tonnage</div><div class="value">-</div></div>
+</div>
+<section class="justification">
+<h2>Justification</h2>
+<div class="text">{e(vessel['vessel_information'])}</div>
+</section>
+<section class="links"><h2>Web Resources</h2><a href="https://www.marinetraffic.com">MarineTraffic</a></section>
+</main>
+<footer><a href="/en">Go to site</a></footer>
+</body>
+</html>
+"""
+
+
+def render_listing_page(vessels: List[Dict], page: int, page_size: int, ids: List[str]) -> str:
+    """Render one page of the paginated vessel listing"""
+    e = html.escape
+    start = (page - 1) * page_size
+    cards = []
+    for vessel, vessel_id in zip(vessels[start:start + page_size], ids[start:start + page_size]):
+        cards.append(
+            f'<a class="vessel" href="{LISTING_PATH}/{vessel_id}">'
+            f'<div class="vessel-details">{e(vessel["vessel_name"])} IMO {e(vessel["IMO"])} {e(vessel["flag"])}</div></a>'
+        )
+    last_page = max(1, -(-len(vessels) // page_size))
+    pages = ''.join(f'<a href="{LISTING_PATH}?page={p}">{p}</a>' for p in sorted({1, page, last_page}))
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Shadow fleet</title></head>
+<body><main><div class="vessels">{''.join(cards)}</div>
+<nav class="pagination">{pages}</nav></main></body></html>
+"""
+
+
+def make_self_signed_cert(directory: str) -> str:
+    """Create a throwaway certificate for 127.0.0.1 with the openssl CLI, returning a combined PEM path"""
+    path = os.path.join(directory, 'standin.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+         '-keyout', path, '-out', path + '.crt'],
+        check=True, capture_output=True
+    )
+    with open(path, 'a') as pem, open(path + '.crt') as crt:
+        pem.write(crt.read())
+    return path
+
+
+class CountingHTTPServer(ThreadingHTTPServer):
+    """Counts accepted connections, i.e. TCP (and TLS) handshakes"""
+
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        self.connections = 0
+        super().__init__(*args, **kwargs)
+
+    def get_request(self):
+        request = super().get_request()
+        self.connections += 1
+        return request
+
+
+class StandinSite:
+    """Threaded HTTP(S) server serving the rendered pages with artificial latency"""
+
+    def __init__(self, vessels: List[Dict], latency: float = 0.0, page_size: int = 12,
+                 host: str = '127.0.0.1', port: int = 0, tls_cert: str = None, validators: bool = True,
+                 api_rate_limit: float = 0):
+        self.vessels = vessels
+        self.latency = latency
+        self.page_size = page_size
+        self.ids = [str(1000 + i) for i in range(len(vessels))]
+        self.pages = {vessel_id: render_vessel_page(v).encode('utf-8') for vessel_id, v in zip(self.ids, vessels)}
+        self.gzipped = {}
+        self.photos = {urlsplit(v['vessel_photo_url']).path: None for v in vessels if v.get('vessel_photo_url')}
+        self.validators = validators
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.tls_cert = tls_cert
+        self.lock = threading.Lock()
+        # Mock vessel API: lookups by MMSI or IMO, one credit per request
+        self.api_rate_limit = api_rate_limit
+        self.api_requests = 0
+        self.api_throttled = 0
+        self.api_window = (0, 0)
+        self.history_interval = HISTORY_INTERVAL
+        self.by_mmsi = {}
+        self.by_imo = {}
+        for i, vessel in enumerate(vessels):
+            if vessel.get('MMSI'):
+                self.by_mmsi.setdefault(str(vessel['MMSI']), i)
+            if vessel.get('IMO'):
+                self.by_imo.setdefault(str(vessel['IMO']), i)
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency)
+                status, body, content_type = site.route(self.path)
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if site.validators and status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    site._count(0, not_modified=True)
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if site.validators:
+                    self.send_header('ETag', etag)
+                if 'gzip' in self.headers.get('Accept-Encoding', '') and content_type != PHOTO_TYPE:
+                    body = site.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                site._count(len(body))
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = CountingHTTPServer((host, port), Handler)
+        if tls_cert:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(tls_cert)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.thread = None
+
+    def _count(self, sent: int, not_modified: bool = False):
+        with self.lock:
+            self.requests += 1
+            self.not_modified += not_modified
+            self.bytes_sent += sent
+
+    def update_vessel(self, index: int, vessel: Dict):
+        """Change a vessel as if the sanctions site had edited its page"""
+        self.vessels[index] = vessel
+        self.pages[self.ids[index]] = render_vessel_page(vessel).encode('utf-8')
+
+    def compress(self, body: bytes) -> bytes:
+        compressed = self.gzipped.get(body)
+        if compressed is None:
+            compressed = self.gzipped[body] = gzip.compress(body, 6)
+        return compressed
+
+    @property
+    def connections(self) -> int:
+        return self.server.connections
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        scheme = 'https' if self.tls_cert else 'http'
+        return f"{scheme}://{host}:{port}"
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.base_url}{API_VESSEL_PATH.rsplit('/', 1)[0]}"
+
+    @property
+    def listing_url(self) -> str:
+        return f"{self.base_url}{LISTING_PATH}"
+
+    def vessel_urls(self) -> List[str]:
+        return [f"{self.listing_url}/{vessel_id}" for vessel_id in self.ids]
+
+    def photo_url(self, vessel: Dict) -> str:
+        """The vessel's photo URL pointed at this server"""
+        return f"{self.base_url}{urlsplit(vessel['vessel_photo_url']).path}" if vessel.get('vessel_photo_url') else ''
+
+    def photo(self, path: str) -> bytes:
+        body = self.photos[path]
+        if body is None:
+            # Rendered on first request; concurrent first requests may both render the same bytes
+            body = self.photos[path] = synthetic_photo(path)
+        return body
+
+    def vessel_list(self) -> List[Dict]:
+        """Vessel list in the format written to vessel_list.json"""
+        return [{'id': vessel_id, 'url': url} for vessel_id, url in zip(self.ids, self.vessel_urls())]
+
+    def _api_call(self, query: Dict[str, List[str]]):
+        """Count a mock API request; returns (status, error payload) if it is refused, else the vessel or None"""
+        with self.lock:
+            self.api_requests += 1
+            second = int(time.monotonic())
+            window, count = self.api_window
+            count = count + 1 if window == second else 1
+            self.api_window = (second, count)
+            if self.api_rate_limit and count > self.api_rate_limit:
+                self.api_throttled += 1
+                return (429, {'error': 'Too many requests'}), None
+        if not query.get('api-key', [''])[0]:
+            return (401, {'error': 'Missing api-key'}), None
+        if 'mmsi' in query:
+            index = self.by_mmsi.get(query['mmsi'][0])
+        else:
+            index = self.by_imo.get(query.get('imo', [''])[0])
+        vessel = self.vessels[index] if index is not None else None
+        if not vessel or not vessel.get('position') or vessel['position'].get('lat') is None:
+            return (404, {'data': None, 'meta': {'success': False, 'message': 'Vessel not found'}}), None
+        return None, vessel
+
+    def api_vessel(self, query: Dict[str, List[str]]):
+        """Mock /vessel lookup: vessels with a stored position are 'visible' to AIS"""
+        refused, vessel = self._api_call(query)
+        if refused:
+            return refused
+        return 200, {
+            'data': {
+                'name': vessel.get('vessel_name'),
+                'mmsi': vessel.get('MMSI'),
+                'imo': vessel.get('IMO'),
+                'lat': vessel['position']['lat'],
+                'lon': vessel['position']['lon'],
+                'speed': vessel.get('speed'),
+                'course': vessel.get('course'),
+                'destination': vessel.get('destination'),
+                'navigation_status': vessel.get('navStatus'),
+                'last_position_UTC': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            },
+            'meta': {'success': True},
+        }
+
+    def api_vessel_history(self, query: Dict[str, List[str]]):
+        """Mock /vessel_history: a synthetic track from date_from 00:00 UTC to the end of date_to (or now)"""
+        refused, vessel = self._api_call(query)
+        if refused:
+            return refused
+        try:
+            day_from = datetime.strptime(query['date_from'][0], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            day_to = datetime.strptime(query['date_to'][0], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        except (KeyError, ValueError):
+            return 400, {'error': 'date_from and date_to (YYYY-MM-DD) are required'}
+        end = min(int((day_to + timedelta(days=1)).timestamp()), int(time.time()))
+        points = synthetic_track(vessel, int(day_from.timestamp()), end, self.history_interval)
+        return 200, {'data': points, 'meta': {'success': True}}
+
+    def route(self, path: str):
+        """Return (status, body, content type) for a request path"""
+        parts = urlsplit(path)
+        if parts.path.rstrip('/') in (API_VESSEL_PATH, API_HISTORY_PATH):
+            api = self.api_vessel if parts.path.rstrip('/') == API_VESSEL_PATH else self.api_vessel_history
+            status, payload = api(parse_qs(parts.query))
+            return status, json.dumps(payload).encode('utf-8'), 'application/json'
+        if parts.path.rstrip('/') == LISTING_PATH:
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            return 200, render_listing_page(self.vessels, page, self.page_size, self.ids).encode('utf-8'), HTML_TYPE
+        if parts.path.startswith(LISTING_PATH + '/'):
+            body = self.pages.get(parts.path.rsplit('/', 1)[-1])
+            if body is not None:
+                return 200, body, HTML_TYPE
+        if parts.path in self.photos:
+            return 200, self.photo(parts.path), PHOTO_TYPE
+        return 404, b'<html><body>Not found</body></html>', HTML_TYPE
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class AisFeed:
+    """TCP NMEA feed: sends `lines` to every client that connects, paced to `rate` lines/sec (0 = as fast as it can)"""
+
+    def __init__(self, lines: List[str], host: str = '127.0.0.1', port: int = 0, rate: float = 0.0,
+                 loop: bool = False, chunk: int = 500):
+        self.lines = lines
+        self.rate = rate
+        self.loop = loop
+        self.sent = 0
+        self.lock = threading.Lock()
+        feed = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                start, sent = time.monotonic(), 0
+                try:
+                    while True:
+                        for i in range(0, len(feed.lines), chunk):
+                            block = feed.lines[i:i + chunk]
+                            self.request.sendall(''.join(block).encode('ascii'))
+                            sent += len(block)
+                            if feed.rate:
+                                delay = start + sent / feed.rate - time.monotonic()
+                                if delay > 0:
+                                    time.sleep(delay)
+                        if not feed.loop:
+                            break
+                except OSError:
+                    pass  # client went away
+                with feed.lock:
+                    feed.sent += sent
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server((host, port), Handler)
+        self.address = self.server.server_address
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.address
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local copy of the shadow fleet pages")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--vessels', type=int, default=0, help="synthetic fleet size (default: shipped registry)")
+    parser.add_argument('--api-rate-limit', type=float, default=0, help="mock API requests/sec before 429s")
+    parser.add_argument('--ais-port', type=int, default=0, help="also serve a synthetic AIS (NMEA) feed on this port")
+    parser.add_argument('--ais-rate', type=float, default=2000, help="AIS feed sentences/sec")
+    args = parser.parse_args()
+
+    vessels = synthetic_vessels(args.vessels) if args.vessels else load_vessels()
+    site = StandinSite(vessels, latency=args.latency, port=args.port, api_rate_limit=args.api_rate_limit)
+    with open('standin_vessel_list.json', 'w', encoding='utf-8') as f:
+        json.dump(site.vessel_list(), f, ensure_ascii=False, indent=2)
+    print(f"Serving {len(vessels)} vessels at {site.listing_url}")
+    print("Wrote standin_vessel_list.json (use with scrape_all_vessels.py --input)")
+    print(f"Mock vessel API at {site.api_base} (use with enrich_positions.py / track_store.py --api-base)")
+    if args.ais_port:
+        # A minute of feed, looped; untagged like a plain receiver, so reports are stamped on arrival
+        lines, _ = synthetic_ais(vessels, int(args.ais_rate * 60), rate=args.ais_rate, tagged=False)
+        AisFeed(lines, port=args.ais_port, rate=args.ais_rate, loop=True).start()
+        print(f"AIS feed at 127.0.0.1:{args.ais_port}, {args.ais_rate:.0f} sentences/s (use with ais_stream.py --tcp)")
+    site.server.serve_forever()
@@ -0,0 +1,275 @@
+"""Run telemetry for the scrapers: stage latency histograms, counters and error classes.
+
+Instrumented code records into one process-wide collector:
+
+    with telemetry.stage('parse'):              # latency histogram; exceptions counted by class
+        record = extract_vessel(content)
+    telemetry.count('http_bytes', len(body))
+    telemetry.count('retries', error=type(error).__name__)
+
+Stages recorded across the scrapers:
+
+    http            every GET through http_session (network plus body download)
+    parse           vessel page extraction (CPU seconds when parsing in worker processes)
+    listing         the whole paginated listing crawl; listing_parse per page
+    api             Datalastic calls from the enrichment job
+    thumbnail       decoding and resizing one mirrored vessel photo
+    journal_append  one journaled record; journal_fsync, write_json and cache_save for the save paths
+
+At the end of a run `finish()` prints a per-stage summary and writes it as
+JSON or, for paths ending in .prom, Prometheus text exposition format.
+`profiled()` wraps a hot path in cProfile or pyinstrument when asked to;
+both follow the calling thread, so fetches in crawl-engine threads show up
+only as waits. Paths and profiler can also come from the environment:
+
+    SCRAPER_METRICS=run.json,run.prom SCRAPER_PROFILE=cprofile python resume_scraping.py
+    python scrape_all_vessels.py --metrics run.json run.prom --profile pyinstrument
+"""
+import bisect
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENV = 'SCRAPER_METRICS'
+PROFILE_ENV = 'SCRAPER_PROFILE'
+PROFILERS = ('cprofile', 'pyinstrument')
+PROMETHEUS_PREFIX = 'baltic_siren'
+# Seconds; spans a cached parse (~1 ms) to a retried, throttled request
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _series(name: str, labels: Labels) -> str:
+    """Prometheus-style series name, e.g. errors{error="Timeout",stage="http"}"""
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with exact count, sum, min and max"""
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[i - 1] if i else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.max
+                value = low + (high - low) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict:
+        return {'count': self.count, 'sum': self.sum, 'mean': self.sum / self.count if self.count else 0.0,
+                'min': self.min if self.count else 0.0, 'max': self.max,
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99),
+                'buckets': dict(zip([str(b) for b in self.bounds] + ['+Inf'], self.counts))}
+
+
+class Telemetry:
+    """Thread-safe collector of stage histograms and labelled counters"""
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stages: Dict[str, Histogram] = {}
+            self.counters: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def error(self, stage: str, error: BaseException):
+        self.count('errors', stage=stage, error=type(error).__name__)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time the block into `name`'s histogram; an exception is counted by class and re-raised"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as error:
+            self.error(name, error)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def summary(self) -> Dict:
+        with self.lock:
+            stages = {name: histogram.summary() for name, histogram in sorted(self.stages.items())}
+            counters = {_series(name, labels): value for (name, labels), value in sorted(self.counters.items())}
+        return {'started': self.started, 'elapsed': time.time() - self.started, 'stages': stages,
+                'counters': counters}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition of every histogram and counter"""
+        lines = []
+        with self.lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+        if stages:
+            metric = f"{PROMETHEUS_PREFIX}_stage_seconds"
+            lines += [f"# HELP {metric} Latency of instrumented scraper stages.", f"# TYPE {metric} histogram"]
+            for name, histogram in stages:
+                cumulative = 0
+                for bound, count in zip([repr(b) for b in histogram.bounds] + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.sum!r}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{_series(metric, labels)} {value:g}")
+        return '\n'.join(lines) + '\n'
+
+    def report(self) -> List[str]:
+        """One print line per stage plus the non-zero counters"""
+        summary = self.summary()
+        lines = []
+        for name, s in summary['stages'].items():
+            lines.append(f"⏱ {name:<15} {s['count']:6d} x  p50 {s['p50'] * 1000:8.1f} ms  "
+                         f"p99 {s['p99'] * 1000:8.1f} ms  max {s['max'] * 1000:8.1f} ms  total {s['sum']:7.1f}s")
+        counters = summary['counters']
+        if counters:
+            lines.append('  ' + ', '.join(f"{name} {value:g}" for name, value in counters.items()))
+        return lines
+
+    def export(self, path: str):
+        """Write the summary to `path`: Prometheus text for *.prom, JSON otherwise"""
+        text = self.prometheus() if path.endswith('.prom') else json.dumps(self.summary(), indent=2)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide collector shared by every scraper"""
+    return _telemetry
+
+
+def stage(name: str):
+    return _telemetry.stage(name)
+
+
+def observe(name: str, seconds: float):
+    _telemetry.observe(name, seconds)
+
+
+def count(name: str, amount: float = 1, **labels):
+    _telemetry.count(name, amount, **labels)
+
+
+def error(stage_name: str, exc: BaseException):
+    _telemetry.error(stage_name, exc)
+
+
+def metrics_paths(paths: Optional[Iterable[str]] = None) -> List[str]:
+    """Explicit paths, else the comma-separated SCRAPER_METRICS list"""
+    if paths:
+        return list(paths)
+    return [path.strip() for path in os.environ.get(METRICS_ENV, '').split(',') if path.strip()]
+
+
+def finish(paths: Optional[Iterable[str]] = None):
+    """Print the run summary and export it to every requested path"""
+    for line in _telemetry.report():
+        print(line)
+    for path in metrics_paths(paths):
+        _telemetry.export(path)
+        print(f"✓ Telemetry written to {path}")
+
+
+@contextlib.contextmanager
+def profiled(profiler: Optional[str] = None, output: str = 'scrape_profile', top: int = 25):
+    """Profile the block with cProfile or pyinstrument (default: $SCRAPER_PROFILE, unset = off).
+
+    cProfile stats go to `output`.prof (open with snakeviz or pstats) and the
+    top functions by cumulative time are printed; pyinstrument writes
+    `output`.html and prints its call tree.
+    """
+    profiler = (profiler or os.environ.get(PROFILE_ENV, '')).lower()
+    if not profiler:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"unknown profiler {profiler!r}; use one of {', '.join(PROFILERS)}")
+
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠ pyinstrument is not installed, profiling with cProfile instead")
+            profiler = 'cprofile'
+        else:
+            session = Profiler()
+            session.start()
+            try:
+                yield
+            finally:
+                session.stop()
+                with open(f"{output}.html", 'w', encoding='utf-8') as f:
+                    f.write(session.output_html())
+                print(session.output_text(unicode=True, color=False))
+                print(f"✓ Profile written to {output}.html")
+            return
+
+    session = cProfile.Profile()
+    session.enable()
+    try:
+        yield
+    finally:
+        session.disable()
+        session.dump_stats(f"{output}.prof")
+        text = io.StringIO()
+        pstats.Stats(session, stream=text).sort_stats('cumulative').print_stats(top)
+        print(text.getvalue())
+        print(f"✓ Profile written to {output}.prof")
+
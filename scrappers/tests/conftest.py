@@ -0,0 +1,5 @@
+"""The scrapers import each other as top-level modules, as they do when run from scrappers/"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+from ais_stream import AisDecoder
+
+# Reference sentences from the gpsd AIVDM documentation
+POSITION = '!AIVDM,1,1,,B,177KQJ5000G?tO`K>RA1wUbN0TKH,0*5C\r\n'
+VOYAGE = ['!AIVDM,2,1,1,A,55?MbV02;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*1C\r\n',
+          '!AIVDM,2,2,1,A,88888888880,2*25\r\n']
+GARBAGE = [
+    '!AIVDM,1,1,,A,1zzzzzzzzz,0*00',  # characters outside the armor alphabet
+    '!AIVDM,2,1,7,A,5zzzzzzzzz,0*00',  # the same in a first fragment
+    '!AIVDM,1,1,,A,1,0*00',  # no MMSI
+    'not a sentence',
+    '!AIVDM,1,1,,A',
+]
+# Breaks off the voyage report after its first fragment, so the second one is dropped
+BAD_FRAGMENT = '!AIVDM,2,x,1,A,88888888880,2*25'
+
+
+def decode(mmsis, lines):
+    decoder = AisDecoder(mmsis)
+    return list(decoder.decode(lines)), decoder.stats
+
+
+def test_reference_vectors_decode():
+    (position, voyage), stats = decode(None, [POSITION] + VOYAGE)
+    assert (position['type'], position['mmsi'], position['status']) == (1, 477553000, 'Moored')
+    assert round(position['lon'], 6) == -122.345833 and round(position['lat'], 6) == 47.582833
+    assert (position['speed'], position['course'], position['heading']) == (0.0, 51.0, 181)
+    assert (voyage['mmsi'], voyage['imo'], voyage['callsign']) == (351759000, 9134270, '3FOF8')
+    assert (voyage['name'], voyage['destination'], voyage['draught']) == ('EVER DIADEM', 'NEW YORK', 12.2)
+    assert stats['decoded'] == 2
+
+
+def test_garbage_lines_are_counted_and_skipped():
+    lines = GARBAGE + [POSITION, VOYAGE[0], BAD_FRAGMENT, VOYAGE[1]] + VOYAGE
+    # The registry filter reads the MMSI before the checksum, so garbage reaches int() first
+    messages, stats = decode({477553000, 351759000}, lines)
+    assert [message['mmsi'] for message in messages] == [477553000, 351759000]
+    assert stats['malformed'] == len(GARBAGE) + 1
+    assert stats['fragments_dropped'] == 1
+
+    messages, stats = decode(None, lines)
+    assert [message['mmsi'] for message in messages] == [477553000, 351759000]
+
+
+def test_registry_filter_drops_other_vessels():
+    messages, stats = decode({351759000}, [POSITION] + VOYAGE)
+    assert [message['mmsi'] for message in messages] == [351759000]
+    assert stats['filtered'] == 1
@@ -0,0 +1,34 @@
+import json
+import os
+
+import numpy as np
+
+from bench_cables import BALTIC, TOLERANCE_KM, reference_nearest
+from cable_index import CableIndex
+from proximity_engine import fleet_positions
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'app', 'data')
+
+
+def load(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def assert_matches_reference(index, features, lat, lon):
+    expected, expected_cable = reference_nearest(lat.tolist(), lon.tolist(), features)
+    distance, cable, _ = index.nearest(lat, lon)
+    error = np.abs(distance - expected)
+    assert error.max() <= TOLERANCE_KM
+    # Equal-distance ties may name a different cable; only the distance must match there
+    assert not ((cable != expected_cable) & (error > TOLERANCE_KM)).any()
+
+
+def test_nearest_cable_matches_brute_force():
+    features = load('submarine_cables.json')['features']
+    index = CableIndex(features)
+    _, fleet_lat, fleet_lon = fleet_positions(load('shadow_fleet.json'))
+    assert_matches_reference(index, features, fleet_lat, fleet_lon)
+
+    rng = np.random.default_rng(7)
+    assert_matches_reference(index, features, rng.uniform(*BALTIC['lat'], 300), rng.uniform(*BALTIC['lon'], 300))
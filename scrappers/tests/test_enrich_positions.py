@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from enrich_positions import staleness_order
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_recent_misses_come_after_stale_positions():
+    vessels = [
+        {'IMO': '1', 'lastMiss': '2026-02-28T12:00:00Z'},                                   # missed yesterday
+        {'IMO': '2', 'lastUpdate': '2026-02-27T00:00:00Z'},                                 # stale
+        {'IMO': '3'},                                                                       # never looked up
+        {'IMO': '4', 'lastMiss': '2026-01-01T00:00:00Z'},                                   # miss long ago
+        {'IMO': '5', 'lastUpdate': '2026-02-20T00:00:00Z'},                                 # staler
+        {'IMO': '6', 'lastMiss': '2026-02-25T00:00:00Z'},                                   # missed last week
+        {'IMO': '7', 'lastUpdate': '2026-02-28T23:00:00Z'},                                 # fresh
+        {'vessel_name': 'NO IDENTIFIERS'},
+    ]
+    assert staleness_order(vessels, max_age_hours=6, now=NOW) == [2, 3, 4, 1, 5, 0]
@@ -0,0 +1,35 @@
+import pytest
+
+from entity_graph import build_graph, company_key, find_companies
+
+
+@pytest.mark.parametrize('spellings', [
+    ('PJSC SOVCOMFLOT', 'SOVCOMFLOT', 'PJSC SOVCOMFLOT S', "PJSC Sovcomflot's", 'Sovcomflot PJSC', 'PJSC "Sovcomflot'),
+    ('TRANSNEFT', 'PJSC TRANSNEFT', 'Transneft PJSC', 'PJSC "Transneft'),
+    ('PJSC Rosneft', 'Rosneft PJSC', 'PJSC NK Rosneft', 'PJSC Oil Company Rosneft', 'PJSC Rosneft Oil Company',
+     'Rosneft Oil Company PJSC'),
+    ('Gaurik Ship Management LLP', 'Gaurik Ship Management', 'Gaurik Shipmanagement'),
+])
+def test_spellings_share_a_key(spellings):
+    assert len({company_key(name) for name in spellings}) == 1
+
+
+def test_distinct_companies_keep_distinct_keys():
+    assert company_key('JSC Rosnefteflot') != company_key('PJSC Rosneft')
+    assert company_key('Chernomortransneft JSC') != company_key('PJSC Transneft')
+
+
+def test_possessive_is_not_part_of_the_name():
+    assert find_companies("In 2024 the tanker joined PJSC Sovcomflot's fleet.") == ['PJSC Sovcomflot']
+
+
+def test_registry_spellings_become_one_node():
+    registry = [
+        {'IMO': '9318034', 'vessel_information': "The tanker is managed by PJSC Sovcomflot's subsidiary."},
+        {'IMO': '9281384', 'vessel_information': 'The vessel is owned by Sovcomflot PJSC.'},
+        {'IMO': '9610781', 'vessel_information': 'The tanker is operated by PJSC SOVCOMFLOT.'},
+    ]
+    graph = build_graph(registry)
+    company = graph.find('Sovcomflot')
+    assert company is not None
+    assert sorted(graph.names[node] for node in graph.neighbors([company])) == ['IMO 9281384', 'IMO 9318034', 'IMO 9610781']
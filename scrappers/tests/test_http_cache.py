@@ -0,0 +1,67 @@
+import os
+
+from http_cache import ResponseCache
+
+URL = 'https://example.org/en/transport/shadow-fleet/1'
+
+
+class Response:
+    def __init__(self, status, body=b'', headers=None):
+        self.status_code, self.content, self.headers = status, body, headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class Server:
+    """get() serving one page with an ETag, answering 304 to a matching If-None-Match"""
+
+    def __init__(self, body=b'<html>ALPHA</html>'):
+        self.body, self.requests = body, []
+
+    def get(self, url, headers=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return Response(304)
+        return Response(200, self.body, {'ETag': '"v1"'})
+
+
+def test_record_from_another_extractor_version_is_parsed_again(tmp_path):
+    server = Server()
+    cache = ResponseCache(str(tmp_path), record_version='fast/1')
+    cache.fetch(URL, server.get)
+    cache.store_record(URL, {'vessel_name': 'ALPHA'})
+    cache.save()
+
+    assert ResponseCache(str(tmp_path), record_version='fast/1').fetch(URL, server.get) == \
+        (None, {'vessel_name': 'ALPHA'})
+    assert ResponseCache(str(tmp_path), record_version='fast/2').fetch(URL, server.get) == (server.body, None)
+
+
+def test_not_modified_without_cached_body_fetches_unconditionally(tmp_path):
+    server = Server()
+    cache = ResponseCache(str(tmp_path))
+    cache.fetch(URL, server.get)
+    os.remove(cache._body_path(URL))
+
+    assert cache.fetch(URL, server.get) == (server.body, None)
+    assert server.requests[-2] == {'If-None-Match': '"v1"'}
+    assert server.requests[-1] == {}
+    assert cache.body(URL) == server.body
+
+
+def test_entry_evicted_during_a_conditional_request_is_fetched_again(tmp_path):
+    server = Server()
+    cache = ResponseCache(str(tmp_path))
+    cache.fetch(URL, server.get)
+
+    def evicting_get(url, headers=None):
+        # Another worker evicts the entry while this request is in flight
+        if headers:
+            cache.entries.pop(url)
+            os.remove(cache._body_path(url))
+        return server.get(url, headers)
+
+    assert cache.fetch(URL, evicting_get) == (server.body, None)
+    assert server.requests[-1] == {}
+    assert URL in cache.entries
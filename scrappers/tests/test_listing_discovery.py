@@ -0,0 +1,50 @@
+import pytest
+
+from incremental_refresh import diff_listing, listing_hash
+from listing_discovery import IncompleteListingError, discover_vessels
+
+BASE = "https://example.org/en/transport/shadow-fleet"
+
+
+class Page:
+    def __init__(self, status, body=b''):
+        self.status_code, self.content = status, body
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def listing_site(pages, failing=()):
+    """fetch() serving `pages` vessel ids per page, with the given page numbers answering 503"""
+    def fetch(url):
+        page = int(url.split('page=')[1]) if 'page=' in url else 1
+        if page in failing:
+            return Page(503)
+        links = ''.join(f'<a href="/en/transport/shadow-fleet/{vessel_id}">{vessel_id}</a>'
+                        for vessel_id in pages.get(page, []))
+        pagination = ''.join(f'<a href="/en/transport/shadow-fleet?page={n}">{n}</a>' for n in pages)
+        return Page(200, f'<html><body>{links}{pagination}</body></html>'.encode())
+    return fetch
+
+
+def test_complete_listing_returns_every_vessel():
+    fetch = listing_site({1: ['1', '2'], 2: ['3'], 3: ['4']})
+    assert [v['id'] for v in discover_vessels(BASE, concurrency=1, rate=0, fetch=fetch)] == ['1', '2', '3', '4']
+
+
+def test_failed_page_raises_with_the_vessels_of_the_other_pages():
+    fetch = listing_site({1: ['1', '2'], 2: ['3'], 3: ['4']}, failing={2})
+    with pytest.raises(IncompleteListingError) as raised:
+        discover_vessels(BASE, concurrency=1, rate=0, fetch=fetch)
+    assert raised.value.failed_pages == [2]
+    assert [v['id'] for v in raised.value.vessels] == ['1', '2', '4']
+
+
+def test_incomplete_listing_removes_nothing():
+    listing = [{'id': '1', 'url': f'{BASE}/1'}, {'id': '4', 'url': f'{BASE}/4'}]
+    manifest = {vessel_id: {'url': f'{BASE}/{vessel_id}', 'record': {'IMO': vessel_id},
+                            'listing_hash': listing_hash({'url': f'{BASE}/{vessel_id}'})}
+                for vessel_id in ('1', '3', '4')}
+    assert diff_listing(listing, manifest) == ([], [], ['3'])
+    assert diff_listing(listing, manifest, complete=False) == ([], [], [])
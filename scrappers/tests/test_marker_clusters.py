@@ -0,0 +1,38 @@
+import json
+import os
+
+import numpy as np
+
+from bench_clusters import synthetic_points
+from marker_clusters import build_clusters, cluster_levels, project, registry_points
+from trail_lod import decimals_for_zoom
+
+REGISTRY = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'app', 'data', 'shadow_fleet.json')
+
+
+def test_every_level_accounts_for_every_point():
+    with open(REGISTRY, 'r', encoding='utf-8') as f:
+        _, centres_lon, centres_lat = registry_points(json.load(f))
+    lon, lat = synthetic_points(20_000, centres_lon, centres_lat)
+    for zoom, level in cluster_levels(*project(lon, lat)).items():
+        assert int(level['count'].sum()) == len(lon)
+        # A cluster splits at a finer zoom than the one it is shown at
+        assert (level['expand'][level['count'] > 1] > zoom).all()
+
+
+def test_single_vessel_features_keep_their_registry_row(tmp_path):
+    with open(REGISTRY, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    rows, _, _ = registry_points(vessels)
+    index = build_clusters(REGISTRY, str(tmp_path))
+    for zoom in index['zooms']:
+        with open(tmp_path / index['levels'][str(zoom)], 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        singles = [feature for feature in features if 'row' in feature['properties']]
+        assert sum(feature['properties'].get('n', 1) for feature in features) == len(rows)
+        for feature in singles:
+            position = vessels[feature['properties']['row']]['position']
+            places = decimals_for_zoom(zoom)
+            assert feature['geometry']['coordinates'] == np.round([position['lon'], position['lat']], places).tolist()
+    # Above the last clustered zoom every vessel is its own feature
+    assert sorted(feature['properties']['row'] for feature in singles) == rows.tolist()
@@ -0,0 +1,30 @@
+import telemetry
+from crawl_engine import CrawlEngine
+from parse_pipeline import ParsePipeline
+from scrape_all_vessels import crawl_vessels, fetch_vessel
+
+
+class WarmCache:
+    """ResponseCache stand-in for which every page is unchanged and already parsed"""
+
+    def fetch(self, url, get):
+        return None, {'vessel_name': url}
+
+
+def cache_hits():
+    return telemetry.get_telemetry().counters.get(('cache_hits', ()), 0)
+
+
+def test_cache_hits_are_counted_once_with_and_without_parse_workers():
+    urls = [f'https://example.org/en/transport/shadow-fleet/{i}' for i in range(5)]
+    cache = WarmCache()
+
+    telemetry.get_telemetry().reset()
+    assert len(list(crawl_vessels(urls, CrawlEngine(concurrency=2, rate=0), cache))) == 5
+    assert cache_hits() == 5
+
+    telemetry.get_telemetry().reset()
+    pipeline = ParsePipeline(CrawlEngine(concurrency=2, rate=0), lambda url: fetch_vessel(url, cache), 1, cache=cache)
+    assert len(list(pipeline.run(urls))) == 5
+    assert cache_hits() == 5
+    assert pipeline.stats['cache_hits'] == 5
@@ -0,0 +1,48 @@
+from position_cache import PositionCache, PositionProxy
+
+
+class Response:
+    def __init__(self, status, payload):
+        self.status_code, self.payload = status, payload
+
+    def json(self):
+        return self.payload
+
+
+def proxy_answering(*answers):
+    calls = []
+
+    def get(url, params=None):
+        calls.append(url)
+        return Response(*answers[min(len(calls), len(answers)) - 1])
+    return PositionProxy('key', 'https://api.example.org/api/v0', PositionCache(), port=0, get=get), calls
+
+
+def test_auth_and_credit_errors_are_not_cached():
+    for status in (401, 402, 403, 429, 500):
+        proxy, calls = proxy_answering((status, {'error': 'no'}), (200, {'data': {'lat': 1.0, 'lon': 2.0}}))
+        assert proxy.lookup({'mmsi': '273000001'})[0] == status
+        assert proxy.lookup({'mmsi': '273000001'}) == (200, {'data': {'lat': 1.0, 'lon': 2.0}})
+        assert len(calls) == 2
+        proxy.server.server_close()
+
+
+def test_unknown_vessel_is_cached():
+    proxy, calls = proxy_answering((404, {'data': None}))
+    assert proxy.lookup({'mmsi': '273000001'})[0] == 404
+    assert proxy.lookup({'mmsi': '273000001'})[0] == 404
+    assert len(calls) == 1
+    proxy.server.server_close()
+
+
+def test_only_known_parameters_reach_the_cache_and_upstream():
+    sent = []
+
+    def get(url, params=None):
+        sent.append(params)
+        return Response(200, {'data': {'lat': 1.0, 'lon': 2.0}})
+    proxy = PositionProxy('key', 'https://api.example.org/api/v0', PositionCache(), port=0, get=get)
+    assert proxy.lookup({'mmsi': '273000001', 'nonce': '1'})[0] == 200
+    assert proxy.lookup({'mmsi': '273000001', 'nonce': '2', 'api-key': 'other'})[0] == 200
+    assert sent == [{'api-key': 'key', 'mmsi': '273000001'}]
+    proxy.server.server_close()
@@ -0,0 +1,29 @@
+import copy
+import json
+
+from build_frontend_data import build_frontend_data, registry_digest
+from marker_clusters import build_clusters
+from search_index import build_search_index
+
+VESSELS = [
+    {'vessel_name': 'ALPHA', 'IMO': '9000001', 'MMSI': '273000001', 'flag': 'Gabon',
+     'position': {'lat': 59.9, 'lon': 29.1}, 'vessel_information': 'Tanker owned by PJSC SOVCOMFLOT.'},
+    {'vessel_name': 'BRAVO', 'IMO': '9000002', 'MMSI': '273000002', 'flag': 'Panama',
+     'position': {'lat': 44.7, 'lon': 37.8}, 'vessel_information': 'Crude carrier.'},
+]
+
+
+def test_every_index_records_the_registry_it_was_built_from(tmp_path):
+    registry = tmp_path / 'shadow_fleet.json'
+    registry.write_text(json.dumps(VESSELS), encoding='utf-8')
+    digest = registry_digest(str(registry))
+
+    assert build_frontend_data(str(registry), str(tmp_path))['registry'] == digest
+    assert build_clusters(str(registry), str(tmp_path))['registry'] == digest
+    assert build_search_index(str(registry), str(tmp_path))['registry'] == digest
+
+    # Any edit to the registry, even one that keeps the row count, changes the digest
+    moved = copy.deepcopy(VESSELS)
+    moved[1]['position']['lat'] += 0.1
+    registry.write_text(json.dumps(moved), encoding='utf-8')
+    assert registry_digest(str(registry)) != digest
@@ -0,0 +1,20 @@
+from resume_scraping import scraped_listing_ids
+
+
+def listed(vessel_id, imo):
+    return {'id': vessel_id, 'url': f'https://example.org/en/transport/shadow-fleet/{vessel_id}',
+            'preview': f'VESSEL {vessel_id} IMO {imo} Panama'}
+
+
+def test_registry_is_matched_to_the_listing_by_imo_not_position():
+    # Two vessels were listed on top since the registry was scraped
+    listing = [listed('901', '9000901'), listed('902', '9000902'), listed('10', '9000010'), listed('11', '9000011')]
+    registry = [{'IMO': '9000010'}, {'IMO': '9000011'}]
+    assert scraped_listing_ids(listing, registry) == {'10', '11'}
+
+
+def test_repeated_imo_is_claimed_once():
+    listing = [listed('20', '9000020'), listed('21', '9000020')]
+    assert scraped_listing_ids(listing, [{'IMO': '9000020'}]) == {'20'}
+    assert scraped_listing_ids(listing, [{'IMO': '9000020'}] * 2) == {'20', '21'}
+    assert scraped_listing_ids([{'id': '22', 'url': '', 'preview': 'no number'}], [{'IMO': '9000020'}]) == set()
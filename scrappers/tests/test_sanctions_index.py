@@ -0,0 +1,42 @@
+import pytest
+
+from sanctions_index import find_dates, sentence_records
+
+
+def summary(sentence):
+    return [(record['jurisdiction'], record['date'], record['effective'], record['action'])
+            for record in sentence_records(sentence)]
+
+
+@pytest.mark.parametrize('sentence, expected', [
+    ("On 24 February 2025, the United Kingdom imposed sanctions on the vessel.",
+     [('United Kingdom', '2025-02-24', None, 'imposed')]),
+    ("On 20 May 2025, the EU imposed sanctions on the tanker, effective 21 May 2025, for transporting crude oil "
+     "and/or petroleum products originating in, or exported from, the russian federation.",
+     [('EU', '2025-05-20', '2025-05-21', 'imposed')]),
+    ("On 20 May 2025, the European Union imposed sanctions on the tanker, which entered into force on 21 May 2025, "
+     "for transporting crude oil or petroleum products originating in or exported from russia.",
+     [('EU', '2025-05-20', '2025-05-21', 'imposed')]),
+    ("On 3 June 2025, sanctions imposed by Switzerland on the vessel entered into force.",
+     [('Switzerland', '2025-06-03', None, 'imposed')]),
+    ("On 16 April 2025, the United States designated the tanker IMO 9250907 for its role in sanctions evasion.",
+     [('United States', '2025-04-16', None, 'imposed')]),
+    ("On 10 April 2025, the United States imposed sanctions on the vessel as property in which the designated "
+     "Glory International FZ-LLC holds an interest.",
+     [('United States', '2025-04-10', None, 'imposed')]),
+    ("On 13 March 2025, the United States imposed sanctions on Turquoise Sea Marine Limited (Seychelles), the owner "
+     "of the tanker, for its activities in the petroleum sector of the Iranian economy.",
+     [('United States', '2025-03-13', None, 'related')]),
+    ("The tanker is affiliated with the Malaysia-based IMS Ltd, which was sanctioned by the United States on "
+     "24 February 2025 for knowingly engaging in a significant transaction.",
+     [('United States', '2025-02-24', None, 'related')]),
+    ("On 18 July 2025, the EU amended the sanctions.", []),
+])
+def test_registry_sentences(sentence, expected):
+    assert summary(sentence) == expected
+
+
+def test_month_first_and_day_first_dates():
+    assert [iso for _, iso, _ in find_dates("May 20, 2025 and 21 May 2025, then June 2025")] == \
+        ['2025-05-20', '2025-05-21', '2025-06-01']
+    assert [iso for _, iso, _ in find_dates("February 24, March 04, 2025")] == ['2025-02-24', '2025-03-04']
@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+from bench_search import QUERIES, synthetic_fleet
+from search_index import SearchIndex
+
+REGISTRY = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'app', 'data', 'shadow_fleet.json')
+
+
+@pytest.fixture(scope='module')
+def registry():
+    with open(REGISTRY, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('size', [None, 3000])
+def test_lazily_loaded_index_matches_the_in_memory_build(registry, tmp_path, size):
+    fleet = registry if size is None else synthetic_fleet(registry, size)
+    built = SearchIndex.build(fleet)
+    built.write(str(tmp_path))
+    loaded = SearchIndex.load(str(tmp_path))
+    for query in QUERIES + ('imo', '9', 'no-such-term'):
+        expected = built.search(query, None)
+        results = loaded.search(query, None)
+        assert [row for row, _ in results] == [row for row, _ in expected]
+        assert [score for _, score in results] == pytest.approx([score for _, score in expected])
+        assert loaded.complete(query) == built.complete(query)
@@ -0,0 +1,26 @@
+from snapshot_store import SnapshotStore
+
+
+def registry(speed):
+    return [{'IMO': '9000001', 'MMSI': '273000001', 'vessel_name': 'ALPHA', 'speed': speed},
+            {'IMO': '9000002', 'MMSI': '273000002', 'vessel_name': 'BRAVO', 'speed': 0.0}]
+
+
+def test_commit_after_torn_log_line_survives_reopen(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.commit(registry(1.0), taken='2026-01-01T00:00:00+00:00')
+    store.close()
+    with open(store.log_path, 'a', encoding='utf-8') as log:
+        log.write('{"taken":"2026-01-02T00:')  # process died mid-write
+
+    store = SnapshotStore(str(tmp_path))
+    assert len(store.snapshots) == 1
+    store.commit(registry(2.0), taken='2026-01-03T00:00:00+00:00')
+    store.close()
+
+    store = SnapshotStore(str(tmp_path))
+    assert len(store.snapshots) == 2
+    assert store.as_of('2026-01-03T12:00:00+00:00')[0]['speed'] == 2.0
+    store.close()
+    with open(store.log_path, encoding='utf-8') as log:
+        assert all(line.endswith('\n') for line in log)
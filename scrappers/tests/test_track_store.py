@@ -0,0 +1,28 @@
+import numpy as np
+
+from track_store import TrackStore, decode_block, encode_block
+
+ANTIMERIDIAN_LON = [179.9, -179.9, -179.8, 179.95, -180.0, 180.0]
+
+
+def test_block_round_trip_across_antimeridian():
+    t = np.arange(len(ANTIMERIDIAN_LON), dtype=np.int64) * 600 + 1_760_000_000
+    lat = np.linspace(60.0, 60.5, len(t))
+    speed = np.full(len(t), 12.3)
+    course = np.full(len(t), np.nan)
+    raw = encode_block(t, lat, ANTIMERIDIAN_LON, speed, course)
+    t2, lat2, lon2, speed2, course2 = decode_block(raw, len(t), int(t[0]))
+    assert t2.tolist() == t.tolist()
+    np.testing.assert_allclose(lat2, lat, atol=1e-7)
+    np.testing.assert_allclose(lon2, ANTIMERIDIAN_LON, atol=1e-7)
+    np.testing.assert_allclose(speed2, speed)
+    assert np.isnan(course2).all()
+
+
+def test_store_query_across_antimeridian(tmp_path):
+    store = TrackStore(str(tmp_path))
+    t = np.arange(3, dtype=np.int64) * 600 + 1_760_000_000
+    store.add(273452780, t, [64.0, 64.1, 64.2], [179.9, -179.9, -179.8])
+    store.flush()
+    track = store.query(273452780)
+    np.testing.assert_allclose(track['lon'], [179.9, -179.9, -179.8], atol=1e-7)
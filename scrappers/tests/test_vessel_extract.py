@@ -0,0 +1,22 @@
+import glob
+import json
+import os
+
+import pytest
+
+from vessel_extract import TEXT_BACKENDS, extract_vessel, lxml
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), os.pardir, 'fixtures', 'vessel_pages')
+PAGES = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+BACKENDS = [name for name in TEXT_BACKENDS if name != 'lxml' or lxml is not None]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('page_path', PAGES, ids=os.path.basename)
+def test_backend_reproduces_the_golden_record(page_path, backend):
+    with open(page_path, 'rb') as f:
+        content = f.read()
+    with open(page_path[:-len('.html')] + '.json', 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    record = extract_vessel(content, backend)
+    assert {field: record.get(field) for field in expected} == expected
@@ -0,0 +1,344 @@
+"""Behaviour detection over stored vessel tracks: loitering, ship-to-ship rendezvous and AIS gaps.
+
+Tracks are streamed one vessel at a time from the track store. Per vessel:
+
+- AIS gaps: consecutive fixes further apart than `gap_hours`, with the
+  distance covered while dark and the speed that implies.
+- Loitering: runs of slow fixes (reported speed, or speed implied by the
+  neighbouring fixes) within `radius_km` of an infrastructure site or
+  submarine cable that last at least `loiter_minutes`.
+
+Slow fixes of every vessel are kept as compact arrays for the rendezvous
+search, which buckets them by time window and by a grid over unit-sphere
+coordinates with cells as wide as the rendezvous distance. Two fixes closer
+than that distance and time window always share a bucket or sit in adjacent
+ones, so only fixes in the same or neighbouring buckets are compared and the
+result matches an all-pairs search. Matched fixes are chained per vessel pair
+into rendezvous that last at least `rendezvous_minutes`.
+
+    python track_events.py --store tracks --days 1 --output track_events.json
+"""
+import argparse
+import itertools
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cable_index import CableIndex
+from fleet_journal import write_json_atomic
+from proximity_engine import PROXIMITY_RADIUS_KM, InfrastructureIndex, chord_length, haversine_km, unit_vectors
+from track_store import TRACK_DIR, TrackStore, vessel_key
+
+SLOW_SPEED_KN = 3.0
+LOITER_MINUTES = 60
+RENDEZVOUS_DISTANCE_M = 500
+RENDEZVOUS_MINUTES = 60
+TIME_WINDOW = 600  # fixes of two vessels this many seconds apart count as simultaneous
+CONTINUITY_SECONDS = 3600  # longer silences break a loitering run or rendezvous
+GAP_HOURS = 3.0
+KM_PER_NM = 1.852
+
+
+def _iso(t) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(int(t)))
+
+
+def implied_speed_kn(t: np.ndarray, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Speed over ground from neighbouring fixes, the slower of the legs in and out of each fix"""
+    if len(t) < 2:
+        return np.full(len(t), np.nan)
+    leg = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:]) / KM_PER_NM / np.maximum(np.diff(t), 1) * 3600
+    return np.minimum(np.append(leg, leg[-1]), np.insert(leg, 0, leg[0]))
+
+
+def effective_speed(track: Dict[str, np.ndarray]) -> np.ndarray:
+    """Reported speed where there is one, else the implied speed"""
+    speed = track['speed']
+    missing = np.isnan(speed)
+    if missing.any():
+        speed = np.where(missing, implied_speed_kn(track['timestamp'], track['lat'], track['lon']), speed)
+    return speed
+
+
+def _runs(mask: np.ndarray, t: np.ndarray, max_gap: float) -> List[Tuple[int, int]]:
+    """(first, last) indices of runs of consecutive True fixes with no silence longer than `max_gap`"""
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero((np.diff(rows) > 1) | (np.diff(t[rows]) > max_gap))
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def ais_gaps(key: int, track: Dict[str, np.ndarray], gap_hours: float = GAP_HOURS) -> List[Dict]:
+    """One event per silence longer than `gap_hours` between consecutive fixes"""
+    t, lat, lon = track['timestamp'], track['lat'], track['lon']
+    gaps = np.flatnonzero(np.diff(t) > gap_hours * 3600)
+    distance = haversine_km(lat[gaps], lon[gaps], lat[gaps + 1], lon[gaps + 1])
+    events = []
+    for i, km in zip(gaps.tolist(), distance.tolist()):
+        hours = (t[i + 1] - t[i]) / 3600
+        events.append({
+            'type': 'ais_gap', 'key': key, 'start': _iso(t[i]), 'end': _iso(t[i + 1]), 'minutes': round(hours * 60),
+            'lat': float(lat[i]), 'lon': float(lon[i]), 'end_lat': float(lat[i + 1]), 'end_lon': float(lon[i + 1]),
+            'distance_km': round(km, 2), 'implied_speed_kn': round(km / KM_PER_NM / hours, 1),
+        })
+    return events
+
+
+class SiteIndex:
+    """Nearest infrastructure site or cable within a radius, for loitering checks"""
+
+    def __init__(self, sites: Optional[InfrastructureIndex] = None, cables: Optional[CableIndex] = None,
+                 radius_km: float = PROXIMITY_RADIUS_KM):
+        self.sites = sites
+        self.cables = cables
+        self.radius_km = radius_km
+
+    def nearest(self, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, List[Optional[Dict]]]:
+        """(distance km, feature properties) of the nearest site or cable; inf/None beyond the radius"""
+        distance = np.full(len(lat), np.inf)
+        owner = np.full(len(lat), -1, dtype=np.int64)
+        features = []
+        if self.sites is not None:
+            positions, site, km = self.sites.within(lat, lon, self.radius_km)
+            # Nearest site per position: first pair after sorting by (position, distance)
+            order = np.lexsort((km, positions))
+            _, first = np.unique(positions[order], return_index=True)
+            nearest = order[first]
+            distance[positions[nearest]] = km[nearest]
+            owner[positions[nearest]] = site[nearest]
+            features = [feature['properties'] for feature in self.sites.features]
+        if self.cables is not None and len(self.cables):
+            km, cable, _ = self.cables.nearest(lat, lon)
+            closer = (km <= self.radius_km) & (km < distance)
+            distance[closer] = km[closer]
+            owner[closer] = len(features) + cable[closer]
+            features = features + [feature['properties'] for feature in self.cables.features]
+        return distance, [features[i] if i >= 0 else None for i in owner.tolist()]
+
+
+def loitering(key: int, track: Dict[str, np.ndarray], sites: SiteIndex, speed: Optional[np.ndarray] = None,
+              slow_kn: float = SLOW_SPEED_KN, min_minutes: float = LOITER_MINUTES,
+              max_gap: float = CONTINUITY_SECONDS) -> List[Dict]:
+    """Runs of slow fixes near a site or cable lasting at least `min_minutes`"""
+    t, lat, lon = track['timestamp'], track['lat'], track['lon']
+    speed = effective_speed(track) if speed is None else speed
+    slow = speed <= slow_kn
+    if not slow.any():
+        return []
+    distance = np.full(len(t), np.inf)
+    properties: List[Optional[Dict]] = [None] * len(t)
+    rows = np.flatnonzero(slow)
+    distance[rows], nearest = sites.nearest(lat[rows], lon[rows])
+    for row, value in zip(rows.tolist(), nearest):
+        properties[row] = value
+
+    events = []
+    for first, last in _runs(np.isfinite(distance), t, max_gap):
+        if t[last] - t[first] < min_minutes * 60:
+            continue
+        closest = first + int(np.argmin(distance[first:last + 1]))
+        site = properties[closest]
+        events.append({
+            'type': 'loitering', 'key': key, 'start': _iso(t[first]), 'end': _iso(t[last]),
+            'minutes': round((t[last] - t[first]) / 60), 'lat': float(lat[closest]), 'lon': float(lon[closest]),
+            'infrastructure': site.get('name', ''), 'category': site.get('category', ''),
+            'criticality': site.get('criticality', ''), 'distance': round(float(distance[closest]), 2),
+            'mean_speed_kn': round(float(np.nanmean(speed[first:last + 1])), 1),
+        })
+    return events
+
+
+def _bucket_keys(columns: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mixed-radix int64 key per row of integer bucket columns, and the key step of each column.
+
+    Every column is shifted so neighbour offsets of +-1 never wrap into another bucket.
+    """
+    keys = np.zeros(len(columns[0]), dtype=np.int64)
+    strides = []
+    stride = 1
+    for column in reversed(columns):
+        low, span = column.min() - 1, int(column.max() - column.min()) + 3
+        keys += (column - low) * stride
+        strides.append(stride)
+        stride *= span
+        if stride >= 2 ** 62:
+            raise ValueError("too many buckets for 64-bit keys; raise the distance or time window")
+    return keys, np.array(strides[::-1], dtype=np.int64)
+
+
+def _pairs_of_groups(first_a, count_a, first_b, count_b) -> Tuple[np.ndarray, np.ndarray]:
+    """All (row in group a, row in group b) combinations for each matched pair of groups"""
+    sizes = count_a * count_b
+    total = int(sizes.sum())
+    if not total:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    offset = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    width = np.repeat(count_b, sizes)
+    return np.repeat(first_a, sizes) + offset // width, np.repeat(first_b, sizes) + offset % width
+
+
+def candidate_pairs(t: np.ndarray, xyz: np.ndarray, distance_km: float, window: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Row pairs (i < j, any order of vessels) closer than `distance_km` and `window` seconds"""
+    cell = chord_length(distance_km)
+    columns = [(t - t.min()) // int(window)] + [np.floor(xyz[:, axis] / cell).astype(np.int64) for axis in range(3)]
+    keys, strides = _bucket_keys(columns)
+    order = np.argsort(keys, kind='stable')
+    buckets, first, count = np.unique(keys[order], return_index=True, return_counts=True)
+
+    left, right = [], []
+    # Half of the 3^4 neighbourhood (plus the bucket itself) visits every adjacent pair of buckets once
+    for step in itertools.product((-1, 0, 1), repeat=4):
+        if step < (0, 0, 0, 0):
+            continue
+        target = buckets + int(np.dot(step, strides))
+        found = np.searchsorted(buckets, target)
+        found[found == len(buckets)] = 0
+        match = np.flatnonzero(buckets[found] == target)
+        a, b = _pairs_of_groups(first[match], count[match], first[found[match]], count[found[match]])
+        if step == (0, 0, 0, 0):
+            keep = a < b
+            a, b = a[keep], b[keep]
+        left.append(order[a])
+        right.append(order[b])
+    left, right = np.concatenate(left), np.concatenate(right)
+
+    near = (np.abs(t[left] - t[right]) <= window) & (np.sum((xyz[left] - xyz[right]) ** 2, axis=1) <= cell ** 2 * (1 + 1e-9))
+    return left[near], right[near]
+
+
+def rendezvous(vessel: np.ndarray, t: np.ndarray, lat: np.ndarray, lon: np.ndarray,
+               distance_m: float = RENDEZVOUS_DISTANCE_M, min_minutes: float = RENDEZVOUS_MINUTES,
+               window: float = TIME_WINDOW, max_gap: float = CONTINUITY_SECONDS) -> List[Dict]:
+    """Vessel pairs whose slow fixes stay within `distance_m` of each other for `min_minutes`.
+
+    `vessel` holds the track key of each fix; only slow fixes should be passed in.
+    """
+    if len(t) < 2:
+        return []
+    distance_km = distance_m / 1000
+    left, right = candidate_pairs(t, unit_vectors(lat, lon), distance_km, window)
+    km = haversine_km(lat[left], lon[left], lat[right], lon[right])
+    keep = (vessel[left] != vessel[right]) & (km <= distance_km)
+    left, right, km = left[keep], right[keep], km[keep]
+    if not len(left):
+        return []
+
+    swap = vessel[left] > vessel[right]
+    left, right = np.where(swap, right, left), np.where(swap, left, right)
+    when = np.minimum(t[left], t[right])
+    order = np.lexsort((when, vessel[right], vessel[left]))
+    left, right, km, when = left[order], right[order], km[order], when[order]
+    a, b = vessel[left], vessel[right]
+    breaks = np.flatnonzero((a[1:] != a[:-1]) | (b[1:] != b[:-1]) | (np.diff(when) > max_gap)) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.append(breaks, len(when)) - 1
+
+    events = []
+    for first, last in zip(starts.tolist(), ends.tolist()):
+        if when[last] - when[first] < min_minutes * 60:
+            continue
+        closest = first + int(np.argmin(km[first:last + 1]))
+        events.append({
+            'type': 'rendezvous', 'key': int(a[first]), 'other_key': int(b[first]),
+            'start': _iso(when[first]), 'end': _iso(when[last]), 'minutes': round((when[last] - when[first]) / 60),
+            'lat': float((lat[left[closest]] + lat[right[closest]]) / 2),
+            'lon': float((lon[left[closest]] + lon[right[closest]]) / 2),
+            'min_distance_m': round(float(km[closest]) * 1000), 'fixes': last - first + 1,
+        })
+    return events
+
+
+def detect_events(tracks: Iterable[Tuple[int, Dict[str, np.ndarray]]], sites: Optional[SiteIndex] = None,
+                  slow_kn: float = SLOW_SPEED_KN, loiter_minutes: float = LOITER_MINUTES,
+                  distance_m: float = RENDEZVOUS_DISTANCE_M, rendezvous_minutes: float = RENDEZVOUS_MINUTES,
+                  gap_hours: float = GAP_HOURS, window: float = TIME_WINDOW) -> Dict[str, List[Dict]]:
+    """Run every detector over a stream of (key, track) and return events by type"""
+    events = {'ais_gap': [], 'loitering': [], 'rendezvous': []}
+    slow_fixes = []
+    for key, track in tracks:
+        if not len(track['timestamp']):
+            continue
+        speed = effective_speed(track)
+        events['ais_gap'] += ais_gaps(key, track, gap_hours)
+        if sites is not None:
+            events['loitering'] += loitering(key, track, sites, speed, slow_kn, loiter_minutes)
+        slow = speed <= slow_kn
+        if slow.any():
+            slow_fixes.append((np.full(int(slow.sum()), key, dtype=np.int64), track['timestamp'][slow],
+                               track['lat'][slow], track['lon'][slow]))
+    if slow_fixes:
+        vessel, t, lat, lon = (np.concatenate(column) for column in zip(*slow_fixes))
+        events['rendezvous'] = rendezvous(vessel, t, lat, lon, distance_m, rendezvous_minutes, window)
+    return events
+
+
+def store_tracks(store: TrackStore, start: int, end: int) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    """Stream (key, track) for every vessel with fixes in [start, end]"""
+    for key in store.keys(start, end):
+        yield key, store.query(key, start, end)
+
+
+def name_events(events: List[Dict], vessels: List[Dict]) -> List[Dict]:
+    """Add vesselName/IMO/MMSI (and the other vessel's, for rendezvous) from the registry"""
+    registry = {}
+    for vessel in vessels:
+        registry.setdefault(vessel_key(vessel), vessel)
+    for event in events:
+        vessel = registry.get(event['key'], {})
+        event.update({'vesselName': vessel.get('vessel_name', ''), 'IMO': vessel.get('IMO', ''),
+                      'MMSI': vessel.get('MMSI', '')})
+        if 'other_key' in event:
+            other = registry.get(event['other_key'], {})
+            event.update({'otherVesselName': other.get('vessel_name', ''), 'otherIMO': other.get('IMO', ''),
+                          'otherMMSI': other.get('MMSI', '')})
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detect loitering, ship-to-ship rendezvous and AIS gaps")
+    parser.add_argument('--store', default=TRACK_DIR)
+    parser.add_argument('--days', type=float, default=1, help="window ending now")
+    parser.add_argument('--fleet', default='../app/data/shadow_fleet.json')
+    parser.add_argument('--infrastructure', default='../app/data/poland_infrastructure.json')
+    parser.add_argument('--cables', default='../app/data/submarine_cables.json')
+    parser.add_argument('--radius', type=float, default=PROXIMITY_RADIUS_KM, help="loitering radius in km")
+    parser.add_argument('--slow', type=float, default=SLOW_SPEED_KN, help="knots at or below which a vessel is idling")
+    parser.add_argument('--loiter-minutes', type=float, default=LOITER_MINUTES)
+    parser.add_argument('--distance', type=float, default=RENDEZVOUS_DISTANCE_M, help="rendezvous distance in metres")
+    parser.add_argument('--rendezvous-minutes', type=float, default=RENDEZVOUS_MINUTES)
+    parser.add_argument('--window', type=float, default=TIME_WINDOW, help="seconds between fixes counted as simultaneous")
+    parser.add_argument('--gap-hours', type=float, default=GAP_HOURS)
+    parser.add_argument('--output', default='track_events.json')
+    args = parser.parse_args()
+
+    with open(args.infrastructure, 'r', encoding='utf-8') as f:
+        infrastructure = InfrastructureIndex(json.load(f)['features'])
+    with open(args.cables, 'r', encoding='utf-8') as f:
+        cables = CableIndex(json.load(f)['features'])
+    with open(args.fleet, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+
+    end = int(time.time())
+    start = time.perf_counter()
+    events = detect_events(store_tracks(TrackStore(args.store), end - int(args.days * 86400), end),
+                           SiteIndex(infrastructure, cables, args.radius), args.slow, args.loiter_minutes,
+                           args.distance, args.rendezvous_minutes, args.gap_hours, args.window)
+    elapsed = time.perf_counter() - start
+    for kind in events:
+        name_events(events[kind], vessels)
+    write_json_atomic(args.output, events, indent=2)
+
+    print(f"✓ {len(events['loitering'])} loitering, {len(events['rendezvous'])} rendezvous, "
+          f"{len(events['ais_gap'])} AIS gaps in the last {args.days:g} days ({elapsed:.2f}s), saved to {args.output}")
+    for event in events['rendezvous'][:5]:
+        print(f"  ⚠ STS? {event['vesselName']} + {event['otherVesselName']}: {event['minutes']} min "
+              f"within {args.distance:g} m from {event['start']}")
+    for event in events['loitering'][:5]:
+        print(f"  ⚠ {event['vesselName']} loitering {event['minutes']} min near {event['infrastructure']} "
+              f"({event['distance']} km)")
@@ -0,0 +1,419 @@
+"""Compact, append-only store for vessel history tracks.
+
+Ingests Datalastic vessel_history answers for the whole fleet and keeps them
+instead of re-fetching raw JSON on every tracker view. Points are
+partitioned by UTC day; each flush writes one immutable segment file per
+day it touched, and a partition with too many segments is compacted into
+one. Inside a segment every vessel has its own block of columns:
+
+    timestamp   int32 deltas from the previous point (the first is stored in the index)
+    lat, lon    int32 degrees x 1e7, delta-encoded
+    speed       uint16 knots x 10 (65535 = unknown)
+    course      uint16 degrees x 10 (65535 = unknown)
+
+Blocks are zlib-compressed separately and the segment header is a sorted
+(vessel, offset, length, first, last) index, so a range query for one
+vessel reads a few small blocks per day and never touches the rest.
+Vessels are keyed by MMSI, or IMO when there is no MMSI.
+
+    python track_store.py ingest --days 7 --concurrency 8 --rate 10 --credits 1000
+    python track_store.py query --mmsi 273452780 --days 7
+    python track_store.py compact
+"""
+import argparse
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import http_session
+from crawl_engine import CrawlEngine, TokenBucket
+from enrich_positions import BudgetExhausted, CreditBudget, PositionAPI
+from fleet_journal import write_json_atomic
+from position_cache import API_BASE, API_KEY_ENV
+from scrape_all_vessels import is_transient_error
+
+TRACK_DIR = 'tracks'
+PARTITION_SECONDS = 86400
+MAX_SEGMENTS = 8  # segments a partition may collect before a flush compacts it
+COORD_SCALE = 10_000_000
+UNKNOWN = 65535
+MAGIC = b'TRK1'
+INDEX_DTYPE = np.dtype([('key', '<i8'), ('offset', '<u8'), ('length', '<u4'), ('count', '<u4'),
+                        ('first', '<i8'), ('last', '<i8')])
+
+
+def vessel_key(vessel: Dict) -> Optional[int]:
+    """Integer track key for a registry record: MMSI, else IMO (the two never collide)"""
+    for field in ('MMSI', 'IMO'):
+        value = str(vessel.get(field) or '').strip()
+        if value.isdigit() and int(value):
+            return int(value)
+    return None
+
+
+def _epoch(value) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return int((parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp())
+
+
+def history_points(data) -> Tuple[np.ndarray, ...]:
+    """(timestamp, lat, lon, speed, course) arrays from a vessel_history `data` value.
+
+    Accepts the point list tracker.js reads (timestamp) as well as Datalastic's
+    {positions: [...]} object (last_position_epoch / last_position_UTC).
+    Points without a position or a time are dropped.
+    """
+    points = (data.get('positions') or []) if isinstance(data, dict) else (data or [])
+    rows = []
+    for point in points:
+        t = _epoch(point.get('timestamp', point.get('last_position_epoch', point.get('last_position_UTC'))))
+        if t is None or point.get('lat') is None or point.get('lon') is None:
+            continue
+        rows.append((t, point['lat'], point['lon'],
+                     np.nan if point.get('speed') is None else point['speed'],
+                     np.nan if point.get('course') is None else point['course']))
+    if not rows:
+        return tuple(np.empty(0, dtype) for dtype in (np.int64,) + (np.float64,) * 4)
+    t, lat, lon, speed, course = zip(*rows)
+    return (np.array(t, dtype=np.int64), np.array(lat, dtype=np.float64), np.array(lon, dtype=np.float64),
+            np.array(speed, dtype=np.float64), np.array(course, dtype=np.float64))
+
+
+def _latest_per_timestamp(t: np.ndarray, *columns: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Sort by time, keeping the last-written point where timestamps repeat"""
+    order = np.argsort(t, kind='stable')
+    t = t[order]
+    last = np.ones(len(t), dtype=bool)
+    last[:-1] = t[1:] != t[:-1]
+    keep = order[last]
+    return (t[last],) + tuple(column[keep] for column in columns)
+
+
+def _scaled(values: np.ndarray, scale: float) -> np.ndarray:
+    return np.where(np.isnan(values), UNKNOWN, np.clip(np.round(values * scale), 0, UNKNOWN - 1)).astype('<u2')
+
+
+def _wrap_i4(values: np.ndarray) -> np.ndarray:
+    """int64 values wrapped modulo 2**32 into int32 range"""
+    return (values + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+def encode_block(t, lat, lon, speed, course) -> bytes:
+    """Compressed column block for one vessel's points, already sorted by time.
+
+    A longitude step across the antimeridian (179.9 to -179.9 is -3.6e9 in
+    1e-7 degrees) does not fit an int32, so deltas are stored modulo 2**32
+    and decode_block sums them back with the same wrap.
+    """
+    lat = np.round(np.asarray(lat) * COORD_SCALE).astype(np.int64)
+    lon = np.round(np.asarray(lon) * COORD_SCALE).astype(np.int64)
+    columns = (np.diff(t, prepend=t[0]).astype('<i4'), np.diff(lat, prepend=0).astype('<i4'),
+               _wrap_i4(np.diff(lon, prepend=0)).astype('<i4'), _scaled(speed, 10), _scaled(course, 10))
+    return zlib.compress(b''.join(column.tobytes() for column in columns), 6)
+
+
+def decode_block(raw: bytes, count: int, first: int) -> Tuple[np.ndarray, ...]:
+    """Inverse of encode_block: (timestamp, lat, lon, speed, course) arrays"""
+    buffer = zlib.decompress(raw)
+    dt, dlat, dlon = (np.frombuffer(buffer, '<i4', count, 4 * count * k) for k in range(3))
+    speed, course = (np.frombuffer(buffer, '<u2', count, 12 * count + 2 * count * k).astype(np.float64)
+                     for k in range(2))
+    speed[speed == UNKNOWN] = np.nan
+    course[course == UNKNOWN] = np.nan
+    return (first + np.cumsum(dt, dtype=np.int64),
+            np.cumsum(dlat, dtype=np.int64) / COORD_SCALE, _wrap_i4(np.cumsum(dlon, dtype=np.int64)) / COORD_SCALE,
+            speed / 10, course / 10)
+
+
+class TrackStore:
+    """Day-partitioned track segments under `path`; add() buffers points, flush() writes them"""
+
+    def __init__(self, path: str = TRACK_DIR, max_segments: int = MAX_SEGMENTS):
+        self.path = path
+        self.max_segments = max_segments
+        self.buffer: Dict[int, Dict[int, List[Tuple[np.ndarray, ...]]]] = {}
+        self.indexes: Dict[str, np.ndarray] = {}
+        os.makedirs(path, exist_ok=True)
+
+    # -- writing --
+
+    def add(self, key: int, t, lat, lon, speed=None, course=None) -> int:
+        """Buffer points for one vessel; returns how many were accepted"""
+        t = np.asarray(t, dtype=np.int64)
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        speed = np.full(len(t), np.nan) if speed is None else np.asarray(speed, dtype=np.float64)
+        course = np.full(len(t), np.nan) if course is None else np.asarray(course, dtype=np.float64)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        t, lat, lon, speed, course = t[valid], lat[valid], lon[valid], speed[valid], course[valid]
+        day = t // PARTITION_SECONDS
+        for partition in np.unique(day):
+            rows = day == partition
+            self.buffer.setdefault(int(partition), {}).setdefault(key, []).append(
+                (t[rows], lat[rows], lon[rows], speed[rows], course[rows]))
+        return len(t)
+
+    def add_history(self, key: int, data) -> int:
+        """Buffer the points of one vessel_history `data` value"""
+        return self.add(key, *history_points(data))
+
+    def flush(self):
+        """Write one segment per buffered partition, compacting partitions that have too many"""
+        buffer, self.buffer = self.buffer, {}
+        for partition, vessels in buffer.items():
+            blocks = {key: tuple(np.concatenate(column) for column in zip(*chunks)) for key, chunks in vessels.items()}
+            self._write_segment(partition, blocks)
+            if len(self.segments(partition)) > self.max_segments:
+                self.compact(partition)
+
+    def _write_segment(self, partition: int, blocks: Dict[int, Tuple[np.ndarray, ...]]):
+        directory = os.path.join(self.path, self.partition_name(partition))
+        os.makedirs(directory, exist_ok=True)
+        keys = sorted(blocks)
+        index = np.zeros(len(keys), dtype=INDEX_DTYPE)
+        payloads = []
+        offset = len(MAGIC) + 4 + INDEX_DTYPE.itemsize * len(keys)
+        for row, key in enumerate(keys):
+            t, lat, lon, speed, course = _latest_per_timestamp(*blocks[key])
+            payload = encode_block(t, lat, lon, speed, course)
+            index[row] = (key, offset, len(payload), len(t), t[0], t[-1])
+            payloads.append(payload)
+            offset += len(payload)
+
+        # Names sort in write order, which is how duplicate points are resolved
+        path = os.path.join(directory, f"seg-{time.time_ns():020d}-{os.getpid()}.trk")
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + np.uint32(len(keys)).tobytes() + index.tobytes())
+            for payload in payloads:
+                f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def compact(self, partition: Optional[int] = None):
+        """Merge each partition's segments (or just `partition`'s) into one, dropping duplicate points"""
+        for day in ([partition] if partition is not None else self.partitions()):
+            segments = self.segments(day)
+            if len(segments) < 2:
+                continue
+            merged: Dict[int, List[Tuple[np.ndarray, ...]]] = {}
+            for segment in segments:
+                index = self._index(segment)
+                with open(segment, 'rb') as f:
+                    for entry in index:
+                        f.seek(int(entry['offset']))
+                        merged.setdefault(int(entry['key']), []).append(
+                            decode_block(f.read(int(entry['length'])), int(entry['count']), int(entry['first'])))
+            self._write_segment(day, {key: tuple(np.concatenate(c) for c in zip(*chunks))
+                                      for key, chunks in merged.items()})
+            # A crash before these removals only leaves duplicates, which reads already resolve
+            for segment in segments:
+                os.remove(segment)
+                self.indexes.pop(segment, None)
+
+    # -- reading --
+
+    @staticmethod
+    def partition_name(partition: int) -> str:
+        return time.strftime('%Y-%m-%d', time.gmtime(partition * PARTITION_SECONDS))
+
+    def partitions(self, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Partition numbers (days since the epoch) on disk that overlap [start, end]"""
+        days = []
+        for name in os.listdir(self.path):
+            try:
+                day = int(datetime.strptime(name, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) // PARTITION_SECONDS
+            except ValueError:
+                continue
+            if (start is None or day >= start // PARTITION_SECONDS) and (end is None or day <= end // PARTITION_SECONDS):
+                days.append(day)
+        return sorted(days)
+
+    def segments(self, partition: int) -> List[str]:
+        directory = os.path.join(self.path, self.partition_name(partition))
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith('.trk')]
+
+    def _index(self, segment: str) -> np.ndarray:
+        # Segments are immutable, so their index is cached for as long as they exist
+        index = self.indexes.get(segment)
+        if index is None:
+            with open(segment, 'rb') as f:
+                header = f.read(len(MAGIC) + 4)
+                if header[:len(MAGIC)] != MAGIC:
+                    raise ValueError(f"{segment} is not a track segment")
+                count = int(np.frombuffer(header, '<u4', 1, len(MAGIC))[0])
+                index = np.frombuffer(f.read(INDEX_DTYPE.itemsize * count), INDEX_DTYPE)
+            self.indexes[segment] = index
+        return index
+
+    def query(self, key: int, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Points of one vessel with start <= timestamp <= end (epoch seconds), oldest first"""
+        chunks = []
+        for partition in self.partitions(start, end):
+            for segment in self.segments(partition):
+                index = self._index(segment)
+                row = np.searchsorted(index['key'], key)
+                if row == len(index) or index['key'][row] != key:
+                    continue
+                entry = index[row]
+                if (start is not None and entry['last'] < start) or (end is not None and entry['first'] > end):
+                    continue
+                with open(segment, 'rb') as f:
+                    f.seek(int(entry['offset']))
+                    chunks.append(decode_block(f.read(int(entry['length'])), int(entry['count']), int(entry['first'])))
+
+        if chunks:
+            t, lat, lon, speed, course = _latest_per_timestamp(*(np.concatenate(c) for c in zip(*chunks)))
+        else:
+            t, lat, lon, speed, course = history_points([])
+        rows = np.ones(len(t), dtype=bool)
+        if start is not None:
+            rows &= t >= start
+        if end is not None:
+            rows &= t <= end
+        return {'timestamp': t[rows], 'lat': lat[rows], 'lon': lon[rows], 'speed': speed[rows], 'course': course[rows]}
+
+    def last(self, key: int, days: float = 7, now: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """The vessel's points from the last `days` days"""
+        now = int(now if now is not None else time.time())
+        return self.query(key, now - int(days * 86400), now)
+
+    def keys(self, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        """Vessel keys with segments in the partitions overlapping [start, end]"""
+        keys = set()
+        for partition in self.partitions(start, end):
+            for segment in self.segments(partition):
+                keys.update(self._index(segment)['key'].tolist())
+        return sorted(keys)
+
+    def stats(self) -> Dict:
+        stats = {'partitions': 0, 'segments': 0, 'points': 0, 'bytes': 0, 'vessels': set()}
+        for partition in self.partitions():
+            stats['partitions'] += 1
+            for segment in self.segments(partition):
+                index = self._index(segment)
+                stats['segments'] += 1
+                stats['points'] += int(index['count'].sum())
+                stats['bytes'] += os.path.getsize(segment)
+                stats['vessels'].update(index['key'].tolist())
+        stats['vessels'] = len(stats['vessels'])
+        return stats
+
+
+def to_points(track: Dict[str, np.ndarray]) -> List[Dict]:
+    """Query result as the point list tracker.js draws (lat, lon, timestamp, speed, course)"""
+    points = []
+    for t, lat, lon, speed, course in zip(*(track[c].tolist() for c in ('timestamp', 'lat', 'lon', 'speed', 'course'))):
+        points.append({'lat': round(lat, 7), 'lon': round(lon, 7),
+                       'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(t)),
+                       'speed': None if speed != speed else speed, 'course': None if course != course else course})
+    return points
+
+
+def ingest_fleet(store: TrackStore, vessels: Iterable[Dict], api: PositionAPI, date_from: str, date_to: str,
+                 concurrency: int = 8, retries: int = 3, flush_every: int = 100) -> Dict:
+    """Fetch vessel_history for every vessel with an identifier and add it to the store"""
+    targets = {}
+    for vessel in vessels:
+        key = vessel_key(vessel)
+        if key is not None:
+            targets.setdefault(key, vessel)
+
+    engine = CrawlEngine(concurrency=concurrency, rate=0, retries=retries, retry_if=is_transient_error)
+    stats = {'vessels': 0, 'points': 0, 'not_found': 0, 'failed': 0, 'over_budget': 0}
+    pending = 0
+    for done, (_, key, data, error) in enumerate(
+            engine.run(list(targets), lambda key: api.history(targets[key], date_from, date_to)), start=1):
+        if isinstance(error, BudgetExhausted):
+            stats['over_budget'] += 1
+            continue
+        if error is not None:
+            stats['failed'] += 1
+            print(f"[{done}/{len(targets)}] ✗ {targets[key].get('vessel_name', '')}: {error}")
+            continue
+        if data is None:
+            stats['not_found'] += 1
+            continue
+        stats['vessels'] += 1
+        stats['points'] += store.add_history(key, data)
+        pending += 1
+        if pending >= flush_every:
+            store.flush()
+            pending = 0
+            print(f"[{done}/{len(targets)}] {stats['points']} points from {stats['vessels']} vessels")
+    store.flush()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest and query compact vessel history tracks")
+    parser.add_argument('--store', default=TRACK_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="fetch vessel_history for the whole fleet")
+    ingest.add_argument('--fleet', default='../app/data/shadow_fleet.json')
+    ingest.add_argument('--days', type=int, default=7, help="history window ending today")
+    ingest.add_argument('--api-key', default=None, help=f"defaults to ${API_KEY_ENV}")
+    ingest.add_argument('--api-base', default=API_BASE)
+    ingest.add_argument('--concurrency', type=int, default=8)
+    ingest.add_argument('--rate', type=float, default=10.0, help="API requests per second")
+    ingest.add_argument('--credits', type=int, default=None, help="stop spending after this many credits")
+
+    query = commands.add_parser('query', help="points for one vessel")
+    query.add_argument('--mmsi', default=None)
+    query.add_argument('--imo', default=None)
+    query.add_argument('--days', type=float, default=7)
+    query.add_argument('--output', default=None, help="write the points as JSON")
+
+    commands.add_parser('compact', help="merge every partition into one segment")
+    commands.add_parser('stats', help="summarize the store")
+    args = parser.parse_args()
+
+    store = TrackStore(args.store)
+    if args.command == 'ingest':
+        api_key = args.api_key or os.environ.get(API_KEY_ENV)
+        if not api_key:
+            raise SystemExit(f"✗ {API_KEY_ENV} is not set (or pass --api-key)")
+        with open(args.fleet, 'r', encoding='utf-8') as f:
+            vessels = json.load(f)
+        today = datetime.now(timezone.utc).date()
+        date_from, date_to = (today - timedelta(days=args.days)).isoformat(), today.isoformat()
+        http_session.configure(max_per_host=args.concurrency)
+        budget = CreditBudget(args.credits)
+        api = PositionAPI(api_key, args.api_base, budget, TokenBucket(args.rate))
+        start = time.monotonic()
+        stats = ingest_fleet(store, vessels, api, date_from, date_to, args.concurrency)
+        print(f"\n✓ {stats['points']} points from {stats['vessels']} vessels ({date_from} to {date_to}), "
+              f"{stats['not_found']} without history, {stats['failed']} failed, {stats['over_budget']} over budget")
+        print(f"💳 {budget.used} credits in {time.monotonic() - start:.1f}s")
+    elif args.command == 'query':
+        key = vessel_key({'MMSI': args.mmsi, 'IMO': args.imo})
+        if key is None:
+            raise SystemExit("✗ pass --mmsi or --imo")
+        start = time.perf_counter()
+        track = store.last(key, args.days)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {len(track['timestamp'])} points in the last {args.days:g} days ({elapsed * 1000:.2f} ms)")
+        if args.output:
+            write_json_atomic(args.output, to_points(track))
+            print(f"Saved to {args.output}")
+    elif args.command == 'compact':
+        store.compact()
+    stats = store.stats()
+    print(f"{stats['points']} points for {stats['vessels']} vessels in {stats['partitions']} partitions, "
+          f"{stats['segments']} segments, {stats['bytes'] / 1024:.0f} KB")
@@ -0,0 +1,219 @@
+"""Level-of-detail vessel trails for the tracker map.
+
+Every track in the track store is simplified once: each point gets an
+importance in Web Mercator units, from Douglas-Peucker (the deviation at
+which the point is split off, capped by its parent's so levels nest) or
+Visvalingam-Whyatt (square root of its effective area). A zoom level keeps
+the points whose importance is at least `tolerance_px` screen pixels at that
+zoom, so one pass yields every level and a level never drifts more than the
+tolerance from the full track (Douglas-Peucker).
+
+Each level is written as a GeoJSON LineString with coordinates rounded to
+what that zoom can show, content-hashed next to the other build artifacts,
+and listed in trails.json. tracker.js loads only the level for the current
+zoom and swaps it on zoomend, falling back to the live history API for
+vessels without a prebuilt trail.
+
+    python trail_lod.py --store tracks --days 7 --output-dir ../app/data
+"""
+import argparse
+import heapq
+import math
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from build_frontend_data import content_name, minify, write_artifacts
+from track_store import TRACK_DIR, TrackStore
+
+ZOOM_LEVELS = (3, 6, 9, 12)  # map.js allows zoom 2-12
+TOLERANCE_PX = 1.0
+TILE_SIZE = 256
+TRAIL_DIR = 'trails'
+TRAIL_INDEX = 'trails.json'
+MAX_LAT = 85.05112878
+
+
+def mercator(lon, lat) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalized Web Mercator (0..1 across the world); longitudes are unwrapped across the antimeridian"""
+    lon = np.degrees(np.unwrap(np.radians(np.asarray(lon, dtype=np.float64))))
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LAT, MAX_LAT))
+    return (lon + 180) / 360, (1 - np.log(np.tan(np.pi / 4 + lat / 2)) / np.pi) / 2
+
+
+def zoom_tolerance(zoom: float, tolerance_px: float = TOLERANCE_PX) -> float:
+    """`tolerance_px` screen pixels at `zoom`, in normalized Mercator units"""
+    return tolerance_px / (TILE_SIZE * 2 ** zoom)
+
+
+def _segment_distance(x, y, points, starts, ends) -> np.ndarray:
+    """Distance from each point to the segment (start, end) paired with it"""
+    ax, ay = x[starts], y[starts]
+    dx, dy = x[ends] - ax, y[ends] - ay
+    length2 = dx * dx + dy * dy
+    px, py = x[points] - ax, y[points] - ay
+    t = np.clip((px * dx + py * dy) / np.where(length2 > 0, length2, 1), 0, 1)
+    return np.hypot(px - t * dx, py - t * dy)
+
+
+def douglas_peucker(x: np.ndarray, y: np.ndarray, min_tolerance: float = 0.0) -> np.ndarray:
+    """Douglas-Peucker importance of every point.
+
+    All open segments are split in the same vectorized round, so the number
+    of numpy passes is the recursion depth rather than the point count.
+    Keeping points with importance >= tol gives exactly the classic result at
+    tol; segments flatter than `min_tolerance` are not split further.
+    """
+    n = len(x)
+    importance = np.zeros(n)
+    importance[[0, n - 1]] = np.inf
+    starts, ends, caps = np.array([0]), np.array([n - 1]), np.array([np.inf])
+    while len(starts):
+        interior = ends - starts - 1
+        open_ = interior > 0
+        starts, ends, caps, interior = starts[open_], ends[open_], caps[open_], interior[open_]
+        if not len(starts):
+            break
+        first = np.concatenate(([0], np.cumsum(interior)[:-1]))
+        segment = np.repeat(np.arange(len(starts)), interior)
+        points = np.arange(interior.sum()) - np.repeat(first, interior) + np.repeat(starts + 1, interior)
+        distance = _segment_distance(x, y, points, starts[segment], ends[segment])
+
+        farthest = np.maximum.reduceat(distance, first)
+        at_max = np.flatnonzero(distance == farthest[segment])
+        _, first_max = np.unique(segment[at_max], return_index=True)
+        split = points[at_max[first_max]]
+
+        deep = farthest >= min_tolerance if min_tolerance > 0 else farthest > 0
+        split, starts, ends = split[deep], starts[deep], ends[deep]
+        weight = np.minimum(farthest[deep], caps[deep])
+        importance[split] = weight
+        starts, ends = np.concatenate((starts, split)), np.concatenate((split, ends))
+        caps = np.concatenate((weight, weight))
+    return importance
+
+
+def visvalingam(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Visvalingam-Whyatt importance: sqrt of each point's effective area, never below an earlier removal's"""
+    n = len(x)
+    importance = np.full(n, np.inf)
+    if n < 3:
+        return importance
+    xs, ys = x.tolist(), y.tolist()
+
+    def area(a, b, c):
+        return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2
+
+    previous, following = list(range(-1, n - 1)), list(range(1, n + 1))
+    current = [0.0] + [area(i - 1, i, i + 1) for i in range(1, n - 1)] + [0.0]
+    heap = [(current[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    removed = [False] * n
+    floor = 0.0
+    while heap:
+        value, i = heapq.heappop(heap)
+        if removed[i] or value != current[i]:
+            continue  # stale entry, the point's area changed since it was pushed
+        removed[i] = True
+        floor = max(floor, value)
+        importance[i] = math.sqrt(floor)
+        before, after = previous[i], following[i]
+        following[before], previous[after] = after, before
+        for j in (before, after):
+            if 0 < j < n - 1:
+                current[j] = area(previous[j], j, following[j])
+                heapq.heappush(heap, (current[j], j))
+    return importance
+
+
+SIMPLIFIERS = {'dp': douglas_peucker, 'vw': visvalingam}
+
+
+def point_importance(lon, lat, method: str = 'dp', zooms: Sequence[int] = ZOOM_LEVELS,
+                     tolerance_px: float = TOLERANCE_PX) -> np.ndarray:
+    x, y = mercator(lon, lat)
+    if method == 'dp':
+        return douglas_peucker(x, y, zoom_tolerance(max(zooms), tolerance_px))
+    return SIMPLIFIERS[method](x, y)
+
+
+def decimals_for_zoom(zoom: int, tolerance_px: float = TOLERANCE_PX) -> int:
+    """Decimal places that keep rounding within a quarter of the tolerance at `zoom`"""
+    degrees = 360 * zoom_tolerance(zoom, tolerance_px) / 4
+    return max(0, math.ceil(-math.log10(degrees)))
+
+
+def lod_coordinates(lon, lat, weights, zoom: int, tolerance_px: float = TOLERANCE_PX) -> List[List[float]]:
+    """[lon, lat] pairs kept at `zoom`, rounded for it, without consecutive repeats"""
+    keep = np.flatnonzero(weights >= zoom_tolerance(zoom, tolerance_px))
+    places = decimals_for_zoom(zoom, tolerance_px)
+    coordinates = np.round(np.column_stack((np.degrees(np.unwrap(np.radians(lon)))[keep], lat[keep])), places)
+    distinct = np.ones(len(coordinates), dtype=bool)
+    distinct[1:] = np.any(coordinates[1:] != coordinates[:-1], axis=1)
+    return coordinates[distinct].tolist()
+
+
+def trail_levels(track: Dict[str, np.ndarray], method: str = 'dp', zooms: Sequence[int] = ZOOM_LEVELS,
+                 tolerance_px: float = TOLERANCE_PX) -> Dict[int, List[List[float]]]:
+    """Coordinates per zoom level for one TrackStore query result"""
+    lon, lat = track['lon'], track['lat']
+    weights = point_importance(lon, lat, method, zooms, tolerance_px)
+    return {zoom: lod_coordinates(lon, lat, weights, zoom, tolerance_px) for zoom in zooms}
+
+
+def trail_feature(key: int, track: Dict[str, np.ndarray], coordinates: List[List[float]]) -> bytes:
+    """Minified GeoJSON LineString Feature for one level"""
+    properties = {'key': key, 'from': int(track['timestamp'][0]), 'to': int(track['timestamp'][-1])}
+    return minify({'type': 'Feature', 'properties': properties,
+                   'geometry': {'type': 'LineString', 'coordinates': coordinates}})
+
+
+def build_trails(store_path: str = TRACK_DIR, output_dir: str = '../app/data', days: float = 7,
+                 method: str = 'dp', zooms: Sequence[int] = ZOOM_LEVELS, tolerance_px: float = TOLERANCE_PX) -> Dict:
+    store = TrackStore(store_path)
+    end = int(time.time())
+    start = end - int(days * 86400)
+
+    files, vessels = {}, {}
+    raw_points, level_points = 0, {zoom: 0 for zoom in zooms}
+    began = time.perf_counter()
+    for key in store.keys(start, end):
+        track = store.query(key, start, end)
+        if len(track['timestamp']) < 2:
+            continue
+        raw_points += len(track['timestamp'])
+        levels = {}
+        for zoom, coordinates in trail_levels(track, method, zooms, tolerance_px).items():
+            # Levels that come out identical share one file
+            body = trail_feature(key, track, coordinates)
+            name = content_name(str(key), body)
+            files[name] = body
+            levels[str(zoom)] = f"{TRAIL_DIR}/{name}"
+            level_points[zoom] += len(coordinates)
+        vessels[str(key)] = levels
+    elapsed = time.perf_counter() - began
+
+    index = {'version': 1, 'days': days, 'generated': end, 'method': method, 'tolerance_px': tolerance_px,
+             'zooms': list(zooms), 'vessels': vessels}
+    stale = write_artifacts(output_dir, index, files, build_dir=TRAIL_DIR, manifest_file=TRAIL_INDEX)
+
+    print(f"✓ {len(vessels)} trails from {raw_points} points in {elapsed:.2f}s ({method}, {tolerance_px:g} px)")
+    for zoom in zooms:
+        print(f"  zoom {zoom:>2}: {level_points[zoom]:8d} points ({level_points[zoom] / max(raw_points, 1):.1%})")
+    print(f"  {len(files)} files, {sum(map(len, files.values())) / 1024:.0f} KB; "
+          f"{TRAIL_INDEX} written to {output_dir}, {len(stale)} stale files removed")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build zoom-dependent simplified vessel trails")
+    parser.add_argument('--store', default=TRACK_DIR)
+    parser.add_argument('--output-dir', default='../app/data')
+    parser.add_argument('--days', type=float, default=7, help="trail length, ending now")
+    parser.add_argument('--method', choices=sorted(SIMPLIFIERS), default='dp')
+    parser.add_argument('--zooms', type=int, nargs='+', default=list(ZOOM_LEVELS))
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE_PX, help="max deviation in screen pixels")
+    args = parser.parse_args()
+
+    build_trails(args.store, args.output_dir, args.days, args.method, sorted(args.zooms), args.tolerance)
@@ -0,0 +1,257 @@
+"""Columnar snapshot of the vessel registry for analytics scripts.
+
+A snapshot is a directory holding one .npy file per column plus meta.json:
+
+    int        IMO, MMSI as int64, 0 where the field is empty
+    float      speed, course as float64, NaN where missing
+    position   lat/lon float64 columns plus a bool null mask
+    timestamp  lastUpdate as datetime64[s], NaT where missing
+    category   flag, vessel_type, category, navStatus as int32 codes into a
+               dictionary kept in meta.json
+    string     names, URLs and text as a UTF-8 byte blob plus int64 offsets
+               and a bool null mask
+    json       sanctions and any other nested or unexpected field, one JSON
+               document per row stored like a string column
+
+Columns are opened with np.load(mmap_mode='r'), so opening a snapshot reads
+only meta.json and a filter pages in just the columns it touches. A field
+whose values do not fit its preferred kind (a non-numeric IMO, an
+unparseable timestamp) falls back to json, so export and records() round-trip.
+
+    python vessel_columns.py --input shadow_fleet.json --output shadow_fleet.columns
+"""
+import argparse
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+
+INT_FIELDS = ('IMO', 'MMSI')
+FLOAT_FIELDS = ('speed', 'course')
+TIMESTAMP_FIELDS = ('lastUpdate',)
+CATEGORY_FIELDS = ('flag', 'vessel_type', 'category', 'navStatus')
+STRING_FIELDS = ('vessel_name', 'vessel_photo_url', 'vessel_information', 'destination')
+POSITION_FIELD = 'position'
+
+
+def _encode_strings(values: List[str]) -> Dict[str, np.ndarray]:
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return {'offsets': offsets, 'data': np.frombuffer(b''.join(encoded), dtype=np.uint8)}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _int_column(values: List) -> np.ndarray:
+    # Leading zeros would not survive the round trip through int
+    if not all(value == '' or (isinstance(value, str) and value.isdigit() and value[0] != '0') for value in values):
+        raise ValueError('not all digits')
+    return np.array([int(value) if value else 0 for value in values], dtype=np.int64)
+
+
+def _float_column(values: List) -> np.ndarray:
+    if not all(value is None or _is_number(value) for value in values):
+        raise ValueError('not all numbers')
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _timestamp_column(values: List) -> np.ndarray:
+    if not all(value is None or (isinstance(value, str) and value.endswith('Z')) for value in values):
+        raise ValueError('not all UTC timestamps')
+    column = np.array([value[:-1] if value else 'NaT' for value in values], dtype='datetime64[s]')
+    # Reject anything datetime64 would not print back identically (fractions, offsets)
+    decoded = np.datetime_as_string(column, unit='s')
+    for value, text in zip(values, decoded):
+        if value and value != text + 'Z':
+            raise ValueError(f'timestamp {value!r} does not round-trip')
+    return column
+
+
+def _null_mask(values: List) -> np.ndarray:
+    return np.array([value is None for value in values], dtype=bool)
+
+
+def _position_columns(values: List) -> Dict[str, np.ndarray]:
+    if not all(value is None or (isinstance(value, dict) and set(value) == {'lat', 'lon'}) for value in values):
+        raise ValueError('not all lat/lon positions')
+    return {
+        'lat': _float_column([value['lat'] if value else None for value in values]),
+        'lon': _float_column([value['lon'] if value else None for value in values]),
+        'null': _null_mask(values),
+    }
+
+
+def _build_column(field: str, values: List):
+    """Return (kind, {file suffix: array}, dictionary) for one field, falling back to json"""
+    try:
+        if field in INT_FIELDS:
+            return 'int', {'': _int_column(values)}, None
+        if field in FLOAT_FIELDS:
+            return 'float', {'': _float_column(values)}, None
+        if field in TIMESTAMP_FIELDS:
+            return 'timestamp', {'': _timestamp_column(values)}, None
+        if field == POSITION_FIELD:
+            return 'position', {'.' + axis: column for axis, column in _position_columns(values).items()}, None
+        if field in CATEGORY_FIELDS:
+            dictionary = list(dict.fromkeys(values))
+            if not all(value is None or isinstance(value, str) for value in dictionary):
+                raise ValueError('not all strings')
+            codes = {value: code for code, value in enumerate(dictionary)}
+            return 'category', {'': np.array([codes[value] for value in values], dtype=np.int32)}, dictionary
+        if field in STRING_FIELDS:
+            if not all(value is None or isinstance(value, str) for value in values):
+                raise ValueError('not all strings')
+            arrays = _encode_strings([value or '' for value in values])
+            arrays['null'] = _null_mask(values)
+            return 'string', {'.' + part: array for part, array in arrays.items()}, None
+    except ValueError:
+        pass
+    documents = [json.dumps(value, ensure_ascii=False) for value in values]
+    return 'json', {'.' + part: array for part, array in _encode_strings(documents).items()}, None
+
+
+def export_columns(vessels: List[Dict], path: str) -> Dict:
+    """Write `vessels` as a columnar snapshot directory at `path`, replacing any previous one"""
+    fields = list(dict.fromkeys(field for vessel in vessels for field in vessel))
+    meta = {'version': FORMAT_VERSION, 'rows': len(vessels), 'fields': fields, 'columns': {}}
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path)
+    for field in fields:
+        kind, arrays, dictionary = _build_column(field, [vessel.get(field) for vessel in vessels])
+        meta['columns'][field] = {'kind': kind}
+        if dictionary is not None:
+            meta['columns'][field]['dictionary'] = dictionary
+        for suffix, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{field}{suffix}.npy"), array)
+    with open(os.path.join(tmp_path, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # Swap directories so readers never open a half-written snapshot
+    old_path = f"{path}.old{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return meta
+
+
+class VesselColumns:
+    """Read-only view of a columnar snapshot.
+
+    Numeric, timestamp and category columns come back as (memory-mapped)
+    NumPy arrays for vectorized filtering; row indices from those filters
+    then select the few string values or whole records that are needed:
+
+        fleet = VesselColumns('shadow_fleet.columns')
+        rows = np.flatnonzero(fleet.equals('flag', 'Panama') & (fleet.column('lat') > 54))
+        names = fleet.values('vessel_name', rows)
+    """
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        self.mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot version {self.meta['version']}")
+        self.rows = self.meta['rows']
+        self.fields = self.meta['fields']
+        self._arrays = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=self.mmap_mode)
+        return self._arrays[name]
+
+    def kind(self, field: str) -> str:
+        return self.meta['columns'][field]['kind']
+
+    def column(self, name: str) -> np.ndarray:
+        """Array for an int, float, timestamp or category (codes) field; 'lat'/'lon' for positions"""
+        if name in ('lat', 'lon') and name not in self.meta['columns']:
+            return self._array(f"{POSITION_FIELD}.{name}")
+        kind = self.kind(name)
+        if kind in ('string', 'json', 'position'):
+            raise ValueError(f"{name} is a {kind} column, use values()")
+        return self._array(name)
+
+    def categories(self, field: str) -> List[Optional[str]]:
+        return self.meta['columns'][field]['dictionary']
+
+    def equals(self, field: str, value) -> np.ndarray:
+        """Boolean mask of rows whose `field` equals `value`"""
+        kind = self.kind(field)
+        if kind == 'category':
+            categories = self.categories(field)
+            if value not in categories:
+                return np.zeros(self.rows, dtype=bool)
+            return self.column(field) == categories.index(value)
+        if kind == 'int':
+            return self.column(field) == (int(value) if value else 0)
+        if kind in ('float', 'timestamp'):
+            return self.column(field) == value
+        return np.array([candidate == value for candidate in self.values(field)], dtype=bool)
+
+    def _decode_blob(self, field: str, rows) -> List[str]:
+        offsets = self._array(f"{field}.offsets")
+        data = self._array(f"{field}.data")
+        return [bytes(data[offsets[row]:offsets[row + 1]]).decode('utf-8') for row in rows]
+
+    def values(self, field: str, rows: Optional[Iterable[int]] = None) -> List:
+        """Decoded Python values of `field`, for `rows` (default: every row)"""
+        rows = range(self.rows) if rows is None else [int(row) for row in rows]
+        kind = self.kind(field)
+        if kind == 'string':
+            null = self._array(f"{field}.null")
+            return [None if null[row] else text for row, text in zip(rows, self._decode_blob(field, rows))]
+        if kind == 'json':
+            return [json.loads(document) for document in self._decode_blob(field, rows)]
+        if kind == 'category':
+            categories, codes = self.categories(field), self.column(field)
+            return [categories[codes[row]] for row in rows]
+        if kind == 'int':
+            column = self.column(field)
+            return [str(column[row]) if column[row] else '' for row in rows]
+        if kind == 'float':
+            column = self.column(field)
+            return [None if np.isnan(column[row]) else column[row].item() for row in rows]
+        if kind == 'timestamp':
+            column = self.column(field)
+            return [None if np.isnat(column[row]) else f"{column[row]}Z" for row in rows]
+        lat, lon, null = self.column('lat'), self.column('lon'), self._array(f"{field}.null")
+
+        def coordinate(value):
+            return None if np.isnan(value) else value.item()
+
+        return [None if null[row] else {'lat': coordinate(lat[row]), 'lon': coordinate(lon[row])} for row in rows]
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Materialize full vessel dicts for `rows` (default: every row)"""
+        rows = list(range(self.rows) if rows is None else rows)
+        columns = {field: self.values(field, rows) for field in self.fields}
+        return [{field: columns[field][i] for field in self.fields} for i in range(len(rows))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the vessel registry as a columnar snapshot")
+    parser.add_argument('--input', default='shadow_fleet.json')
+    parser.add_argument('--output', default='shadow_fleet.columns')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        vessels = json.load(f)
+    meta = export_columns(vessels, args.output)
+    kinds = ', '.join(f"{field}:{column['kind']}" for field, column in meta['columns'].items())
+    print(f"✓ {meta['rows']} vessels exported to {args.output}/ ({kinds})")
@@ -0,0 +1,191 @@
+"""Field extraction for vessel pages with interchangeable HTML backends.
+
+Every backend reduces a page to the same two inputs, the document text (what
+BeautifulSoup's get_text() returns) and the first /uploads/ or /media/ image,
+and the precompiled patterns below turn those into a vessel record.
+
+Backends:
+    bs4   BeautifulSoup with html.parser, the reference implementation
+    lxml  lxml.html with XPath text/img selection (requires lxml)
+    fast  stdlib-only regex tokenizer, no tree is built
+    auto  fast, which measures quickest in bench_extract.py
+"""
+import html
+import re
+from typing import Dict, Optional, Tuple
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+SITE_URL = "https://war-sanctions.gur.gov.ua"
+
+NAME_RE = re.compile(r'Vessel\s*name\s*([A-Z0-9\s\-\.]+?)(?=Category|IMO)', re.IGNORECASE)
+IMO_RE = re.compile(r'IMO\s*(\d+)')
+MMSI_RE = re.compile(r'MMSI\s*(\d+)')
+FLAG_RE = re.compile(r'Flag\s*\(Current\)\s*([A-Za-z\s]+?)(?=MMSI|Vessel\s*Type|Call)')
+TYPE_RE = re.compile(r'Vessel\s*Type\s*([A-Za-z\s/\-]+?)(?=Length|Gross|DWT|P&I)')
+CATEGORY_RE = re.compile(r'Category\s*(.+?)(?=IMO|Flag|MMSI)', re.DOTALL)
+INFO_RE = re.compile(
+    r'(?:Justification|Vessel information)\s*(.+?)(?=Cases of AIS|Visited ports|Available additional|Web Resources|Go to site|$)',
+    re.DOTALL
+)
+SANCTION_RE = re.compile(
+    r'(?:On|From|Since|In)\s+[A-Za-z]+\s+\d{1,2},?\s+\d{4},?\s+(?:the\s+)?([A-Z][A-Za-z\s,]+?)\s+(?:imposed|introduced|applied)\s+sanctions[^\.]*\.',
+    re.IGNORECASE
+)
+
+# Tokens for the fast backend. Markup that get_text() ignores (comments,
+# doctype, processing instructions, script/style bodies) is dropped first.
+SKIPPED_RE = re.compile(
+    r'<!--.*?-->|<script\b[^>]*>.*?</script\s*>|<style\b[^>]*>.*?</style\s*>|<![A-Za-z][^>]*>|<\?.*?>',
+    re.DOTALL | re.IGNORECASE
+)
+CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+TAG_RE = re.compile(r'''</?[A-Za-z][^\s/>]*(?:[^>"']|"[^"]*"|'[^']*')*>''')
+IMG_RE = re.compile(r'''<img\b(?:[^>"']|"[^"]*"|'[^']*')*>''', re.IGNORECASE)
+SRC_RE = re.compile(r'''\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+CR_PLACEHOLDER = '\ue000'
+
+BACKENDS = ('auto', 'bs4', 'lxml', 'fast')
+EXTRACTOR_VERSION = 1  # bump whenever a change here alters the records extracted from a page
+
+
+def is_photo(src: Optional[str]) -> bool:
+    return bool(src) and ('/uploads/' in src or '/media/' in src)
+
+
+def _escape_cdata(match) -> str:
+    return match.group(1).replace('&', '&amp;').replace('<', '&lt;')
+
+
+def _decode(content) -> str:
+    if isinstance(content, bytes):
+        return content.decode('utf-8', errors='replace')
+    return content
+
+
+def text_and_photo_bs4(content) -> Tuple[str, str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    img = soup.find('img', src=is_photo)
+    return soup.get_text(), img.get('src', '') if img else ''
+
+
+def text_and_photo_lxml(content) -> Tuple[str, str]:
+    if lxml is None:
+        raise ImportError("the lxml extractor requires 'pip install lxml'")
+    # libxml2 folds CR into LF and drops CDATA sections, both of which
+    # html.parser keeps, so protect them before parsing
+    page = CDATA_RE.sub(_escape_cdata, _decode(content)).replace('\r', CR_PLACEHOLDER)
+    doc = lxml.html.fromstring(page)
+    etree.strip_elements(doc, 'script', 'style', etree.Comment, etree.ProcessingInstruction, with_tail=False)
+    photo = next((src for src in doc.xpath('//img/@src') if is_photo(src)), '')
+    return ''.join(doc.xpath('//text()')).replace(CR_PLACEHOLDER, '\r'), photo
+
+
+def text_and_photo_fast(content) -> Tuple[str, str]:
+    page = _decode(content)
+    page = SKIPPED_RE.sub('', page)
+
+    photo = ''
+    for tag in IMG_RE.finditer(page):
+        src_match = SRC_RE.search(tag.group(0))
+        if src_match:
+            src = html.unescape(next(group for group in src_match.groups() if group is not None))
+            if is_photo(src):
+                photo = src
+                break
+
+    page = CDATA_RE.sub(_escape_cdata, page)
+    return html.unescape(TAG_RE.sub('', page)), photo
+
+
+TEXT_BACKENDS = {
+    'bs4': text_and_photo_bs4,
+    'lxml': text_and_photo_lxml,
+    'fast': text_and_photo_fast,
+}
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    if backend == 'auto':
+        return 'fast'
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"unknown extractor backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def record_version(backend: str = 'auto') -> str:
+    """Tag for cached records, so records from another backend or extractor version are parsed again"""
+    return f"{resolve_backend(backend)}/{EXTRACTOR_VERSION}"
+
+
+def extract_fields(page_text: str, photo_url: str) -> Dict:
+    """Build a vessel record from the page text and photo src"""
+    vessel_data = {
+        'vessel_name': '',
+        'IMO': '',
+        'MMSI': '',
+        'flag': '',
+        'vessel_type': '',
+        'category': '',
+        'vessel_photo_url': '',
+        'sanctions': [],
+        'vessel_information': ''
+    }
+
+    if photo_url and not photo_url.startswith('http'):
+        vessel_data['vessel_photo_url'] = f"{SITE_URL}{photo_url}"
+    else:
+        vessel_data['vessel_photo_url'] = photo_url
+
+    name_match = NAME_RE.search(page_text)
+    if name_match:
+        vessel_data['vessel_name'] = name_match.group(1).strip()
+
+    imo_match = IMO_RE.search(page_text)
+    if imo_match:
+        vessel_data['IMO'] = imo_match.group(1).strip()
+
+    mmsi_match = MMSI_RE.search(page_text)
+    if mmsi_match:
+        vessel_data['MMSI'] = mmsi_match.group(1).strip()
+
+    flag_match = FLAG_RE.search(page_text)
+    if flag_match:
+        vessel_data['flag'] = flag_match.group(1).strip()
+
+    type_match = TYPE_RE.search(page_text)
+    if type_match:
+        vessel_data['vessel_type'] = type_match.group(1).strip()
+
+    # Category - keep the first two distinct lines
+    category_match = CATEGORY_RE.search(page_text)
+    if category_match:
+        category_text = category_match.group(1).strip()
+        category_lines = [line.strip() for line in category_text.split('\n') if line.strip() and len(line.strip()) > 5]
+        unique_cats = []
+        for line in category_lines:
+            if line not in unique_cats and not line.startswith(('The ', 'On ', 'In ', 'From ', 'Since ')):
+                unique_cats.append(line)
+        vessel_data['category'] = ' → '.join(unique_cats[:2]) if len(unique_cats) > 1 else (unique_cats[0] if unique_cats else '')
+
+    info_match = INFO_RE.search(page_text)
+    if info_match:
+        vessel_data['vessel_information'] = info_match.group(1).strip()
+
+    # dict keeps first-seen order while deduplicating in O(1)
+    sanctions = dict.fromkeys(match.group(0).strip() for match in SANCTION_RE.finditer(page_text))
+    vessel_data['sanctions'] = [text for text in sanctions if text]
+
+    return vessel_data
+
+
+def extract_vessel(content, backend: str = 'auto') -> Dict:
+    """Extract a vessel record from raw page HTML with the chosen backend"""
+    page_text, photo_url = TEXT_BACKENDS[resolve_backend(backend)](content)
+    return extract_fields(page_text, photo_url)